@@ -32,6 +32,7 @@ DEPENDENCIES = [
     ("apscheduler", "APScheduler"),
     ("click", "Click"),
     ("dashscope", "DashScope"),
+    ("brotli", "Brotli"),
 ]
 
 
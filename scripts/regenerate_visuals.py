@@ -49,6 +49,7 @@ sys.path.insert(0, str(project_root / "src"))
 from reinvent_insight.core import config
 from reinvent_insight.services.analysis.visual_worker import VisualInterpretationWorker
 from reinvent_insight.services.analysis.task_manager import manager as task_manager
+from reinvent_insight.infrastructure.media.browser_pool import run_with_browser_pools
 
 
 def find_task_dir_for_article(article_path: Path) -> Optional[str]:
@@ -394,9 +395,9 @@ def main():
     
     # 执行
     start_time = time.time()
-    success, fail = asyncio.run(
+    success, fail = asyncio.run(run_with_browser_pools(
         process_batch(articles, args.concurrency, args.dry_run, args.delay)
-    )
+    ))
     elapsed = time.time() - start_time
     
     # 结果统计
@@ -81,8 +81,9 @@ async def startup_event():
     logger.info("应用启动")
     
     # Import startup services
-    from reinvent_insight.services.document.hash_registry import init_hash_mappings
-    from reinvent_insight.services.document.summary_cache import init_summary_cache
+    from reinvent_insight.services.document.hash_registry import init_hash_mappings, apply_hash_mapping_change
+    from reinvent_insight.services.document.summary_cache import init_summary_cache, apply_summary_cache_change
+    from reinvent_insight.services.document.document_cache import apply_document_cache_change
     from reinvent_insight.infrastructure.file_system.watcher import start_watching
     from reinvent_insight.services.startup_service import start_visual_watcher, init_post_processors
     from reinvent_insight.services.tts_pregeneration_service import get_tts_pregeneration_service
@@ -95,10 +96,12 @@ async def startup_event():
     # 2. Initialize summary cache (depends on hash mappings)
     init_summary_cache()
     
-    # 3. Start file monitoring (refresh both hash mappings and summary cache)
-    def on_file_change():
-        init_hash_mappings()
-        init_summary_cache()
+    # 3. Start file monitoring (incrementally update hash mappings, then summary and document caches)
+    def on_file_change(file_path):
+        filename = Path(file_path).name
+        affected_hashes = apply_hash_mapping_change(filename)
+        apply_summary_cache_change(filename)
+        apply_document_cache_change(filename, affected_hashes)
     start_watching(config.OUTPUT_DIR, on_file_change)
     
     # 4. Initialize post-processing pipeline
@@ -129,6 +132,29 @@ async def startup_event():
         logger.error(f"启动 Worker Pool 失败: {e}", exc_info=True)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Application shutdown event"""
+    from reinvent_insight.infrastructure.media.browser_pool import close_browser_pools
+    from reinvent_insight.services.document.pdf_render_service import shutdown_pdf_render_service
+    from reinvent_insight.services.analysis.visual_watcher import get_visual_watcher
+    from reinvent_insight.services.audio_cache import close_audio_caches
+
+    # Stop the visual interpretation scheduler (running generation tasks are left alone)
+    visual_watcher = get_visual_watcher()
+    if visual_watcher is not None:
+        visual_watcher.stop()
+
+    # Close shared Chromium browsers
+    await close_browser_pools()
+
+    # Stop PDF render workers
+    shutdown_pdf_render_service()
+
+    # Wait for audio encodes and flush batched audio cache access times
+    await asyncio.to_thread(close_audio_caches)
+
+
 # Mount static files
 web_dir = config.PROJECT_ROOT / "web"
 
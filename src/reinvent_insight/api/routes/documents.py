@@ -1,5 +1,6 @@
 """Document management routes"""
 
+import asyncio
 import logging
 import urllib.parse
 import shutil
@@ -12,6 +13,7 @@ from fastapi.responses import FileResponse, Response
 from reinvent_insight.core import config
 from reinvent_insight.api.routes.auth import verify_token
 from reinvent_insight.core.utils.file_utils import generate_doc_hash, is_pdf_document, get_source_identifier
+from reinvent_insight.core.utils.http_utils import etag_matches
 
 # Import from new modules
 from reinvent_insight.services.document.hash_registry import (
@@ -21,12 +23,11 @@ from reinvent_insight.services.document.hash_registry import (
     init_hash_mappings,
 )
 from reinvent_insight.services.document.metadata_service import (
-    parse_metadata_from_md,
     extract_text_from_markdown,
     count_chinese_words,
-    clean_content_metadata,
-    discover_versions,
 )
+from reinvent_insight.services.document.metadata_index import get_metadata_index
+from reinvent_insight.services.document.document_cache import get_document_cache
 
 logger = logging.getLogger(__name__)
 
@@ -134,10 +135,9 @@ async def check_summary_by_video_id(video_id: str):
         return {"exists": False, "hash": None, "title": None}
     
     try:
-        file_path = config.OUTPUT_DIR / filename
-        if file_path.exists():
-            content = file_path.read_text(encoding="utf-8")
-            metadata = parse_metadata_from_md(content)
+        record = get_metadata_index().get(config.OUTPUT_DIR / filename)
+        if record:
+            metadata = record.metadata
             title = metadata.get("title_cn") or metadata.get("title_en") or metadata.get("title", "")
             
             return {"exists": True, "hash": doc_hash, "title": title, "filename": filename}
@@ -147,9 +147,8 @@ async def check_summary_by_video_id(video_id: str):
     return {"exists": False, "hash": None, "title": None, "filename": None}
 
 
-@router.get("/public/summaries/{filename}")
-async def get_public_summary(filename: str):
-    """获取指定摘要文件的公开内容，无需认证。"""
+async def public_summary_response(filename: str, if_none_match: Optional[str] = None) -> Response:
+    """生成指定摘要文件的公开内容响应（带 ETag，命中 If-None-Match 时返回 304）"""
     try:
         filename = urllib.parse.unquote(filename)
         if ".." in filename or "/" in filename or "\\" in filename:
@@ -157,55 +156,18 @@ async def get_public_summary(filename: str):
             
         if not filename.endswith(".md"):
             filename += ".md"
-            
-        file_path = config.OUTPUT_DIR / filename
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="摘要文件未找到")
-        
-        content = file_path.read_text(encoding="utf-8")
-        metadata = parse_metadata_from_md(content)
-        
-        title_cn = metadata.get("title_cn")
-        title_en = metadata.get("title_en", metadata.get("title", ""))
-        
-        if not title_cn:
-            for line in content.splitlines():
-                stripped = line.strip()
-                if stripped.startswith('# '):
-                    title_cn = stripped[2:].strip()
-                    break
-        
-        if not title_cn:
-            title_cn = title_en if title_en else file_path.stem
-
-        video_url = metadata.get("video_url", "")
-        content_identifier = metadata.get("content_identifier", "")
         
-        # 兼容处理：旧文档可能将文档标识符存储在 video_url 中
-        # 如果 video_url 是文档格式（pdf://, txt://, md://, docx://），则转移到 content_identifier
-        if video_url and "://" in video_url and not video_url.startswith(("http://", "https://")):
-            # 这是文档标识符，不是视频 URL
-            if not content_identifier:
-                content_identifier = video_url
-            video_url = ""  # 前端不应该看到这个值
+        cache = get_document_cache()
+        try:
+            # 命中缓存只需 stat，未命中时在线程中读取并解析文档
+            entry = cache.peek(filename) or await asyncio.to_thread(cache.load, filename)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="摘要文件未找到")
         
-        source_id = content_identifier or video_url
-        versions = []
-        if source_id:
-            versions = discover_versions(source_id, config.OUTPUT_DIR)
-
-        cleaned_content = clean_content_metadata(content, title_cn)
-
-        return {
-            "filename": filename,
-            "title": title_cn,
-            "title_cn": title_cn,
-            "title_en": title_en,
-            "content": cleaned_content,
-            "video_url": video_url,
-            "content_identifier": content_identifier,
-            "versions": versions
-        }
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, [entry.etag]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -213,8 +175,14 @@ async def get_public_summary(filename: str):
         raise HTTPException(status_code=500, detail="读取摘要文件失败")
 
 
+@router.get("/public/summaries/{filename}")
+async def get_public_summary(filename: str, if_none_match: Optional[str] = Header(None)):
+    """获取指定摘要文件的公开内容，无需认证。"""
+    return await public_summary_response(filename, if_none_match)
+
+
 @router.get("/public/doc/{doc_hash}")
-async def get_public_summary_by_hash(doc_hash: str):
+async def get_public_summary_by_hash(doc_hash: str, if_none_match: Optional[str] = Header(None)):
     """通过统一hash获取指定摘要文件的公开内容。
     
     返回完整文档信息包括:
@@ -230,4 +198,4 @@ async def get_public_summary_by_hash(doc_hash: str):
     if not filename:
         raise HTTPException(status_code=404, detail="文档未找到")
     
-    return await get_public_summary(filename)
+    return await public_summary_response(filename, if_none_match)
@@ -2,15 +2,13 @@
 
 import logging
 import urllib.parse
-import subprocess
-import tempfile
 import re
-from pathlib import Path
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse, Response
 from urllib.parse import quote
 
 from reinvent_insight.core import config
+from reinvent_insight.services.document.pdf_render_service import get_pdf_render_service
 
 # Import from legacy for compatibility
 from reinvent_insight.services.document.metadata_service import (
@@ -104,41 +102,13 @@ async def get_summary_pdf(filename: str, response: Response):
             raise HTTPException(status_code=404, detail="摘要文件未找到")
         
         pdf_filename = filename.replace('.md', '.pdf')
-        pdf_dir = config.OUTPUT_DIR.parent / "pdfs"
-        pdf_dir.mkdir(exist_ok=True)
-        pdf_file_path = pdf_dir / pdf_filename
         
-        if not pdf_file_path.exists():
-            logger.info(f"生成PDF文件: {pdf_filename}")
-            
-            script_path = Path(__file__).parent.parent.parent / "tools" / "generate_pdfs.py"
-            logger.info(f"PDF生成脚本路径: {script_path}")
-            
-            if not script_path.exists():
-                logger.error(f"PDF生成工具不存在: {script_path}")
-                raise HTTPException(status_code=500, detail="PDF生成工具不存在")
-            
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_pdf_path = Path(temp_dir) / pdf_filename
-                
-                cmd = [
-                    "python",
-                    str(script_path),
-                    "-f", str(md_file_path),
-                    "-o", str(temp_dir),
-                    "--css", str(config.PROJECT_ROOT / "web" / "css" / "pdf_style.css")
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    logger.error(f"PDF生成失败: {result.stderr}")
-                    raise HTTPException(status_code=500, detail=f"PDF生成失败: {result.stderr or '未知错误'}")
-                
-                if temp_pdf_path.exists():
-                    temp_pdf_path.rename(pdf_file_path)
-                else:
-                    raise HTTPException(status_code=500, detail="PDF文件生成后未找到")
+        # 在常驻进程池中渲染（源文件未修改时直接返回已有PDF）
+        try:
+            pdf_file_path = await get_pdf_render_service().render(md_file_path)
+        except Exception as e:
+            logger.error(f"PDF生成失败: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"PDF生成失败: {str(e) or type(e).__name__}")
         
         if pdf_file_path.exists():
             logger.info(f"返回PDF文件: {pdf_filename}")
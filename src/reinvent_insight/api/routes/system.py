@@ -110,6 +110,64 @@ async def get_queue_stats():
     return worker_pool.get_stats()
 
 
+@router.get("/model/rate-limits")
+async def get_model_rate_limits():
+    """
+    获取模型调用限流状态（公开访问）
+    
+    返回每个 provider/model 当前的自适应并发上限、在途请求数、限流次数等
+    """
+    from reinvent_insight.infrastructure.ai.observability import get_manager
+    return get_manager().get_rate_limit_status()
+
+
+@router.get("/model/executors")
+async def get_model_executors():
+    """
+    获取模型 SDK 线程池状态（公开访问）
+    
+    返回每个 provider 线程池的运行/排队调用数、排队等待与调用耗时
+    """
+    from reinvent_insight.infrastructure.ai.observability import get_manager
+    return get_manager().get_executor_status()
+
+
+@router.get("/model/response-cache")
+async def get_model_response_cache():
+    """
+    获取模型响应缓存状态（公开访问）
+    
+    返回缓存是否启用、当前大小与命中率
+    """
+    from reinvent_insight.infrastructure.ai.observability import get_manager
+    return get_manager().get_response_cache_status()
+
+
+@router.get("/pdf/stats")
+async def get_pdf_render_stats():
+    """
+    获取 PDF 渲染服务状态（公开访问）
+    
+    返回渲染进程数、在途/排队渲染数、缓存命中与排队等待、渲染耗时
+    """
+    from reinvent_insight.services.document.pdf_render_service import get_pdf_render_service
+    return get_pdf_render_service().get_stats()
+
+
+@router.get("/visual/scheduler/stats")
+async def get_visual_scheduler_stats():
+    """
+    获取可视化解读调度器状态（公开访问）
+    
+    返回并发数、积压清理模式、排队/运行中的文档、完成/失败数及各状态文档数
+    """
+    from reinvent_insight.services.analysis.visual_watcher import get_visual_watcher
+    watcher = get_visual_watcher()
+    if watcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **watcher.get_stats()}
+
+
 @router.get("/queue/tasks")
 async def get_queue_tasks():
     """
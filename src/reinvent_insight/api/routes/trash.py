@@ -18,7 +18,7 @@ from reinvent_insight.services.document.hash_registry import (
     init_hash_mappings,
 )
 from reinvent_insight.services.document.metadata_service import (
-    parse_metadata_from_md,
+    read_document_head,
 )
 
 logger = logging.getLogger(__name__)
@@ -160,20 +160,12 @@ async def list_trash(authorization: str = Header(None)):
             else:
                 continue
             
-            # 读取元数据
-            content = md_file.read_text(encoding="utf-8")
-            metadata = parse_metadata_from_md(content)
+            # 读取元数据（只读取 front matter 和一级标题）
+            metadata, heading = read_document_head(md_file)
             
-            title_cn = metadata.get("title_cn", "")
+            title_cn = metadata.get("title_cn", "") or heading
             title_en = metadata.get("title_en", metadata.get("title", ""))
             
-            if not title_cn:
-                for line in content.splitlines():
-                    stripped = line.strip()
-                    if stripped.startswith('# '):
-                        title_cn = stripped[2:].strip()
-                        break
-            
             if not title_cn:
                 title_cn = title_en if title_en else md_file.stem
             
@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse, Response
 
 from reinvent_insight.core import config
+from reinvent_insight.infrastructure.audio.audio_utils import get_audio_media_type
 from reinvent_insight.api.schemas.tts import TTSStatusResponse
 from reinvent_insight.services.audio_cache import AudioCache
 from reinvent_insight.services.tts_pregeneration_service import TTSPregenerationService
@@ -51,7 +52,7 @@ async def get_cached_audio(audio_hash: str):
     """
     获取缓存的音频文件
     
-    返回WAV格式的音频文件
+    按缓存中的存储格式返回音频文件（WAV，或压缩后的 Opus/MP3）
     """
     try:
         audio_cache = get_audio_cache()
@@ -64,8 +65,8 @@ async def get_cached_audio(audio_hash: str):
         
         return FileResponse(
             cached_path,
-            media_type="audio/wav",
-            filename=f"{audio_hash}.wav",
+            media_type=get_audio_media_type(cached_path),
+            filename=f"{audio_hash}{cached_path.suffix}",
             headers={
                 "Accept-Ranges": "bytes",
                 "Cache-Control": "public, max-age=31536000",
@@ -1,10 +1,11 @@
 """TTS音频生成路由"""
 
-import logging
 import base64
-from typing import Optional
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+import json
+import logging
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 
 from reinvent_insight.api.schemas.tts import (
     TTSRequest,
@@ -13,7 +14,13 @@ from reinvent_insight.api.schemas.tts import (
 )
 from reinvent_insight.services.tts_service import TTSService
 from reinvent_insight.services.audio_cache import AudioCache
-from reinvent_insight.infrastructure.audio.audio_utils import assemble_wav, decode_base64_pcm, calculate_audio_duration
+from reinvent_insight.services.tts_generation import get_generation_registry
+from reinvent_insight.infrastructure.audio.audio_utils import (
+    UNKNOWN_PCM_SIZE,
+    build_wav_header,
+    calculate_audio_duration,
+    get_audio_media_type,
+)
 from reinvent_insight.infrastructure.ai.model_config import get_model_client
 from reinvent_insight.core import config
 
@@ -67,40 +74,27 @@ async def generate_tts(req: TTSRequest):
             cached_path = audio_cache.get(audio_hash)
             if cached_path:
                 logger.info(f"TTS缓存命中: {audio_hash}")
-                file_size = cached_path.stat().st_size
-                duration = calculate_audio_duration(file_size - 44)
                 
                 return TTSResponse(
                     audio_url=f"/api/tts/cache/{audio_hash}",
-                    duration=duration,
+                    duration=_cached_duration(audio_cache, audio_hash),
                     cached=True,
                     voice=voice,
-                    language=language
+                    language=language,
+                    audio_format=cached_path.suffix.lstrip(".")
                 )
         
-        # 生成音频
+        # 生成音频（同一音频哈希的并发请求共享一次生成）
         logger.info(f"开始生成TTS音频: {audio_hash}")
-        audio_chunks = []
-        async for chunk in tts_service.generate_audio_stream(
-            req.text, voice, language, req.skip_code_blocks
-        ):
-            pcm_data = decode_base64_pcm(chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk)
-            audio_chunks.append(pcm_data)
-        
-        # 组装WAV文件
-        wav_data = assemble_wav(audio_chunks)
-        duration = calculate_audio_duration(len(wav_data) - 44)
+        generation = get_generation_registry().start(
+            tts_service, audio_cache, audio_hash, req.text, voice, language, req.skip_code_blocks
+        )
+        await generation.wait()
+        duration = generation.duration
         
         # 缓存音频
         text_hash = tts_service.calculate_hash(req.text, "", "")
-        audio_cache.put(
-            audio_hash=audio_hash,
-            audio_data=wav_data,
-            text_hash=text_hash,
-            voice=voice,
-            language=language,
-            duration=duration
-        )
+        file_path = generation.store_in(audio_cache, text_hash=text_hash, voice=voice, language=language)
         
         logger.info(f"TTS音频生成完成: {audio_hash}, 时长: {duration:.2f}s")
         
@@ -109,7 +103,8 @@ async def generate_tts(req: TTSRequest):
             duration=duration,
             cached=False,
             voice=voice,
-            language=language
+            language=language,
+            audio_format=file_path.suffix.lstrip(".")
         )
         
     except ValueError as e:
@@ -120,104 +115,148 @@ async def generate_tts(req: TTSRequest):
         raise HTTPException(status_code=500, detail=f"TTS生成失败: {str(e)}")
 
 
+def _cached_duration(audio_cache: AudioCache, audio_hash: str) -> float:
+    """从缓存元数据读取音频时长（压缩格式无法按文件大小推算）"""
+    metadata = audio_cache.get_metadata(audio_hash)
+    return metadata.duration if metadata else 0.0
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """格式化一条 JSON 编码的 SSE 事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _wants_binary(request: Request) -> bool:
+    """客户端通过 Accept 请求二进制音频（audio/wav）而不是 SSE"""
+    accept = request.headers.get("accept", "")
+    return "audio/" in accept and "text/event-stream" not in accept
+
+
+async def _generate_shared(
+    audio_hash: str,
+    text: str,
+    voice: str,
+    language: str,
+    skip_code_blocks: bool,
+    article_hash: str = ""
+) -> AsyncIterator[bytes]:
+    """
+    订阅（必要时启动）同一音频哈希的生成，逐片段产出 PCM 数据
+
+    生成结束后把结果连同文章哈希登记到缓存。
+    """
+    tts_service = get_tts_service()
+    audio_cache = get_audio_cache()
+
+    generation = get_generation_registry().start(
+        tts_service, audio_cache, audio_hash, text, voice, language, skip_code_blocks
+    )
+    async for pcm_data in generation.subscribe():
+        yield pcm_data
+
+    await generation.wait()
+    generation.store_in(
+        audio_cache,
+        text_hash=tts_service.calculate_hash(text, "", ""),
+        voice=voice,
+        language=language,
+        article_hash=article_hash
+    )
+    logger.info(f"流式TTS完成: {audio_hash}, 时长: {generation.duration:.2f}s")
+
+
 @router.post("/stream")
-async def stream_tts(req: TTSStreamRequest):
+async def stream_tts(req: TTSStreamRequest, request: Request):
     """
-    流式生成TTS音频（SSE）
-    
-    实时返回音频块，支持边生成边播放
+    流式生成TTS音频
+
+    默认返回 SSE：缓存命中时发送 cached 事件，客户端直接从
+    /api/tts/cache/{audio_hash} 下载（支持 Range）；未命中时边生成边发送
+    chunk 事件，结束时发送 complete 事件。
+
+    请求头 Accept 为 audio/* 时返回二进制音频：缓存命中直接返回文件
+    （按存储格式返回 WAV 或 Opus/MP3，支持 Range，由服务器零拷贝发送），
+    未命中时以分块传输输出 WAV 流。
     """
-    article_hash = req.article_hash
-    text = req.text
-    use_cache = req.use_cache
-    skip_code_blocks = req.skip_code_blocks
-    
+    try:
+        tts_service = get_tts_service()
+        audio_cache = get_audio_cache()
+
+        voice = req.voice or getattr(tts_service.config, 'tts_default_voice', 'Kai')
+        language = req.language or getattr(tts_service.config, 'tts_default_language', 'Chinese')
+        audio_hash = tts_service.calculate_hash(req.text, voice, language)
+
+        cached_path = audio_cache.get(audio_hash) if req.use_cache else None
+    except Exception as e:
+        logger.error(f"流式TTS初始化失败: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"TTS生成失败: {str(e)}")
+    if cached_path:
+        logger.info(f"TTS缓存命中（流式）: {audio_hash}")
+
+    if _wants_binary(request):
+        if cached_path:
+            return FileResponse(
+                cached_path,
+                media_type=get_audio_media_type(cached_path),
+                headers={
+                    "Accept-Ranges": "bytes",
+                    "Cache-Control": "public, max-age=31536000",
+                    "X-Audio-Hash": audio_hash
+                }
+            )
+
+        async def wav_generator():
+            yield build_wav_header(UNKNOWN_PCM_SIZE)
+            async for pcm_data in _generate_shared(
+                audio_hash, req.text, voice, language, req.skip_code_blocks, req.article_hash
+            ):
+                yield pcm_data
+
+        return StreamingResponse(
+            wav_generator(),
+            media_type="audio/wav",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+                "X-Audio-Hash": audio_hash
+            }
+        )
+
     async def event_generator():
         try:
-            tts_service = get_tts_service()
-            audio_cache = get_audio_cache()
-            
-            voice = req.voice or getattr(tts_service.config, 'tts_default_voice', 'Kai')
-            language = req.language or getattr(tts_service.config, 'tts_default_language', 'Chinese')
-            
-            audio_hash = tts_service.calculate_hash(text, voice, language)
-            
-            # 检查缓存
-            if use_cache:
-                cached_path = audio_cache.get(audio_hash)
-                if cached_path:
-                    logger.info(f"TTS缓存命中（流式）: {audio_hash}")
-                    file_size = cached_path.stat().st_size
-                    duration = calculate_audio_duration(file_size - 44)
-                    
-                    # 读取缓存的WAV文件并流式发送
-                    chunk_size = 48000
-                    chunk_index = 0
-                    total_bytes = 0
-                    
-                    with open(cached_path, 'rb') as f:
-                        f.seek(44)  # 跳过WAV头
-                        
-                        while True:
-                            pcm_chunk = f.read(chunk_size)
-                            if not pcm_chunk:
-                                break
-                            
-                            total_bytes += len(pcm_chunk)
-                            chunk_base64 = base64.b64encode(pcm_chunk).decode('utf-8')
-                            
-                            event_data = {
-                                "type": "audio",
-                                "data": chunk_base64,
-                                "index": chunk_index,
-                                "totalBytes": total_bytes,
-                                "cached": True
-                            }
-                            
-                            yield f"data: {str(event_data)}\n\n"
-                            chunk_index += 1
-                    
-                    # 发送完成事件
-                    yield f"data: {{\"type\": \"end\", \"duration\": {duration}}}\n\n"
-                    return
-            
+            if cached_path:
+                yield _sse_event("cached", {
+                    "audio_url": f"/api/tts/cache/{audio_hash}",
+                    "audio_hash": audio_hash,
+                    "duration": _cached_duration(audio_cache, audio_hash)
+                })
+                return
+
             # 生成音频
             logger.info(f"开始流式生成TTS: {audio_hash}")
-            audio_chunks = []
             chunk_index = 0
             total_bytes = 0
-            
-            async for chunk in tts_service.generate_audio_stream(text, voice, language, skip_code_blocks):
-                pcm_data = decode_base64_pcm(chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk)
-                audio_chunks.append(pcm_data)
+
+            async for pcm_data in _generate_shared(
+                audio_hash, req.text, voice, language, req.skip_code_blocks, req.article_hash
+            ):
+                chunk_index += 1
                 total_bytes += len(pcm_data)
-                
-                event_data = {
-                    "type": "audio",
-                    "data": chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk,
+                yield _sse_event("chunk", {
+                    "data": base64.b64encode(pcm_data).decode('utf-8'),
                     "index": chunk_index,
-                    "totalBytes": total_bytes,
-                    "cached": False
-                }
-                
-                yield f"data: {str(event_data)}\n\n"
-                chunk_index += 1
-            
-            # 组装并缓存
-            wav_data = assemble_wav(audio_chunks)
-            duration = calculate_audio_duration(len(wav_data) - 44)
-            
-            text_hash = tts_service.calculate_hash(text, "", "")
-            audio_cache.put(audio_hash, wav_data, text_hash, voice, language, duration, article_hash)
-            
-            logger.info(f"流式TTS完成: {audio_hash}, 时长: {duration:.2f}s")
-            
-            yield f"data: {{\"type\": \"end\", \"duration\": {duration}, \"audioHash\": \"{audio_hash}\"}}\n\n"
-            
+                    "totalBytes": total_bytes
+                })
+
+            yield _sse_event("complete", {
+                "audio_hash": audio_hash,
+                "duration": calculate_audio_duration(total_bytes)
+            })
+
         except Exception as e:
             logger.error(f"流式TTS失败: {e}", exc_info=True)
-            yield f"data: {{\"type\": \"error\", \"message\": \"{str(e)}\"}}\n\n"
-    
+            yield _sse_event("error", {"message": str(e)})
+
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
@@ -13,9 +13,8 @@ from reinvent_insight.services.document.hash_registry import (
 )
 from reinvent_insight.services.document.metadata_service import (
     parse_metadata_from_md,
-    extract_text_from_markdown,
-    count_chinese_words,
 )
+from reinvent_insight.services.document.metadata_index import get_metadata_index
 from reinvent_insight.services.analysis.task_manager import manager
 
 logger = logging.getLogger(__name__)
@@ -103,6 +102,11 @@ def count_toc_chapters(content: str) -> int:
     return h2_count
 
 
+def get_ultra_chapter_count(file_path):
+    """获取文档章节数（按 mtime 缓存在元数据索引中），文件不存在时返回 None"""
+    return get_metadata_index().get_stat(file_path, "ultra_chapter_count", count_toc_chapters)
+
+
 @router.post("/batch-ultra-status")
 async def batch_get_ultra_status(hashes: list[str]):
     """
@@ -138,7 +142,8 @@ async def batch_get_ultra_status(hashes: list[str]):
             task_state.status in ['queued', 'running', 'processing']):
             generating_hashes.add(task_state.doc_hash)
     
-    # 2. 处理每个 hash
+    # 2. 处理每个 hash（元数据来自索引，只读取 front matter）
+    index = get_metadata_index()
     for doc_hash in hashes:
         if doc_hash in generating_hashes:
             results[doc_hash] = {"exists": False, "status": "generating"}
@@ -150,13 +155,11 @@ async def batch_get_ultra_status(hashes: list[str]):
         
         for filename in versions:
             try:
-                file_path = config.OUTPUT_DIR / filename
-                if not file_path.exists():
+                record = index.get(config.OUTPUT_DIR / filename)
+                if not record:
                     continue
-                content = file_path.read_text(encoding="utf-8")
-                metadata = parse_metadata_from_md(content)
                 
-                if metadata.get("is_ultra_deep", False):
+                if record.metadata.get("is_ultra_deep", False):
                     results[doc_hash] = {"exists": True, "status": "completed"}
                     ultra_found = True
                     break
@@ -170,10 +173,8 @@ async def batch_get_ultra_status(hashes: list[str]):
         default_filename = hash_to_filename.get(doc_hash)
         if default_filename:
             try:
-                file_path = config.OUTPUT_DIR / default_filename
-                if file_path.exists():
-                    content = file_path.read_text(encoding="utf-8")
-                    chapter_count = count_toc_chapters(content)
+                chapter_count = get_ultra_chapter_count(config.OUTPUT_DIR / default_filename)
+                if chapter_count is not None:
                     if chapter_count > 15:
                         results[doc_hash] = {
                             "exists": True, 
@@ -284,14 +285,15 @@ async def get_ultra_deep_status(doc_hash: str):
             }
         
         # 遍历所有版本，查找Ultra版本
+        index = get_metadata_index()
         for filename in versions:
             try:
                 file_path = config.OUTPUT_DIR / filename
-                if not file_path.exists():
+                record = index.get(file_path)
+                if not record:
                     continue
                     
-                content = file_path.read_text(encoding="utf-8")
-                metadata = parse_metadata_from_md(content)
+                metadata = record.metadata
                 
                 # 检查是否为Ultra版本
                 if metadata.get("is_ultra_deep", False):
@@ -299,9 +301,8 @@ async def get_ultra_deep_status(doc_hash: str):
                     version_match = re.search(r'_v(\d+)\.md$', filename)
                     version_num = int(version_match.group(1)) if version_match else 0
                     
-                    # 计算字数
-                    pure_text = extract_text_from_markdown(content)
-                    word_count = count_chinese_words(pure_text)
+                    # 计算字数（按需计算并缓存）
+                    word_count = index.get_word_count(file_path)
                     
                     return {
                         "exists": True,
@@ -322,17 +323,16 @@ async def get_ultra_deep_status(doc_hash: str):
         if default_filename:
             try:
                 default_file_path = config.OUTPUT_DIR / default_filename
-                if default_file_path.exists():
-                    default_content = default_file_path.read_text(encoding="utf-8")
-                    chapter_count = count_toc_chapters(default_content)
+                record = index.get(default_file_path)
+                if record:
+                    chapter_count = get_ultra_chapter_count(default_file_path)
                     
                     if chapter_count > 15:
                         # 章节数超过15，视为已是Ultra级别内容
                         version_match = re.search(r'_v(\d+)\.md$', default_filename)
                         version_num = int(version_match.group(1)) if version_match else 0
                         
-                        pure_text = extract_text_from_markdown(default_content)
-                        word_count = count_chinese_words(pure_text)
+                        word_count = index.get_word_count(default_file_path)
                         
                         return {
                             "exists": True,
@@ -341,7 +341,7 @@ async def get_ultra_deep_status(doc_hash: str):
                             "filename": default_filename,
                             "word_count": word_count,
                             "chapter_count": chapter_count,
-                            "generated_at": parse_metadata_from_md(default_content).get("created_at"),
+                            "generated_at": record.metadata.get("created_at"),
                             "reason": "章节数超过15章，已是深度内容"
                         }
             except Exception as e:
@@ -1,5 +1,6 @@
 """Visual interpretation routes"""
 
+import asyncio
 import logging
 from typing import Optional, List
 from pathlib import Path
@@ -10,16 +11,40 @@ import yaml
 import re
 
 from reinvent_insight.core import config
+from reinvent_insight.core.utils.http_utils import choose_encoding, etag_matches
 from reinvent_insight.services.document.hash_registry import (
     hash_to_filename,
     hash_to_versions,
 )
+from reinvent_insight.services.document.visual_html_cache import get_visual_html_cache
 from reinvent_insight.services.visual_to_image_service import get_visual_to_image_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/article", tags=["visual"])
 
+# 可视化 HTML 的 CSP 策略（允许其所需的外部资源）
+VISUAL_CSP = (
+    "default-src 'self' 'unsafe-inline' 'unsafe-eval' "
+    "https://fonts.googleapis.com https://fonts.gstatic.com "
+    "https://fonts.loli.net https://gstatic.loli.net "
+    "https://cdn.tailwindcss.com https://cdn.jsdelivr.net "
+    "https://cdnjs.cloudflare.com "
+    "https://lf26-cdn-tos.bytecdntp.com https://lf6-cdn-tos.bytecdntp.com "
+    "https://unpkg.com https://cdn.bootcdn.net; "
+    "script-src 'self' 'unsafe-inline' 'unsafe-eval' "
+    "https://cdn.tailwindcss.com https://cdn.jsdelivr.net "
+    "https://cdnjs.cloudflare.com "
+    "https://lf26-cdn-tos.bytecdntp.com https://lf6-cdn-tos.bytecdntp.com "
+    "https://unpkg.com https://cdn.bootcdn.net; "
+    "style-src 'self' 'unsafe-inline' "
+    "https://fonts.googleapis.com https://fonts.loli.net "
+    "https://cdnjs.cloudflare.com https://cdn.bootcdn.net; "
+    "font-src 'self' https://fonts.gstatic.com https://gstatic.loli.net "
+    "https://cdnjs.cloudflare.com https://cdn.bootcdn.net; "
+    "img-src 'self' data: https:;"
+)
+
 
 def _find_task_dir_for_article(article_path: Path) -> Optional[Path]:
     """查找文章对应的 task_dir（用于分章节生成模式）"""
@@ -102,13 +127,20 @@ def _find_task_dir_for_article(article_path: Path) -> Optional[Path]:
 
 
 @router.get("/{doc_hash}/visual")
-async def get_visual_interpretation(doc_hash: str, version: Optional[int] = None):
+async def get_visual_interpretation(
+    doc_hash: str,
+    version: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
     """
     获取文章的可视化解读 HTML(版本跟随深度解读)
     
     Args:
         doc_hash: 文档哈希
         version: 可选的版本号(如果不指定，使用默认版本)
+        if_none_match: 条件请求，ETag 一致时返回 304
+        accept_encoding: 客户端接受的压缩格式（优先 br，其次 gzip）
         
     Returns:
         HTML 内容或错误信息
@@ -136,63 +168,32 @@ async def get_visual_interpretation(doc_hash: str, version: Optional[int] = None
         visual_filename = f"{base_name}_visual.html"
         visual_path = config.OUTPUT_DIR / visual_filename
         
-        if not visual_path.exists():
+        # 按修改时间缓存 CDN 替换和压缩结果，未命中时在线程中处理
+        cache = get_visual_html_cache()
+        try:
+            entry = cache.peek(visual_path)
+            if entry is None:
+                entry = await asyncio.to_thread(cache.load, visual_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="可视化解读尚未生成")
         
-        # 读取 HTML 内容
-        html_content = visual_path.read_text(encoding="utf-8")
+        encoding = choose_encoding(accept_encoding, entry.encodings)
+        headers = {
+            "ETag": entry.etag_for(encoding),
+            "Cache-Control": "public, no-cache",
+            "Vary": "Accept-Encoding",
+            "Content-Security-Policy": VISUAL_CSP,
+        }
         
-        # 动态替换 CDN 链接为本地路径，加快加载速度
-        # Chart.js
-        html_content = re.sub(
-            r'https://cdn\.bootcdn\.net/ajax/libs/Chart\.js/[\d.]+/chart\.umd\.min\.js',
-            '/js/vendor/chart.umd.min.js',
-            html_content
-        )
-        html_content = re.sub(
-            r'https://cdn\.jsdelivr\.net/npm/chart\.js@[\d.]+/dist/chart\.umd\.min\.js',
-            '/js/vendor/chart.umd.min.js',
-            html_content
-        )
-        # Font Awesome CSS
-        html_content = re.sub(
-            r'https://cdn\.bootcdn\.net/ajax/libs/font-awesome/[\d.]+/css/all\.min\.css',
-            '/css/vendor/fontawesome/all.min.css',
-            html_content
-        )
-        html_content = re.sub(
-            r'https://cdnjs\.cloudflare\.com/ajax/libs/font-awesome/[\d.]+/css/all\.min\.css',
-            '/css/vendor/fontawesome/all.min.css',
-            html_content
-        )
+        if etag_matches(if_none_match, entry.etags):
+            return Response(status_code=304, headers=headers)
         
+        if encoding:
+            headers["Content-Encoding"] = encoding
         return Response(
-            content=html_content,
+            content=entry.bodies[encoding],
             media_type="text/html",
-            headers={
-                "Cache-Control": "public, max-age=3600",
-                # 更新 CSP 策略以允许可视化 HTML 所需的外部资源
-                "Content-Security-Policy": (
-                    "default-src 'self' 'unsafe-inline' 'unsafe-eval' "
-                    "https://fonts.googleapis.com https://fonts.gstatic.com "
-                    "https://fonts.loli.net https://gstatic.loli.net "
-                    "https://cdn.tailwindcss.com https://cdn.jsdelivr.net "
-                    "https://cdnjs.cloudflare.com "
-                    "https://lf26-cdn-tos.bytecdntp.com https://lf6-cdn-tos.bytecdntp.com "
-                    "https://unpkg.com https://cdn.bootcdn.net; "
-                    "script-src 'self' 'unsafe-inline' 'unsafe-eval' "
-                    "https://cdn.tailwindcss.com https://cdn.jsdelivr.net "
-                    "https://cdnjs.cloudflare.com "
-                    "https://lf26-cdn-tos.bytecdntp.com https://lf6-cdn-tos.bytecdntp.com "
-                    "https://unpkg.com https://cdn.bootcdn.net; "
-                    "style-src 'self' 'unsafe-inline' "
-                    "https://fonts.googleapis.com https://fonts.loli.net "
-                    "https://cdnjs.cloudflare.com https://cdn.bootcdn.net; "
-                    "font-src 'self' https://fonts.gstatic.com https://gstatic.loli.net "
-                    "https://cdnjs.cloudflare.com https://cdn.bootcdn.net; "
-                    "img-src 'self' data: https:;"
-                )
-            }
+            headers=headers
         )
         
     except HTTPException:
@@ -21,6 +21,7 @@ class TTSResponse(BaseModel):
     cached: bool
     voice: str
     language: str
+    audio_format: str = "wav"
 
 
 class TTSStreamRequest(BaseModel):
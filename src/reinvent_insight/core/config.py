@@ -81,6 +81,9 @@ TASKS_DIR.mkdir(exist_ok=True)
 CHUNK_DEBUG_DIR = CACHE_DIR / "chunks"
 CHUNK_DEBUG_DIR.mkdir(exist_ok=True)
 
+# 文档元数据索引（可随时删除，启动时自动重建）
+METADATA_INDEX_PATH = CACHE_DIR / "metadata_index.db"
+
 # --- 日志配置 ---
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 # 生产环境使用 journalctl，关闭文件日志；开发环境输出到 logs/ 目录
@@ -156,6 +159,37 @@ ANALYSIS_QUEUE_MAX_SIZE = int(os.getenv("ANALYSIS_QUEUE_MAX_SIZE", "100"))
 # 任务超时时间（秒）- 单个分析任务的最大执行时间
 ANALYSIS_TASK_TIMEOUT = int(os.getenv("ANALYSIS_TASK_TIMEOUT", "3600"))  # 默认 1 小时
 
+# 是否持久化任务队列（重启/重新部署后恢复排队中和执行中的任务）
+ANALYSIS_QUEUE_PERSISTENT = os.getenv("ANALYSIS_QUEUE_PERSISTENT", "true").lower() == "true"
+
+# 持久化队列数据库路径（位于 downloads 下，重新部署时随共享数据保留）
+ANALYSIS_QUEUE_DB_PATH = PROJECT_ROOT / "downloads" / "queue" / "analysis_queue.db"
+
+# 执行中任务的心跳间隔（秒）
+ANALYSIS_QUEUE_HEARTBEAT_INTERVAL = int(os.getenv("ANALYSIS_QUEUE_HEARTBEAT_INTERVAL", "30"))
+
+# 心跳超过该时间未更新的执行中任务，在启动时视为中断并重新排队（秒）
+ANALYSIS_QUEUE_STALE_AFTER = int(os.getenv("ANALYSIS_QUEUE_STALE_AFTER", "120"))
+
+# 单个任务因中断被重新排队的最大次数
+ANALYSIS_QUEUE_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_QUEUE_MAX_ATTEMPTS", "3"))
+
+# --- 任务状态保留策略 ---
+# 内存中最多保留的已结束任务数，超出后最早结束的任务被移出内存
+TASK_RETENTION_MAX_FINISHED = int(os.getenv("TASK_RETENTION_MAX_FINISHED", "200"))
+
+# 已结束任务在内存中的最长保留时间（秒）
+TASK_RETENTION_MAX_AGE = int(os.getenv("TASK_RETENTION_MAX_AGE", "3600"))
+
+# 每个任务在内存中保留的日志行数
+TASK_LOG_MAX_LINES = int(os.getenv("TASK_LOG_MAX_LINES", "500"))
+
+# 被移出内存的任务摘要存储（/api/tasks/{task_id}/status 仍可查询）
+TASK_HISTORY_PATH = CACHE_DIR / "task_history.db"
+
+# 任务摘要最长保留天数
+TASK_HISTORY_RETENTION_DAYS = int(os.getenv("TASK_HISTORY_RETENTION_DAYS", "30"))
+
 # --- Cookie Manager 配置 ---
 # Cookie 刷新间隔（小时）
 COOKIE_REFRESH_INTERVAL = int(os.getenv("COOKIE_REFRESH_INTERVAL", "6"))
@@ -231,6 +265,16 @@ SUPPORTED_TEXT_FORMATS = ['.txt', '.md']
 # 支持的二进制格式
 SUPPORTED_BINARY_FORMATS = ['.pdf', '.docx']
 
+# --- PDF 下载渲染配置 ---
+# 常驻的 WeasyPrint 渲染进程数
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+
+# 单个 PDF 的渲染超时（秒，包含排队时间）
+PDF_RENDER_TIMEOUT = int(os.getenv("PDF_RENDER_TIMEOUT", "300"))
+
+# PDF 样式表
+PDF_STYLE_PATH = PROJECT_ROOT / "web" / "css" / "pdf_style.css"
+
 # --- 可视化解读配置 ---
 # 是否启用可视化解读生成功能
 VISUAL_INTERPRETATION_ENABLED = os.getenv("VISUAL_INTERPRETATION_ENABLED", "true").lower() == "true"
@@ -241,6 +285,25 @@ TEXT2HTML_PROMPT_PATH = PROJECT_ROOT / "prompt" / "text2html.txt"
 # 可视化 HTML 存储目录（与深度解读同目录）
 VISUAL_HTML_DIR = OUTPUT_DIR
 
+# 同时运行的可视化生成任务数（新文档与积压文档共用）
+VISUAL_MAX_CONCURRENT = int(os.getenv("VISUAL_MAX_CONCURRENT", "1"))
+
+# 积压清理模式：关闭时积压文档逐个生成，且让位于正在运行的分析任务；
+# 开启时只要可视化模型的限流器仍有余量，积压文档就占满全部并发名额
+VISUAL_BACKLOG_DRAIN = os.getenv("VISUAL_BACKLOG_DRAIN", "false").lower() == "true"
+
+# 同一版本文档的可视化生成最多尝试次数，超过后不再自动重试
+VISUAL_MAX_ATTEMPTS = int(os.getenv("VISUAL_MAX_ATTEMPTS", "3"))
+
+# 可视化解读生成状态数据库（替代 .visual_processed.json）
+VISUAL_STATE_DB_PATH = CACHE_DIR / "visual_state.db"
+
+# 内存中缓存的可视化 HTML 数量（含压缩版本）
+VISUAL_HTML_CACHE_SIZE = int(os.getenv("VISUAL_HTML_CACHE_SIZE", "64"))
+
+# 内存中缓存的文档详情响应数量
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "256"))
+
 # --- Visual Long Image 配置 ---
 # 是否启用长图生成功能
 VISUAL_LONG_IMAGE_ENABLED = os.getenv("VISUAL_LONG_IMAGE_ENABLED", "true").lower() == "true"
@@ -259,6 +322,13 @@ VISUAL_SCREENSHOT_WAIT_TIME = int(os.getenv("VISUAL_SCREENSHOT_WAIT_TIME", "3"))
 # 浏览器启动超时（秒）
 VISUAL_SCREENSHOT_BROWSER_TIMEOUT = int(os.getenv("VISUAL_SCREENSHOT_BROWSER_TIMEOUT", "90"))
 
+# --- 浏览器池配置 ---
+# 每种启动配置常驻的 Chromium 数量（截图、关键帧共享）
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+
+# 每个浏览器服务多少个页面后回收重启
+BROWSER_POOL_MAX_PAGES = int(os.getenv("BROWSER_POOL_MAX_PAGES", "50"))
+
 # --- 关键帧截图配置 ---
 # 是否启用关键帧截图功能
 ENABLE_KEYFRAME_SCREENSHOT = os.getenv("ENABLE_KEYFRAME_SCREENSHOT", "false").lower() == "true"
@@ -317,6 +387,16 @@ TTS_TASK_TIMEOUT = int(os.getenv("TTS_TASK_TIMEOUT", "600"))
 # TTS 预处理规则版本
 TTS_PREPROCESSING_VERSION = "1.0.0"
 
+# 音频缓存存储格式：wav（不压缩）、opus 或 mp3
+# 压缩依赖本地 ffmpeg，找不到编码器时自动保留 WAV；Safari 等旧浏览器建议使用 mp3
+TTS_CACHE_FORMAT = os.getenv("TTS_CACHE_FORMAT", "wav").lower()
+
+# 压缩码率（如 32k），留空使用格式默认值（opus 32k，mp3 64k）
+TTS_CACHE_BITRATE = os.getenv("TTS_CACHE_BITRATE", "")
+
+# ffmpeg 可执行文件（命令名或完整路径）
+TTS_AUDIO_ENCODER = os.getenv("TTS_AUDIO_ENCODER", "ffmpeg")
+
 # --- 字幕翻译配置 ---
 # 是否在文章生成后自动翻译中文字幕
 SUBTITLE_AUTO_TRANSLATE = os.getenv("SUBTITLE_AUTO_TRANSLATE", "true").lower() == "true"
@@ -358,3 +438,17 @@ MODEL_OBSERVABILITY_RETENTION_DAYS = int(os.getenv("MODEL_OBSERVABILITY_RETENTIO
 
 # 单个文件最大大小（MB）
 MODEL_OBSERVABILITY_MAX_FILE_SIZE_MB = int(os.getenv("MODEL_OBSERVABILITY_MAX_FILE_SIZE_MB", "100"))
+
+# --- 模型响应缓存配置 ---
+# 相同的提示词（同一模型、生成参数和输入文件）直接复用上次的响应，
+# 使重新分析、崩溃恢复和后处理重跑几乎不产生 API 调用
+MODEL_RESPONSE_CACHE_ENABLED = os.getenv("MODEL_RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+
+# 缓存数据库路径
+MODEL_RESPONSE_CACHE_PATH = CACHE_DIR / "model_responses.db"
+
+# 缓存最大大小（MB），超出后按最近最少使用淘汰
+MODEL_RESPONSE_CACHE_MAX_MB = int(os.getenv("MODEL_RESPONSE_CACHE_MAX_MB", "512"))
+
+# 缓存有效期（小时）
+MODEL_RESPONSE_CACHE_TTL_HOURS = int(os.getenv("MODEL_RESPONSE_CACHE_TTL_HOURS", "168"))
@@ -0,0 +1,72 @@
+"""HTTP 条件请求与内容协商工具函数"""
+
+import hashlib
+from typing import Iterable, Optional
+
+
+def make_etag(data: bytes) -> str:
+    """
+    根据内容生成强 ETag
+
+    Args:
+        data: 响应内容
+
+    Returns:
+        带引号的 ETag，如 "3f2a..."
+    """
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    """
+    判断 If-None-Match 是否命中任一 ETag（弱比较，命中时可返回 304）
+
+    Args:
+        if_none_match: 请求头 If-None-Match 的值
+        etags: 当前资源各表示形式的 ETag
+
+    Returns:
+        是否命中
+    """
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    candidates = {tag[2:] if tag.startswith("W/") else tag for tag in candidates}
+    return any(etag in candidates for etag in etags)
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    按 Accept-Encoding 选择压缩格式
+
+    按 available 的顺序（优先级从高到低）返回第一个客户端接受的格式。
+
+    Args:
+        accept_encoding: 请求头 Accept-Encoding 的值
+        available: 可用的压缩格式，如 ("br", "gzip")
+
+    Returns:
+        选中的格式，客户端都不接受时返回 None（不压缩）
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
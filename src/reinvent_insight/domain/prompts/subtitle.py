@@ -8,6 +8,9 @@
 - 分段翻译
 """
 
+# 翻译提示词版本：修改翻译提示词后递增，使已保存的分片翻译检查点失效
+SUBTITLE_PROMPT_VERSION = "1"
+
 # 字幕翻译主提示词（带文章上下文）
 SUBTITLE_TRANSLATION_PROMPT_WITH_CONTEXT = """你是一个专业的视频字幕翻译专家。请将以下{source_language}字幕翻译为{target_language}。
 
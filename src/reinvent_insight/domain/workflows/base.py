@@ -40,7 +40,7 @@ TASKS_ROOT_DIR = str(config.TASKS_DIR)
 BASE_PROMPT_PATH = "./prompt/youtbe-deep-summary.txt"
 
 
-def get_task_dir_path(task_id: str, content_type: str = "youtube") -> str:
+def get_task_dir_path(task_id: str, content_type: str = "youtube", reuse_existing: bool = False) -> str:
     """生成任务目录路径
     
     格式: tasks/YYYYMMDD/HHMM-taskid-type
@@ -48,6 +48,7 @@ def get_task_dir_path(task_id: str, content_type: str = "youtube") -> str:
     Args:
         task_id: 任务ID
         content_type: 内容类型 (youtube/pdf/md/txt/document)
+        reuse_existing: 是否优先返回该任务已有的目录（任务续跑时使用）
     
     Returns:
         任务目录路径
@@ -72,6 +73,16 @@ def get_task_dir_path(task_id: str, content_type: str = "youtube") -> str:
     # 取task_id前8位作为短标识
     short_id = task_id[:8] if len(task_id) >= 8 else task_id
     
+    if reuse_existing:
+        # 按日期倒序查找该任务之前创建的目录；同一任务可能留下多个目录，
+        # 优先选择保存了大纲（即已有中间结果）的目录
+        existing = sorted(Path(TASKS_ROOT_DIR).glob(f"*/*-{short_id}-{task_type}"), reverse=True)
+        for path in existing:
+            if (path / "outline.md").is_file():
+                return str(path)
+        if existing:
+            return str(existing[0])
+    
     folder_name = f"{time_prefix}-{short_id}-{task_type}"
     return os.path.join(TASKS_ROOT_DIR, date_dir, folder_name)
 
@@ -147,8 +158,12 @@ class AnalysisWorkflow(ABC):
         else:
             raise ValueError(f"不支持的内容类型: {type(content)}")
         
+        # 服务重启后恢复的任务，复用原任务目录中已生成的大纲和章节
+        task_state = self.task_notifier.tasks.get(self.task_id)
+        self.resumed = getattr(task_state, "resumed", False) is True
+        
         # 任务目录（使用日期+类型结构）
-        self.task_dir = get_task_dir_path(self.task_id, self.content_type)
+        self.task_dir = get_task_dir_path(self.task_id, self.content_type, reuse_existing=self.resumed)
         os.makedirs(self.task_dir, exist_ok=True)
         
         # 模型客户端
@@ -199,8 +214,12 @@ class AnalysisWorkflow(ABC):
                 await self._log("正在启动深度分析流程...")
                 self.task_notifier.tasks[self.task_id].status = "running"
 
-                # 步骤 1: 生成大纲
-                outline_content = await self._generate_outline()
+                # 步骤 1: 生成大纲（续跑时复用已有大纲，保证章节划分一致）
+                outline_content = self._load_task_file("outline.md")
+                if outline_content:
+                    await self._log("已恢复此前生成的大纲，从中断处继续", progress=25)
+                else:
+                    outline_content = await self._generate_outline()
                 if not outline_content:
                     raise Exception("生成大纲失败")
 
@@ -230,7 +249,9 @@ class AnalysisWorkflow(ABC):
                     raise Exception("部分或全部章节内容生成失败")
                 
                 # 步骤 3: 生成结论
-                conclusion_content = await self._generate_conclusion(chapters)
+                conclusion_content = self._load_task_file("conclusion.md")
+                if not conclusion_content:
+                    conclusion_content = await self._generate_conclusion(chapters)
                 if not conclusion_content:
                     raise Exception("生成收尾内容失败")
                 
@@ -298,6 +319,28 @@ class AnalysisWorkflow(ABC):
     
     # ======= 通用辅助方法 =======
     
+    def _load_task_file(self, filename: str) -> Optional[str]:
+        """续跑任务时读取任务目录中已生成的中间文件
+        
+        Args:
+            filename: 文件名（如 outline.md、chapter_1.md）
+            
+        Returns:
+            文件内容；非续跑任务或文件不存在/为空时返回 None
+        """
+        if not self.resumed:
+            return None
+        path = os.path.join(self.task_dir, filename)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except (FileNotFoundError, OSError):
+            return None
+        if not content.strip():
+            return None
+        logger.info(f"任务 {self.task_id} - 复用已生成的 {filename}")
+        return content
+    
     async def _log(self, message: str, progress: int = None):
         """记录日志到任务管理器"""
         if progress is not None:
@@ -433,9 +476,13 @@ class AnalysisWorkflow(ABC):
         """并发生成所有章节"""
         await self._log(f"步骤 2/4: 正在并发生成 {len(chapters)} 个核心章节...")
 
-        # 从配置中读取并发延迟
+        # 从配置中读取并发延迟；已配置 provider 配额时由共享限制器调度，无需固定错峰
         concurrent_delay = getattr(self.client.config, 'concurrent_delay', 1.0)
-        logger.info(f"使用章节并发生成间隔: {concurrent_delay} 秒")
+        if getattr(self.client.config, 'rate_limit_policy', None) is not None:
+            concurrent_delay = 0
+            logger.info(f"章节并发由速率限制器调度: {self.client.rate_limiter.get_stats()}")
+        else:
+            logger.info(f"使用章节并发生成间隔: {concurrent_delay} 秒")
 
         # 创建所有章节的生成任务
         tasks = []
@@ -483,12 +530,14 @@ class AnalysisWorkflow(ABC):
                 chapter_meta = self._get_chapter_metadata(i + 1)
                 rationale = self._build_chapter_rationale(i + 1, chapter_meta)
                 
-                # 生成单个章节，传递已生成的章节列表
-                chapter_content = await self._generate_single_chapter(
-                    i, chapter_title, outline_content, 
-                    previous_chapters=generated_chapters,
-                    rationale=rationale
-                )
+                # 生成单个章节，传递已生成的章节列表（续跑时跳过已生成的章节）
+                chapter_content = self._load_task_file(f"chapter_{i + 1}.md")
+                if not chapter_content:
+                    chapter_content = await self._generate_single_chapter(
+                        i, chapter_title, outline_content, 
+                        previous_chapters=generated_chapters,
+                        rationale=rationale
+                    )
                 
                 if chapter_content:
                     # 将生成的章节添加到列表中
@@ -521,6 +570,11 @@ class AnalysisWorkflow(ABC):
         delay: float
     ) -> bool:
         """带延迟的章节生成"""
+        # 续跑任务中已生成的章节直接复用
+        if self._load_task_file(f"chapter_{index + 1}.md"):
+            await self._log(f"章节 {index + 1} 已在此前生成，跳过")
+            return True
+        
         if delay > 0:
             await asyncio.sleep(delay)
         
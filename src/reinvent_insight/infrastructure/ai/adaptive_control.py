@@ -0,0 +1,225 @@
+"""自适应速率控制
+
+根据模型 API 的返回情况动态调整每个 provider/model 的并发上限（AIMD）：
+
+- 成功：每完成"当前上限"个请求，上限 +1（加性增长），直到配置的上限
+- 限流（429 / RESOURCE_EXHAUSTED / Throttling）：上限减半（乘性下降），
+  并让该键上的所有调用暂停到 Retry-After 提示的时间点，避免重试风暴
+- 超时：按退避重试，不调整并发
+- 致命错误（密钥无效、参数错误等）：立即失败，不再重试
+"""
+
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+from .config_models import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# 未配置 max_concurrency 时的自适应并发上限
+ADAPTIVE_MAX_CONCURRENCY = 16
+
+# 两次乘性下降之间的最小间隔（秒），同一波被限流的请求只触发一次下降
+MIN_DECREASE_INTERVAL = 2.0
+
+# 服务端暂停提示的最大采纳时长（秒）
+MAX_RETRY_AFTER = 300.0
+
+
+class ErrorKind(Enum):
+    """API 错误分类"""
+    RATE_LIMIT = "rate_limit"   # 限流 / 配额耗尽
+    TIMEOUT = "timeout"         # 超时
+    FATAL = "fatal"             # 不可重试
+    TRANSIENT = "transient"     # 其他可重试错误
+
+
+_RATE_LIMIT_PATTERN = re.compile(
+    r"\b429\b|resource[_ ]exhausted|rate[ _-]?limit|too many requests|throttl|quota|overloaded|速率限制|限流",
+    re.IGNORECASE,
+)
+_TIMEOUT_PATTERN = re.compile(r"timeout|timed out|deadline[_ ]exceeded|\b504\b|超时", re.IGNORECASE)
+_FATAL_PATTERN = re.compile(
+    r"api key not valid|invalid api[-_ ]?key|unauthorized|permission[_ ]denied|invalid[_ ]argument"
+    r"|\b(400|401|403|404)\b",
+    re.IGNORECASE,
+)
+_RETRY_AFTER_PATTERNS = [
+    # Gemini: 'retryDelay': '31s'
+    re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    # Retry-After: 10
+    re.compile(r"retry[-_ ]after['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)", re.IGNORECASE),
+    # Please retry in 12.5s
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """尽量从 SDK 异常中取出 HTTP 状态码"""
+    for source in (exc, getattr(exc, "response", None)):
+        if source is None:
+            continue
+        for attr in ("status_code", "code", "status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def classify_error(exc: BaseException) -> ErrorKind:
+    """
+    将模型调用异常分类
+
+    Args:
+        exc: 异常对象
+
+    Returns:
+        错误类别
+    """
+    if isinstance(exc, ConfigurationError):
+        return ErrorKind.FATAL
+
+    status = _status_code(exc)
+    text = str(exc)
+
+    if status == 429 or _RATE_LIMIT_PATTERN.search(text):
+        return ErrorKind.RATE_LIMIT
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)) or status in (408, 504) \
+            or _TIMEOUT_PATTERN.search(text):
+        return ErrorKind.TIMEOUT
+    if status in (400, 401, 403, 404) or _FATAL_PATTERN.search(text):
+        return ErrorKind.FATAL
+    return ErrorKind.TRANSIENT
+
+
+def extract_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    提取服务端建议的重试等待时间（秒）
+
+    依次检查响应头中的 Retry-After 和错误信息中的 retryDelay 等提示。
+
+    Args:
+        exc: 异常对象
+
+    Returns:
+        等待秒数（不超过 MAX_RETRY_AFTER），没有提示时返回 None
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+            if value is not None:
+                return min(float(value), MAX_RETRY_AFTER)
+        except (TypeError, ValueError, AttributeError):
+            pass
+
+    text = str(exc)
+    for pattern in _RETRY_AFTER_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return min(float(match.group(1)), MAX_RETRY_AFTER)
+    return None
+
+
+def backoff_delay(attempt: int, base: float) -> float:
+    """
+    带抖动的指数退避时间，打散同时失败的请求
+
+    Args:
+        attempt: 已失败的次数（从 0 开始）
+        base: 退避基数
+
+    Returns:
+        等待秒数，范围 [base**attempt / 2, base**attempt]
+    """
+    delay = base ** attempt
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class AdaptiveController:
+    """单个 provider/model 的 AIMD 并发控制器"""
+
+    def __init__(self, ceiling: int, on_resize: Callable[[int], None]):
+        """
+        初始化控制器
+
+        Args:
+            ceiling: 并发上限的最大值
+            on_resize: 并发上限变化时的回调
+        """
+        self._lock = threading.Lock()
+        self._on_resize = on_resize
+        self.ceiling = max(ceiling, 1)
+        self.limit = self.ceiling
+
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._pause_until = 0.0
+
+        # 统计信息
+        self.throttle_count = 0
+        self.decrease_count = 0
+
+    def reset(self, ceiling: int) -> None:
+        """配置变化时重置上限"""
+        with self._lock:
+            self.ceiling = max(ceiling, 1)
+            self.limit = self.ceiling
+            self._successes = 0
+        self._on_resize(self.limit)
+
+    def pause_remaining(self, now: Optional[float] = None) -> float:
+        """距离限流暂停结束的秒数"""
+        now = time.monotonic() if now is None else now
+        return max(self._pause_until - now, 0.0)
+
+    def on_success(self) -> None:
+        """记录一次成功调用，必要时加性增长并发上限"""
+        with self._lock:
+            if self.limit >= self.ceiling:
+                return
+            self._successes += 1
+            if self._successes < self.limit:
+                return
+            self._successes = 0
+            self.limit += 1
+            limit = self.limit
+        logger.debug(f"自适应并发上限提升至 {limit}")
+        self._on_resize(limit)
+
+    def on_throttle(self, pause: float) -> None:
+        """
+        记录一次限流，乘性下降并发上限并暂停新的调用
+
+        Args:
+            pause: 所有调用需要暂停的秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.throttle_count += 1
+            self._pause_until = max(self._pause_until, now + pause)
+            if now - self._last_decrease < MIN_DECREASE_INTERVAL:
+                return
+            self._last_decrease = now
+            self._successes = 0
+            self.limit = max(self.limit // 2, 1)
+            self.decrease_count += 1
+            limit = self.limit
+        logger.warning(f"触发服务端限流，并发上限降至 {limit}，暂停 {pause:.1f} 秒")
+        self._on_resize(limit)
+
+    def get_stats(self) -> Dict:
+        """获取控制器状态"""
+        return {
+            "adaptive_limit": self.limit,
+            "adaptive_ceiling": self.ceiling,
+            "throttle_count": self.throttle_count,
+            "decrease_count": self.decrease_count,
+            "paused_seconds": round(self.pause_remaining(), 3),
+        }
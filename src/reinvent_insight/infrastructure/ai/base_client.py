@@ -3,10 +3,13 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
 
-from .config_models import ModelConfig, APIError
-from .rate_limiter import RateLimiter
+from .adaptive_control import ErrorKind, backoff_delay, classify_error, extract_retry_after
+from .config_models import ModelConfig, APIError, RateLimitPolicy
+from .executor import ModelExecutor, get_executor
+from .rate_limiter import RateLimiter, get_rate_limiter, estimate_tokens
+from .response_cache import file_fingerprint, get_response_cache, make_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +25,14 @@ class BaseModelClient(ABC):
             config: 模型配置
         """
         self.config = config
-        self._rate_limiter = RateLimiter(config.rate_limit_interval)
+        
+        # 同一 provider/model 的所有客户端共享一个限制器；
+        # 显式配置的配额覆盖已有策略，否则按任务的 interval 创建
+        self._rate_limiter: RateLimiter = get_rate_limiter(
+            f"{config.provider}/{config.model_name}",
+            config.rate_limit_policy or RateLimitPolicy(interval=config.rate_limit_interval),
+            override=config.rate_limit_policy is not None
+        )
         
         # 可观测层支持
         self._observability_enabled = False
@@ -77,10 +87,126 @@ class BaseModelClient(ABC):
         """
         pass
         
-    async def _apply_rate_limit(self) -> None:
-        """应用速率限制"""
-        await self._rate_limiter.acquire(self.config.provider)
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """当前 provider/model 的共享速率限制器"""
+        return self._rate_limiter
+    
+    @property
+    def executor(self) -> ModelExecutor:
+        """当前 provider 的 SDK 专用线程池"""
+        return get_executor(self.config.provider)
+    
+    async def _run_blocking(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        在 provider 专用线程池中执行阻塞的 SDK 调用
         
+        Args:
+            func: 同步函数
+            *args: 位置参数
+            timeout: 超时时间（秒），超时后未开始的调用会从队列移除
+            
+        Returns:
+            函数返回值
+            
+        Raises:
+            asyncio.TimeoutError: 超时
+        """
+        return await self.executor.run(func, *args, timeout=timeout)
+    
+    def _rate_limited(
+        self,
+        func: Callable,
+        prompt: str = "",
+        recorder: Optional[Any] = None
+    ) -> Callable:
+        """
+        包装单次 API 调用，使其在令牌桶和并发闸门的限制下执行
+        
+        与 _retry_with_backoff 配合使用，每次重试都会重新申请配额。
+        
+        Args:
+            func: 要执行的异步函数
+            prompt: 提示词（用于估算 token 消耗）
+            recorder: 可观测层记录器，用于记录限流等待耗时
+            
+        Returns:
+            包装后的异步函数
+        """
+        tokens = estimate_tokens(prompt) if self._rate_limiter.policy.tokens_per_minute else 0
+        attempts = 0
+        
+        async def _limited(*args, **kwargs):
+            nonlocal attempts
+            attempts += 1
+            if recorder is not None:
+                if attempts > 1:
+                    recorder.record_retry()
+                recorder.record_rate_limit_start()
+            async with self._rate_limiter.limit(tokens):
+                if recorder is not None:
+                    recorder.record_rate_limit_end()
+                return await func(*args, **kwargs)
+        
+        return _limited
+
+    async def _with_response_cache(
+        self,
+        method_name: str,
+        prompt: str,
+        params: Dict[str, Any],
+        producer: Callable,
+        recorder: Optional[Any] = None,
+        file_info: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        先查询响应缓存，未命中时执行实际调用并写入缓存
+
+        缓存未启用时直接执行调用。命中时不经过速率限制，也不占用线程池。
+
+        Args:
+            method_name: 调用的方法名
+            prompt: 提示词
+            params: 生成参数（参与缓存键计算）
+            producer: 无参异步函数，执行实际的 API 调用
+            recorder: 可观测层记录器，用于记录命中情况
+            file_info: 输入文件信息（参与缓存键计算）
+
+        Returns:
+            生成的文本内容
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return await producer()
+
+        try:
+            # 本地文件需要读取内容计算哈希，放到线程中执行
+            file_print = await asyncio.to_thread(file_fingerprint, file_info) if file_info else ""
+            key = make_cache_key(
+                self.config.provider,
+                self.config.model_name,
+                method_name,
+                params,
+                prompt,
+                file_print
+            )
+        except OSError as e:
+            logger.warning(f"计算响应缓存键失败，跳过缓存: {e}")
+            return await producer()
+
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            logger.info(f"模型响应缓存命中 [{self.config.provider}/{self.config.model_name}] {method_name}")
+            if recorder is not None:
+                recorder.record_cache("hit")
+            return cached
+
+        if recorder is not None:
+            recorder.record_cache("miss")
+        content = await producer()
+        await asyncio.to_thread(cache.put, key, content)
+        return content
+
     async def _retry_with_backoff(
         self,
         func: Callable,
@@ -88,7 +214,12 @@ class BaseModelClient(ABC):
         **kwargs
     ) -> Any:
         """
-        带指数退避的重试机制
+        按错误类型自适应重试
+        
+        - 限流：上报给共享限制器（降低并发并暂停该 provider/model 的所有调用），
+          优先采用服务端的 Retry-After 提示作为暂停时长
+        - 超时 / 其他临时错误：带抖动的指数退避后重试
+        - 致命错误（密钥无效、参数错误等）：立即抛出，不再重试
         
         Args:
             func: 要执行的异步函数
@@ -105,16 +236,31 @@ class BaseModelClient(ABC):
         
         for attempt in range(self.config.max_retries):
             try:
-                return await func(*args, **kwargs)
+                result = await func(*args, **kwargs)
+                self._rate_limiter.report_success()
+                return result
             except Exception as e:
                 last_exception = e
+                kind = classify_error(e)
+                
+                if kind is ErrorKind.FATAL:
+                    logger.error(f"API调用失败（不可重试）: {e}")
+                    raise
+                
+                wait_time = backoff_delay(attempt, self.config.retry_backoff_base)
+                if kind is ErrorKind.RATE_LIMIT:
+                    # 暂停由共享限制器执行，下一次尝试会在 acquire 时等待
+                    retry_after = extract_retry_after(e)
+                    self._rate_limiter.report_throttle(retry_after if retry_after is not None else wait_time)
+                    wait_time = 0
+                
                 if attempt < self.config.max_retries - 1:
-                    wait_time = self.config.retry_backoff_base ** attempt
                     logger.warning(
-                        f"API调用失败 (尝试 {attempt + 1}/{self.config.max_retries}): {e}"
+                        f"API调用失败 [{kind.value}] (尝试 {attempt + 1}/{self.config.max_retries}): {e}"
                     )
-                    logger.info(f"等待 {wait_time} 秒后重试...")
-                    await asyncio.sleep(wait_time)
+                    if wait_time > 0:
+                        logger.info(f"等待 {wait_time:.1f} 秒后重试...")
+                        await asyncio.sleep(wait_time)
                 else:
                     logger.error(
                         f"API调用失败，已达最大重试次数 ({self.config.max_retries})"
@@ -122,6 +268,53 @@ class BaseModelClient(ABC):
         
         raise APIError(f"API调用失败: {last_exception}") from last_exception
     
+    async def _pipeline_segments(
+        self,
+        segments: List[str],
+        synthesize: Callable,
+        concurrency: int = 1
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        以流水线方式合成多个文本片段，严格按原始顺序产出结果
+        
+        同时保持至多 concurrency 个片段在途，下一个片段完成后立即产出。
+        每个片段的每次尝试都经过令牌桶和并发闸门，失败的片段单独重试，
+        不会从头重新合成；某个片段最终失败时取消其余在途片段并抛出异常。
+        
+        Args:
+            segments: 文本片段列表
+            synthesize: 异步函数，接收单个文本片段，返回该片段的合成结果
+            concurrency: 最大在途片段数（1 表示逐个合成）
+            
+        Yields:
+            (片段序号, 合成结果)，序号从 0 开始
+        """
+        concurrency = max(1, concurrency)
+        in_flight: Dict[int, asyncio.Task] = {}
+        next_index = 0
+        
+        def _fill():
+            nonlocal next_index
+            while next_index < len(segments) and len(in_flight) < concurrency:
+                segment = segments[next_index]
+                in_flight[next_index] = asyncio.create_task(
+                    self._retry_with_backoff(self._rate_limited(synthesize, segment), segment)
+                )
+                next_index += 1
+        
+        try:
+            for index in range(len(segments)):
+                _fill()
+                result = await in_flight.pop(index)
+                # 产出前补充在途片段，消费方处理结果时后续片段继续合成
+                _fill()
+                yield index, result
+        finally:
+            for task in in_flight.values():
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+    
     def _start_observability_recording(
         self,
         method_name: str
@@ -6,7 +6,7 @@ import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from .config_models import ModelConfig
+from .config_models import ModelConfig, RateLimitPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,8 @@ class ModelConfigManager:
     _instance: Optional['ModelConfigManager'] = None
     _configs: Dict[str, ModelConfig] = {}
     _default_config: Optional[ModelConfig] = None
+    _rate_limit_policies: Dict[str, RateLimitPolicy] = {}
+    _executor_workers: Dict[str, int] = {}
     
     def __init__(self, config_path: Optional[Path] = None):
         """
@@ -48,6 +50,15 @@ class ModelConfigManager:
                 self._load_default_config()
                 return
             
+            # 加载 provider/model 级别的限流配额（需在解析任务配置之前）
+            for key, policy_config in (config_data.get('rate_limits') or {}).items():
+                self._rate_limit_policies[key] = self._parse_rate_limit_policy(key, policy_config or {})
+            
+            # 加载各 provider 的 SDK 线程池大小
+            for provider, executor_config in (config_data.get('executors') or {}).items():
+                if executor_config and executor_config.get('max_workers'):
+                    self._executor_workers[provider.lower()] = int(executor_config['max_workers'])
+            
             # 加载默认配置
             if 'default' in config_data:
                 self._default_config = self._parse_config('default', config_data['default'])
@@ -119,7 +130,8 @@ class ModelConfigManager:
             max_retries=max_retries,
             retry_backoff_base=retry_backoff_base,
             timeout=timeout,
-            concurrent_delay=concurrent_delay
+            concurrent_delay=concurrent_delay,
+            rate_limit_policy=self.get_rate_limit_policy(provider, model_name)
         )
         
         # 解析 TTS 专用配置（仅在 text_to_speech 任务类型时）
@@ -128,9 +140,67 @@ class ModelConfigManager:
             setattr(mc, 'tts_default_voice', tts_cfg.get('default_voice', 'Kai'))
             setattr(mc, 'tts_default_language', tts_cfg.get('default_language', 'Chinese'))
             setattr(mc, 'tts_sample_rate', tts_cfg.get('sample_rate', 24000))
+            setattr(mc, 'tts_pipeline_concurrency', int(self._get_env_override(
+                task_type, 'tts_pipeline_concurrency', tts_cfg.get('pipeline_concurrency', 3)
+            )))
         
         return mc
     
+    def _parse_rate_limit_policy(self, key: str, config_dict: Dict[str, Any]) -> RateLimitPolicy:
+        """
+        解析 rate_limits 中的单个配额配置
+        
+        Args:
+            key: 配额键（"provider" 或 "provider/model"）
+            config_dict: 配置字典
+            
+        Returns:
+            RateLimitPolicy 对象
+        """
+        def optional(name: str, cast):
+            value = config_dict.get(name)
+            return cast(value) if value is not None else None
+        
+        policy = RateLimitPolicy(
+            interval=float(config_dict.get('interval', 0.0)),
+            requests_per_minute=optional('requests_per_minute', float),
+            tokens_per_minute=optional('tokens_per_minute', float),
+            burst=int(config_dict.get('burst', 1)),
+            max_concurrency=optional('max_concurrency', int),
+        )
+        logger.debug(f"限流配额 [{key}]: {policy}")
+        return policy
+    
+    def get_rate_limit_policy(self, provider: str, model_name: str) -> Optional[RateLimitPolicy]:
+        """
+        获取 provider/model 的显式限流配额
+        
+        查找顺序："provider/model" -> "provider"。
+        
+        Args:
+            provider: 模型提供商
+            model_name: 模型名称
+            
+        Returns:
+            RateLimitPolicy 对象，未配置时返回 None
+        """
+        return (
+            self._rate_limit_policies.get(f"{provider}/{model_name}")
+            or self._rate_limit_policies.get(provider)
+        )
+    
+    def get_executor_workers(self, provider: str) -> Optional[int]:
+        """
+        获取 provider 的 SDK 线程池大小
+        
+        Args:
+            provider: 模型提供商
+            
+        Returns:
+            线程数，未配置时返回 None
+        """
+        return self._executor_workers.get(provider.lower())
+    
     def _get_env_override(self, task_type: str, param_name: str, default_value: Any) -> Any:
         """
         获取环境变量覆盖值
@@ -207,6 +277,8 @@ class ModelConfigManager:
         """重新加载配置（用于热更新）"""
         logger.info("重新加载配置...")
         self._configs.clear()
+        self._rate_limit_policies.clear()
+        self._executor_workers.clear()
         self._default_config = None
         self.load_config()
     
@@ -1,6 +1,26 @@
 """AI模型配置数据模型和异常类"""
 
 from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class RateLimitPolicy:
+    """限流策略（按 provider/model 生效）"""
+    interval: float = 0.0                        # 最小调用间隔（秒），未配置 requests_per_minute 时使用
+    requests_per_minute: Optional[float] = None  # 每分钟请求数
+    tokens_per_minute: Optional[float] = None    # 每分钟输入 token 数
+    burst: int = 1                               # 请求令牌桶容量（允许的突发请求数）
+    max_concurrency: Optional[int] = None        # 最大在途请求数，None 表示不限制
+    
+    @property
+    def request_rate(self) -> Optional[float]:
+        """每秒允许的请求数，未限制时返回 None"""
+        if self.requests_per_minute:
+            return self.requests_per_minute / 60.0
+        if self.interval > 0:
+            return 1.0 / self.interval
+        return None
 
 
 @dataclass
@@ -26,6 +46,7 @@ class ModelConfig:
     retry_backoff_base: float = 2.0   # 重试退避基数
     timeout: int = 120                # API超时时间（秒）
     concurrent_delay: float = 0.5     # 并发处理时每个任务的启动间隔（秒）
+    rate_limit_policy: Optional[RateLimitPolicy] = None  # rate_limits 中显式配置的配额（None 表示按 interval 限流）
 
 
 class ModelConfigError(Exception):
@@ -46,6 +46,18 @@ class DashScopeClient(BaseModelClient):
         except Exception as e:
             raise ConfigurationError(f"DashScope客户端初始化失败: {e}")
     
+    async def _call_with_timeout(self, call_api):
+        """
+        在 DashScope 专用线程池中执行同步调用，并限制总耗时
+        
+        SDK 的 request_timeout 负责结束卡住的 HTTP 请求以释放线程，
+        这里额外留出少量余量作为整体超时。
+        """
+        try:
+            return await self._run_blocking(call_api, timeout=self.config.timeout + 5)
+        except asyncio.TimeoutError:
+            raise APIError(f"API 调用超时（超过 {self.config.timeout} 秒），请检查网络连接或减少输入长度")
+    
     async def generate_content(
         self, 
         prompt: str, 
@@ -67,17 +79,16 @@ class DashScopeClient(BaseModelClient):
         # 钩子：开始可观测层记录
         recorder = self._start_observability_recording("generate_content")
         
-        await self._apply_rate_limit()
-        
         logger.info(f"开始使用 {self.config.model_name} 生成内容...")
         
         # 钩子：记录请求
-        self._record_request(recorder, prompt, {
+        request_params = {
             "is_json": is_json,
             "temperature": self.config.temperature,
             "top_p": self.config.top_p,
             "max_tokens": self.config.max_output_tokens
-        })
+        }
+        self._record_request(recorder, prompt, request_params)
         
         # 构建消息
         messages = [
@@ -89,9 +100,7 @@ class DashScopeClient(BaseModelClient):
             messages[0]['content'] = f"{prompt}\n\n请以JSON格式返回结果。"
         
         async def _generate():
-            # DashScope SDK 使用同步调用，需要在executor中运行
-            loop = asyncio.get_event_loop()
-            
+            # DashScope SDK 使用同步调用，在 DashScope 专用线程池中运行
             def _call_api():
                 response = self.Generation.call(
                     model=self.config.model_name,
@@ -100,10 +109,11 @@ class DashScopeClient(BaseModelClient):
                     temperature=self.config.temperature,
                     top_p=self.config.top_p,
                     max_tokens=self.config.max_output_tokens,
+                    request_timeout=self.config.timeout,
                 )
                 return response
             
-            response = await loop.run_in_executor(None, _call_api)
+            response = await self._call_with_timeout(_call_api)
             
             # 检查响应状态
             if response.status_code != 200:
@@ -123,7 +133,11 @@ class DashScopeClient(BaseModelClient):
             return content
         
         try:
-            content = await self._retry_with_backoff(_generate)
+            content = await self._with_response_cache(
+                "generate_content", prompt, request_params,
+                lambda: self._retry_with_backoff(self._rate_limited(_generate, prompt, recorder)),
+                recorder=recorder
+            )
             logger.info(f"{self.config.model_name} 内容生成完成")
             
             # 钩子：记录响应
@@ -167,19 +181,18 @@ class DashScopeClient(BaseModelClient):
         # 钩子：开始可观测层记录
         recorder = self._start_observability_recording("generate_content_with_file")
         
-        await self._apply_rate_limit()
-        
         logger.info(f"开始使用 {self.config.model_name} 进行多模态分析...")
         
         # 钩子：记录请求
-        self._record_request(recorder, prompt, {
+        request_params = {
             "is_json": is_json,
             "has_file": True,
             "file_type": file_info.get("mime_type", "unknown"),
             "temperature": self.config.temperature,
             "top_p": self.config.top_p,
             "max_tokens": self.config.max_output_tokens
-        })
+        }
+        self._record_request(recorder, prompt, request_params)
         
         # 构建多模态消息
         content_parts = []
@@ -222,8 +235,6 @@ class DashScopeClient(BaseModelClient):
         ]
         
         async def _generate():
-            loop = asyncio.get_event_loop()
-            
             def _call_api():
                 # 使用支持多模态的模型
                 model = self.config.model_name
@@ -240,10 +251,11 @@ class DashScopeClient(BaseModelClient):
                     temperature=self.config.temperature,
                     top_p=self.config.top_p,
                     max_tokens=self.config.max_output_tokens,
+                    request_timeout=self.config.timeout,
                 )
                 return response
             
-            response = await loop.run_in_executor(None, _call_api)
+            response = await self._call_with_timeout(_call_api)
             
             # 检查响应状态
             if response.status_code != 200:
@@ -263,7 +275,12 @@ class DashScopeClient(BaseModelClient):
             return content
         
         try:
-            content = await self._retry_with_backoff(_generate)
+            content = await self._with_response_cache(
+                "generate_content_with_file", prompt, request_params,
+                lambda: self._retry_with_backoff(self._rate_limited(_generate, prompt, recorder)),
+                recorder=recorder,
+                file_info=file_info
+            )
             logger.info(f"{self.config.model_name} 多模态分析完成")
             
             # 钩子：记录响应
@@ -393,9 +410,10 @@ class DashScopeClient(BaseModelClient):
         
         使用输入端分片策略实现低延迟流式播放：
         1. 将长文本切分为多个短片段（50-100字）
-        2. 使用 MultiModalConversation.call 串行处理每个片段
-        3. 一旦收到音频数据就立即 yield
-        4. 持续处理后续片段，实现连续播放
+        2. 使用 MultiModalConversation.call 流水线处理各片段
+           （同时在途 tts_pipeline_concurrency 个片段）
+        3. 严格按顺序 yield，下一个片段一完成就立即输出
+        4. 失败的片段单独重试，不会从头重新合成
         
         Args:
             text: 要转换的文本
@@ -408,19 +426,19 @@ class DashScopeClient(BaseModelClient):
         Raises:
             APIError: API 调用失败
         """
-        await self._apply_rate_limit()
-        
         try:
             import base64
             
             # 记录流开始的详细信息
             start_time = asyncio.get_event_loop().time()
+            concurrency = getattr(self.config, 'tts_pipeline_concurrency', 1)
             logger.info(
                 f"🎤 开始 Qwen3-TTS 流式 TTS: "
                 f"model={self.config.model_name}, "
                 f"voice={voice}, "
                 f"language={language}, "
-                f"text_length={len(text)}"
+                f"text_length={len(text)}, "
+                f"concurrency={concurrency}"
             )
             
             # 🔥 关键策略：将长文本切分为多个短片段（50-100字）
@@ -432,17 +450,8 @@ class DashScopeClient(BaseModelClient):
             total_bytes = 0
             first_audio_time = None
             
-            for segment_index, text_segment in enumerate(text_chunks, 1):
-                segment_start_time = asyncio.get_event_loop().time()
-                logger.info(f"🎯 处理片段 {segment_index}/{len(text_chunks)}: {len(text_segment)} 字符")
-                
-                # 在片段之间添加短暂延迟，避免请求过快导致连接问题
-                if segment_index > 1:
-                    await asyncio.sleep(0.5)
-                
-                # 为每个片段生成音频（使用 MultiModalConversation API）
-                loop = asyncio.get_event_loop()
-                
+            async def generate_segment_audio(text_segment):
+                """为单个文本片段生成音频（使用 MultiModalConversation API），返回 PCM 数据"""
                 def _call_and_collect_tts():
                     """
                     在同步上下文中调用 DashScope API 并收集所有音频块
@@ -498,9 +507,7 @@ class DashScopeClient(BaseModelClient):
                     return segment_audio_data, audio_url
                 
                 # ✅ 整个同步过程在 executor 中执行，不阻塞事件循环
-                segment_audio_data, audio_url = await loop.run_in_executor(
-                    None, _call_and_collect_tts
-                )
+                segment_audio_data, audio_url = await self._run_blocking(_call_and_collect_tts)
                 
                 # 如果收到的是 URL，需要下载音频
                 if audio_url and not segment_audio_data:
@@ -512,7 +519,14 @@ class DashScopeClient(BaseModelClient):
                         response.raise_for_status()
                         return response.content
                     
-                    segment_audio_data = await loop.run_in_executor(None, _download_audio)
+                    segment_audio_data = await self._run_blocking(_download_audio)
+                
+                return segment_audio_data
+            
+            async for segment_index, segment_audio_data in self._pipeline_segments(
+                text_chunks, generate_segment_audio, concurrency
+            ):
+                segment_index += 1
                 
                 if not segment_audio_data:
                     logger.warning(f"⚠️  片段 {segment_index} 没有生成音频，跳过")
@@ -530,16 +544,13 @@ class DashScopeClient(BaseModelClient):
                 total_bytes += len(segment_audio_data)
                 
                 logger.info(
-                    f"📦 发送片段 {segment_index} 的音频: "
+                    f"📦 发送片段 {segment_index}/{len(text_chunks)} 的音频: "
                     f"{len(segment_audio_data)} bytes, "
                     f"累计 {total_bytes / 1024:.1f}KB"
                 )
                 
                 # ✅ 立即 yield 给前端播放！
                 yield b64_data.encode('utf-8')
-                
-                segment_time = asyncio.get_event_loop().time() - segment_start_time
-                logger.info(f"✅ 片段 {segment_index} 完成，耗时 {segment_time:.2f}s")
             
             # 记录完成统计
             end_time = asyncio.get_event_loop().time()
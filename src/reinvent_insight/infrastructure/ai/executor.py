@@ -0,0 +1,178 @@
+"""模型 SDK 专用线程池
+
+Gemini / DashScope 的 SDK 都是同步阻塞调用，高思考模式下单次调用可长达
+300 秒以上。如果与文件读写、yt-dlp、PDF 生成等共用事件循环的默认线程池，
+长调用会把线程占满，导致无关任务排队。
+
+本模块为每个 provider 提供独立的有界线程池：
+
+- 线程数可在 config/model_config.yaml 的 executors 段配置
+- 统计排队等待时间和实际调用时间，便于区分"线程池不够"与"模型慢"
+- 超时或取消时，尚未开始执行的任务直接从队列移除；已在执行的调用
+  由 SDK 层的请求超时负责结束，期间计入 abandoned 统计
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 未在配置中指定时每个 provider 的线程数
+DEFAULT_EXECUTOR_WORKERS = 16
+
+
+class ModelExecutor:
+    """单个 provider 的有界线程池"""
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        初始化线程池
+
+        Args:
+            name: 线程池名称（provider）
+            max_workers: 最大线程数
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"model-{name}")
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled_before_start = 0
+        self.abandoned = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_call_seconds = 0.0
+        self.max_call_seconds = 0.0
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        在线程池中执行阻塞调用
+
+        Args:
+            func: 同步函数
+            *args: 位置参数
+            timeout: 超时时间（秒），包含排队时间；None 表示不限制
+
+        Returns:
+            函数返回值
+
+        Raises:
+            asyncio.TimeoutError: 超时
+        """
+        submitted = time.monotonic()
+
+        def _job():
+            started = time.monotonic()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                wait = started - submitted
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            success = False
+            try:
+                result = func(*args)
+                success = True
+                return result
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self.running -= 1
+                    self.total_call_seconds += elapsed
+                    self.max_call_seconds = max(self.max_call_seconds, elapsed)
+                    if success:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        with self._lock:
+            self.queued += 1
+        future = self._pool.submit(_job)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # 未开始执行的任务可以直接移除，释放排队位置
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+                    self.cancelled_before_start += 1
+            elif not future.done():
+                with self._lock:
+                    self.abandoned += 1
+                logger.warning(f"[{self.name}] 调用已超时/取消，但线程仍在执行，等待 SDK 请求超时后释放")
+            raise
+
+    def shutdown(self) -> None:
+        """关闭线程池（不等待正在执行的调用）"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        """获取线程池统计信息"""
+        with self._lock:
+            finished = self.completed + self.failed
+            started = finished + self.running
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queued": self.queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled_before_start": self.cancelled_before_start,
+                "abandoned": self.abandoned,
+                "avg_wait_ms": int(self.total_wait_seconds / started * 1000) if started else 0,
+                "max_wait_ms": int(self.max_wait_seconds * 1000),
+                "avg_call_ms": int(self.total_call_seconds / finished * 1000) if finished else 0,
+                "max_call_ms": int(self.max_call_seconds * 1000),
+            }
+
+
+# 全局线程池注册表：provider -> ModelExecutor
+_executors: Dict[str, ModelExecutor] = {}
+_registry_lock = threading.Lock()
+
+
+def get_executor(provider: str) -> ModelExecutor:
+    """
+    获取（必要时创建）指定 provider 的线程池
+
+    线程数来自 ModelConfigManager 的 executors 配置，未配置时使用 DEFAULT_EXECUTOR_WORKERS。
+
+    Args:
+        provider: 模型提供商
+
+    Returns:
+        ModelExecutor 实例
+    """
+    provider = provider.lower()
+    executor = _executors.get(provider)
+    if executor is not None:
+        return executor
+
+    from .config_manager import ModelConfigManager
+    max_workers = ModelConfigManager.get_instance().get_executor_workers(provider) or DEFAULT_EXECUTOR_WORKERS
+
+    with _registry_lock:
+        executor = _executors.get(provider)
+        if executor is None:
+            executor = ModelExecutor(provider, max_workers)
+            _executors[provider] = executor
+            logger.info(f"已创建模型线程池 [{provider}]: {max_workers} 个线程")
+    return executor
+
+
+def get_executor_stats() -> Dict[str, Dict]:
+    """获取所有模型线程池的统计信息"""
+    with _registry_lock:
+        executors = list(_executors.values())
+    return {executor.name: executor.get_stats() for executor in executors}
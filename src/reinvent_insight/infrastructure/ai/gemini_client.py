@@ -45,6 +45,23 @@ class GeminiClient(BaseModelClient):
         except Exception as e:
             raise ConfigurationError(f"Gemini客户端初始化失败: {e}")
     
+    def _resolve_timeout(self, thinking_level: str) -> float:
+        """
+        计算单次调用的超时时间
+        
+        使用配置中的 timeout；高思考模式需要更长的思考时间，配置较短时自动增加。
+        """
+        base_timeout = self.config.timeout
+        if thinking_level == "high" and base_timeout < 300:
+            timeout_seconds = max(base_timeout * 1.5, 300)  # 高思考模式至少300秒
+            logger.debug(f"高思考模式，超时时间从 {base_timeout}秒 增加到 {timeout_seconds}秒")
+            return timeout_seconds
+        return base_timeout
+    
+    def _http_options(self, timeout_seconds: float):
+        """SDK 层的请求超时，保证调用超时后线程池中的线程也能及时释放"""
+        return self.types.HttpOptions(timeout=int(timeout_seconds * 1000))
+    
     async def generate_content(
         self, 
         prompt: str, 
@@ -68,8 +85,6 @@ class GeminiClient(BaseModelClient):
         # 钩子：开始可观测层记录
         recorder = self._start_observability_recording("generate_content")
         
-        await self._apply_rate_limit()
-        
         # 如果没有指定thinking_level，根据配置自动选择
         if thinking_level is None:
             thinking_level = "low" if self.config.low_thinking else "high"
@@ -77,14 +92,17 @@ class GeminiClient(BaseModelClient):
         logger.info(f"开始使用 {self.config.model_name} 生成内容 (thinking_level={thinking_level}, from_config={thinking_level is None})...")
         
         # 钩子：记录请求
-        self._record_request(recorder, prompt, {
+        request_params = {
             "is_json": is_json,
             "thinking_level": thinking_level,
             "temperature": self.config.temperature,
             "top_p": self.config.top_p,
             "top_k": self.config.top_k,
             "max_output_tokens": self.config.max_output_tokens
-        })
+        }
+        self._record_request(recorder, prompt, request_params)
+        
+        timeout_seconds = self._resolve_timeout(thinking_level)
         
         # 使用新的google.genai SDK
         config = self.types.GenerateContentConfig(
@@ -93,23 +111,12 @@ class GeminiClient(BaseModelClient):
             top_k=self.config.top_k,
             max_output_tokens=self.config.max_output_tokens,
             response_mime_type="application/json" if is_json else "text/plain",
-            thinking_config=self.types.ThinkingConfig(thinking_level=thinking_level)
+            thinking_config=self.types.ThinkingConfig(thinking_level=thinking_level),
+            http_options=self._http_options(timeout_seconds)
         )
         
         async def _generate():
-            # 设置超时时间：使用配置中的timeout，如果是高思考模式且配置超时较短，则自动增加
-            # 高思考模式需要更长的思考时间
-            base_timeout = self.config.timeout
-            if thinking_level == "high" and base_timeout < 300:
-                timeout_seconds = max(base_timeout * 1.5, 300)  # 高思考模式至少300秒
-                logger.debug(f"高思考模式，超时时间从 {base_timeout}秒 增加到 {timeout_seconds}秒")
-            else:
-                timeout_seconds = base_timeout
-            
             try:
-                # 使用 run_in_executor 避免阻塞事件循环
-                loop = asyncio.get_event_loop()
-                
                 def sync_generate():
                     # 使用新的 google.genai SDK 调用
                     return self.client.models.generate_content(
@@ -118,10 +125,8 @@ class GeminiClient(BaseModelClient):
                         config=config
                     )
                 
-                response = await asyncio.wait_for(
-                    loop.run_in_executor(None, sync_generate),
-                    timeout=timeout_seconds
-                )
+                # 在 Gemini 专用线程池中执行，避免阻塞事件循环和占用默认线程池
+                response = await self._run_blocking(sync_generate, timeout=timeout_seconds)
                 
                 # 提取文本内容
                 if not response.text:
@@ -133,7 +138,11 @@ class GeminiClient(BaseModelClient):
                 raise APIError(f"API 调用超时（超过 {timeout_seconds} 秒），请检查网络连接或减少输入长度")
         
         try:
-            content = await self._retry_with_backoff(_generate)
+            content = await self._with_response_cache(
+                "generate_content", prompt, request_params,
+                lambda: self._retry_with_backoff(self._rate_limited(_generate, prompt, recorder)),
+                recorder=recorder
+            )
             logger.info(f"{self.config.model_name} 内容生成完成")
             
             # 钩子：记录响应
@@ -179,8 +188,6 @@ class GeminiClient(BaseModelClient):
         # 钩子：开始可观测层记录
         recorder = self._start_observability_recording("generate_content_with_file")
         
-        await self._apply_rate_limit()
-        
         # 如果没有指定thinking_level，根据配置自动选择
         if thinking_level is None:
             thinking_level = "low" if self.config.low_thinking else "high"
@@ -188,7 +195,7 @@ class GeminiClient(BaseModelClient):
         logger.info(f"开始使用 {self.config.model_name} 进行多模态分析 (thinking_level={thinking_level})...")
         
         # 钩子：记录请求
-        self._record_request(recorder, prompt, {
+        request_params = {
             "is_json": is_json,
             "thinking_level": thinking_level,
             "has_file": True,
@@ -197,7 +204,10 @@ class GeminiClient(BaseModelClient):
             "top_p": self.config.top_p,
             "top_k": self.config.top_k,
             "max_output_tokens": self.config.max_output_tokens
-        })
+        }
+        self._record_request(recorder, prompt, request_params)
+        
+        timeout_seconds = self._resolve_timeout(thinking_level)
         
         generation_config = self.types.GenerateContentConfig(
             temperature=self.config.temperature,
@@ -205,21 +215,12 @@ class GeminiClient(BaseModelClient):
             top_k=self.config.top_k,
             max_output_tokens=self.config.max_output_tokens,
             response_mime_type="application/json" if is_json else "text/plain",
-            thinking_config=self.types.ThinkingConfig(thinking_level=thinking_level)
+            thinking_config=self.types.ThinkingConfig(thinking_level=thinking_level),
+            http_options=self._http_options(timeout_seconds)
         )
         
         async def _generate():
-            # 根据思考级别设置超时
-            base_timeout = self.config.timeout
-            if thinking_level == "high" and base_timeout < 300:
-                timeout_seconds = max(base_timeout * 1.5, 300)
-                logger.debug(f"高思考模式，超时时间从 {base_timeout}秒 增加到 {timeout_seconds}秒")
-            else:
-                timeout_seconds = base_timeout
-            
             try:
-                loop = asyncio.get_event_loop()
-                
                 # 根据文件类型选择处理方式
                 if file_info.get("local_file", False):
                     # 使用本地文件
@@ -240,10 +241,7 @@ class GeminiClient(BaseModelClient):
                             config=generation_config
                         )
                     
-                    response = await asyncio.wait_for(
-                        loop.run_in_executor(None, read_and_process),
-                        timeout=timeout_seconds
-                    )
+                    response = await self._run_blocking(read_and_process, timeout=timeout_seconds)
                 else:
                     # 使用已上传的文件引用
                     def sync_generate_with_file():
@@ -254,10 +252,7 @@ class GeminiClient(BaseModelClient):
                             config=generation_config
                         )
                     
-                    response = await asyncio.wait_for(
-                        loop.run_in_executor(None, sync_generate_with_file),
-                        timeout=timeout_seconds
-                    )
+                    response = await self._run_blocking(sync_generate_with_file, timeout=timeout_seconds)
                 
                 # 检查是否有候选内容
                 if not response.candidates:
@@ -277,7 +272,12 @@ class GeminiClient(BaseModelClient):
                 raise APIError(f"API 调用超时（超过 {timeout_seconds} 秒），请检查网络连接或减少输入长度")
         
         try:
-            content = await self._retry_with_backoff(_generate)
+            content = await self._with_response_cache(
+                "generate_content_with_file", prompt, request_params,
+                lambda: self._retry_with_backoff(self._rate_limited(_generate, prompt, recorder)),
+                recorder=recorder,
+                file_info=file_info
+            )
             logger.info(f"{self.config.model_name} 多模态分析完成")
             
             # 钩子：记录响应
@@ -310,12 +310,9 @@ class GeminiClient(BaseModelClient):
             APIError: 上传失败
         """
         try:
-            loop = asyncio.get_event_loop()
-            
             # 尝试上传文件
             try:
-                file_obj = await loop.run_in_executor(
-                    None, 
+                file_obj = await self._run_blocking(
                     lambda: self.client.files.upload(file=file_path)
                 )
                 
@@ -372,9 +369,7 @@ class GeminiClient(BaseModelClient):
             删除是否成功
         """
         try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None, 
+            await self._run_blocking(
                 lambda: self.client.files.delete(name=file_id)
             )
             logger.info(f"已删除文件: {file_id}")
@@ -455,10 +450,10 @@ class GeminiClient(BaseModelClient):
         生成 TTS 音频（使用输入端分片策略实现低延迟流式播放）
         
         策略：
-        1. 将长文本切分为多个短片段（50-100字）
-        2. 串行请求每个片段的 TTS
-        3. 一旦收到第一个片段的音频就立即 yield
-        4. 持续处理后续片段，实现连续播放
+        1. 将长文本切分为多个短片段（20-30字）
+        2. 流水线请求各片段的 TTS（同时在途 tts_pipeline_concurrency 个片段）
+        3. 严格按顺序 yield，下一个片段一完成就立即输出
+        4. 失败的片段单独重试，不会从头重新合成
         
         这样可以将首字延迟从 15 秒降低到 3-5 秒！
         
@@ -473,8 +468,6 @@ class GeminiClient(BaseModelClient):
         Raises:
             APIError: API 调用失败
         """
-        await self._apply_rate_limit()
-        
         try:
             # 使用新的 google-genai SDK
             try:
@@ -489,12 +482,14 @@ class GeminiClient(BaseModelClient):
             
             # 记录流开始的详细信息
             start_time = asyncio.get_event_loop().time()
+            concurrency = getattr(self.config, 'tts_pipeline_concurrency', 1)
             logger.info(
                 f"🎤 开始输入端分片流式 TTS: "
                 f"model={self.config.model_name}, "
                 f"voice={voice}, "
                 f"language={language}, "
-                f"text_length={len(text)}"
+                f"text_length={len(text)}, "
+                f"concurrency={concurrency}"
             )
             
             # 🔥 关键策略：将长文本切分为多个短片段（20-30字，约2-4秒音频）
@@ -514,73 +509,54 @@ class GeminiClient(BaseModelClient):
             total_bytes = 0
             first_audio_time = None
             
-            for segment_index, text_segment in enumerate(text_chunks, 1):
-                segment_start_time = asyncio.get_event_loop().time()
-                logger.info(f"🎯 处理片段 {segment_index}/{len(text_chunks)}: {len(text_segment)} 字符")
-                
-                # 为每个片段生成音频
-                async def generate_segment_audio(segment_text):
-                    """为单个文本片段生成音频"""
-                    def _get_stream():
-                        return client.models.generate_content_stream(
-                            model=self.config.model_name,
-                            contents=segment_text,
-                            config=types.GenerateContentConfig(
-                                response_modalities=["AUDIO"],
-                                speech_config=types.SpeechConfig(
-                                    voice_config=types.VoiceConfig(
-                                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                            voice_name=voice
-                                        )
+            async def generate_segment_audio(segment_text):
+                """为单个文本片段生成音频，返回 PCM 数据块列表"""
+                def _get_stream():
+                    return client.models.generate_content_stream(
+                        model=self.config.model_name,
+                        contents=segment_text,
+                        config=types.GenerateContentConfig(
+                            response_modalities=["AUDIO"],
+                            speech_config=types.SpeechConfig(
+                                voice_config=types.VoiceConfig(
+                                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                        voice_name=voice
                                     )
                                 )
                             )
                         )
+                    )
+                
+                # 在 Gemini 专用线程池中获取流
+                stream = await self._run_blocking(_get_stream)
+                
+                # 收集这个片段的所有音频块；读取出错时抛出，由流水线重试该片段
+                segment_audio_chunks = []
+                while True:
+                    chunk = await self._run_blocking(next, stream, None)
+                    if chunk is None:
+                        break
                     
-                    # 在线程池中获取流
-                    stream = await asyncio.to_thread(_get_stream)
-                    
-                    # 收集这个片段的所有音频块
-                    segment_audio_chunks = []
-                    chunk_index = 0
-                    
-                    while True:
-                        try:
-                            chunk = await asyncio.to_thread(lambda: next(stream, None))
-                            if chunk is None:
-                                break
-                            
-                            chunk_index += 1
-                            
-                            # 解析音频数据
-                            if hasattr(chunk, 'candidates') and chunk.candidates:
-                                candidate = chunk.candidates[0]
-                                if hasattr(candidate, 'content') and candidate.content:
-                                    if hasattr(candidate.content, 'parts') and candidate.content.parts:
-                                        for part in candidate.content.parts:
-                                            if hasattr(part, 'inline_data') and part.inline_data:
-                                                if hasattr(part.inline_data, 'data') and part.inline_data.data:
-                                                    audio_data = part.inline_data.data
-                                                    
-                                                    # 解码音频数据
-                                                    if isinstance(audio_data, str):
-                                                        pcm_data = base64.b64decode(audio_data)
-                                                    else:
-                                                        pcm_data = audio_data
-                                                    
-                                                    if pcm_data:
-                                                        segment_audio_chunks.append(pcm_data)
+                    # 解析音频数据
+                    candidates = getattr(chunk, 'candidates', None)
+                    content = getattr(candidates[0], 'content', None) if candidates else None
+                    for part in (getattr(content, 'parts', None) or []):
+                        inline_data = getattr(part, 'inline_data', None)
+                        audio_data = getattr(inline_data, 'data', None) if inline_data else None
+                        if not audio_data:
+                            continue
                         
-                        except StopIteration:
-                            break
-                        except Exception as e:
-                            logger.error(f"读取片段音频块时出错: {e}")
-                            break
-                    
-                    return segment_audio_chunks
+                        # 解码音频数据
+                        pcm_data = base64.b64decode(audio_data) if isinstance(audio_data, str) else audio_data
+                        if pcm_data:
+                            segment_audio_chunks.append(pcm_data)
                 
-                # 生成这个片段的音频
-                segment_audio_chunks = await generate_segment_audio(text_segment)
+                return segment_audio_chunks
+            
+            async for segment_index, segment_audio_chunks in self._pipeline_segments(
+                text_chunks, generate_segment_audio, concurrency
+            ):
+                segment_index += 1
                 
                 if not segment_audio_chunks:
                     logger.warning(f"⚠️  片段 {segment_index} 没有生成音频，跳过")
@@ -599,16 +575,13 @@ class GeminiClient(BaseModelClient):
                     total_bytes += len(pcm_data)
                     
                     logger.info(
-                        f"📦 发送片段 {segment_index} 的音频: "
+                        f"📦 发送片段 {segment_index}/{len(text_chunks)} 的音频: "
                         f"{len(pcm_data)} bytes, "
                         f"累计 {total_bytes / 1024:.1f}KB"
                     )
                     
                     # ✅ 立即 yield 给前端播放！
                     yield b64_data.encode('utf-8')
-                
-                segment_time = asyncio.get_event_loop().time() - segment_start_time
-                logger.info(f"✅ 片段 {segment_index} 完成，耗时 {segment_time:.2f}s")
             
             # 记录完成统计
             end_time = asyncio.get_event_loop().time()
@@ -9,13 +9,14 @@
 # 导出核心类和函数
 from .config_models import (
     ModelConfig,
+    RateLimitPolicy,
     ModelConfigError,
     ConfigurationError,
     UnsupportedProviderError,
     APIError,
 )
 
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, get_rate_limiter_stats
 
 from .base_client import BaseModelClient
 
@@ -33,6 +34,7 @@ from .client_factory import (
 __all__ = [
     # 数据模型
     'ModelConfig',
+    'RateLimitPolicy',
     
     # 异常类
     'ModelConfigError',
@@ -53,4 +55,5 @@ __all__ = [
     # 便捷函数
     'get_model_client',
     'get_default_client',
+    'get_rate_limiter_stats',
 ]
@@ -86,6 +86,8 @@ class LogFormatter:
             lines.append(f"  • 重试次数: {record.retry_count}")
         if record.rate_limit_wait_ms > 0:
             lines.append(f"  • 速率限制等待: {record.rate_limit_wait_ms:,} ms")
+        if record.cache_status:
+            lines.append(f"  • 响应缓存: {record.cache_status}")
         
         # 状态
         status_emoji = "✅" if record.status == "success" else "❌" if record.status == "error" else "⏱️"
@@ -137,7 +139,8 @@ class LogFormatter:
             "performance": {
                 "latency_ms": record.latency_ms,
                 "retry_count": record.retry_count,
-                "rate_limit_wait_ms": record.rate_limit_wait_ms
+                "rate_limit_wait_ms": record.rate_limit_wait_ms,
+                "cache_status": record.cache_status
             }
         }
         
@@ -3,7 +3,7 @@
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 import asyncio
 from threading import Lock
 
@@ -60,6 +60,33 @@ class ObservabilityManager:
         """检查是否启用可观测"""
         return self.enabled and self._error_count < self._max_errors
     
+    def get_rate_limit_status(self) -> Dict[str, Dict]:
+        """
+        获取各 provider/model 当前的限流状态
+        
+        包括自适应并发上限、在途/等待请求数、限流次数和剩余暂停时间。
+        与日志是否启用无关，始终可用。
+        """
+        from ..rate_limiter import get_rate_limiter_stats
+        return get_rate_limiter_stats()
+    
+    def get_executor_status(self) -> Dict[str, Dict]:
+        """
+        获取各 provider SDK 线程池的状态
+        
+        包括运行/排队中的调用数、排队等待时间与实际调用时间、超时后仍在执行的调用数。
+        """
+        from ..executor import get_executor_stats
+        return get_executor_stats()
+    
+    def get_response_cache_status(self) -> Dict[str, Any]:
+        """获取模型响应缓存的状态（大小与命中率）"""
+        from ..response_cache import get_response_cache
+        cache = get_response_cache()
+        if cache is None:
+            return {"enabled": False}
+        return cache.get_stats()
+    
     def log_interaction(self, record: Optional[InteractionRecord]) -> None:
         """
         记录一次交互
@@ -36,6 +36,7 @@ class InteractionRecord:
     latency_ms: int = 0
     retry_count: int = 0
     rate_limit_wait_ms: int = 0
+    cache_status: Optional[str] = None  # hit / miss，未启用响应缓存时为 None
     
     # 错误信息（可选）
     error_message: Optional[str] = None
@@ -156,6 +156,11 @@ class InteractionRecorder:
             self.record.rate_limit_wait_ms += wait_time
             self._rate_limit_start = None
     
+    def record_cache(self, status: str) -> None:
+        """记录响应缓存命中情况（hit / miss）"""
+        if self.record:
+            self.record.cache_status = status
+    
     def finalize(
         self,
         max_prompt_length: int = 2000,
@@ -1,43 +1,313 @@
-"""速率限制器"""
+"""速率限制器
+
+按 provider/model 维度限流，每个键拥有独立的令牌桶和并发闸门：
+
+- 请求令牌桶：requests_per_minute（或旧配置的 interval）+ burst 突发容量
+- Token 令牌桶：tokens_per_minute，按提示词估算的 token 数扣减
+- 并发闸门：max_concurrency，限制同时在途的请求数；实际上限由
+  AdaptiveController 根据限流反馈在 [1, max_concurrency] 内自适应调整
+
+预约令牌只在很短的临界区内完成，等待发生在锁外，因此一个键上的等待
+不会阻塞其他键（例如 Gemini 限流时 DashScope 调用不受影响），同一个键
+上的多个请求也按各自预约的时间点并发放行，而不是串行排队。
+"""
 
 import asyncio
-import time
 import logging
-from typing import Dict
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from .adaptive_control import ADAPTIVE_MAX_CONCURRENCY, AdaptiveController
+from .config_models import RateLimitPolicy
 
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """令牌桶（预约式，允许余额为负表示已被预约的未来令牌）"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量）
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        预约令牌，返回需要等待的秒数（调用方需持有锁）
+
+        Args:
+            amount: 需要的令牌数
+            now: 当前单调时钟时间
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class ConcurrencyGate:
+    """并发闸门
+
+    与事件循环无关：等待者记录自己所在的事件循环，释放时通过
+    call_soon_threadsafe 唤醒，因此可在多个事件循环/线程间共享。
+    """
+
+    def __init__(self, limit: Optional[int]):
+        """
+        初始化并发闸门
+
+        Args:
+            limit: 最大并发数，None 表示不限制
+        """
+        self.limit = limit
+        self.active = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        """正在等待并发名额的请求数"""
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """获取一个并发名额，名额不足时等待"""
+        with self._lock:
+            if self.limit is None or (self.active < self.limit and not self._waiters):
+                self.active += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    raise
+                except ValueError:
+                    pass
+            # 名额已经移交给本请求，取消时需要归还
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """归还并发名额，优先直接移交给最早的等待者（上限已下调时不移交）"""
+        with self._lock:
+            while self._waiters and (self.limit is None or self.active <= self.limit):
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    # 等待者所在的事件循环已关闭
+                    continue
+            self.active = max(self.active - 1, 0)
+
+    def resize(self, limit: Optional[int]) -> None:
+        """调整并发上限，扩容时唤醒等待者"""
+        with self._lock:
+            self.limit = limit
+            grants = []
+            while self._waiters and (limit is None or self.active < limit):
+                grants.append(self._waiters.popleft())
+                self.active += 1
+        for loop, future in grants:
+            try:
+                loop.call_soon_threadsafe(self._grant, future)
+            except RuntimeError:
+                self.release()
+
+    def _grant(self, future: asyncio.Future) -> None:
+        """移交名额；等待者已取消时继续移交给下一个"""
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+
 class RateLimiter:
-    """全局速率限制器"""
-    
-    _lock = asyncio.Lock()
-    _last_call_time: Dict[str, float] = {}
-    
-    def __init__(self, interval: float):
+    """单个 provider/model 的速率限制器"""
+
+    def __init__(self, policy: RateLimitPolicy, key: str = "default"):
         """
         初始化速率限制器
-        
+
+        Args:
+            policy: 限流策略
+            key: 限制器键名（provider/model），用于日志和统计
+        """
+        self.key = key
+        self._lock = threading.Lock()
+        self._gate = ConcurrencyGate(policy.max_concurrency)
+        self.controller = AdaptiveController(
+            policy.max_concurrency or ADAPTIVE_MAX_CONCURRENCY, self._gate.resize
+        )
+
+        # 统计信息
+        self.total_acquired = 0
+        self.total_wait_seconds = 0.0
+        self._pending_wait = 0
+
+        self.configure(policy)
+
+    def configure(self, policy: RateLimitPolicy) -> None:
+        """
+        应用新的限流策略（配置热更新时使用）
+
         Args:
-            interval: 调用间隔（秒）
+            policy: 限流策略
         """
-        self.interval = interval
-        
-    async def acquire(self, key: str = "default") -> None:
+        request_rate = policy.request_rate
+        with self._lock:
+            self.policy = policy
+            self._request_bucket = (
+                TokenBucket(request_rate, policy.burst) if request_rate else None
+            )
+            self._token_bucket = (
+                TokenBucket(policy.tokens_per_minute / 60.0, policy.tokens_per_minute)
+                if policy.tokens_per_minute else None
+            )
+        self.controller.reset(policy.max_concurrency or ADAPTIVE_MAX_CONCURRENCY)
+
+    async def acquire(self, tokens: int = 0) -> float:
         """
-        获取调用许可，必要时等待
-        
+        等待令牌桶放行（不占用并发名额）
+
         Args:
-            key: 限制器键名，用于区分不同的限制器
+            tokens: 本次请求预计消耗的 token 数
+
+        Returns:
+            实际等待的秒数
         """
-        async with self._lock:
+        with self._lock:
             now = time.monotonic()
-            last_time = self._last_call_time.get(key, 0.0)
-            elapsed = now - last_time
-            
-            if elapsed < self.interval:
-                sleep_time = self.interval - elapsed
-                logger.debug(f"触发速率限制 [{key}]，等待 {sleep_time:.2f} 秒")
-                await asyncio.sleep(sleep_time)
-            
-            self._last_call_time[key] = time.monotonic()
+            delay = 0.0
+            if self._request_bucket:
+                delay = self._request_bucket.reserve(1, now)
+            if self._token_bucket and tokens > 0:
+                delay = max(delay, self._token_bucket.reserve(tokens, now))
+            # 服务端限流后的暂停期内，所有调用统一等待
+            delay = max(delay, self.controller.pause_remaining(now))
+            self.total_acquired += 1
+            self.total_wait_seconds += delay
+
+        if delay > 0:
+            logger.debug(f"触发速率限制 [{self.key}]，等待 {delay:.2f} 秒")
+            self._pending_wait += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._pending_wait -= 1
+        return delay
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0) -> AsyncIterator[None]:
+        """
+        在令牌桶和并发闸门的限制下执行一次调用
+
+        用法：
+            async with limiter.limit(tokens=1200):
+                await call_api()
+
+        Args:
+            tokens: 本次请求预计消耗的 token 数
+        """
+        await self.acquire(tokens)
+        await self._gate.acquire()
+        try:
+            yield
+        finally:
+            self._gate.release()
+
+    def report_success(self) -> None:
+        """上报一次成功调用（用于自适应增长并发上限）"""
+        self.controller.on_success()
+
+    def report_throttle(self, pause: float) -> None:
+        """
+        上报一次服务端限流
+
+        Args:
+            pause: 该键上所有调用需要暂停的秒数
+        """
+        self.controller.on_throttle(pause)
+
+    def get_stats(self) -> Dict:
+        """获取限制器统计信息"""
+        return {
+            **self.controller.get_stats(),
+            "key": self.key,
+            "in_flight": self._gate.active,
+            "waiting_for_slot": self._gate.waiting,
+            "waiting_for_rate": self._pending_wait,
+            "max_concurrency": self.policy.max_concurrency,
+            "requests_per_minute": self.policy.request_rate * 60 if self.policy.request_rate else None,
+            "tokens_per_minute": self.policy.tokens_per_minute,
+            "total_acquired": self.total_acquired,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数（用于 tokens_per_minute 限流）
+
+    中日韩字符按 1 字 1 token，其余字符按 4 字符 1 token 计算。
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if '一' <= ch <= '鿿' or '぀' <= ch <= 'ヿ')
+    return cjk + (len(text) - cjk) // 4
+
+
+# 全局限制器注册表：provider/model -> RateLimiter
+_limiters: Dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, policy: RateLimitPolicy, override: bool = False) -> RateLimiter:
+    """
+    获取（必要时创建）指定键的共享限制器
+
+    Args:
+        key: 限制器键名，通常为 "provider/model"
+        policy: 限流策略，仅在创建时使用
+        override: 为 True 时用 policy 覆盖已存在限制器的策略（显式配置的配额）
+
+    Returns:
+        RateLimiter 实例
+    """
+    with _registry_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(policy, key)
+            _limiters[key] = limiter
+            return limiter
+
+    if override and limiter.policy != policy:
+        logger.info(f"更新限流策略 [{key}]: {policy}")
+        limiter.configure(policy)
+    return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict]:
+    """获取所有限制器的统计信息"""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    return {limiter.key: limiter.get_stats() for limiter in limiters}
@@ -0,0 +1,264 @@
+"""模型响应缓存
+
+重新分析（reassemble_from_task_id）、后处理重跑、批量重新生成可视化等场景
+会把完全相同的提示词再次发送给模型。本模块按
+(provider, model, 方法, 生成参数, 提示词哈希, 输入文件指纹) 计算缓存键，
+将成功的响应保存在 SQLite 中：
+
+- 超过有效期（TTL）的条目在读取时失效
+- 总大小超过上限时按最近访问时间淘汰（LRU）
+
+缓存默认关闭，通过 MODEL_RESPONSE_CACHE_ENABLED=true 启用。
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from reinvent_insight.core import config
+
+logger = logging.getLogger(__name__)
+
+# 淘汰时清理到上限的比例，避免每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.9
+
+
+def file_fingerprint(file_info: Optional[Dict[str, Any]]) -> str:
+    """
+    计算输入文件的指纹
+
+    本地文件使用内容 SHA-256；已上传的文件引用使用文件名和大小。
+
+    Args:
+        file_info: 文件信息字典（与 generate_content_with_file 参数相同）
+
+    Returns:
+        指纹字符串，没有文件时返回空字符串
+    """
+    if not file_info:
+        return ""
+
+    if file_info.get("local_file"):
+        digest = hashlib.sha256()
+        with open(file_info["uri"], "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return f"sha256:{digest.hexdigest()}"
+
+    return f"ref:{file_info.get('name', '')}:{file_info.get('size_bytes', '')}"
+
+
+def make_cache_key(
+    provider: str,
+    model_name: str,
+    method_name: str,
+    params: Dict[str, Any],
+    prompt: str,
+    file_print: str = ""
+) -> str:
+    """
+    计算缓存键
+
+    Args:
+        provider: 模型提供商
+        model_name: 模型名称
+        method_name: 调用的方法名
+        params: 生成参数（温度、思考级别、是否 JSON 等）
+        prompt: 提示词
+        file_print: 输入文件指纹
+
+    Returns:
+        缓存键（SHA-256 十六进制）
+    """
+    payload = json.dumps({
+        "provider": provider,
+        "model": model_name,
+        "method": method_name,
+        "params": params,
+        "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "file": file_print,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """基于 SQLite 的模型响应缓存（LRU + TTL）"""
+
+    def __init__(self, db_path: Path, max_size_bytes: int, ttl_seconds: float):
+        """
+        初始化响应缓存
+
+        Args:
+            db_path: SQLite 数据库路径
+            max_size_bytes: 缓存最大字节数
+            ttl_seconds: 条目有效期（秒）
+        """
+        self.db_path = Path(db_path)
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_size = 0
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+        self._open()
+
+    def _open(self) -> None:
+        """打开数据库，失败时禁用缓存"""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "content TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            conn.commit()
+            self._total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"模型响应缓存不可用，已禁用: {e}")
+            self._conn = None
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的响应
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            响应内容，未命中或已过期时返回 None
+        """
+        if self._conn is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT content, size, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+
+                content, size, created_at = row
+                with self._conn:
+                    if now - created_at > self.ttl_seconds:
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._total_size -= size
+                        self.misses += 1
+                        return None
+                    self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"读取模型响应缓存失败: {e}")
+                return None
+
+        self.hits += 1
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        """
+        写入响应，必要时淘汰最久未访问的条目
+
+        Args:
+            key: 缓存键
+            content: 响应内容
+        """
+        if self._conn is None or not content:
+            return
+
+        size = len(content.encode("utf-8"))
+        if size > self.max_size_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, content, size, created_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, content, size, now, now)
+                    )
+                    self._total_size += size - (old[0] if old else 0)
+                    if self._total_size > self.max_size_bytes:
+                        self._evict(now)
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"写入模型响应缓存失败: {e}")
+
+    def _evict(self, now: float) -> None:
+        """清理过期条目，再按最近访问时间淘汰到目标大小（调用方需持有锁并处于事务中）"""
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        target = self.max_size_bytes * EVICT_TARGET_RATIO
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._total_size <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_size -= size
+            evicted += 1
+
+        if evicted:
+            logger.info(f"模型响应缓存淘汰 {evicted} 条，当前 {self._total_size / 1024 / 1024:.1f}MB")
+
+    def clear(self) -> None:
+        """清空缓存"""
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._total_size = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "enabled": self._conn is not None,
+            "size_mb": round(self._total_size / 1024 / 1024, 2),
+            "max_size_mb": round(self.max_size_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# 全局单例（仅在启用时创建）
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取响应缓存单例，未启用时返回 None"""
+    global _response_cache
+    if not config.MODEL_RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    config.MODEL_RESPONSE_CACHE_PATH,
+                    max_size_bytes=config.MODEL_RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                    ttl_seconds=config.MODEL_RESPONSE_CACHE_TTL_HOURS * 3600,
+                )
+    return _response_cache
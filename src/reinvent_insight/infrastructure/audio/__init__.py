@@ -2,7 +2,25 @@
 Audio utilities package for reinvent_insight.
 """
 
-from .audio_utils import assemble_wav, decode_base64_pcm, calculate_audio_duration
+from .audio_utils import (
+    assemble_wav,
+    build_wav_header,
+    decode_base64_pcm,
+    calculate_audio_duration,
+    StreamingWavWriter,
+    encode_audio,
+    find_audio_encoder,
+    get_audio_media_type,
+)
 
-__all__ = ['assemble_wav', 'decode_base64_pcm', 'calculate_audio_duration']
+__all__ = [
+    'assemble_wav',
+    'build_wav_header',
+    'decode_base64_pcm',
+    'calculate_audio_duration',
+    'StreamingWavWriter',
+    'encode_audio',
+    'find_audio_encoder',
+    'get_audio_media_type',
+]
 
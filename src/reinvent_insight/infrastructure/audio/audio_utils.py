@@ -1,13 +1,17 @@
 """
 音频处理工具
 
-提供 WAV 文件组装、Base64 解码等音频处理功能
+提供 WAV 文件组装、流式写入、Base64 解码、压缩编码等音频处理功能
 """
 
 import base64
+import os
+import shutil
 import struct
+import subprocess
 import logging
-from typing import List
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -29,38 +33,33 @@ def decode_base64_pcm(base64_data: str) -> bytes:
         raise ValueError(f"无效的 Base64 数据: {e}")
 
 
-def assemble_wav(
-    pcm_chunks: List[bytes],
+def build_wav_header(
+    pcm_size: int,
     sample_rate: int = 24000,
     channels: int = 1,
     bits_per_sample: int = 16
 ) -> bytes:
     """
-    将 PCM 音频块组装成 WAV 文件
+    构建 44 字节的 PCM WAV 文件头
     
     WAV 文件格式:
     - RIFF header (12 bytes)
     - fmt chunk (24 bytes)
-    - data chunk (8 bytes + PCM data)
+    - data chunk header (8 bytes)
     
     Args:
-        pcm_chunks: PCM 数据块列表
-        sample_rate: 采样率（Hz），默认 24000
-        channels: 声道数，默认 1（单声道）
-        bits_per_sample: 每样本位数，默认 16
+        pcm_size: PCM 数据大小（字节）
+        sample_rate: 采样率（Hz）
+        channels: 声道数
+        bits_per_sample: 每样本位数
         
     Returns:
-        完整的 WAV 文件字节数据
+        WAV 文件头字节数据
     """
-    # 拼接所有 PCM 数据
-    pcm_data = b''.join(pcm_chunks)
-    pcm_size = len(pcm_data)
-    
     # 计算参数
     byte_rate = sample_rate * channels * bits_per_sample // 8
     block_align = channels * bits_per_sample // 8
     
-    # 构建 WAV 头
     # RIFF header
     riff_header = struct.pack(
         '<4sI4s',
@@ -89,8 +88,32 @@ def assemble_wav(
         pcm_size                    # Subchunk2Size
     )
     
+    return riff_header + fmt_chunk + data_chunk
+
+
+def assemble_wav(
+    pcm_chunks: List[bytes],
+    sample_rate: int = 24000,
+    channels: int = 1,
+    bits_per_sample: int = 16
+) -> bytes:
+    """
+    将 PCM 音频块组装成 WAV 文件
+    
+    Args:
+        pcm_chunks: PCM 数据块列表
+        sample_rate: 采样率（Hz），默认 24000
+        channels: 声道数，默认 1（单声道）
+        bits_per_sample: 每样本位数，默认 16
+        
+    Returns:
+        完整的 WAV 文件字节数据
+    """
+    # 拼接所有 PCM 数据
+    pcm_data = b''.join(pcm_chunks)
+    
     # 组装完整的 WAV 文件
-    wav_data = riff_header + fmt_chunk + data_chunk + pcm_data
+    wav_data = build_wav_header(len(pcm_data), sample_rate, channels, bits_per_sample) + pcm_data
     
     logger.info(
         f"WAV 文件组装完成: "
@@ -126,3 +149,229 @@ def calculate_audio_duration(
     duration = total_samples / sample_rate
     
     return duration
+
+
+# WAV 头中需要随数据增长回写的字段偏移
+_RIFF_SIZE_OFFSET = 4
+_DATA_SIZE_OFFSET = 40
+WAV_HEADER_SIZE = 44
+
+# 边生成边输出时长度未知，按惯例在头中写入最大值，播放器会读到流结束为止
+UNKNOWN_PCM_SIZE = 0xFFFFFFFF - 36
+
+
+class StreamingWavWriter:
+    """
+    追加写入的 WAV 文件
+    
+    PCM 数据直接追加到打开的文件末尾，内存中只保留当前写入的块；
+    每次 checkpoint 在原位回写 RIFF/data 长度字段并刷盘，使文件在
+    checkpoint 之后始终是可播放的完整 WAV。写入完成后通过 finalize
+    原子地重命名为目标文件。
+    """
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sample_rate: int = 24000,
+        channels: int = 1,
+        bits_per_sample: int = 16
+    ):
+        """
+        创建文件并写入长度为 0 的 WAV 头
+        
+        Args:
+            path: 写入中的文件路径（已存在时会被覆盖）
+            sample_rate: 采样率（Hz）
+            channels: 声道数
+            bits_per_sample: 每样本位数
+        """
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bits_per_sample = bits_per_sample
+        self.pcm_size = 0
+        self._file: Optional[BinaryIO] = open(self.path, 'wb')
+        self._file.write(build_wav_header(0, sample_rate, channels, bits_per_sample))
+    
+    @property
+    def duration(self) -> float:
+        """已写入音频的时长（秒）"""
+        return calculate_audio_duration(
+            self.pcm_size, self.sample_rate, self.channels, self.bits_per_sample
+        )
+    
+    @property
+    def file_size(self) -> int:
+        """已写入的文件大小（字节，含 WAV 头）"""
+        return WAV_HEADER_SIZE + self.pcm_size
+    
+    def append(self, pcm_data: bytes) -> None:
+        """追加一块 PCM 数据"""
+        if self._file is None:
+            raise ValueError("WAV 文件已关闭")
+        self._file.write(pcm_data)
+        self.pcm_size += len(pcm_data)
+    
+    def flush(self) -> None:
+        """将缓冲区写入文件（不回写长度字段），供同进程中的读取方读取"""
+        if self._file is None:
+            raise ValueError("WAV 文件已关闭")
+        self._file.flush()
+    
+    def checkpoint(self) -> None:
+        """回写 WAV 头中的长度字段并刷盘"""
+        if self._file is None:
+            raise ValueError("WAV 文件已关闭")
+        f = self._file
+        f.seek(_RIFF_SIZE_OFFSET)
+        f.write(struct.pack('<I', 36 + self.pcm_size))
+        f.seek(_DATA_SIZE_OFFSET)
+        f.write(struct.pack('<I', self.pcm_size))
+        f.seek(0, os.SEEK_END)
+        f.flush()
+        os.fsync(f.fileno())
+    
+    def close(self) -> None:
+        """回写长度字段后关闭文件（文件保留在原路径）"""
+        if self._file is None:
+            return
+        try:
+            self.checkpoint()
+        finally:
+            self._file.close()
+            self._file = None
+    
+    def finalize(self, target_path: Union[str, Path]) -> Path:
+        """
+        完成写入并原子地移动到目标路径
+        
+        Args:
+            target_path: 最终文件路径（已存在时被替换）
+            
+        Returns:
+            最终文件路径
+        """
+        self.close()
+        target_path = Path(target_path)
+        os.replace(self.path, target_path)
+        self.path = target_path
+        
+        logger.info(
+            f"WAV 文件写入完成: {target_path}, "
+            f"大小={self.file_size} bytes, "
+            f"时长={self.duration:.2f}s"
+        )
+        return target_path
+    
+    def abort(self) -> None:
+        """放弃写入并删除文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def __enter__(self) -> "StreamingWavWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+# 压缩格式 -> (文件扩展名, ffmpeg 编码参数, 默认码率)
+COMPRESSED_FORMATS = {
+    "opus": (".opus", ["-c:a", "libopus", "-application", "voip", "-f", "ogg"], "32k"),
+    "mp3": (".mp3", ["-c:a", "libmp3lame", "-f", "mp3"], "64k"),
+}
+
+# 文件扩展名 -> HTTP 媒体类型
+AUDIO_MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".opus": "audio/ogg",
+    ".mp3": "audio/mpeg",
+}
+
+
+def get_audio_media_type(file_path: Union[str, Path]) -> str:
+    """
+    根据文件扩展名返回音频的媒体类型
+    
+    Args:
+        file_path: 音频文件路径
+        
+    Returns:
+        媒体类型，未知扩展名按 WAV 处理
+    """
+    return AUDIO_MEDIA_TYPES.get(Path(file_path).suffix.lower(), "audio/wav")
+
+
+def find_audio_encoder(encoder: str = "ffmpeg") -> Optional[str]:
+    """
+    查找本地音频编码器（ffmpeg）
+    
+    Args:
+        encoder: 命令名或完整路径
+        
+    Returns:
+        可执行文件路径，找不到时返回 None
+    """
+    return shutil.which(encoder)
+
+
+def encode_audio(
+    source_path: Union[str, Path],
+    target_path: Union[str, Path],
+    audio_format: str,
+    bitrate: Optional[str] = None,
+    encoder: str = "ffmpeg",
+    timeout: float = 600
+) -> Path:
+    """
+    调用 ffmpeg 将 WAV 文件编码为压缩格式
+    
+    先写入临时文件，成功后原子地替换目标文件，编码失败不会留下不完整的文件。
+    
+    Args:
+        source_path: 源 WAV 文件
+        target_path: 目标文件路径
+        audio_format: 压缩格式（opus 或 mp3）
+        bitrate: 码率（如 32k），为空时使用格式默认值
+        encoder: ffmpeg 可执行文件
+        timeout: 编码超时（秒）
+        
+    Returns:
+        目标文件路径
+        
+    Raises:
+        ValueError: 不支持的压缩格式
+        RuntimeError: 编码失败
+    """
+    if audio_format not in COMPRESSED_FORMATS:
+        raise ValueError(f"不支持的音频压缩格式: {audio_format}")
+    _, codec_args, default_bitrate = COMPRESSED_FORMATS[audio_format]
+    
+    target_path = Path(target_path)
+    tmp_path = target_path.with_name(target_path.name + ".tmp")
+    command = [
+        encoder, "-hide_banner", "-loglevel", "error", "-y",
+        "-i", str(source_path),
+        *codec_args, "-b:a", bitrate or default_bitrate,
+        str(tmp_path)
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"音频编码失败({result.returncode}): "
+                f"{result.stderr.decode('utf-8', errors='replace').strip()}"
+            )
+        os.replace(tmp_path, target_path)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"音频编码超时: {source_path}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    
+    return target_path
@@ -17,7 +17,10 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 class SummaryDirectoryEventHandler(FileSystemEventHandler):
-    """处理摘要目录中的文件系统事件。"""
+    """处理摘要目录中的文件系统事件。
+    
+    回调函数接收发生变化的文件路径，由调用方决定如何增量更新。
+    """
     
     def __init__(self, callback):
         self.callback = callback
@@ -28,8 +31,9 @@ class SummaryDirectoryEventHandler(FileSystemEventHandler):
         """当文件或目录被删除时调用。"""
         if not event.is_directory and event.src_path.endswith('.md'):
             logger.info(f"检测到摘要文件被删除: {event.src_path}. 准备刷新缓存...")
-            # 删除事件立即触发，无需等待
-            self.callback()
+            # 删除事件立即触发，无需等待；同时取消该文件尚未执行的刷新
+            self._cancel_pending(event.src_path)
+            self.callback(event.src_path)
 
     def on_created(self, event):
         """当文件或目录被创建时调用。"""
@@ -40,14 +44,28 @@ class SummaryDirectoryEventHandler(FileSystemEventHandler):
 
     def on_modified(self, event):
         """当文件或目录被修改时调用。"""
-        # 注意：简单地保存文件就会触发此事件。
-        # 如果修改元数据（如版本号）后需要立即更新，可以启用此功能。
-        # 目前，为避免过于频繁的刷新，我们主要关注创建和删除。
-        # 如果需要，可以取消下面的注释。
-        # if not event.is_directory and event.src_path.endswith('.md'):
-        #     logger.info(f"摘要文件被修改: {event.src_path}. 准备刷新缓存...")
-        #     self.callback()
-        pass
+        # 缓存按文件增量更新，代价与文档总数无关，因此修改事件也可以处理。
+        # 连续写入由 _schedule_refresh 的定时器合并为一次刷新。
+        if not event.is_directory and event.src_path.endswith('.md'):
+            logger.debug(f"摘要文件被修改: {event.src_path}. 等待写入完成...")
+            self._schedule_refresh(event.src_path)
+
+    def on_moved(self, event):
+        """当文件被重命名时调用（视为旧文件删除 + 新文件创建）。"""
+        if event.is_directory:
+            return
+        if event.src_path.endswith('.md'):
+            self._cancel_pending(event.src_path)
+            self.callback(event.src_path)
+        if event.dest_path.endswith('.md'):
+            self._schedule_refresh(event.dest_path)
+    
+    def _cancel_pending(self, file_path):
+        """取消文件尚未执行的延迟刷新"""
+        with self._lock:
+            timer = self._pending_files.pop(file_path, None)
+        if timer:
+            timer.cancel()
     
     def _schedule_refresh(self, file_path):
         """延迟调度缓存刷新，避免文件未完全写入"""
@@ -73,7 +91,7 @@ class SummaryDirectoryEventHandler(FileSystemEventHandler):
             path = Path(file_path)
             if path.exists() and path.stat().st_size > 0:
                 logger.info(f"文件 {file_path} 已完全写入，开始刷新缓存...")
-                self.callback()
+                self.callback(file_path)
             else:
                 logger.warning(f"文件 {file_path} 不存在或为空，跳过缓存刷新")
         except Exception as e:
@@ -85,7 +103,7 @@ def start_watching(path: Path, callback):
 
     Args:
         path (Path): 需要监控的目录路径。
-        callback (function): 当检测到变化时需要调用的回调函数。
+        callback (function): 当检测到变化时需要调用的回调函数，接收变化文件的路径。
     """
     if not path.is_dir():
         logger.warning(f"无法启动文件监控，因为目录不存在: {path}")
@@ -0,0 +1,290 @@
+"""
+Playwright 浏览器池
+
+截图、关键帧等任务共享进程内常驻的 Chromium 实例，不再每次调用都启动一个新
+浏览器。每个任务在独立的浏览器上下文（BrowserContext）中运行，Cookie、缓存
+互不影响，任务结束后关闭上下文即可。
+
+- 按启动参数分为不同的配置（web 访问网页，render 渲染本地 HTML），每种配置
+  一个池，池中最多 N 个浏览器，任务分配到在途上下文最少的浏览器
+- 浏览器断开连接（崩溃）时自动丢弃并重新启动
+- 每个浏览器服务 M 个页面后退役，空闲时关闭并由新实例替换，避免长期运行的
+  内存增长
+- CookieStore 中的 Cookie 只在首次使用或文件变化时读取
+
+Playwright 对象绑定创建它的事件循环，因此池按事件循环登记。
+"""
+
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import Browser, Page, async_playwright
+
+from reinvent_insight.core import config
+
+logger = logging.getLogger(__name__)
+
+# 启动参数配置
+BROWSER_PROFILES: Dict[str, List[str]] = {
+    # 访问 YouTube 等网页
+    "web": [
+        '--disable-gpu',
+        '--no-sandbox',
+        '--disable-dev-shm-usage',
+    ],
+    # 渲染本地 HTML：允许加载本地资源，使用 GPU 光栅化避免长页面色块/撕裂问题
+    "render": [
+        '--no-sandbox',
+        '--disable-dev-shm-usage',
+        '--disable-web-security',
+        '--disable-software-rasterizer',
+        '--enable-gpu-rasterization',
+        '--enable-zero-copy',
+        '--ignore-gpu-blocklist',
+    ],
+}
+
+
+def to_playwright_cookies(cookies: List[dict]) -> List[dict]:
+    """
+    将 CookieStore 中的 Cookie 转换为 Playwright add_cookies 的格式
+
+    Args:
+        cookies: CookieStore.load_cookies 返回的 Cookie 列表
+
+    Returns:
+        Playwright Cookie 列表
+    """
+    playwright_cookies = []
+    for c in cookies:
+        pc = {
+            'name': c.get('name', ''),
+            'value': c.get('value', ''),
+            'domain': c.get('domain', ''),
+            'path': c.get('path', '/'),
+        }
+        if c.get('expires'):
+            pc['expires'] = c['expires']
+        if c.get('httpOnly') is not None:
+            pc['httpOnly'] = c['httpOnly']
+        if c.get('secure') is not None:
+            pc['secure'] = c['secure']
+        if c.get('sameSite'):
+            pc['sameSite'] = c['sameSite']
+        playwright_cookies.append(pc)
+    return playwright_cookies
+
+
+class _PooledBrowser:
+    """池中的一个浏览器及其使用计数"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.active = 0          # 在途的上下文数
+        self.pages_served = 0    # 已服务的页面数
+        self.retiring = False    # 达到页面上限，空闲后关闭
+
+
+class BrowserPool:
+    """常驻 Chromium 浏览器池"""
+
+    def __init__(
+        self,
+        profile: str = "web",
+        size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        launch_timeout: Optional[float] = None
+    ):
+        """
+        初始化浏览器池（浏览器在首次使用时启动）
+
+        Args:
+            profile: 启动参数配置名（见 BROWSER_PROFILES）
+            size: 最多同时保持的浏览器数，默认取 config.BROWSER_POOL_SIZE
+            max_pages: 每个浏览器服务多少个页面后回收，默认取 config.BROWSER_POOL_MAX_PAGES
+            launch_timeout: 浏览器启动超时（秒），默认取 config.VISUAL_SCREENSHOT_BROWSER_TIMEOUT
+        """
+        if profile not in BROWSER_PROFILES:
+            raise ValueError(f"未知的浏览器配置: {profile}")
+        self.profile = profile
+        self.size = max(1, size or config.BROWSER_POOL_SIZE)
+        self.max_pages = max(1, max_pages or config.BROWSER_POOL_MAX_PAGES)
+        self.launch_timeout = (launch_timeout or config.VISUAL_SCREENSHOT_BROWSER_TIMEOUT) * 1000
+
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+
+        # Cookie 缓存：文件修改时间变化时重新读取
+        self._cookies: List[dict] = []
+        self._cookies_mtime: Optional[float] = None
+
+    @property
+    def browser_count(self) -> int:
+        """当前启动的浏览器数"""
+        return len(self._browsers)
+
+    async def _launch(self) -> _PooledBrowser:
+        """启动一个浏览器（调用方持有锁）"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        logger.info(f"启动 Chromium 浏览器（{self.profile}），当前 {len(self._browsers)} 个")
+        browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=BROWSER_PROFILES[self.profile],
+            timeout=self.launch_timeout
+        )
+        slot = _PooledBrowser(browser)
+        self._browsers.append(slot)
+        return slot
+
+    async def _acquire(self) -> _PooledBrowser:
+        """选择（必要时启动）一个健康的浏览器"""
+        async with self._lock:
+            # 健康检查：丢弃已断开连接的浏览器
+            for slot in list(self._browsers):
+                if not slot.browser.is_connected():
+                    logger.warning(f"浏览器已断开连接（{self.profile}），将重新启动")
+                    self._browsers.remove(slot)
+
+            available = [slot for slot in self._browsers if not slot.retiring]
+            if len(available) < self.size:
+                slot = await self._launch()
+            else:
+                slot = min(available, key=lambda s: s.active)
+
+            slot.active += 1
+            slot.pages_served += 1
+            if slot.pages_served >= self.max_pages:
+                slot.retiring = True
+            return slot
+
+    async def _release(self, slot: _PooledBrowser) -> None:
+        """归还浏览器，已退役且空闲的浏览器被关闭"""
+        async with self._lock:
+            slot.active -= 1
+            if not (slot.retiring and slot.active == 0):
+                return
+            if slot in self._browsers:
+                self._browsers.remove(slot)
+        logger.info(f"浏览器已服务 {slot.pages_served} 个页面，回收（{self.profile}）")
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.debug(f"关闭浏览器失败: {e}")
+
+    def _load_cookies(self) -> List[dict]:
+        """读取 CookieStore 中的 Cookie，文件未变化时使用缓存"""
+        try:
+            from reinvent_insight.services.cookie.cookie_store import CookieStore
+            store = CookieStore()
+            mtime = store.store_path.stat().st_mtime if store.store_path.exists() else None
+            if mtime != self._cookies_mtime:
+                self._cookies = to_playwright_cookies(store.load_cookies()) if mtime else []
+                self._cookies_mtime = mtime
+                logger.info(f"浏览器池加载了 {len(self._cookies)} 个 Cookie")
+        except Exception as e:
+            logger.warning(f"加载 Cookie 失败: {e}")
+        return self._cookies
+
+    @asynccontextmanager
+    async def page(
+        self,
+        viewport: Optional[Dict[str, int]] = None,
+        device_scale_factor: float = 1,
+        load_cookies: bool = False,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Page]:
+        """
+        在独立的浏览器上下文中打开一个页面，退出时关闭上下文
+
+        Args:
+            viewport: 视口大小，如 {'width': 1920, 'height': 1080}
+            device_scale_factor: 设备像素比
+            load_cookies: 是否为上下文加载 CookieStore 中的 Cookie
+            timeout: 页面默认超时（毫秒）
+
+        Yields:
+            Playwright Page 对象
+        """
+        slot = await self._acquire()
+        context = None
+        try:
+            context = await slot.browser.new_context(
+                viewport=viewport,
+                device_scale_factor=device_scale_factor
+            )
+            if load_cookies:
+                cookies = self._load_cookies()
+                if cookies:
+                    await context.add_cookies(cookies)
+            page = await context.new_page()
+            if timeout:
+                page.set_default_timeout(timeout)
+            yield page
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.debug(f"关闭浏览器上下文失败: {e}")
+            await self._release(slot)
+
+    async def warm_up(self) -> None:
+        """预先启动所有浏览器"""
+        async with self._lock:
+            while len([s for s in self._browsers if not s.retiring]) < self.size:
+                await self._launch()
+
+    async def close(self) -> None:
+        """关闭所有浏览器和 Playwright"""
+        async with self._lock:
+            browsers, self._browsers = self._browsers, []
+            for slot in browsers:
+                try:
+                    await slot.browser.close()
+                except Exception as e:
+                    logger.debug(f"关闭浏览器失败: {e}")
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    logger.debug(f"停止 Playwright 失败: {e}")
+                self._playwright = None
+        if browsers:
+            logger.info(f"浏览器池已关闭（{self.profile}），共 {len(browsers)} 个浏览器")
+
+
+# 事件循环 -> {配置名: 浏览器池}
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, BrowserPool]]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool(profile: str = "web") -> BrowserPool:
+    """获取当前事件循环中指定配置的浏览器池（单例）"""
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    if profile not in pools:
+        pools[profile] = BrowserPool(profile)
+    return pools[profile]
+
+
+async def close_browser_pools() -> None:
+    """关闭当前事件循环中的所有浏览器池"""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.close()
+
+
+async def run_with_browser_pools(coro):
+    """
+    运行协程，结束后关闭本事件循环中的浏览器池
+
+    命令行入口通过 asyncio.run 运行任务，没有 Web 服务的关闭钩子，
+    需要用它包装，避免退出时留下未关闭的 Chromium。
+    """
+    try:
+        return await coro
+    finally:
+        await close_browser_pools()
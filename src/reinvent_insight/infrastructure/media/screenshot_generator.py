@@ -10,9 +10,10 @@ from typing import Optional, Dict
 from datetime import datetime
 
 import logging
-from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
 from reinvent_insight.core import config
+from .browser_pool import get_browser_pool
 
 
 logger = logging.getLogger(__name__)
@@ -81,41 +82,15 @@ class ScreenshotGenerator:
         logger.info(f"开始截图 - HTML: {html_path}, 输出: {output_path}, 视口宽度: {width}px")
         start_time = datetime.now()
         
-        browser: Optional[Browser] = None
-        page: Optional[Page] = None
-        
         try:
-            # 启动 Playwright
-            async with async_playwright() as p:
-                logger.info("启动 Chromium 浏览器（无头模式）")
-                
-                # 启动浏览器（无头模式）
-                # 注意：移除 --disable-gpu，使用 GPU 加速渲染避免长页面色块/撕裂问题
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-web-security',  # 允许加载本地资源
-                        '--disable-software-rasterizer',  # 禁用软件光栅化
-                        '--enable-gpu-rasterization',  # 启用 GPU 光栅化
-                        '--enable-zero-copy',  # 零拷贝优化
-                        '--ignore-gpu-blocklist',  # 忽略 GPU 黑名单
-                    ],
-                    timeout=self.browser_timeout
-                )
-                
-                # 创建页面并设置视口
-                # 使用 2x deviceScaleFactor 平衡清晰度和渲染稳定性
-                # 注意：3x 在无 GPU 环境下超长页面会出现色块遮挡
-                page = await browser.new_page(
-                    viewport={'width': width, 'height': 1080},
-                    device_scale_factor=2.0  # 2倍分辨率，高清输出
-                )
-                
-                # 设置超时
-                page.set_default_timeout(self.browser_timeout)
-                
+            # 从共享浏览器池获取页面（独立上下文，退出时关闭）
+            # 使用 2x deviceScaleFactor 平衡清晰度和渲染稳定性
+            # 注意：3x 在无 GPU 环境下超长页面会出现色块遮挡
+            async with get_browser_pool("render").page(
+                viewport={'width': width, 'height': 1080},
+                device_scale_factor=2.0,  # 2倍分辨率，高清输出
+                timeout=self.browser_timeout
+            ) as page:
                 # 加载 HTML 文件（使用 file:// 协议）
                 file_url = html_path.absolute().as_uri()
                 logger.info(f"加载 HTML 文件: {file_url}")
@@ -149,9 +124,6 @@ class ScreenshotGenerator:
                     type='png'
                 )
                 
-                # 关闭浏览器
-                await browser.close()
-                
                 # 获取文件大小
                 file_size = output_path.stat().st_size
                 
@@ -179,13 +151,6 @@ class ScreenshotGenerator:
         except Exception as e:
             logger.error(f"截图失败: {e}", exc_info=True)
             raise
-        finally:
-            # 确保浏览器关闭
-            if browser:
-                try:
-                    await browser.close()
-                except Exception:
-                    pass
     
     async def _trigger_all_animations(self, page: Page) -> None:
         """
@@ -12,6 +12,7 @@ from rich.markup import escape
 from .core import config
 from .api.app import serve as serve_web
 from .core.logger import setup_logger
+from .infrastructure.media.browser_pool import run_with_browser_pools
 from .services.analysis.task_manager import manager as task_manager
 
 # TODO: reassemble_from_task_id 函数待迁移
@@ -107,7 +108,7 @@ def run_interactive_mode():
             console.print("\n操作已取消。", style="yellow")
             return
         
-        asyncio.run(process_single_video(url, show_status=True))
+        asyncio.run(run_with_browser_pools(process_single_video(url, show_status=True)))
 
     except NotImplementedError:
         console.print(f"\n[bold yellow]提示: 您选择的模型 '{config.PREFERRED_MODEL}' 当前尚未支持。[/bold yellow]")
@@ -171,7 +172,7 @@ def cli():
 
     if args.url:
         if not config.check_gemini_api_key(): return
-        asyncio.run(process_single_video(args.url, show_status=True))
+        asyncio.run(run_with_browser_pools(process_single_video(args.url, show_status=True)))
 
     elif args.file:
         if not config.check_gemini_api_key(): return
@@ -201,7 +202,7 @@ def cli():
                 
                 await asyncio.gather(*tasks)
 
-            asyncio.run(batch_process(urls, args.concurrency))
+            asyncio.run(run_with_browser_pools(batch_process(urls, args.concurrency)))
             console.rule("[bold green]🎉 所有视频处理完毕! 🎉[/bold green]")
 
         except FileNotFoundError:
@@ -16,6 +16,7 @@ import logging
 from reinvent_insight.core import config
 from reinvent_insight.infrastructure.ai.model_config import get_model_client
 from reinvent_insight.infrastructure.ai.config_models import APIError
+from reinvent_insight.infrastructure.media.browser_pool import get_browser_pool
 from reinvent_insight.infrastructure.media.screenshot_generator import ScreenshotGenerator
 from reinvent_insight.services.analysis.post_processors.base import (
     PostProcessor,
@@ -24,7 +25,7 @@ from reinvent_insight.services.analysis.post_processors.base import (
     ProcessorPriority
 )
 
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 
 logger = logging.getLogger(__name__)
@@ -400,7 +401,7 @@ class KeyframeScreenshotProcessor(PostProcessor):
         keyframes: List[KeyframePoint],
         doc_hash: str
     ) -> List[Dict]:
-        """捕获关键帧截图（复用浏览器实例）"""
+        """捕获关键帧截图（复用浏览器池中的页面）"""
         successful_screenshots = []
         
         # 确保输出目录存在
@@ -408,57 +409,16 @@ class KeyframeScreenshotProcessor(PostProcessor):
         output_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            async with async_playwright() as p:
-                # 启动浏览器（只启动一次）
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-gpu',
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                    ],
-                    timeout=config.KEYFRAME_TIMEOUT * 1000
-                )
-                
-                # 创建页面
-                page = await browser.new_page(
-                    viewport={
-                        'width': config.KEYFRAME_SCREENSHOT_WIDTH,
-                        'height': config.KEYFRAME_SCREENSHOT_HEIGHT
-                    },
-                    device_scale_factor=2  # 2倍分辨率
-                )
-                page.set_default_timeout(config.KEYFRAME_TIMEOUT * 1000)
-                
-                # 加载 Cookie（只加载一次）
-                try:
-                    from reinvent_insight.services.cookie.cookie_store import CookieStore
-                    store = CookieStore()
-                    cookies = store.load_cookies()
-                    if cookies:
-                        playwright_cookies = []
-                        for c in cookies:
-                            pc = {
-                                'name': c.get('name', ''),
-                                'value': c.get('value', ''),
-                                'domain': c.get('domain', ''),
-                                'path': c.get('path', '/'),
-                            }
-                            if c.get('expires'):
-                                pc['expires'] = c['expires']
-                            if c.get('httpOnly') is not None:
-                                pc['httpOnly'] = c['httpOnly']
-                            if c.get('secure') is not None:
-                                pc['secure'] = c['secure']
-                            if c.get('sameSite'):
-                                pc['sameSite'] = c['sameSite']
-                            playwright_cookies.append(pc)
-                        
-                        await page.context.add_cookies(playwright_cookies)
-                        logger.info(f"成功加载 {len(playwright_cookies)} 个 Cookie")
-                except Exception as e:
-                    logger.warning(f"加载 Cookie 失败: {e}")
-                
+            # 从共享浏览器池获取页面（独立上下文，已加载 Cookie）
+            async with get_browser_pool("web").page(
+                viewport={
+                    'width': config.KEYFRAME_SCREENSHOT_WIDTH,
+                    'height': config.KEYFRAME_SCREENSHOT_HEIGHT
+                },
+                device_scale_factor=2,  # 2倍分辨率
+                load_cookies=True,
+                timeout=config.KEYFRAME_TIMEOUT * 1000
+            ) as page:
                 # 串行处理每个截图点
                 for i, keyframe in enumerate(keyframes, 1):
                     try:
@@ -533,9 +493,6 @@ class KeyframeScreenshotProcessor(PostProcessor):
                         logger.warning(f"截图失败 (时间: {keyframe.timestamp}s): {e}")
                         continue
                 
-                # 关闭浏览器
-                await browser.close()
-                
         except PlaywrightTimeoutError:
             logger.error("浏览器超时")
         except Exception as e:
@@ -551,39 +508,15 @@ class KeyframeScreenshotProcessor(PostProcessor):
     ) -> bool:
         """使用 Playwright 截取 YouTube 视频截图（单次调用，保留以兼容旧代码）"""
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage'],
-                    timeout=config.KEYFRAME_TIMEOUT * 1000
-                )
-                
-                page = await browser.new_page(
-                    viewport={
-                        'width': config.KEYFRAME_SCREENSHOT_WIDTH,
-                        'height': config.KEYFRAME_SCREENSHOT_HEIGHT
-                    },
-                    device_scale_factor=2
-                )
-                page.set_default_timeout(config.KEYFRAME_TIMEOUT * 1000)
-                
-                # 加载 Cookie
-                try:
-                    from reinvent_insight.services.cookie.cookie_store import CookieStore
-                    store = CookieStore()
-                    cookies = store.load_cookies()
-                    if cookies:
-                        playwright_cookies = [{
-                            'name': c.get('name', ''),
-                            'value': c.get('value', ''),
-                            'domain': c.get('domain', ''),
-                            'path': c.get('path', '/'),
-                            **({k: c[k] for k in ['expires', 'httpOnly', 'secure', 'sameSite'] if c.get(k) is not None})
-                        } for c in cookies]
-                        await page.context.add_cookies(playwright_cookies)
-                except Exception as e:
-                    logger.warning(f"加载 Cookie 失败: {e}")
-                
+            async with get_browser_pool("web").page(
+                viewport={
+                    'width': config.KEYFRAME_SCREENSHOT_WIDTH,
+                    'height': config.KEYFRAME_SCREENSHOT_HEIGHT
+                },
+                device_scale_factor=2,
+                load_cookies=True,
+                timeout=config.KEYFRAME_TIMEOUT * 1000
+            ) as page:
                 await page.goto(url, wait_until='domcontentloaded', timeout=config.KEYFRAME_TIMEOUT * 1000)
                 await page.wait_for_selector('video', timeout=10000)
                 await asyncio.sleep(wait_time)
@@ -595,7 +528,6 @@ class KeyframeScreenshotProcessor(PostProcessor):
                     pass
                 
                 await page.screenshot(path=str(output_path), type='png', full_page=False)
-                await browser.close()
                 return True
                 
         except PlaywrightTimeoutError:
@@ -86,6 +86,19 @@ class VisualInsightProcessor(PostProcessor):
                     f"文章文件不存在"
                 )
             
+            # 调度器运行时交给调度器排队（统一并发控制与状态记录）
+            from reinvent_insight.services.analysis.visual_watcher import get_visual_watcher
+            
+            watcher = get_visual_watcher()
+            if watcher is not None:
+                task_dir = context.task_dir if context.task_dir else self._find_task_dir(article_path)
+                watcher.submit(article_path, task_dir=task_dir)
+                logger.info(f"Visual 生成已加入调度队列: {article_path.name}")
+                return PostProcessorResult.ok(
+                    context.report_content,
+                    "已加入 Visual 生成队列"
+                )
+            
             # 生成标准化的文档标识（用于去重检查）
             normalized_name = self._get_normalized_name(article_path)
             
@@ -0,0 +1,239 @@
+"""分析任务队列持久化
+
+WorkerPool 的内存队列在重启或重新部署后会全部丢失。本模块把每个任务的
+生命周期记录到 SQLite（WAL 模式）：
+
+- 入队：保存重建 WorkerTask 所需的全部参数
+- 开始执行：记录开始时间和执行次数
+- 心跳：执行期间定期刷新，用于判断任务是否随进程一起中断
+- 结束：记录成功/失败，之后不会再被恢复
+
+服务启动时，仍在排队的任务，以及所属进程已退出或心跳过期的执行中任务，
+会被重新放回队列。
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from reinvent_insight.core import config
+
+logger = logging.getLogger(__name__)
+
+# 任务记录状态
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+# 已结束任务记录的保留时间（秒）
+FINISHED_RETENTION_SECONDS = 30 * 86400
+
+# 当前进程标识，用于判断执行中的任务所属进程是否仍然存活
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """判断任务所属的进程是否仍在运行（仅能判断本机进程）"""
+    if not owner:
+        return False
+    if owner == INSTANCE_ID:
+        return True
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        # 其他主机上的进程无法判断，交给心跳过期判断
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class QueueStore:
+    """基于 SQLite 的任务队列持久化存储"""
+
+    def __init__(self, db_path: Path):
+        """
+        初始化队列存储
+
+        Args:
+            db_path: SQLite 数据库路径
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queue_tasks ("
+            "task_id TEXT PRIMARY KEY, "
+            "priority INTEGER NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "enqueued_at REAL NOT NULL, "
+            "started_at REAL, "
+            "heartbeat_at REAL, "
+            "owner TEXT, "
+            "finished_at REAL, "
+            "error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_tasks_status ON queue_tasks (status)")
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: Iterable = ()) -> None:
+        """在锁内执行一条写语句并提交"""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(sql, tuple(params))
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"任务队列持久化失败: {e}")
+
+    def enqueue(self, task_id: str, priority: int, payload: Dict[str, Any]) -> None:
+        """
+        记录入队
+
+        Args:
+            task_id: 任务ID
+            priority: 队列优先级（与 WorkerTask.priority 相同，越小越先执行）
+            payload: 重建任务所需的参数
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO queue_tasks (task_id, priority, payload, status, enqueued_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (task_id, priority, json.dumps(payload, ensure_ascii=False), STATUS_QUEUED, time.time())
+        )
+
+    def mark_started(self, task_id: str) -> None:
+        """记录开始执行"""
+        now = time.time()
+        self._execute(
+            "UPDATE queue_tasks SET status = ?, started_at = ?, heartbeat_at = ?, owner = ?, "
+            "attempts = attempts + 1 WHERE task_id = ?",
+            (STATUS_RUNNING, now, now, INSTANCE_ID, task_id)
+        )
+
+    def heartbeat(self, task_ids: List[str]) -> None:
+        """刷新执行中任务的心跳"""
+        if not task_ids:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE queue_tasks SET heartbeat_at = ? WHERE task_id = ? AND status = ?",
+                        [(now, task_id, STATUS_RUNNING) for task_id in task_ids]
+                    )
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"任务心跳写入失败: {e}")
+
+    def mark_finished(self, task_id: str, success: bool, error: Optional[str] = None) -> None:
+        """记录执行结束"""
+        self._execute(
+            "UPDATE queue_tasks SET status = ?, finished_at = ?, error = ? WHERE task_id = ?",
+            (STATUS_DONE if success else STATUS_FAILED, time.time(), error, task_id)
+        )
+
+    def mark_cancelled(self, task_ids: List[str]) -> None:
+        """将任务标记为已取消（例如清空队列时）"""
+        for task_id in task_ids:
+            self._execute(
+                "UPDATE queue_tasks SET status = ?, finished_at = ? WHERE task_id = ?",
+                (STATUS_CANCELLED, time.time(), task_id)
+            )
+
+    def recover(self, stale_after: float, max_attempts: int) -> List[Dict[str, Any]]:
+        """
+        取出需要恢复执行的任务
+
+        排队中的任务全部恢复；执行中的任务如果所属进程已退出，或心跳超过
+        stale_after 秒未更新，视为随进程中断：执行次数未超过 max_attempts 时
+        重新排队，否则标记失败。
+
+        Args:
+            stale_after: 心跳过期时间（秒）
+            max_attempts: 最大执行次数
+
+        Returns:
+            需要重新入队的任务列表（按优先级和入队时间排序），
+            每项包含 task_id、priority、attempts、payload
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                rows = self._conn.execute(
+                    "SELECT task_id, priority, payload, status, attempts, heartbeat_at, owner FROM queue_tasks "
+                    "WHERE status IN (?, ?) ORDER BY priority, enqueued_at",
+                    (STATUS_QUEUED, STATUS_RUNNING)
+                ).fetchall()
+
+                recovered = []
+                for task_id, priority, payload, status, attempts, heartbeat_at, owner in rows:
+                    if status == STATUS_RUNNING:
+                        fresh = heartbeat_at is not None and now - heartbeat_at < stale_after
+                        if fresh and _owner_alive(owner):
+                            continue
+                        if attempts >= max_attempts:
+                            self._conn.execute(
+                                "UPDATE queue_tasks SET status = ?, finished_at = ?, error = ? WHERE task_id = ?",
+                                (STATUS_FAILED, now, "多次中断后放弃执行", task_id)
+                            )
+                            logger.warning(f"任务 {task_id} 已中断 {attempts} 次，不再恢复")
+                            continue
+                        self._conn.execute(
+                            "UPDATE queue_tasks SET status = ? WHERE task_id = ?", (STATUS_QUEUED, task_id)
+                        )
+                    recovered.append({
+                        "task_id": task_id,
+                        "priority": priority,
+                        "attempts": attempts,
+                        "payload": json.loads(payload),
+                    })
+
+                self._conn.execute(
+                    "DELETE FROM queue_tasks WHERE status IN (?, ?, ?) AND finished_at < ?",
+                    (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED, now - FINISHED_RETENTION_SECONDS)
+                )
+        return recovered
+
+    def get_status(self, task_id: str) -> Optional[str]:
+        """查询任务记录状态"""
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM queue_tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+# 全局单例
+_store: Optional[QueueStore] = None
+
+
+def get_queue_store() -> Optional[QueueStore]:
+    """获取队列存储单例，未启用持久化或无法打开数据库时返回 None"""
+    global _store
+    if not config.ANALYSIS_QUEUE_PERSISTENT:
+        return None
+    if _store is None:
+        try:
+            _store = QueueStore(config.ANALYSIS_QUEUE_DB_PATH)
+        except sqlite3.DatabaseError as e:
+            logger.error(f"无法打开任务队列数据库，队列将不会持久化: {e}")
+            return None
+    return _store
@@ -0,0 +1,121 @@
+"""已结束任务的摘要存储
+
+TaskManager 只在内存中保留最近结束的任务。被移出内存的任务在这里保存一份
+精简摘要（状态、结果、最后几行日志和结束事件），使旧任务ID的状态查询和
+SSE 重连仍然可以得到最终结果。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from reinvent_insight.core import config
+
+logger = logging.getLogger(__name__)
+
+
+class TaskHistoryStore:
+    """基于 SQLite 的任务摘要存储"""
+
+    def __init__(self, db_path: Path, retention_days: int):
+        """
+        初始化任务摘要存储
+
+        Args:
+            db_path: SQLite 数据库路径
+            retention_days: 摘要最长保留天数
+        """
+        self.db_path = Path(db_path)
+        self.retention_seconds = retention_days * 86400
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """延迟打开数据库，失败时返回 None（摘要存储不可用不影响任务执行）"""
+        if self._conn is not None:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_history ("
+                "task_id TEXT PRIMARY KEY, "
+                "finished_at REAL NOT NULL, "
+                "summary TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_task_history_finished ON task_history (finished_at)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"任务摘要存储不可用: {e}")
+        return self._conn
+
+    def save_many(self, summaries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        批量保存任务摘要，并清理超过保留期的旧摘要
+
+        Args:
+            summaries: task_id -> 摘要字典（需包含 finished_at）
+        """
+        if not summaries:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO task_history (task_id, finished_at, summary) VALUES (?, ?, ?)",
+                        [
+                            (task_id, summary.get("finished_at") or time.time(),
+                             json.dumps(summary, ensure_ascii=False, default=str))
+                            for task_id, summary in summaries.items()
+                        ]
+                    )
+                    conn.execute(
+                        "DELETE FROM task_history WHERE finished_at < ?",
+                        (time.time() - self.retention_seconds,)
+                    )
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"保存任务摘要失败: {e}")
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查询任务摘要
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            摘要字典，不存在时返回 None
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT summary FROM task_history WHERE task_id = ?", (task_id,)
+                ).fetchone()
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"读取任务摘要失败: {e}")
+                return None
+        return json.loads(row[0]) if row else None
+
+
+# 全局单例
+_store: Optional[TaskHistoryStore] = None
+
+
+def get_task_history() -> TaskHistoryStore:
+    """获取任务摘要存储单例"""
+    global _store
+    if _store is None:
+        _store = TaskHistoryStore(config.TASK_HISTORY_PATH, config.TASK_HISTORY_RETENTION_DAYS)
+    return _store
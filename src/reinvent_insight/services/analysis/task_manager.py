@@ -1,133 +1,240 @@
 import asyncio
+import itertools
 import logging
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-from asyncio import Queue
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
 from pathlib import Path
 
+from reinvent_insight.core import config
 from reinvent_insight.core.logger import task_id_var
+from .task_history import get_task_history
 
 logger = logging.getLogger(__name__)
 
-# 导入内容清理函数
-try:
-    from .api import clean_content_metadata
-except ImportError:
-    # 如果导入失败，提供一个简单的备用函数
-    def clean_content_metadata(content: str, title: str = '') -> str:
-        logger.warning("无法导入 clean_content_metadata，使用备用清理函数")
-        return content
+# 每个任务保留的日志条数（环形缓冲，超出后丢弃最早的日志）
+TASK_LOG_HISTORY = config.TASK_LOG_MAX_LINES
+
+# 每个任务保留的 SSE 事件数，用于新连接回放和 Last-Event-ID 断线续传
+TASK_EVENT_HISTORY = 1000
+
+# 订阅者在没有新事件时发送心跳的间隔（秒）
+HEARTBEAT_INTERVAL = 15.0
+
+# 表示任务结束的事件类型，订阅者收到后结束订阅
+TERMINAL_EVENT_TYPES = ("result", "error")
+
+# 任务摘要中保留的日志行数
+SUMMARY_LOG_LINES = 10
+
 
 @dataclass
 class TaskState:
     task_id: str
-    status: str  # "pending", "running", "completed", "error"
-    logs: List[str] = field(default_factory=list)
+    status: str  # "pending", "running", "completed", "error", "cancelled"
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=TASK_LOG_HISTORY))
     progress: int = 0  # 进度百分比
     result_title: Optional[str] = None
     result_summary: Optional[str] = None
     result_path: Optional[str] = None # 最终报告的文件路径
+    doc_hash: Optional[str] = None
     task: Optional[asyncio.Task] = None
-    message_queue: Optional[Queue] = None  # SSE 消息队列
+    resumed: bool = False  # 服务重启后从持久化队列恢复、需要续跑的任务
+
+    # SSE 事件环形缓冲：(事件ID, 事件数据)，事件ID 从 1 开始连续递增
+    events: Deque[Tuple[int, dict]] = field(default_factory=lambda: deque(maxlen=TASK_EVENT_HISTORY))
+    last_event_id: int = 0
+    terminal_event_id: Optional[int] = None  # 结果/错误事件的ID，任务结束后设置
+    subscribers: int = 0
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None  # 发布结束事件的时间
+    # 每次发布事件时触发并替换，唤醒所有等待中的订阅者
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
 
 class TaskManager:
-    """管理 SSE 连接和后台任务状态"""
+    """管理后台任务状态，并以发布/订阅方式向 SSE 连接推送任务事件"""
     def __init__(self):
         self.tasks: Dict[str, TaskState] = {}
-        self.max_queue_size = 100  # 限制队列大小，防止内存溢出
+        self.max_finished_tasks = config.TASK_RETENTION_MAX_FINISHED
+        self.max_finished_age = config.TASK_RETENTION_MAX_AGE
+
+    def _publish(self, task_state: TaskState, payload: dict) -> int:
+        """
+        发布一个事件：写入环形缓冲并唤醒该任务的所有订阅者
+
+        Args:
+            task_state: 任务状态
+            payload: 事件数据（包含 type 字段）
+
+        Returns:
+            事件ID
+        """
+        task_state.last_event_id += 1
+        event_id = task_state.last_event_id
+        task_state.events.append((event_id, payload))
+        terminal = payload.get("type") in TERMINAL_EVENT_TYPES
+        if terminal:
+            task_state.terminal_event_id = event_id
+            task_state.finished_at = time.time()
+
+        changed = task_state.changed
+        task_state.changed = asyncio.Event()
+        changed.set()
 
-    async def register_sse_connection(self, task_id: str) -> Queue:
+        if terminal:
+            self.evict_finished_tasks()
+        return event_id
+
+    def evict_finished_tasks(self, now: Optional[float] = None) -> List[str]:
         """
-        注册 SSE 连接，返回消息队列
-        
+        按保留策略将已结束的任务移出内存
+
+        超过最长保留时间的任务，以及超出数量上限时最早结束的任务，
+        会被写入任务摘要存储后从内存中移除。
+
+        Args:
+            now: 当前时间（秒），默认取系统时间
+
+        Returns:
+            被移出的任务ID列表
+        """
+        now = time.time() if now is None else now
+        finished = sorted(
+            (state for state in self.tasks.values() if state.finished_at is not None),
+            key=lambda state: state.finished_at
+        )
+        overflow = len(finished) - self.max_finished_tasks
+        evicted = [
+            state for index, state in enumerate(finished)
+            if index < overflow or now - state.finished_at > self.max_finished_age
+        ]
+        if not evicted:
+            return []
+
+        get_task_history().save_many({state.task_id: self._build_summary(state) for state in evicted})
+        for state in evicted:
+            self.tasks.pop(state.task_id, None)
+        logger.info(f"已将 {len(evicted)} 个已结束任务移出内存，当前保留 {len(self.tasks)} 个任务")
+        return [state.task_id for state in evicted]
+
+    def _build_summary(self, task_state: TaskState) -> Dict[str, Any]:
+        """生成任务的精简摘要（用于持久化和状态查询）"""
+        final_event = None
+        if task_state.terminal_event_id is not None:
+            for event_id, payload in reversed(task_state.events):
+                if event_id == task_state.terminal_event_id:
+                    final_event = payload
+                    break
+        return {
+            "task_id": task_state.task_id,
+            "status": task_state.status,
+            "progress": task_state.progress,
+            "logs": list(task_state.logs)[-SUMMARY_LOG_LINES:],
+            "result_title": task_state.result_title,
+            "result_path": task_state.result_path,
+            "doc_hash": task_state.doc_hash,
+            "created_at": task_state.created_at,
+            "finished_at": task_state.finished_at,
+            "final_event": final_event,
+        }
+
+    def get_task_summary(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务摘要，内存中不存在时从任务摘要存储中查找
+
         Args:
             task_id: 任务ID
-            
+
         Returns:
-            Queue: 消息队列，用于接收任务更新
-            
-        Raises:
-            ValueError: 如果任务不存在
+            摘要字典，任务未知时返回 None
         """
-        if task_id not in self.tasks:
-            raise ValueError(f"任务 {task_id} 不存在")
-        
-        # 创建新的消息队列
-        queue = Queue(maxsize=self.max_queue_size)
-        self.tasks[task_id].message_queue = queue
-        logger.info(f"SSE 连接已注册到任务: {task_id}")
-        
-        # 如果任务已经有历史消息，将它们放入队列
-        task_state = self.tasks[task_id]
-        for log_message in task_state.logs:
-            try:
-                await queue.put({"type": "log", "message": log_message})
-            except asyncio.QueueFull:
-                logger.warning(f"任务 {task_id} 的消息队列已满，丢弃历史日志")
-                break
-        
-        # 如果有进度信息，也发送
-        if task_state.progress > 0:
-            try:
-                await queue.put({
-                    "type": "progress",
-                    "progress": task_state.progress,
-                    "message": task_state.logs[-1] if task_state.logs else ""
-                })
-            except asyncio.QueueFull:
-                logger.warning(f"任务 {task_id} 的消息队列已满，丢弃进度信息")
-        
-        # 如果任务已完成，发送结果
-        if task_state.status == "completed":
-            await self._send_result_to_queue(task_id)
-        elif task_state.status == "error":
-            try:
-                await queue.put({
-                    "type": "error",
-                    "message": task_state.logs[-1] if task_state.logs else "未知错误"
-                })
-            except asyncio.QueueFull:
-                logger.warning(f"任务 {task_id} 的消息队列已满，丢弃错误信息")
-        
-        return queue
-
-    async def unregister_sse_connection(self, task_id: str):
+        task_state = self.tasks.get(task_id)
+        if task_state is not None:
+            return self._build_summary(task_state)
+        return get_task_history().get(task_id)
+
+    async def subscribe(
+        self,
+        task_id: str,
+        last_event_id: int = 0,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL
+    ) -> AsyncIterator[Tuple[Optional[int], dict]]:
         """
-        注销 SSE 连接，清理队列资源
-        
+        订阅任务事件
+
+        先回放缓冲区中 ID 大于 last_event_id 的事件，之后等待新事件推送；
+        没有新事件时按心跳间隔产出心跳。收到结果或错误事件后结束。
+        任意数量的订阅者可以同时订阅同一任务，彼此互不影响。
+
         Args:
             task_id: 任务ID
+            last_event_id: 客户端已收到的最后一个事件ID（Last-Event-ID），0 表示从头回放
+            heartbeat_interval: 心跳间隔（秒）
+
+        Yields:
+            (事件ID, 事件数据)，心跳的事件ID为 None
+
+        Raises:
+            ValueError: 如果任务不存在
         """
-        if task_id in self.tasks:
-            self.tasks[task_id].message_queue = None
-            logger.info(f"SSE 连接已从任务断开: {task_id}")
+        task_state = self.tasks.get(task_id)
+        if task_state is None:
+            raise ValueError(f"任务 {task_id} 不存在")
+
+        task_state.subscribers += 1
+        logger.info(f"SSE 订阅任务: {task_id} (last_event_id={last_event_id}, 订阅者 {task_state.subscribers})")
+        try:
+            while True:
+                # 事件ID连续，直接定位到第一个未发送的事件
+                if task_state.events:
+                    first_id = task_state.events[0][0]
+                    if last_event_id + 1 < first_id:
+                        logger.debug(f"任务 {task_id} 的部分事件已被淘汰，从 {first_id} 开始回放")
+                    start = max(last_event_id + 1 - first_id, 0)
+                    pending = list(itertools.islice(task_state.events, start, None))
+                else:
+                    pending = []
+
+                for event_id, payload in pending:
+                    last_event_id = event_id
+                    yield event_id, payload
+                    if event_id == task_state.terminal_event_id:
+                        return
+
+                terminal_id = task_state.terminal_event_id
+                if terminal_id is not None and last_event_id >= terminal_id:
+                    return
+                if self.tasks.get(task_id) is not task_state:
+                    return
+
+                changed = task_state.changed
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield None, {"type": "heartbeat"}
+        finally:
+            task_state.subscribers -= 1
+            logger.info(f"SSE 订阅已断开: {task_id}")
 
     async def send_message(self, message: str, task_id: str):
         """
-        发送日志消息到队列
-        
+        记录日志消息并推送给订阅者
+
         Args:
             message: 日志消息
             task_id: 任务ID
         """
         if task_id in self.tasks:
-            self.tasks[task_id].logs.append(message)
-            queue = self.tasks[task_id].message_queue
-            if queue:
-                try:
-                    await asyncio.wait_for(
-                        queue.put({"type": "log", "message": message}),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"向任务 {task_id} 发送日志消息超时（队列可能已满）")
-                except Exception as e:
-                    logger.warning(f"向任务 {task_id} 发送日志消息失败: {e}")
+            task_state = self.tasks[task_id]
+            task_state.logs.append(message)
+            self._publish(task_state, {"type": "log", "message": message})
 
     async def send_result(self, title: str, summary: str, task_id: str, filename: str = None, doc_hash: str = None):
         """
-        发送任务结果到队列
-        
+        记录任务结果并推送给订阅者
+
         Args:
             title: 文档标题
             summary: 文档摘要内容
@@ -141,65 +248,50 @@ class TaskManager:
             task_state.result_title = title
             task_state.result_summary = summary
             task_state.doc_hash = doc_hash
-            
+
             # 设置 result_path
             if filename:
                 from reinvent_insight.core import config
                 task_state.result_path = str(config.OUTPUT_DIR / filename)
-            
-            await self._send_result_to_queue(task_id, filename, doc_hash)
-    
-    async def _send_result_to_queue(self, task_id: str, filename: str = None, doc_hash: str = None):
+
+            self._publish_result(task_state, filename, doc_hash)
+
+    def _publish_result(self, task_state: TaskState, filename: str = None, doc_hash: str = None):
         """
-        内部方法：将结果发送到消息队列
-        
+        内部方法：发布结果事件
+
+        事件只携带标题、文件名和哈希，报告正文由前端按哈希加载，
+        避免在事件缓冲中为每个任务保留完整报告。
+
         Args:
-            task_id: 任务ID
+            task_state: 任务状态
             filename: 文件名（可选）
             doc_hash: 文档哈希（可选）
         """
-        task_state = self.tasks[task_id]
-        queue = task_state.message_queue
-        
-        if queue:
-            # 清理内容，移除 metadata 和重复标题
-            cleaned_summary = clean_content_metadata(
-                task_state.result_summary, 
-                task_state.result_title
-            )
-            
-            result_data = {
-                "type": "result",
-                "title": task_state.result_title,
-                "summary": cleaned_summary
-            }
-            
-            # 如果没有传入 filename 和 doc_hash，尝试从 result_path 获取
-            if not filename and task_state.result_path:
-                filename = Path(task_state.result_path).name
-            
-            if not doc_hash and filename:
-                try:
-                    from .api import filename_to_hash
-                    doc_hash = filename_to_hash.get(filename)
-                except (ImportError, KeyError):
-                    pass
-            
-            # 添加文件名和 hash
-            if filename:
-                result_data["filename"] = filename
-            if doc_hash:
-                result_data["hash"] = doc_hash
-            
-            try:
-                await asyncio.wait_for(
-                    queue.put(result_data),
-                    timeout=1.0
-                )
-            except asyncio.TimeoutError:
-                logger.warning(f"向任务 {task_id} 发送结果超时（队列可能已满）")
-            except Exception as e:
-                logger.warning(f"向任务 {task_id} 发送结果失败: {e}")
+        if task_state.terminal_event_id is not None:
+            return
+
+        result_data = {
+            "type": "result",
+            "title": task_state.result_title or "",
+            "message": "分析完成"
+        }
+
+        # 如果没有传入 filename 和 doc_hash，尝试从 result_path 获取
+        if not filename and task_state.result_path:
+            filename = Path(task_state.result_path).name
+
+        if not doc_hash and filename:
+            from reinvent_insight.services.document.hash_registry import get_registry
+            doc_hash = get_registry().get_hash(filename)
+
+        # 添加文件名和 hash
+        if filename:
+            result_data["filename"] = filename
+        if doc_hash:
+            result_data["hash"] = doc_hash
+
+        self._publish(task_state, result_data)
 
     def set_task_result(self, task_id: str, file_path: str):
         """当任务完成时，由工作流调用，用于记录最终产物路径。"""
@@ -216,6 +308,7 @@ class TaskManager:
                 await coro
             except asyncio.CancelledError:
                 logger.warning(f"任务 {task_id} 被取消。")
+                self.set_task_cancelled(task_id)
             except Exception as e:
                 logger.error(f"任务 {task_id} 内部发生未捕获的异常: {e}", exc_info=True)
                 # 确保即使在意外情况下也更新任务状态
@@ -228,13 +321,16 @@ class TaskManager:
         state = TaskState(task_id=task_id, status="pending", task=task)
         self.tasks[task_id] = state
 
+        # 顺带清理超过保留时间的已结束任务
+        self.evict_finished_tasks()
+
     def get_task_state(self, task_id: str) -> Optional[TaskState]:
         return self.tasks.get(task_id)
-    
+
     def get_running_tasks_count(self) -> int:
         """
         获取当前运行中的任务数量
-        
+
         Returns:
             运行中的任务数量
         """
@@ -245,12 +341,15 @@ class TaskManager:
         return running_count
 
     def cleanup_task(self, task_id: str):
-        pass
+        """将任务立即移出内存（已结束的任务会先保存摘要）"""
+        task_state = self.tasks.pop(task_id, None)
+        if task_state is not None and task_state.finished_at is not None:
+            get_task_history().save_many({task_id: self._build_summary(task_state)})
 
     async def set_task_completed(self, task_id: str, result_path: str = None):
         """
-        设置任务为完成状态
-        
+        设置任务为完成状态，并在尚未发布结果时推送结果事件
+
         Args:
             task_id: 任务ID
             result_path: 结果文件路径（可选）
@@ -261,12 +360,13 @@ class TaskManager:
             task_state.progress = 100
             if result_path:
                 task_state.result_path = result_path
+            self._publish_result(task_state)
             logger.info(f"任务 {task_id} 已标记为完成")
 
     async def update_progress(self, task_id: str, progress: int, message: Optional[str] = None):
         """
-        更新任务进度并发送到队列
-        
+        更新任务进度并推送给订阅者
+
         Args:
             task_id: 任务ID
             progress: 进度百分比 (0-100)
@@ -277,27 +377,17 @@ class TaskManager:
             task_state.progress = progress
             if message:
                 task_state.logs.append(message)
-            
-            queue = task_state.message_queue
-            if queue:
-                try:
-                    await asyncio.wait_for(
-                        queue.put({
-                            "type": "progress",
-                            "progress": progress,
-                            "message": message or (task_state.logs[-1] if task_state.logs else "")
-                        }),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"向任务 {task_id} 更新进度超时（队列可能已满）")
-                except Exception as e:
-                    logger.warning(f"向任务 {task_id} 更新进度失败: {e}")
-    
+
+            self._publish(task_state, {
+                "type": "progress",
+                "progress": progress,
+                "message": message or (task_state.logs[-1] if task_state.logs else "")
+            })
+
     async def set_task_error(self, task_id: str, error_info):
         """
-        设置任务错误状态并发送到队列
-        
+        设置任务错误状态并推送给订阅者
+
         Args:
             task_id: 任务ID
             error_info: 错误信息，可以是字符串或字典
@@ -306,13 +396,13 @@ class TaskManager:
         if task_id in self.tasks:
             task_state = self.tasks[task_id]
             task_state.status = "error"
-            
+
             # 处理不同类型的错误信息
             if isinstance(error_info, dict):
                 # 结构化错误信息
                 error_message = error_info.get("message", "未知错误")
                 task_state.logs.append(error_message)
-                
+
                 error_data = {
                     "type": "error",
                     "error_type": error_info.get("error_type", "unknown"),
@@ -325,24 +415,36 @@ class TaskManager:
                 # 简单字符串错误消息（向后兼容）
                 error_message = str(error_info)
                 task_state.logs.append(error_message)
-                
+
                 error_data = {
                     "type": "error",
                     "error_type": "unknown",
                     "message": error_message
                 }
-            
-            queue = task_state.message_queue
-            if queue:
-                try:
-                    await asyncio.wait_for(
-                        queue.put(error_data),
-                        timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning(f"向任务 {task_id} 发送错误消息超时（队列可能已满）")
-                except Exception as e:
-                    logger.warning(f"向任务 {task_id} 发送错误消息失败: {e}")
+
+            self._publish(task_state, error_data)
+
+    def set_task_cancelled(self, task_id: str, message: str = "任务已取消"):
+        """
+        设置任务为取消状态，并推送结束事件
+
+        取消的任务与失败的任务一样记录结束时间，按保留策略移出内存。
+        已经结束的任务不受影响。
+
+        Args:
+            task_id: 任务ID
+            message: 推送给订阅者的提示
+        """
+        task_state = self.tasks.get(task_id)
+        if task_state is None or task_state.finished_at is not None:
+            return
+        task_state.status = "cancelled"
+        task_state.logs.append(message)
+        self._publish(task_state, {
+            "type": "error",
+            "error_type": "cancelled",
+            "message": message
+        })
 
 # 创建一个全局唯一的 TaskManager 实例
-manager = TaskManager() 
\ No newline at end of file
+manager = TaskManager()
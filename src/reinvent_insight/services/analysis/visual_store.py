@@ -0,0 +1,182 @@
+"""可视化解读生成状态持久化
+
+原来的文件监测器把已处理的文件写入 .visual_processed.json（"文件名:mtime"
+集合），每触发一个任务就重写整个文件，也无法记录失败与重试次数。本模块把
+每篇深度解读的可视化生成状态记录到 SQLite（WAL 模式）：
+
+- 按文件名索引，记录对应的文件版本（mtime_ns + size）
+- 状态：running（生成中）、done（已完成）、failed（失败）
+- 尝试次数与最近一次错误，用于限制同一版本的自动重试
+
+状态只是调度提示：HTML 是否存在仍以磁盘为准，删除数据库不会导致错误，
+只会让启动时的积压扫描重新核对一遍。
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from reinvent_insight.core import config
+
+logger = logging.getLogger(__name__)
+
+# 生成状态
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class VisualRecord:
+    """单篇深度解读的可视化生成状态"""
+    filename: str        # 深度解读文件名
+    mtime_ns: int        # 记录时的文件修改时间（纳秒）
+    size: int            # 记录时的文件大小（字节）
+    status: str          # 生成状态
+    attempts: int        # 当前版本的尝试次数
+    error: Optional[str] = None  # 最近一次失败原因
+
+    def matches(self, stat) -> bool:
+        """判断记录是否对应文件的当前版本"""
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class VisualStateStore:
+    """基于 SQLite 的可视化生成状态存储"""
+
+    def __init__(self, db_path: Path):
+        """
+        初始化状态存储
+
+        Args:
+            db_path: SQLite 数据库路径
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS visual_documents ("
+            "filename TEXT PRIMARY KEY, "
+            "mtime_ns INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_visual_documents_status ON visual_documents (status)")
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: Iterable = ()) -> None:
+        """在锁内执行一条写语句并提交"""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(sql, tuple(params))
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"可视化状态持久化失败: {e}")
+
+    def get(self, filename: str) -> Optional[VisualRecord]:
+        """查询单个文件的生成状态"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename, mtime_ns, size, status, attempts, error FROM visual_documents WHERE filename = ?",
+                (filename,)
+            ).fetchone()
+        return VisualRecord(*row) if row else None
+
+    def load_all(self) -> Dict[str, VisualRecord]:
+        """一次性读取全部记录（启动时的积压扫描使用）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, mtime_ns, size, status, attempts, error FROM visual_documents"
+            ).fetchall()
+        return {row[0]: VisualRecord(*row) for row in rows}
+
+    def mark_running(self, filename: str, stat) -> int:
+        """
+        记录开始生成
+
+        文件版本变化时尝试次数从 1 重新计数。
+
+        Returns:
+            当前版本的尝试次数
+        """
+        record = self.get(filename)
+        attempts = record.attempts + 1 if record and record.matches(stat) else 1
+        self._execute(
+            "INSERT OR REPLACE INTO visual_documents "
+            "(filename, mtime_ns, size, status, attempts, error, updated_at) VALUES (?, ?, ?, ?, ?, NULL, ?)",
+            (filename, stat.st_mtime_ns, stat.st_size, STATUS_RUNNING, attempts, time.time())
+        )
+        return attempts
+
+    def mark_done(self, filename: str, stat) -> None:
+        """记录已完成（HTML 已存在），stat 为文件当前状态"""
+        self._execute(
+            "INSERT INTO visual_documents (filename, mtime_ns, size, status, attempts, updated_at) "
+            "VALUES (?, ?, ?, ?, 0, ?) "
+            "ON CONFLICT(filename) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, "
+            "status = excluded.status, error = NULL, updated_at = excluded.updated_at",
+            (filename, stat.st_mtime_ns, stat.st_size, STATUS_DONE, time.time())
+        )
+
+    def mark_done_many(self, items: Iterable) -> None:
+        """批量记录已完成，items 为 (文件名, stat) 列表"""
+        now = time.time()
+        rows = [(filename, stat.st_mtime_ns, stat.st_size, STATUS_DONE, now) for filename, stat in items]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO visual_documents "
+                        "(filename, mtime_ns, size, status, attempts, updated_at) VALUES (?, ?, ?, ?, 0, ?)",
+                        rows
+                    )
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"可视化状态持久化失败: {e}")
+
+    def mark_failed(self, filename: str, error: Optional[str]) -> None:
+        """记录生成失败"""
+        self._execute(
+            "UPDATE visual_documents SET status = ?, error = ?, updated_at = ? WHERE filename = ?",
+            (STATUS_FAILED, error, time.time(), filename)
+        )
+
+    def discard(self, filename: str) -> None:
+        """删除文件的记录（深度解读被删除时）"""
+        self._execute("DELETE FROM visual_documents WHERE filename = ?", (filename,))
+
+    def count_by_status(self) -> Dict[str, int]:
+        """按状态统计记录数"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM visual_documents GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+# 全局单例
+_store: Optional[VisualStateStore] = None
+
+
+def get_visual_store() -> VisualStateStore:
+    """获取可视化状态存储单例"""
+    global _store
+    if _store is None:
+        _store = VisualStateStore(config.VISUAL_STATE_DB_PATH)
+    return _store
@@ -1,76 +1,103 @@
 """
-可视化解读文件监测器
+可视化解读调度器
 
-该模块监测深度解读文件的变化，自动触发可视化解读的生成任务。
+深度解读生成或更新后，自动触发对应可视化解读的生成任务。
 支持版本管理，确保每个版本的深度解读都有对应的可视化解读。
+
+原来的实现每 15 秒遍历整个输出目录并逐个判断是否需要生成，每轮最多
+触发一个任务后再等待 10 秒，积压文档每轮只能消化一篇。现在改为事件驱动：
+
+- 目录监控（新增/修改/删除）与工作流完成（VisualInsightProcessor）产生事件，
+  文档进入优先级队列；新文档优先于启动时扫描出的积压文档
+- 按 VISUAL_MAX_CONCURRENT 启动固定数量的工作协程，等待每个生成任务结束
+  后再领取下一篇
+- 生成状态记录在 SQLite（visual_store），替代每次触发都整体重写的
+  .visual_processed.json，并限制同一版本失败后的自动重试次数
+- 积压文档默认逐个生成并让位于正在运行的分析任务；开启
+  VISUAL_BACKLOG_DRAIN 后，只要可视化模型的限流器仍有余量就占满并发名额
 """
 
-import os
 import re
-import json
 import time
 import asyncio
+import itertools
 from pathlib import Path
-from typing import Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from reinvent_insight.core.logger import get_logger
 
 from reinvent_insight.core import config
 from .task_manager import manager as task_manager
+from .visual_store import STATUS_DONE, STATUS_FAILED, VisualStateStore, get_visual_store
 
 logger = get_logger(__name__)
 
+# 队列优先级（数值越小越先处理）
+PRIORITY_NEW = 0        # 新生成或更新的文档
+PRIORITY_BACKLOG = 10   # 启动时扫描出的积压文档、失败后的重试
+
+# 积压文档暂不能开始时，等待新事件的最长时间（秒），超时后重新检查
+BACKLOG_RECHECK_INTERVAL = 5.0
+
 
 class VisualInterpretationWatcher:
-    """监测深度解读文件变化，自动生成可视化解读"""
-    
-    def __init__(self, watch_dir: Path, model_name: str):
+    """事件驱动的可视化解读调度器"""
+
+    def __init__(
+        self,
+        watch_dir: Path,
+        model_name: str,
+        max_concurrent: Optional[int] = None,
+        backlog_drain: Optional[bool] = None,
+        store: Optional[VisualStateStore] = None
+    ):
         """
-        初始化文件监测器
-        
+        初始化调度器
+
         Args:
             watch_dir: 监测的目录路径
             model_name: AI模型名称
+            max_concurrent: 同时运行的生成任务数，默认取 config.VISUAL_MAX_CONCURRENT
+            backlog_drain: 是否启用积压清理模式，默认取 config.VISUAL_BACKLOG_DRAIN
+            store: 生成状态存储，默认使用全局单例
         """
         self.watch_dir = Path(watch_dir)
         self.model_name = model_name
-        self.processed_files: Set[str] = set()  # 已处理的文件集合
-        self.cache_file = self.watch_dir / ".visual_processed.json"
-        
-        self._load_processed_files()
+        self.max_concurrent = max(1, max_concurrent or config.VISUAL_MAX_CONCURRENT)
+        self.backlog_drain = config.VISUAL_BACKLOG_DRAIN if backlog_drain is None else backlog_drain
+        self.max_attempts = config.VISUAL_MAX_ATTEMPTS
+        self.store = store or get_visual_store()
+
+        # 优先级队列：(优先级, 序号, 文件名)；同一文件只保留优先级最高的条目
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._queued: Dict[str, int] = {}      # 文件名 -> 排队优先级
+        self._running: Dict[str, int] = {}     # 文件名 -> 优先级
+        self._rerun: Set[str] = set()          # 生成期间再次提交的文件，结束后重新入队
+        self._task_dirs: Dict[str, str] = {}   # 文件名 -> 工作流提供的 task_dir
+        # 有新文档入队或任务结束时触发并替换，唤醒所有等待中的积压文档
+        self._wakeup = asyncio.Event()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._observer = None
+
+        # 统计信息
+        self.completed = 0
+        self.failed = 0
+
         self._cleanup_temp_files()
-        
-        logger.info(f"[文件监测器] 初始化完成, 目录={watch_dir}, 模型={model_name}")
-    
-    def _load_processed_files(self):
-        """从持久化存储加载已处理文件列表"""
-        if self.cache_file.exists():
-            try:
-                data = json.loads(self.cache_file.read_text(encoding="utf-8"))
-                self.processed_files = set(data)
-                logger.info(f"加载已处理文件列表: {len(self.processed_files)} 个文件")
-            except Exception as e:
-                logger.warning(f"加载已处理文件列表失败: {e}")
-                self.processed_files = set()
-        else:
-            logger.info("未找到已处理文件缓存，从空列表开始")
-    
-    def _save_processed_files(self):
-        """保存已处理文件列表"""
-        try:
-            self.cache_file.write_text(
-                json.dumps(list(self.processed_files), indent=2, ensure_ascii=False),
-                encoding="utf-8"
-            )
-            logger.debug(f"已保存处理文件列表: {len(self.processed_files)} 个文件")
-        except Exception as e:
-            logger.error(f"保存已处理文件列表失败: {e}")
-    
+
+        logger.info(
+            f"[可视化调度] 初始化完成, 目录={watch_dir}, 模型={model_name}, "
+            f"并发={self.max_concurrent}, 积压清理模式={self.backlog_drain}"
+        )
+
     def _cleanup_temp_files(self):
         """清理残留的临时文件（.html.tmp）"""
         if not self.watch_dir.exists():
             return
-        
+
         try:
             temp_files = list(self.watch_dir.glob("*.html.tmp"))
             if temp_files:
@@ -85,189 +112,371 @@ class VisualInterpretationWatcher:
                 logger.debug("未发现残留的临时文件")
         except Exception as e:
             logger.warning(f"清理临时文件时出错: {e}")
-    
+
+    # ==================== 事件入口 ====================
+
     async def start_watching(self):
-        """开始监测文件变化"""
-        logger.info(f"[文件监测器] 开始监测, 目录={self.watch_dir}")
-        
-        while True:
-            try:
-                await self._check_new_files()
-                await asyncio.sleep(15)  # 每60秒检查一次（增加间隔）
-            except Exception as e:
-                logger.error(f"文件监测出错: {e}", exc_info=True)
-                await asyncio.sleep(120)  # 出错后等待更长时间
-    
-    async def _check_new_files(self):
-        """检查新文件或版本更新，带频率控制"""
-        if not self.watch_dir.exists():
-            logger.warning(f"监测目录不存在: {self.watch_dir}")
+        """启动调度：监控目录变化，扫描积压文档，并持续处理队列"""
+        global _watcher
+        from reinvent_insight.infrastructure.file_system.watcher import start_watching as watch_directory
+
+        self._loop = asyncio.get_running_loop()
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.max_concurrent)]
+        _watcher = self
+        logger.info(f"[可视化调度] 开始运行, 目录={self.watch_dir}")
+
+        try:
+            self._observer = watch_directory(self.watch_dir, self.notify_file_changed)
+            await self.enqueue_backlog()
+            await asyncio.gather(*self._workers)
+        finally:
+            self.stop()
+
+    def stop(self):
+        """停止目录监控和工作协程（已触发的生成任务继续运行）"""
+        global _watcher
+        if _watcher is self:
+            _watcher = None
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        for worker in self._workers:
+            worker.cancel()
+
+    def notify_file_changed(self, file_path):
+        """
+        目录监控回调（在监控线程中调用），转交事件循环处理
+
+        Args:
+            file_path: 发生变化的 Markdown 文件路径
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._on_file_changed, Path(file_path))
+
+    def _on_file_changed(self, md_file: Path):
+        """文件新增/修改时入队，删除时清理状态"""
+        if md_file.exists():
+            self.submit(md_file, PRIORITY_NEW)
             return
-        
-        checked_count = 0
-        triggered_count = 0
-        max_concurrent_tasks = 1  # 每次只处理 1 个任务，避免 API 超限和重复生成
-        
-        for md_file in self.watch_dir.glob("*.md"):
-            checked_count += 1
-            file_key = self._get_file_key(md_file)
-            
-            # 检查是否需要生成可视化
-            if await self._should_generate_visual(md_file, file_key):
-                # 检查当前运行的任务数
-                running_tasks = task_manager.get_running_tasks_count()
-                
-                if running_tasks >= max_concurrent_tasks:
-                    logger.info(
-                        f"当前有 {running_tasks} 个任务运行中，"
-                        f"达到并发限制 ({max_concurrent_tasks})，跳过 {md_file.name}"
-                    )
-                    continue
-                
-                await self._trigger_visual_generation(md_file)
-                self.processed_files.add(file_key)
-                self._save_processed_files()
-                triggered_count += 1
-                
-                # 任务间添加延迟，避免短时间内大量请求
-                if triggered_count > 0:
-                    logger.info("等待 10 秒后继续检查下一个文件...")
-                    await asyncio.sleep(10)  # 增加延迟到 10 秒
-                    break  # 每次只触发 1 个任务
-        
-        # 只在有触发任务时才记录日志
-        if triggered_count > 0:
-            logger.info(f"检查了 {checked_count} 个文件，触发了 {triggered_count} 个生成任务")
-    
-    def _get_file_key(self, md_file: Path) -> str:
+
+        filename = md_file.name
+        # 队列中的旧条目在出队时会因为不在 _queued 中被丢弃
+        self._queued.pop(filename, None)
+        self._rerun.discard(filename)
+        self._task_dirs.pop(filename, None)
+        self.store.discard(filename)
+
+    def submit(self, md_file: Path, priority: int = PRIORITY_NEW, task_dir: Optional[str] = None) -> bool:
         """
-        生成文件的唯一标识（包含修改时间）
-        
+        将文档加入生成队列（需在事件循环线程中调用）
+
         Args:
-            md_file: Markdown 文件路径
-            
+            md_file: 深度解读文件路径
+            priority: 队列优先级（PRIORITY_NEW / PRIORITY_BACKLOG）
+            task_dir: 工作流的任务目录（用于分章节生成模式）
+
         Returns:
-            文件唯一标识
+            是否新入队（已以同等或更高优先级排队时返回 False）
         """
-        stat = md_file.stat()
-        return f"{md_file.name}:{stat.st_mtime}"
-    
-    async def _should_generate_visual(self, md_file: Path, file_key: str) -> bool:
+        filename = Path(md_file).name
+        if not filename.endswith(".md"):
+            return False
+        if task_dir:
+            self._task_dirs[filename] = task_dir
+
+        current = self._queued.get(filename)
+        if current is not None and current <= priority:
+            return False
+
+        self._queued[filename] = priority
+        if filename in self._running:
+            # 同一文档正在生成：结束后再入队，避免占据队首反复出队
+            self._rerun.add(filename)
+            return True
+        self._queue.put_nowait((priority, next(self._seq), filename))
+        self._notify()
+        return True
+
+    def _notify(self):
+        """唤醒所有等待中的积压文档（替换事件，等待方不会错过通知）"""
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    async def enqueue_backlog(self) -> int:
         """
-        判断是否需要生成可视化
-        
+        扫描输出目录，将缺少可视化解读的文档作为积压加入队列
+
+        Returns:
+            入队的文档数
+        """
+        pending = await asyncio.to_thread(self._scan_backlog)
+        enqueued = sum(1 for filename in pending if self.submit(self.watch_dir / filename, PRIORITY_BACKLOG))
+        if enqueued:
+            logger.info(f"[可视化调度] 发现 {enqueued} 篇积压文档待生成可视化解读")
+        return enqueued
+
+    def _scan_backlog(self) -> List[str]:
+        """
+        找出缺少可视化解读的文档（只 stat，不读取文件内容）
+
+        已有 HTML 的文档记为已完成；同一版本失败次数达到上限的文档不再入队。
+
+        Returns:
+            需要生成的文件名列表（按修改时间从新到旧）
+        """
+        if not self.watch_dir.exists():
+            logger.warning(f"监测目录不存在: {self.watch_dir}")
+            return []
+
+        records = self.store.load_all()
+        pending = []
+        done = []
+        for md_file in self.watch_dir.glob("*.md"):
+            try:
+                stat = md_file.stat()
+            except FileNotFoundError:
+                continue
+
+            record = records.get(md_file.name)
+            if self._visual_html_ready(md_file):
+                if record is None or record.status != STATUS_DONE:
+                    done.append((md_file.name, stat))
+                continue
+
+            if (record is not None and record.status == STATUS_FAILED
+                    and record.matches(stat) and record.attempts >= self.max_attempts):
+                continue
+            pending.append((stat.st_mtime_ns, md_file.name))
+
+        self.store.mark_done_many(done)
+        pending.sort(reverse=True)
+        return [filename for _, filename in pending]
+
+    # ==================== 调度 ====================
+
+    async def _worker_loop(self):
+        """工作协程：按优先级领取文档并等待生成任务结束"""
+        while True:
+            priority, seq, filename = await self._queue.get()
+            if self._queued.get(filename) != priority:
+                # 已被更高优先级的条目取代，或文件已被删除
+                continue
+
+            if filename in self._running:
+                self._rerun.add(filename)
+                continue
+
+            if priority >= PRIORITY_BACKLOG and not self._backlog_slot_available():
+                # 积压文档暂不能开始：放回队列，等待新文档入队、任务结束或超时后重新检查
+                wakeup = self._wakeup
+                self._queue.put_nowait((priority, seq, filename))
+                try:
+                    await asyncio.wait_for(wakeup.wait(), BACKLOG_RECHECK_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            del self._queued[filename]
+            self._running[filename] = priority
+            try:
+                await self._process(filename, priority, self._task_dirs.pop(filename, None))
+            except Exception as e:
+                logger.error(f"[可视化调度] 处理 {filename} 出错: {e}", exc_info=True)
+            finally:
+                del self._running[filename]
+                if filename in self._rerun:
+                    self._rerun.discard(filename)
+                    rerun_priority = self._queued.get(filename)
+                    if rerun_priority is not None:
+                        self._queue.put_nowait((rerun_priority, next(self._seq), filename))
+                self._notify()
+
+    def _backlog_slot_available(self) -> bool:
+        """判断现在能否开始一篇积压文档"""
+        if self.backlog_drain:
+            # 积压清理模式：占满并发名额，直到可视化模型的限流器出现排队或暂停
+            return not self._model_saturated()
+        # 默认：逐个生成，且让位于其他正在运行的任务
+        return not self._running and task_manager.get_running_tasks_count() == 0
+
+    def _model_saturated(self) -> bool:
+        """可视化模型的限流器是否已饱和（请求在排队等待，或因服务端限流暂停）"""
+        try:
+            from reinvent_insight.infrastructure.ai.config_manager import ModelConfigManager
+            from reinvent_insight.infrastructure.ai.rate_limiter import get_rate_limiter_stats
+
+            model_config = ModelConfigManager.get_instance().get_config("visual_generation")
+            stats = get_rate_limiter_stats().get(f"{model_config.provider}/{model_config.model_name}")
+        except Exception as e:
+            logger.debug(f"读取可视化模型限流状态失败: {e}")
+            return False
+
+        if not stats:
+            return False
+        return bool(stats["paused_seconds"] > 0 or stats["waiting_for_slot"] or stats["waiting_for_rate"])
+
+    async def _process(self, filename: str, priority: int, task_dir: Optional[str] = None):
+        """
+        生成单篇文档的可视化解读，并记录结果
+
         Args:
-            md_file: Markdown 文件路径
-            file_key: 文件唯一标识
-            
+            filename: 深度解读文件名
+            priority: 出队时的优先级
+            task_dir: 工作流的任务目录
+        """
+        md_file = self.watch_dir / filename
+        try:
+            stat = md_file.stat()
+        except FileNotFoundError:
+            self.store.discard(filename)
+            return
+
+        if not self._should_generate_visual(md_file):
+            if self._visual_html_ready(md_file):
+                self.store.mark_done(filename, stat)
+            return
+
+        attempts = self.store.mark_running(filename, stat)
+        success, error = await self._run_generation(md_file, task_dir)
+
+        try:
+            # 生成任务会更新文章元数据，按结束时的文件状态记录
+            stat = md_file.stat()
+        except FileNotFoundError:
+            self.store.discard(filename)
+            return
+
+        if success:
+            self.completed += 1
+            self.store.mark_done(filename, stat)
+            return
+
+        self.failed += 1
+        self.store.mark_failed(filename, error)
+        if attempts < self.max_attempts:
+            logger.warning(f"[可视化调度] {filename} 第 {attempts} 次生成失败，稍后重试: {error}")
+            self.submit(md_file, PRIORITY_BACKLOG, task_dir)
+        else:
+            logger.error(f"[可视化调度] {filename} 已失败 {attempts} 次，不再自动重试: {error}")
+
+    async def _run_generation(self, md_file: Path, task_dir: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        触发生成任务并等待结束
+
         Returns:
-            是否需要生成
+            (是否生成了可视化 HTML, 失败原因)
         """
-        # 1. 先检查对应的可视化 HTML 是否存在
-        visual_html = self._get_visual_html_path(md_file)
-        html_exists = visual_html.exists()
-        
-        # 2. 检查是否有临时文件正在生成（.html.tmp）
-        temp_html = visual_html.with_suffix('.html.tmp')
-        if temp_html.exists():
-            logger.info(
-                f"跳过 {md_file.name}，检测到临时文件正在生成: {temp_html.name}"
-            )
+        task_id = await self._trigger_visual_generation(md_file, task_dir)
+        if not task_id:
+            return False, "触发可视化生成失败"
+
+        task_state = task_manager.get_task_state(task_id)
+        if task_state is not None and task_state.task is not None:
+            # 调度器停止时不取消已触发的生成任务
+            await asyncio.shield(task_state.task)
+
+        if self._visual_html_ready(md_file):
+            return True, None
+
+        task_state = task_manager.get_task_state(task_id)
+        if task_state is not None and task_state.logs:
+            return False, task_state.logs[-1]
+        return False, "未生成可视化 HTML"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调度器状态"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "backlog_drain": self.backlog_drain,
+            "queued": len(self._queued),
+            "queued_backlog": sum(1 for priority in self._queued.values() if priority >= PRIORITY_BACKLOG),
+            "running": sorted(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "documents": self.store.count_by_status(),
+        }
+
+    # ==================== 判断与触发 ====================
+
+    def _visual_html_ready(self, md_file: Path) -> bool:
+        """对应的可视化 HTML 是否已存在且非空"""
+        try:
+            return self._get_visual_html_path(md_file).stat().st_size > 0
+        except FileNotFoundError:
             return False
-        
-        # 3. 检查是否有正在运行的可视化任务（避免重复生成）
+
+    def _has_active_task(self, md_file: Path) -> bool:
+        """是否已有同一文档的可视化任务在排队或运行（可能由其他入口触发）"""
         base_name = md_file.stem
         # 移除版本号后缀以获取基础名称
         version_match = re.match(r'^(.+)_v(\d+)$', base_name)
         if version_match:
             base_name = version_match.group(1)
-        
+
         # 标准化文件名：空格转为下划线，长破折号转为短破折号
         normalized_base = base_name.replace(' ', '_').replace('–', '-')
-        
-        # 检查是否有相关的可视化任务正在运行
+
         for task_id, task_state in task_manager.tasks.items():
             if not task_id.startswith('visual_'):
                 continue
-            
+
             if task_state.status not in ['pending', 'running']:
                 continue
-            
+
             # 从任务 ID 中提取文件名部分（移除 visual_ 前缀和时间戳后缀）
             # 任务 ID 格式: visual_{文件名}_{时间戳}
             task_file_part = task_id[7:]  # 移除 'visual_' 前缀
             task_file_part = '_'.join(task_file_part.split('_')[:-1])  # 移除时间戳
-            
+
             if task_file_part == normalized_base:
                 logger.info(
                     f"跳过 {md_file.name}，已有可视化任务正在运行: {task_id} (状态: {task_state.status})"
                 )
-                return False
-        
-        # 4. 检查是否已处理过
-        if file_key in self.processed_files:
-            # 如果 metadata 中有记录，但 HTML 文件不存在
-            if not html_exists:
-                # 再次检查是否有正在运行的任务（可能正在生成中）
-                for task_id, task_state in task_manager.tasks.items():
-                    if not task_id.startswith('visual_'):
-                        continue
-                    if task_state.status not in ['pending', 'running']:
-                        continue
-                    
-                    task_file_part = task_id[7:]
-                    task_file_part = '_'.join(task_file_part.split('_')[:-1])
-                    normalized_base_check = base_name.replace(' ', '_').replace('–', '-')
-                    
-                    if task_file_part == normalized_base_check:
-                        # HTML 文件缺失但有任务正在运行，跳过
-                        return False
-                
-                # 确实没有任务在运行，可能是生成失败或文件被删除
-                logger.warning(
-                    f"检测到 metadata 记录存在但 HTML 文件缺失: {md_file.name}，"
-                    f"将从 metadata 中移除并重新生成"
-                )
-                self.processed_files.discard(file_key)
-                self._save_processed_files()
                 return True
-            
-            # 如果 HTML 文件存在但大小为 0，说明生成失败
-            if html_exists and visual_html.stat().st_size == 0:
-                logger.warning(
-                    f"检测到 HTML 文件为空: {md_file.name}，"
-                    f"将从 metadata 中移除并重新生成"
-                )
-                self.processed_files.discard(file_key)
-                self._save_processed_files()
-                # 删除空文件
-                try:
-                    visual_html.unlink()
-                    logger.info(f"已删除空 HTML 文件: {visual_html.name}")
-                except Exception as e:
-                    logger.warning(f"删除空文件失败: {e}")
-                return True
-            
-            return False
-        
-        # 5. 如果 HTML 文件不存在，需要生成
-        if not html_exists:
-            logger.info(f"发现新文件需要生成可视化: {md_file.name}")
-            return True
-        
-        # 6. 检查版本是否匹配
-        md_version = self._extract_version(md_file.stem)
-        html_version = self._extract_version(visual_html.stem)
-        
-        if md_version != html_version:
+        return False
+
+    def _should_generate_visual(self, md_file: Path) -> bool:
+        """
+        判断是否需要生成可视化
+
+        Args:
+            md_file: Markdown 文件路径
+
+        Returns:
+            是否需要生成
+        """
+        # 1. 检查是否有临时文件正在生成（.html.tmp）
+        visual_html = self._get_visual_html_path(md_file)
+        temp_html = visual_html.with_suffix('.html.tmp')
+        if temp_html.exists():
             logger.info(
-                f"版本不匹配，需要重新生成: {md_file.name} "
-                f"(深度解读 v{md_version} vs 可视化 v{html_version})"
+                f"跳过 {md_file.name}，检测到临时文件正在生成: {temp_html.name}"
             )
+            return False
+
+        # 2. 检查是否有正在运行的可视化任务（避免重复生成）
+        if self._has_active_task(md_file):
+            return False
+
+        # 3. HTML 文件不存在时需要生成（HTML 文件名与深度解读版本号一一对应）
+        try:
+            html_size = visual_html.stat().st_size
+        except FileNotFoundError:
+            logger.info(f"发现文件需要生成可视化: {md_file.name}")
             return True
-        
+
+        # 4. HTML 文件大小为 0，说明生成失败
+        if html_size == 0:
+            logger.warning(f"检测到 HTML 文件为空: {md_file.name}，将重新生成")
+            try:
+                visual_html.unlink()
+                logger.info(f"已删除空 HTML 文件: {visual_html.name}")
+            except Exception as e:
+                logger.warning(f"删除空文件失败: {e}")
+            return True
+
         return False
-    
+
     def _get_visual_html_path(self, md_file: Path) -> Path:
         """
         获取对应的可视化 HTML 文件路径
@@ -305,12 +514,16 @@ class VisualInterpretationWatcher:
         version_match = re.search(r'_v(\d+)', filename)
         return int(version_match.group(1)) if version_match else 0
     
-    async def _trigger_visual_generation(self, md_file: Path):
+    async def _trigger_visual_generation(self, md_file: Path, task_dir: Optional[str] = None) -> Optional[str]:
         """
         触发可视化生成任务
         
         Args:
             md_file: Markdown 文件路径
+            task_dir: 工作流的任务目录，未提供时尝试查找
+            
+        Returns:
+            任务ID，触发失败时返回 None
         """
         try:
             # 生成任务ID（标准化文件名，避免特殊字符）
@@ -328,7 +541,8 @@ class VisualInterpretationWatcher:
             version = self._extract_version(md_file.stem)
             
             # 尝试查找对应的 task_dir
-            task_dir = self._find_task_dir_for_article(md_file)
+            if not task_dir:
+                task_dir = await asyncio.to_thread(self._find_task_dir_for_article, md_file)
             
             if not task_dir:
                 logger.info(
@@ -351,9 +565,11 @@ class VisualInterpretationWatcher:
             task_manager.create_task(task_id, worker.run())
             
             logger.success(f"已触发可视化生成任务: {task_id}")
+            return task_id
             
         except Exception as e:
             logger.error(f"触发可视化生成失败: {e}", exc_info=True)
+            return None
     
     def _find_task_dir_for_article(self, md_file: Path) -> str:
         """
@@ -416,3 +632,12 @@ class VisualInterpretationWatcher:
                             pass
         
         return ""
+
+
+# 正在运行的调度器（未启用可视化解读时为 None）
+_watcher: Optional[VisualInterpretationWatcher] = None
+
+
+def get_visual_watcher() -> Optional[VisualInterpretationWatcher]:
+    """获取正在运行的可视化解读调度器"""
+    return _watcher
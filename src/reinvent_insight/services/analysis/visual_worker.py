@@ -19,6 +19,7 @@ from reinvent_insight.core import config
 from reinvent_insight.core.logger import get_logger
 from reinvent_insight.infrastructure.ai.model_config import get_model_client
 from .task_manager import manager as task_manager
+from reinvent_insight.services.document.visual_html_cache import get_visual_html_cache
 
 logger = get_logger(__name__)
 
@@ -667,8 +668,10 @@ class VisualInterpretationWorker:
         total = len(chapters)
         results = [''] * total
         
-        # 获取并发延迟配置
+        # 获取并发延迟配置；已配置 provider 配额时由共享限制器调度
         concurrent_delay = getattr(self.client.config, 'concurrent_delay', 1.0)
+        if getattr(self.client.config, 'rate_limit_policy', None) is not None:
+            concurrent_delay = 0
         logger.info(f"并发生成 {total} 个章节，间隔: {concurrent_delay}秒")
         
         # 创建并发任务
@@ -885,6 +888,12 @@ class VisualInterpretationWorker:
                 file_size = html_path.stat().st_size
                 logger.success(f"可视化 HTML 已保存: {html_path} (版本: {self.version}, 大小: {file_size} 字节)")
                 
+                # 5. 预先生成响应缓存（CDN 替换和压缩），首个访问者无需等待
+                try:
+                    await asyncio.to_thread(get_visual_html_cache().load, html_path)
+                except Exception as e:
+                    logger.warning(f"预生成可视化 HTML 响应缓存失败: {e}")
+                
                 return html_path
                 
             except Exception as e:
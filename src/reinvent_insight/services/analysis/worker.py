@@ -66,8 +66,11 @@ async def summary_task_worker_async(
         logger.info(f"[字幕获取成功] task_id={task_id}, 标题={video_title[:50]}..." if len(video_title) > 50 else f"[字幕获取成功] task_id={task_id}, 标题={video_title}")
         
         # 将原始视频标题写入任务目录，供后续重新拼接等操作使用
+        # 续跑任务必须使用原任务目录，否则会新建空目录，工作流随后复用的也是这个空目录
         from reinvent_insight.domain.workflows.base import get_task_dir_path
-        task_dir = get_task_dir_path(task_id, "youtube")
+        task_state = manager.get_task_state(task_id)
+        resumed = getattr(task_state, "resumed", False) is True
+        task_dir = get_task_dir_path(task_id, "youtube", reuse_existing=resumed)
         try:
             Path(task_dir).mkdir(parents=True, exist_ok=True)
             (Path(task_dir) / "video_title.txt").write_text(video_title, encoding="utf-8")
@@ -6,6 +6,7 @@
 2. 并发控制（可配置的 worker 数量）
 3. 任务超时处理
 4. 队列状态监控
+5. 队列持久化（重启后恢复排队中和被中断的任务）
 """
 
 import asyncio
@@ -17,7 +18,8 @@ from enum import Enum
 
 from reinvent_insight.core import config
 from reinvent_insight.core.config import GenerationMode
-from .task_manager import manager
+from .queue_store import QueueStore, get_queue_store
+from .task_manager import manager, TaskState
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +71,30 @@ class WorkerTask:
     
     # 生成模式
     generation_mode: GenerationMode = field(default=GenerationMode.CONCURRENT, compare=False)
+    
+    def to_payload(self) -> dict:
+        """转换为可持久化的参数字典（回调函数无法持久化）"""
+        return {
+            "task_type": self.task_type,
+            "url_or_path": self.url_or_path,
+            "title": self.title,
+            "created_at": self.created_at,
+            "is_ultra_mode": self.is_ultra_mode,
+            "doc_hash": self.doc_hash,
+            "base_version": self.base_version,
+            "next_version": self.next_version,
+            "content_identifier": self.content_identifier,
+            "generation_mode": self.generation_mode.value,
+        }
+    
+    @classmethod
+    def from_payload(cls, task_id: str, priority: int, payload: dict) -> "WorkerTask":
+        """从持久化的参数字典重建任务"""
+        payload = dict(payload)
+        payload["generation_mode"] = GenerationMode(
+            payload.get("generation_mode", config.DEFAULT_GENERATION_MODE.value)
+        )
+        return cls(priority=priority, task_id=task_id, **payload)
 
 
 class WorkerPool:
@@ -79,13 +105,15 @@ class WorkerPool:
     - 并发数控制
     - 任务超时
     - 状态监控
+    - 队列持久化与启动时恢复
     """
     
     def __init__(
         self,
         max_workers: Optional[int] = None,
         max_queue_size: Optional[int] = None,
-        task_timeout: Optional[int] = None
+        task_timeout: Optional[int] = None,
+        store: Optional[QueueStore] = None
     ):
         """初始化 Worker 池
         
@@ -93,6 +121,7 @@ class WorkerPool:
             max_workers: 最大并发 worker 数，默认从配置读取
             max_queue_size: 队列最大长度，默认从配置读取
             task_timeout: 任务超时时间（秒），默认从配置读取
+            store: 队列持久化存储，默认按配置在首次使用时创建
         """
         self.max_workers = max_workers or config.MAX_CONCURRENT_ANALYSIS_TASKS
         self.max_queue_size = max_queue_size or config.ANALYSIS_QUEUE_MAX_SIZE
@@ -107,6 +136,11 @@ class WorkerPool:
         # Worker 运行状态
         self.is_running = False
         self.workers = []
+        self.heartbeat_task: Optional[asyncio.Task] = None
+        
+        # 队列持久化存储（延迟创建，避免导入时打开数据库）
+        self._store = store
+        self._store_resolved = store is not None
         
         # 统计信息
         self.stats = {
@@ -114,7 +148,8 @@ class WorkerPool:
             'total_success': 0,
             'total_failed': 0,
             'total_timeout': 0,
-            'current_processing': 0
+            'current_processing': 0,
+            'total_recovered': 0
         }
         
         # 正在处理的任务信息（用于查询）
@@ -127,6 +162,14 @@ class WorkerPool:
             f"task_timeout={self.task_timeout}s"
         )
     
+    @property
+    def store(self) -> Optional[QueueStore]:
+        """队列持久化存储，未启用时为 None"""
+        if not self._store_resolved:
+            self._store = get_queue_store()
+            self._store_resolved = True
+        return self._store
+    
     async def add_task(
         self,
         task_id: str,
@@ -176,6 +219,12 @@ class WorkerPool:
             # 非阻塞加入队列
             self.queue.put_nowait(task)
             
+            # 持久化，重启后可恢复
+            if self.store:
+                if callback:
+                    logger.debug(f"任务 {task_id} 的回调函数无法持久化，恢复执行时将不会调用")
+                self.store.enqueue(task_id, task.priority, task.to_payload())
+            
             queue_size = self.queue.qsize()
             logger.info(
                 f"[任务入队] task_id={task_id}, "
@@ -353,6 +402,8 @@ class WorkerPool:
                 
                 # 将任务加入正在处理的映射
                 self.processing_tasks[task.task_id] = task
+                if self.store:
+                    self.store.mark_started(task.task_id)
                 
                 logger.info(
                     f"[Worker取任务] worker_id={worker_id}, "
@@ -363,6 +414,8 @@ class WorkerPool:
                 
                 # 执行任务
                 success = await self._execute_task(task)
+                if self.store:
+                    self.store.mark_finished(task.task_id, success)
                 
                 self.stats['current_processing'] -= 1
                 
@@ -387,6 +440,8 @@ class WorkerPool:
                 
                 # 如果任务获取成功但执行失败，也要标记完成
                 if task:
+                    if self.store:
+                        self.store.mark_finished(task.task_id, False, str(e))
                     self.stats['current_processing'] -= 1
                     self.processing_tasks.pop(task.task_id, None)
                     self.queue.task_done()
@@ -404,18 +459,85 @@ class WorkerPool:
         
         self.is_running = True
         
+        # 恢复上次运行时未完成的任务
+        if self.store:
+            self._recover_tasks()
+        
         # 启动多个 worker
         self.workers = []
         for i in range(self.max_workers):
             worker_task = asyncio.create_task(self.worker(i))
             self.workers.append(worker_task)
         
+        if self.store:
+            self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        
         logger.info(
             f"✅ Worker Pool 已启动: "
             f"{self.max_workers} 个 Worker, "
             f"队列容量: {self.max_queue_size}"
         )
     
+    def _recover_tasks(self) -> int:
+        """恢复持久化队列中未完成的任务（在 worker 启动前调用）
+        
+        Returns:
+            恢复的任务数
+        """
+        records = self.store.recover(
+            stale_after=config.ANALYSIS_QUEUE_STALE_AFTER,
+            max_attempts=config.ANALYSIS_QUEUE_MAX_ATTEMPTS
+        )
+        if not records:
+            return 0
+        
+        # 恢复的任务可能多于队列容量，此时放宽容量以免丢失
+        if len(records) + self.queue.qsize() > self.max_queue_size:
+            pending = []
+            while not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+                self.queue.task_done()
+            self.queue = asyncio.PriorityQueue(maxsize=len(records) + len(pending))
+            for task in pending:
+                self.queue.put_nowait(task)
+        
+        recovered = 0
+        for record in records:
+            task_id = record["task_id"]
+            try:
+                task = WorkerTask.from_payload(task_id, record["priority"], record["payload"])
+            except (TypeError, ValueError) as e:
+                logger.error(f"无法恢复任务 {task_id}: {e}")
+                self.store.mark_finished(task_id, False, f"恢复失败: {e}")
+                continue
+            
+            # 已经执行过的任务标记为续跑，工作流会复用任务目录中已生成的章节
+            resumed = record["attempts"] > 0
+            if task_id not in manager.tasks:
+                manager.tasks[task_id] = TaskState(task_id=task_id, status="queued", resumed=resumed)
+            else:
+                manager.tasks[task_id].resumed = resumed
+            
+            self.queue.put_nowait(task)
+            recovered += 1
+            asyncio.create_task(manager.send_message(
+                "服务重启后已恢复任务，将从中断处继续" if resumed else "服务重启后已恢复排队中的任务",
+                task_id
+            ))
+        
+        self.stats['total_recovered'] += recovered
+        logger.info(f"已从持久化队列恢复 {recovered} 个任务")
+        return recovered
+    
+    async def _heartbeat_loop(self):
+        """定期刷新执行中任务的心跳"""
+        while self.is_running:
+            await asyncio.sleep(config.ANALYSIS_QUEUE_HEARTBEAT_INTERVAL)
+            try:
+                self.store.heartbeat(list(self.processing_tasks.keys()))
+            except Exception as e:
+                logger.warning(f"任务心跳更新失败: {e}")
+    
     async def stop(self, wait_completion: bool = True):
         """停止 Worker 池
         
@@ -439,6 +561,10 @@ class WorkerPool:
         
         # 等待所有 worker 退出
         await asyncio.gather(*self.workers, return_exceptions=True)
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            await asyncio.gather(self.heartbeat_task, return_exceptions=True)
+            self.heartbeat_task = None
         
         logger.info("Worker Pool 已停止")
     
@@ -453,7 +579,8 @@ class WorkerPool:
             'queue_size': self.queue.qsize(),
             'max_workers': self.max_workers,
             'max_queue_size': self.max_queue_size,
-            'is_running': self.is_running
+            'is_running': self.is_running,
+            'persistent': self.store is not None
         }
     
     def get_task_list(self) -> dict:
@@ -544,13 +671,20 @@ class WorkerPool:
     
     async def clear_queue(self):
         """清空队列（慎用）"""
+        cleared = []
         while not self.queue.empty():
             try:
-                self.queue.get_nowait()
+                task = self.queue.get_nowait()
                 self.queue.task_done()
+                cleared.append(task.task_id)
             except asyncio.QueueEmpty:
                 break
         
+        if self.store:
+            self.store.mark_cancelled(cleared)
+        for task_id in cleared:
+            manager.set_task_cancelled(task_id, "任务已从队列中移除")
+        
         logger.warning("队列已清空")
 
 
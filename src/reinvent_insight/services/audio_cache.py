@@ -1,19 +1,49 @@
 """
 音频缓存系统
 
-提供 LRU 缓存管理功能，用于存储和检索 TTS 生成的音频文件
+提供 LRU 缓存管理功能，用于存储和检索 TTS 生成的音频文件。
+
+元数据保存在缓存目录下的 SQLite 数据库（WAL 模式）中，按音频哈希、文章哈希
+和最后访问时间建立索引；缓存总大小和文件数由触发器维护在统计表中，无需遍历
+全部记录。缓存命中时的访问时间和访问次数先在内存中累积，按条数或时间间隔
+批量写回，避免每次命中都写库。旧版的 metadata.json 会在首次打开时自动导入。
+
+音频先以 WAV 写入缓存。配置了压缩格式（opus/mp3）且本地有 ffmpeg 时，登记
+完成的音频在后台线程中转码，成功后元数据指向压缩文件并删除 WAV。时长在生成
+时由 PCM 字节数算出并保存在元数据中，读取时无需解码。
 """
 
 import json
 import logging
+import sqlite3
+import threading
 import time
-from dataclasses import dataclass, asdict
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Set, Tuple
+
+from reinvent_insight.core import config
+from reinvent_insight.infrastructure.audio.audio_utils import (
+    COMPRESSED_FORMATS,
+    encode_audio,
+    find_audio_encoder,
+)
 
 logger = logging.getLogger(__name__)
 
+# 访问记录批量写回的条数和时间间隔（秒）
+ACCESS_FLUSH_BATCH = 100
+ACCESS_FLUSH_INTERVAL = 5.0
+
+# LRU 淘汰时每次从索引中取出的候选条数
+EVICT_BATCH_SIZE = 64
+
+# 尚未关闭的缓存实例（各路由和预生成服务各自创建），服务关闭时统一写回
+_open_caches: "weakref.WeakSet[AudioCache]" = weakref.WeakSet()
+
 
 @dataclass
 class AudioMetadata:
@@ -35,105 +65,237 @@ class AudioMetadata:
     is_pregenerated: bool = False   # 是否为预生成（true）
 
 
+_COLUMNS = [f.name for f in fields(AudioMetadata)]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio_metadata (
+    hash TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    voice TEXT NOT NULL,
+    language TEXT NOT NULL,
+    duration REAL NOT NULL,
+    file_size INTEGER NOT NULL,
+    file_path TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_accessed TEXT NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0,
+    article_hash TEXT NOT NULL DEFAULT '',
+    source_file TEXT NOT NULL DEFAULT '',
+    preprocessing_version TEXT NOT NULL DEFAULT '',
+    is_pregenerated INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_audio_article_hash ON audio_metadata (article_hash);
+CREATE INDEX IF NOT EXISTS idx_audio_last_accessed ON audio_metadata (last_accessed);
+
+CREATE TABLE IF NOT EXISTS audio_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_files INTEGER NOT NULL,
+    total_size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO audio_stats (id, total_files, total_size) VALUES (1, 0, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_audio_insert AFTER INSERT ON audio_metadata BEGIN
+    UPDATE audio_stats SET total_files = total_files + 1, total_size = total_size + NEW.file_size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_audio_delete AFTER DELETE ON audio_metadata BEGIN
+    UPDATE audio_stats SET total_files = total_files - 1, total_size = total_size - OLD.file_size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_audio_resize AFTER UPDATE OF file_size ON audio_metadata BEGIN
+    UPDATE audio_stats SET total_size = total_size - OLD.file_size + NEW.file_size WHERE id = 1;
+END;
+"""
+
+
 class AudioCache:
     """LRU 音频缓存管理器"""
-    
+
     def __init__(
         self,
         cache_dir: Path,
-        max_size_mb: int = 500
+        max_size_mb: int = 500,
+        audio_format: Optional[str] = None,
+        bitrate: Optional[str] = None
     ):
         """
         初始化音频缓存
-        
+
         Args:
             cache_dir: 缓存目录路径
             max_size_mb: 最大缓存大小（MB）
+            audio_format: 存储格式（wav/opus/mp3），默认取 config.TTS_CACHE_FORMAT
+            bitrate: 压缩码率，默认取 config.TTS_CACHE_BITRATE
         """
         self.cache_dir = Path(cache_dir)
         self.max_size_bytes = max_size_mb * 1024 * 1024
-        self.metadata: Dict[str, AudioMetadata] = {}
+        self.audio_format = (audio_format or config.TTS_CACHE_FORMAT).lower()
+        self.bitrate = bitrate or config.TTS_CACHE_BITRATE or None
+        if self.audio_format != "wav" and self.audio_format not in COMPRESSED_FORMATS:
+            logger.warning(f"不支持的音频缓存格式 {self.audio_format}，使用 wav")
+            self.audio_format = "wav"
         self.metadata_file = self.cache_dir / "metadata.json"
-        
+        self.db_path = self.cache_dir / "metadata.db"
+
+        # 待写回的访问记录：哈希 -> (最后访问时间, 新增访问次数)
+        self._pending_access: Dict[str, Tuple[str, int]] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+        # 后台转码：单线程执行，同一哈希同时只转码一次
+        self._encoder: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._compressing: Set[str] = set()
+
         # 创建缓存目录
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 加载元数据
-        self._load_metadata()
-        
+
+        # 打开元数据库
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_json()
+        self._closed = False
+        _open_caches.add(self)
+
         logger.info(
             f"AudioCache 初始化成功: {cache_dir}, "
             f"最大大小: {max_size_mb}MB, "
-            f"当前缓存: {len(self.metadata)} 个文件"
+            f"存储格式: {self.audio_format}, "
+            f"当前缓存: {self._stats()[0]} 个文件"
         )
-    
-    def _load_metadata(self) -> None:
-        """从文件加载元数据"""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.metadata = {
-                        k: AudioMetadata(**v) for k, v in data.items()
-                    }
-                logger.info(f"加载了 {len(self.metadata)} 个缓存元数据")
-            except Exception as e:
-                logger.error(f"加载元数据失败: {e}")
-                self.metadata = {}
-        else:
-            self.metadata = {}
-    
-    def _save_metadata(self) -> None:
-        """保存元数据到文件"""
+
+    def _migrate_json(self) -> None:
+        """导入旧版 metadata.json，完成后重命名以免重复导入"""
+        if not self.metadata_file.exists():
+            return
         try:
-            data = {k: asdict(v) for k, v in self.metadata.items()}
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            records = [AudioMetadata(**v) for v in data.values()]
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO audio_metadata ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    [self._to_row(m) for m in records]
+                )
+            self.metadata_file.rename(self.metadata_file.with_suffix(".json.migrated"))
+            logger.info(f"从 metadata.json 导入了 {len(records)} 个缓存元数据")
         except Exception as e:
-            logger.error(f"保存元数据失败: {e}")
-    
+            logger.error(f"导入旧版元数据失败: {e}")
+
+    @staticmethod
+    def _to_row(metadata: AudioMetadata) -> tuple:
+        """元数据对象 -> 数据库行"""
+        return tuple(getattr(metadata, name) for name in _COLUMNS)
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> AudioMetadata:
+        """数据库行 -> 元数据对象"""
+        data = dict(row)
+        data["is_pregenerated"] = bool(data["is_pregenerated"])
+        return AudioMetadata(**data)
+
+    def _stats(self) -> Tuple[int, int]:
+        """返回 (文件数, 总大小)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total_files, total_size FROM audio_stats WHERE id = 1"
+            ).fetchone()
+        return row[0], row[1]
+
+    def _delete(self, audio_hash: str) -> None:
+        """删除一条元数据（含未写回的访问记录）"""
+        with self._lock, self._conn:
+            self._pending_access.pop(audio_hash, None)
+            self._conn.execute("DELETE FROM audio_metadata WHERE hash = ?", (audio_hash,))
+
+    def flush_access(self) -> None:
+        """将累积的访问时间和访问次数批量写回数据库"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_access:
+                return
+            pending = self._pending_access
+            self._pending_access = {}
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE audio_metadata SET last_accessed = ?, access_count = access_count + ? "
+                        "WHERE hash = ?",
+                        [(accessed, count, h) for h, (accessed, count) in pending.items()]
+                    )
+            except sqlite3.DatabaseError as e:
+                logger.error(f"写回访问记录失败: {e}")
+
+    def _record_access(self, audio_hash: str) -> int:
+        """
+        记录一次访问，达到批量条数或时间间隔时写回
+
+        Returns:
+            尚未写回的访问次数
+        """
+        with self._lock:
+            _, count = self._pending_access.get(audio_hash, ("", 0))
+            self._pending_access[audio_hash] = (datetime.now().isoformat(), count + 1)
+            if (len(self._pending_access) >= ACCESS_FLUSH_BATCH
+                    or time.monotonic() - self._last_flush >= ACCESS_FLUSH_INTERVAL):
+                self.flush_access()
+            return self._pending_access.get(audio_hash, ("", 0))[1]
+
     def get(self, audio_hash: str) -> Optional[Path]:
         """
         获取缓存的音频文件
-        
+
         Args:
             audio_hash: 音频哈希值
-            
+
         Returns:
             音频文件路径，如果不存在则返回 None
         """
-        if audio_hash not in self.metadata:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_path, access_count FROM audio_metadata WHERE hash = ?", (audio_hash,)
+            ).fetchone()
+        if row is None:
             return None
-        
-        metadata = self.metadata[audio_hash]
-        file_path = Path(metadata.file_path)
-        
+
+        file_path = Path(row["file_path"])
+
         # 检查文件是否存在
         if not file_path.exists():
             logger.warning(f"缓存文件不存在: {file_path}")
-            del self.metadata[audio_hash]
-            self._save_metadata()
+            self._delete(audio_hash)
             return None
-        
-        # 更新访问信息
-        metadata.last_accessed = datetime.now().isoformat()
-        metadata.access_count += 1
-        self._save_metadata()
-        
-        logger.info(f"缓存命中: {audio_hash}, 访问次数: {metadata.access_count}")
+
+        # 更新访问信息（批量写回）
+        pending = self._record_access(audio_hash)
+
+        logger.debug(f"缓存命中: {audio_hash}, 访问次数: {row['access_count'] + pending}")
         return file_path
-    
+
     def get_metadata(self, audio_hash: str) -> Optional[AudioMetadata]:
         """
         获取缓存元数据（不更新访问计数）
-        
+
         Args:
             audio_hash: 音频哈希值
-            
+
         Returns:
             元数据对象，如果不存在则返回 None
         """
-        return self.metadata.get(audio_hash)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM audio_metadata WHERE hash = ?", (audio_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            metadata = self._from_row(row)
+            if audio_hash in self._pending_access:
+                accessed, count = self._pending_access[audio_hash]
+                metadata.last_accessed = accessed
+                metadata.access_count += count
+        return metadata
 
     def put(
         self,
@@ -150,7 +312,7 @@ class AudioCache:
     ) -> Path:
         """
         存储音频到缓存
-        
+
         Args:
             audio_hash: 音频哈希值
             audio_data: 音频数据
@@ -158,24 +320,100 @@ class AudioCache:
             voice: 音色名称
             language: 语言类型
             duration: 音频时长（秒）
-            
+
         Returns:
             存储的文件路径
         """
-        # 检查是否需要淘汰
-        file_size = len(audio_data)
-        if self.get_cache_size() + file_size > self.max_size_bytes:
-            logger.info("缓存空间不足，开始 LRU 淘汰")
-            self.evict_lru()
-        
         # 生成文件路径
-        file_path = self.cache_dir / f"{audio_hash}.wav"
-        
+        file_path = self.get_file_path(audio_hash)
+
         # 写入文件
         try:
             with open(file_path, 'wb') as f:
                 f.write(audio_data)
-            
+        except Exception as e:
+            logger.error(f"缓存音频失败: {e}")
+            raise
+
+        file_path = self.register(
+            audio_hash=audio_hash,
+            file_path=file_path,
+            text_hash=text_hash,
+            voice=voice,
+            language=language,
+            duration=duration,
+            article_hash=article_hash,
+            source_file=source_file,
+            preprocessing_version=preprocessing_version,
+            is_pregenerated=is_pregenerated
+        )
+        self.schedule_compress(audio_hash)
+        return file_path
+
+    def get_file_path(self, audio_hash: str) -> Path:
+        """
+        获取音频在缓存目录中的文件路径（不检查是否存在）
+
+        Args:
+            audio_hash: 音频哈希值
+
+        Returns:
+            文件路径
+        """
+        return self.cache_dir / f"{audio_hash}.wav"
+
+    def register(
+        self,
+        audio_hash: str,
+        file_path: Path,
+        text_hash: str,
+        voice: str,
+        language: str,
+        duration: float = 0.0,
+        article_hash: str = "",
+        source_file: str = "",
+        preprocessing_version: str = "",
+        is_pregenerated: bool = False
+    ) -> Path:
+        """
+        登记已写入缓存目录的音频文件
+
+        用于流式写入的音频：文件由调用方直接写到 get_file_path 返回的位置，
+        这里只更新元数据。重复登记同一哈希会刷新大小和时长；WAV 已被压缩
+        替换时保留压缩文件，只刷新其余元数据。
+
+        Args:
+            audio_hash: 音频哈希值
+            file_path: 音频文件路径
+            text_hash: 文本哈希值
+            voice: 音色名称
+            language: 语言类型
+            duration: 音频时长（秒）
+
+        Returns:
+            实际登记的文件路径
+        """
+        # 与后台转码互斥，避免登记的文件在中途被替换
+        with self._lock:
+            file_path = Path(file_path)
+            previous = self.get_metadata(audio_hash)
+            if previous and Path(previous.file_path) != file_path and Path(previous.file_path).exists():
+                if file_path.exists():
+                    # 重新生成的音频替换旧文件
+                    Path(previous.file_path).unlink()
+                else:
+                    file_path = Path(previous.file_path)
+            file_size = file_path.stat().st_size
+
+            # 先移除旧记录，避免淘汰时删掉正在登记的文件
+            if previous:
+                self._delete(audio_hash)
+
+            # 检查是否需要淘汰
+            if self.get_cache_size() + file_size > self.max_size_bytes:
+                logger.info("缓存空间不足，开始 LRU 淘汰")
+                self.evict_lru()
+
             # 创建元数据
             now = datetime.now().isoformat()
             metadata = AudioMetadata(
@@ -186,135 +424,280 @@ class AudioCache:
                 duration=duration,
                 file_size=file_size,
                 file_path=str(file_path),
-                created_at=now,
+                created_at=previous.created_at if previous else now,
                 last_accessed=now,
-                access_count=0,
+                access_count=previous.access_count if previous else 0,
                 article_hash=article_hash,
                 source_file=source_file,
                 preprocessing_version=preprocessing_version,
                 is_pregenerated=is_pregenerated
             )
-            
-            self.metadata[audio_hash] = metadata
-            self._save_metadata()
-            
+
+            with self._conn:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO audio_metadata ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    self._to_row(metadata)
+                )
+
             logger.info(
                 f"音频已缓存: {audio_hash}, "
                 f"大小: {file_size / 1024:.2f}KB, "
                 f"时长: {duration:.2f}s"
             )
-            
-            return file_path
-            
+
+        return file_path
+
+    def locate(self, audio_hash: str) -> Optional[Path]:
+        """
+        获取已登记音频的当前文件路径（不更新访问计数）
+
+        Args:
+            audio_hash: 音频哈希值
+
+        Returns:
+            文件路径（可能是 WAV 或压缩文件），不存在时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_path FROM audio_metadata WHERE hash = ?", (audio_hash,)
+            ).fetchone()
+        if row is None or not Path(row["file_path"]).exists():
+            return None
+        return Path(row["file_path"])
+
+    def _get_encoder(self) -> Optional[str]:
+        """查找 ffmpeg，找不到时关闭压缩"""
+        if self._encoder is None:
+            self._encoder = find_audio_encoder(config.TTS_AUDIO_ENCODER)
+            if self._encoder is None:
+                logger.warning(
+                    f"未找到音频编码器 {config.TTS_AUDIO_ENCODER}，"
+                    f"音频缓存保留 WAV 格式"
+                )
+                self.audio_format = "wav"
+        return self._encoder
+
+    def compress(self, audio_hash: str) -> Optional[Path]:
+        """
+        将缓存中的 WAV 音频转码为配置的压缩格式（同步执行）
+
+        转码期间 WAV 仍可正常读取；完成后元数据指向压缩文件并删除 WAV。
+        转码期间音频被重新登记或删除时放弃本次结果。
+
+        Args:
+            audio_hash: 音频哈希值
+
+        Returns:
+            压缩文件路径；无需压缩、编码器不可用或转码失败时返回 None
+        """
+        if self.audio_format == "wav":
+            return None
+        source = self.locate(audio_hash)
+        if source is None or source.suffix != ".wav":
+            return None
+        encoder = self._get_encoder()
+        if encoder is None:
+            return None
+
+        extension = COMPRESSED_FORMATS[self.audio_format][0]
+        target = source.with_suffix(extension)
+        start = time.monotonic()
+        try:
+            encode_audio(source, target, self.audio_format, self.bitrate, encoder)
         except Exception as e:
-            logger.error(f"缓存音频失败: {e}")
-            raise
-    
+            logger.error(f"音频转码失败: {audio_hash}, 错误: {e}")
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_path, file_size FROM audio_metadata WHERE hash = ?", (audio_hash,)
+            ).fetchone()
+            if row is None or row["file_path"] != str(source):
+                target.unlink(missing_ok=True)
+                return None
+            file_size = target.stat().st_size
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE audio_metadata SET file_path = ?, file_size = ? WHERE hash = ?",
+                    (str(target), file_size, audio_hash)
+                )
+            source.unlink(missing_ok=True)
+
+        logger.info(
+            f"音频已压缩: {audio_hash}, 格式: {self.audio_format}, "
+            f"{row['file_size'] / 1024:.2f}KB -> {file_size / 1024:.2f}KB, "
+            f"耗时: {time.monotonic() - start:.2f}s"
+        )
+        return target
+
+    def schedule_compress(self, audio_hash: str) -> Optional[Future]:
+        """
+        在后台线程中压缩音频，同一哈希重复提交时只转码一次
+
+        Args:
+            audio_hash: 音频哈希值
+
+        Returns:
+            转码任务（结果同 compress），未启用压缩或已在转码中时返回 None
+        """
+        if self.audio_format == "wav":
+            return None
+        with self._lock:
+            if audio_hash in self._compressing:
+                return None
+            self._compressing.add(audio_hash)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-encode")
+
+        def run() -> Optional[Path]:
+            try:
+                return self.compress(audio_hash)
+            finally:
+                with self._lock:
+                    self._compressing.discard(audio_hash)
+
+        return self._executor.submit(run)
+
     def invalidate(self, audio_hash: str) -> bool:
         """
         使缓存失效（删除）
-        
+
         Args:
             audio_hash: 音频哈希值
-            
+
         Returns:
             是否成功删除
         """
-        if audio_hash not in self.metadata:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_path FROM audio_metadata WHERE hash = ?", (audio_hash,)
+            ).fetchone()
+        if row is None:
             return False
-        
-        metadata = self.metadata[audio_hash]
-        file_path = Path(metadata.file_path)
-        
+
+        file_path = Path(row["file_path"])
+
         try:
             # 删除文件
             if file_path.exists():
                 file_path.unlink()
-            
+
             # 删除元数据
-            del self.metadata[audio_hash]
-            self._save_metadata()
-            
+            self._delete(audio_hash)
+
             logger.info(f"缓存已失效: {audio_hash}")
             return True
-            
+
         except Exception as e:
             logger.error(f"删除缓存失败: {e}")
             return False
-    
+
     def evict_lru(self) -> None:
         """
         LRU 淘汰：删除最少使用的文件直到空间足够
+
+        按 last_accessed 索引分批取出最早访问的记录，不需要排序全部元数据。
         """
-        if not self.metadata:
-            return
-        
-        # 按最后访问时间排序
-        sorted_items = sorted(
-            self.metadata.items(),
-            key=lambda x: x[1].last_accessed
-        )
-        
+        # 先写回访问记录，保证淘汰顺序基于最新的访问时间
+        self.flush_access()
+
         evicted_count = 0
         target_size = self.max_size_bytes * 0.8  # 淘汰到 80% 容量
-        
-        for audio_hash, metadata in sorted_items:
-            if self.get_cache_size() <= target_size:
+
+        while self.get_cache_size() > target_size:
+            with self._lock:
+                candidates: List[str] = [
+                    row["hash"] for row in self._conn.execute(
+                        "SELECT hash FROM audio_metadata ORDER BY last_accessed LIMIT ?",
+                        (EVICT_BATCH_SIZE,)
+                    )
+                ]
+            if not candidates:
+                break
+
+            progressed = False
+            for audio_hash in candidates:
+                if self.get_cache_size() <= target_size:
+                    break
+                if self.invalidate(audio_hash):
+                    evicted_count += 1
+                    progressed = True
+            if not progressed:
                 break
-            
-            if self.invalidate(audio_hash):
-                evicted_count += 1
-        
+
         logger.info(
             f"LRU 淘汰完成: 删除了 {evicted_count} 个文件, "
             f"当前大小: {self.get_cache_size() / 1024 / 1024:.2f}MB"
         )
-    
+
     def get_cache_size(self) -> int:
         """
         获取当前缓存总大小
-        
+
         Returns:
             缓存大小（字节）
         """
-        total_size = 0
-        for metadata in self.metadata.values():
-            total_size += metadata.file_size
-        return total_size
-    
+        return self._stats()[1]
+
     def get_stats(self) -> Dict:
         """
         获取缓存统计信息
-        
+
         Returns:
             统计信息字典
         """
-        total_size = self.get_cache_size()
-        total_count = len(self.metadata)
-        
+        total_count, total_size = self._stats()
+
         return {
             "total_files": total_count,
             "total_size_mb": total_size / 1024 / 1024,
             "max_size_mb": self.max_size_bytes / 1024 / 1024,
             "usage_percent": (total_size / self.max_size_bytes * 100) if self.max_size_bytes > 0 else 0,
+            "audio_format": self.audio_format,
             "cache_dir": str(self.cache_dir)
         }
-    
+
     def find_by_article_hash(self, article_hash: str) -> Optional[AudioMetadata]:
         """
         根据文章哈希查找音频元数据
-        
+
         Args:
             article_hash: 文章哈希值
-            
+
         Returns:
             音频元数据，如果不存在则返回 None
         """
-        for metadata in self.metadata.values():
-            if metadata.article_hash == article_hash:
-                # 验证文件是否存在
-                file_path = Path(metadata.file_path)
-                if file_path.exists():
-                    return metadata
-        
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM audio_metadata WHERE article_hash = ? ORDER BY rowid", (article_hash,)
+            ).fetchall()
+
+        for row in rows:
+            # 验证文件是否存在
+            if Path(row["file_path"]).exists():
+                return self.get_metadata(row["hash"])
+
         return None
+
+    def close(self) -> None:
+        """等待后台转码结束，写回访问记录并关闭数据库连接（可重复调用）"""
+        if self._closed:
+            return
+        self._closed = True
+        _open_caches.discard(self)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            self.flush_access()
+            self._conn.close()
+
+
+def close_audio_caches() -> None:
+    """关闭所有音频缓存实例（服务关闭时调用）"""
+    for cache in list(_open_caches):
+        try:
+            cache.close()
+        except Exception as e:
+            logger.warning(f"关闭音频缓存失败 {cache.cache_dir}: {e}")
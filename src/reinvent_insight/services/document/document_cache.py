@@ -0,0 +1,217 @@
+"""文档详情响应缓存
+
+解决性能问题：/api/public/summaries/{filename} 和 /api/public/doc/{doc_hash}
+每次请求都完整读取文档、解析元数据、查找标题、扫描全部文档查找其他版本并
+清理正文，打开一篇文章的代价与文档总数成正比。
+
+本模块按 (文件名, mtime, size) 缓存序列化后的响应及其 ETag：
+
+- 版本列表从哈希注册表的版本分组读取，代价与该文档的版本数成正比
+- 目录监控发现文件变化时，移除该文件及同一文档所有版本的缓存
+  （新增或删除版本会改变其他版本响应中的 versions 列表）
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from reinvent_insight.core import config
+from reinvent_insight.core.utils.file_utils import generate_doc_hash
+from reinvent_insight.core.utils.http_utils import make_etag
+from reinvent_insight.services.document.hash_registry import get_registry
+from reinvent_insight.services.document.metadata_service import (
+    parse_metadata_from_md,
+    clean_content_metadata,
+    discover_versions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_summary_payload(file_path: Path) -> Dict[str, Any]:
+    """
+    读取文档并生成公开接口返回的内容
+
+    Args:
+        file_path: Markdown 文件路径
+
+    Returns:
+        文档信息（文件名、标题、正文、视频链接、版本列表等）
+    """
+    content = file_path.read_text(encoding="utf-8")
+    metadata = parse_metadata_from_md(content)
+
+    title_cn = metadata.get("title_cn")
+    title_en = metadata.get("title_en", metadata.get("title", ""))
+
+    if not title_cn:
+        for line in content.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('# '):
+                title_cn = stripped[2:].strip()
+                break
+
+    if not title_cn:
+        title_cn = title_en if title_en else file_path.stem
+
+    video_url = metadata.get("video_url", "")
+    content_identifier = metadata.get("content_identifier", "")
+
+    # 兼容处理：旧文档可能将文档标识符存储在 video_url 中
+    # 如果 video_url 是文档格式（pdf://, txt://, md://, docx://），则转移到 content_identifier
+    if video_url and "://" in video_url and not video_url.startswith(("http://", "https://")):
+        # 这是文档标识符，不是视频 URL
+        if not content_identifier:
+            content_identifier = video_url
+        video_url = ""  # 前端不应该看到这个值
+
+    source_id = content_identifier or video_url
+    versions = []
+    if source_id:
+        # 注册表尚未收录（如监控还未处理的新文件）时回退为目录扫描
+        versions = get_registry().get_version_infos(source_id)
+        if versions is None:
+            versions = discover_versions(source_id, config.OUTPUT_DIR)
+
+    cleaned_content = clean_content_metadata(content, title_cn)
+
+    return {
+        "filename": file_path.name,
+        "title": title_cn,
+        "title_cn": title_cn,
+        "title_en": title_en,
+        "content": cleaned_content,
+        "video_url": video_url,
+        "content_identifier": content_identifier,
+        "versions": versions
+    }
+
+
+class DocumentEntry:
+    """一篇文档序列化后的响应"""
+
+    def __init__(self, mtime_ns: int, size: int, payload: Dict[str, Any]):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        source_id = payload["content_identifier"] or payload["video_url"]
+        self.doc_hash = generate_doc_hash(source_id) if source_id else None
+        # 与路由直接返回字典时相同的序列化方式（日期等类型先转换为 JSON 兼容值）
+        self.body = json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = make_etag(self.body)
+
+
+class DocumentResponseCache:
+    """文档详情响应缓存（LRU）"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: 最多缓存的文档数，默认取 config.DOCUMENT_CACHE_SIZE
+        """
+        self.max_entries = max_entries or config.DOCUMENT_CACHE_SIZE
+        self._entries: "OrderedDict[str, DocumentEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, filename: str) -> Optional[DocumentEntry]:
+        """
+        获取与文件当前版本一致的缓存（不读取文件内容）
+
+        Args:
+            filename: OUTPUT_DIR 下的文件名
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        stat = (config.OUTPUT_DIR / filename).stat()
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                return None
+            self._entries.move_to_end(filename)
+            self.hits += 1
+            return entry
+
+    def load(self, filename: str) -> DocumentEntry:
+        """
+        获取文档响应，文件变化或未缓存时重新生成（读取并解析文档，耗时操作）
+
+        Args:
+            filename: OUTPUT_DIR 下的文件名
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        entry = self.peek(filename)
+        if entry is not None:
+            return entry
+
+        file_path = config.OUTPUT_DIR / filename
+        stat = file_path.stat()
+        entry = DocumentEntry(stat.st_mtime_ns, stat.st_size, build_summary_payload(file_path))
+        with self._lock:
+            self.misses += 1
+            self._entries[filename] = entry
+            self._entries.move_to_end(filename)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def apply_file_change(self, filename: str, affected_hashes: Iterable[str] = ()) -> None:
+        """
+        文件变化时移除该文件及受影响文档所有版本的缓存
+
+        Args:
+            filename: 发生变化的文件名
+            affected_hashes: 哈希注册表增量更新返回的受影响 doc_hash
+        """
+        affected = set(affected_hashes)
+        with self._lock:
+            stale = [
+                name for name, entry in self._entries.items()
+                if name == filename or (entry.doc_hash and entry.doc_hash in affected)
+            ]
+            for name in stale:
+                del self._entries[name]
+        if stale:
+            logger.debug(f"文档响应缓存失效: {filename} -> {len(stale)} 个文件")
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# 全局单例
+_cache: Optional[DocumentResponseCache] = None
+
+
+def get_document_cache() -> DocumentResponseCache:
+    """获取文档响应缓存单例"""
+    global _cache
+    if _cache is None:
+        _cache = DocumentResponseCache()
+    return _cache
+
+
+def apply_document_cache_change(filename: str, affected_hashes: Iterable[str] = ()) -> None:
+    """按单个文件的变化使文档响应缓存失效"""
+    get_document_cache().apply_file_change(filename, affected_hashes)
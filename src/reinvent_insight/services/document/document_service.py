@@ -6,13 +6,13 @@ from pathlib import Path
 
 from reinvent_insight.core import config
 from reinvent_insight.core.utils.file_utils import generate_doc_hash, is_pdf_document, get_source_identifier
-from reinvent_insight.core.utils.text_utils import extract_text_from_markdown, count_chinese_words
 from .metadata_service import (
     parse_metadata_from_md,
     clean_content_metadata,
     discover_versions,
 )
 from .hash_registry import HashRegistry
+from .metadata_index import DocumentRecord, get_metadata_index
 
 logger = logging.getLogger(__name__)
 
@@ -43,29 +43,35 @@ class DocumentService:
         if not self.output_dir.exists():
             return documents
         
-        for md_file in self.output_dir.glob("*.md"):
-            try:
-                doc_info = self._build_document_info(md_file)
-                if not doc_info:
-                    continue
+        # 从持久化索引读取，只有变化的文件会被重新解析
+        index = get_metadata_index()
+        records = index.scan(self.output_dir)
+        
+        # 批量提交按需计算的字数统计
+        with index.batch():
+            for filename, record in records.items():
+                try:
+                    doc_info = self._build_document_info(record)
+                    if not doc_info:
+                        continue
                 
-                source_id = doc_info.get("content_identifier") or doc_info.get("video_url", "")
+                    source_id = doc_info.get("content_identifier") or doc_info.get("video_url", "")
                 
-                if include_versions:
-                    # 包含所有版本
-                    documents.append(doc_info)
-                else:
-                    # 只保留每个 source_id 的最新版本
-                    if source_id:
-                        if source_id not in source_id_map:
-                            source_id_map[source_id] = doc_info
-                        else:
-                            existing_version = source_id_map[source_id].get("version", 0)
-                            new_version = doc_info.get("version", 0)
-                            if new_version > existing_version:
+                    if include_versions:
+                        # 包含所有版本
+                        documents.append(doc_info)
+                    else:
+                        # 只保留每个 source_id 的最新版本
+                        if source_id:
+                            if source_id not in source_id_map:
                                 source_id_map[source_id] = doc_info
-            except Exception as e:
-                logger.warning(f"处理文件 {md_file.name} 时出错: {e}")
+                            else:
+                                existing_version = source_id_map[source_id].get("version", 0)
+                                new_version = doc_info.get("version", 0)
+                                if new_version > existing_version:
+                                    source_id_map[source_id] = doc_info
+                except Exception as e:
+                    logger.warning(f"处理文件 {filename} 时出错: {e}")
         
         if not include_versions:
             documents = list(source_id_map.values())
@@ -152,10 +158,9 @@ class DocumentService:
             return {"exists": False}
         
         try:
-            file_path = self.output_dir / filename
-            if file_path.exists():
-                content = file_path.read_text(encoding="utf-8")
-                metadata = parse_metadata_from_md(content)
+            record = get_metadata_index().get(self.output_dir / filename)
+            if record:
+                metadata = record.metadata
                 title = metadata.get("title_cn") or metadata.get("title_en") or metadata.get("title", "")
                 
                 return {"exists": True, "hash": doc_hash, "title": title}
@@ -177,121 +182,52 @@ class DocumentService:
         if not filename:
             return []
         
-        file_path = self.output_dir / filename
-        if not file_path.exists():
-            return []
-        
         try:
-            content = file_path.read_text(encoding="utf-8")
-            metadata = parse_metadata_from_md(content)
-            source_id = get_source_identifier(metadata)
-            
-            if source_id:
-                return discover_versions(source_id, self.output_dir)
+            record = get_metadata_index().get(self.output_dir / filename)
+            if record and record.source_id:
+                return discover_versions(record.source_id, self.output_dir)
         except Exception as e:
             logger.warning(f"获取版本信息失败: {e}")
         
         return []
     
     def refresh_hash_mappings(self):
-        """刷新哈希映射（扫描所有文件重建映射）"""
-        self.hash_registry.clear()
-        
-        if not self.output_dir.exists():
-            return
-        
-        source_id_to_files = {}
-        skipped_count = 0
-        error_count = 0
-        
-        # 第一遍：基于 content_identifier 或 video_url 对所有文件进行分组
-        for md_file in self.output_dir.glob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                metadata = parse_metadata_from_md(content)
-                source_id = get_source_identifier(metadata)
-                
-                if source_id:
-                    if source_id not in source_id_to_files:
-                        source_id_to_files[source_id] = []
-                    source_id_to_files[source_id].append({
-                        'filename': md_file.name,
-                        'version': metadata.get('version', 0)
-                    })
-                else:
-                    skipped_count += 1
-                    logger.debug(f"跳过文件 {md_file.name}（无标识符）")
-            except Exception as e:
-                error_count += 1
-                logger.error(f"解析文件 {md_file.name} 时出错: {e}")
-        
-        # 第二遍：为每个分组生成和注册唯一的统一hash
-        for source_id, files in source_id_to_files.items():
-            doc_hash = generate_doc_hash(source_id)
-            if not doc_hash:
-                continue
-            
-            # 按版本号排序，最新版本在前
-            files.sort(key=lambda x: x['version'], reverse=True)
-            latest_file = files[0]['filename']
-            
-            # 注册映射
-            for i, file_info in enumerate(files):
-                self.hash_registry.register(
-                    doc_hash, 
-                    file_info['filename'],
-                    is_default=(i == 0)  # 第一个为默认版本
-                )
-        
-        stats = self.hash_registry.stats()
-        log_msg = f"--- 统一Hash映射初始化完成，共处理 {stats['total_documents']} 个独立文档"
-        if skipped_count > 0:
-            log_msg += f"，跳过 {skipped_count} 个文件（无标识符）"
-        if error_count > 0:
-            log_msg += f"，{error_count} 个文件解析失败"
-        log_msg += "。 ---"
-        logger.info(log_msg)
+        """刷新哈希映射（基于元数据索引重建映射，只重新解析变化的文件）"""
+        self.hash_registry.init_mappings()
     
-    def _build_document_info(self, md_file: Path) -> Optional[Dict]:
+    def _build_document_info(self, record: DocumentRecord) -> Optional[Dict]:
         """构建文档信息字典
         
         Args:
-            md_file: Markdown文件路径
+            record: 元数据索引记录
             
         Returns:
             文档信息字典
         """
         try:
-            content = md_file.read_text(encoding="utf-8")
-            metadata = parse_metadata_from_md(content)
-            
-            title_cn, title_en = self._extract_title(content, metadata)
-            if not title_cn:
-                title_cn = title_en if title_en else md_file.stem
+            metadata = record.metadata
             
-            doc_hash = self.hash_registry.get_hash(md_file.name)
+            doc_hash = self.hash_registry.get_hash(record.filename)
             if not doc_hash:
                 return None
             
-            # 计算字数
-            pure_text = extract_text_from_markdown(content)
-            word_count = count_chinese_words(pure_text)
+            # 计算字数（按需计算并缓存）
+            word_count = get_metadata_index().get_word_count(self.output_dir / record.filename)
             
             # 获取时间戳
-            stat = md_file.stat()
-            created_at, modified_at = self._extract_timestamps(metadata, stat)
+            created_at, modified_at = self._extract_timestamps(metadata, record)
             
             # 检查是否为PDF文档
-            source_id = get_source_identifier(metadata)
+            source_id = record.source_id
             is_pdf = is_pdf_document(source_id) if source_id else False
             is_document = bool(metadata.get('content_identifier'))
             
             return {
-                "filename": md_file.name,
-                "title_cn": title_cn,
-                "title_en": title_en,
-                "size": stat.st_size,
-                "word_count": word_count,
+                "filename": record.filename,
+                "title_cn": record.title_cn,
+                "title_en": record.title_en,
+                "size": record.size,
+                "word_count": word_count or 0,
                 "created_at": created_at,
                 "modified_at": modified_at,
                 "upload_date": metadata.get("upload_date", "1970-01-01"),
@@ -307,7 +243,7 @@ class DocumentService:
                 "content_type": "文档" if is_document else ("PDF文档" if is_pdf else "YouTube视频")
             }
         except Exception as e:
-            logger.warning(f"构建文档信息失败 {md_file.name}: {e}")
+            logger.warning(f"构建文档信息失败 {record.filename}: {e}")
             return None
     
     def _find_version_file(self, doc_hash: str, version: int) -> Optional[str]:
@@ -348,20 +284,20 @@ class DocumentService:
         
         return title_cn, title_en
     
-    def _extract_timestamps(self, metadata: Dict, stat) -> tuple:
-        """从元数据和文件统计信息中提取时间戳
+    def _extract_timestamps(self, metadata: Dict, record: DocumentRecord) -> tuple:
+        """从元数据和文件时间中提取时间戳
         
         Args:
             metadata: 元数据字典
-            stat: 文件统计信息
+            record: 元数据索引记录（提供文件时间）
             
         Returns:
             (created_at, modified_at) 元组
         """
         from datetime import datetime
         
-        created_at = stat.st_ctime
-        modified_at = stat.st_mtime
+        created_at = record.ctime
+        modified_at = record.mtime
         
         if metadata.get("created_at"):
             try:
@@ -1,11 +1,13 @@
 """文档哈希注册表 - 管理文档hash到文件名的映射关系"""
 
 import logging
-from typing import Dict, List
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from reinvent_insight.core import config
 from reinvent_insight.core.utils.file_utils import generate_doc_hash, get_source_identifier
+from reinvent_insight.services.document.metadata_index import get_metadata_index
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +34,13 @@ class HashRegistry:
         # 存储 filename -> hash 的反向映射
         self.filename_to_hash: Dict[str, str] = {}
         
+        # 增量更新所需的索引：filename -> (source_id, version)
+        self._file_index: Dict[str, Tuple[str, Any]] = {}
+        # source_id -> {filename: version}，用于单个分组的版本重选
+        self._source_groups: Dict[str, Dict[str, Any]] = {}
+        # 监控线程与请求线程可能并发修改映射
+        self._lock = threading.RLock()
+        
         self._initialized = True
     
     def get_filename(self, doc_hash: str) -> str:
@@ -45,64 +54,69 @@ class HashRegistry:
     def get_hash(self, filename: str) -> str:
         """根据文件名获取hash"""
         return self.filename_to_hash.get(filename, "")
+
+    def get_version_infos(self, source_identifier: str) -> Optional[List[Dict[str, Any]]]:
+        """获取指定内容标识符的所有版本信息（格式与 discover_versions 一致）
+
+        从版本分组和元数据索引读取，代价与该文档的版本数成正比。
+
+        Args:
+            source_identifier: 内容来源标识符（video_url 或 content_identifier）
+
+        Returns:
+            按版本号排序的版本信息列表；注册表中没有该分组时返回 None
+        """
+        with self._lock:
+            filenames = sorted(self._source_groups.get(source_identifier, {}))
+        if not filenames:
+            return None
+
+        index = get_metadata_index()
+        versions = []
+        for filename in filenames:
+            record = index.get(config.OUTPUT_DIR / filename)
+            if record is None:
+                continue
+            versions.append({
+                'filename': filename,
+                'version': record.metadata.get('version', 0),
+                'created_at': str(record.metadata.get('created_at', '')),
+                'title_cn': str(record.metadata.get('title_cn', '')),
+                'title_en': str(record.metadata.get('title_en', ''))
+            })
+        versions.sort(key=lambda x: x['version'])
+        return versions
     
     def init_mappings(self, metadata_parser=None):
         """初始化所有文档的基于内容标识符的统一hash映射
         
         Args:
-            metadata_parser: 元数据解析函数，如果不提供则使用默认
+            metadata_parser: 元数据解析函数，如果不提供则从元数据索引读取
         """
-        self.hash_to_filename.clear()
-        self.hash_to_versions.clear()
-        self.filename_to_hash.clear()
-
-        if not config.OUTPUT_DIR.exists():
-            return
+        with self._lock:
+            self.hash_to_filename.clear()
+            self.hash_to_versions.clear()
+            self.filename_to_hash.clear()
+            self._file_index.clear()
+            self._source_groups.clear()
 
-        # 使用默认解析器如果未提供
-        if metadata_parser is None:
-            from reinvent_insight.services.document.metadata_service import parse_metadata_from_md
-            metadata_parser = parse_metadata_from_md
+            if not config.OUTPUT_DIR.exists():
+                return
 
-        source_id_to_files = {}
-        skipped_count = 0
-        error_count = 0
-        
-        # 第一遍：基于 content_identifier 或 video_url 对所有文件进行分组
-        for md_file in config.OUTPUT_DIR.glob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                metadata = metadata_parser(content)
-                source_id = get_source_identifier(metadata)
-                
-                if source_id:
-                    if source_id not in source_id_to_files:
-                        source_id_to_files[source_id] = []
-                    source_id_to_files[source_id].append({
-                        'filename': md_file.name,
-                        'version': metadata.get('version', 0)
-                    })
+            skipped_count = 0
+            entries, error_count = self._collect_entries(metadata_parser)
+            
+            # 第一遍：基于 content_identifier 或 video_url 对所有文件进行分组
+            for filename, entry in entries.items():
+                if entry:
+                    self._index_file(filename, entry)
                 else:
                     skipped_count += 1
-                    logger.debug(f"跳过文件 {md_file.name}（无标识符）")
-            except Exception as e:
-                error_count += 1
-                logger.error(f"解析文件 {md_file.name} 时出错，已跳过: {e}")
-        
-        # 第二遍：为每个分组生成和注册唯一的统一hash
-        for source_id, files in source_id_to_files.items():
-            doc_hash = generate_doc_hash(source_id)
-            if not doc_hash:
-                continue
-
-            files.sort(key=lambda x: x['version'], reverse=True)
-            latest_file = files[0]['filename']
+                    logger.debug(f"跳过文件 {filename}（无标识符）")
             
-            # 注册核心映射
-            self.hash_to_filename[doc_hash] = latest_file
-            self.hash_to_versions[doc_hash] = [f['filename'] for f in files]
-            for file_info in files:
-                self.filename_to_hash[file_info['filename']] = doc_hash
+            # 第二遍：为每个分组生成和注册唯一的统一hash
+            for source_id in list(self._source_groups):
+                self._elect_latest(source_id)
 
         log_msg = f"Hash映射初始化完成，共处理 {len(self.hash_to_filename)} 个独立文档"
         if skipped_count > 0:
@@ -111,52 +125,154 @@ class HashRegistry:
             log_msg += f"，{error_count} 个文件解析失败"
         logger.info(log_msg)
     
+    def apply_file_change(self, filename: str, metadata_parser=None) -> List[str]:
+        """根据单个文件的新增/修改/删除增量更新映射
+        
+        只重新解析变化的文件，并对其所在版本分组重新选举默认（最新）文件，
+        代价与文档总数无关。增量更新失败时回退为全量重建。
+        
+        Args:
+            filename: 发生变化的文件名（OUTPUT_DIR 下）
+            metadata_parser: 元数据解析函数，如果不提供则从元数据索引读取
+            
+        Returns:
+            受影响的 doc_hash 列表（全量重建时返回空列表）
+        """
+        try:
+            with self._lock:
+                md_file = config.OUTPUT_DIR / filename
+                new_entry = self._parse_entry(md_file, metadata_parser)
+                old_entry = self._unindex_file(filename)
+                if new_entry:
+                    self._index_file(filename, new_entry)
+                
+                affected = []
+                for source_id in {entry[0] for entry in (old_entry, new_entry) if entry}:
+                    doc_hash = self._elect_latest(source_id)
+                    if doc_hash:
+                        affected.append(doc_hash)
+            
+            logger.debug(f"Hash映射增量更新: {filename} -> {affected}")
+            return affected
+        except Exception as e:
+            logger.warning(f"增量更新Hash映射失败 {filename}，回退为全量重建: {e}")
+            self.init_mappings(metadata_parser)
+            return []
+    
+    def _collect_entries(self, metadata_parser=None) -> Tuple[Dict[str, Optional[Tuple[str, Any]]], int]:
+        """收集 OUTPUT_DIR 下所有文件的 (source_id, version)
+        
+        未提供解析器时从持久化元数据索引读取，只有变化的文件会被重新解析。
+        
+        Returns:
+            (文件名 -> 索引项, 解析失败的文件数)
+        """
+        if metadata_parser is None:
+            records = get_metadata_index().scan(config.OUTPUT_DIR)
+            entries = {
+                filename: (record.source_id, record.version) if record.source_id else None
+                for filename, record in records.items()
+            }
+            return entries, 0
+        
+        entries = {}
+        error_count = 0
+        for md_file in config.OUTPUT_DIR.glob("*.md"):
+            try:
+                entries[md_file.name] = self._parse_entry(md_file, metadata_parser)
+            except Exception as e:
+                error_count += 1
+                logger.error(f"解析文件 {md_file.name} 时出错，已跳过: {e}")
+        return entries, error_count
+    
+    def _parse_entry(self, md_file: Path, metadata_parser=None) -> Optional[Tuple[str, Any]]:
+        """解析单个文件，返回 (source_id, version)，无标识符或文件不存在时返回 None"""
+        if metadata_parser is None:
+            record = get_metadata_index().get(md_file)
+            if not record or not record.source_id:
+                return None
+            return record.source_id, record.version
+        
+        if not md_file.exists():
+            return None
+        content = md_file.read_text(encoding="utf-8")
+        metadata = metadata_parser(content)
+        source_id = get_source_identifier(metadata)
+        if not source_id:
+            return None
+        return source_id, metadata.get('version', 0)
+    
+    def _index_file(self, filename: str, entry: Tuple[str, Any]) -> None:
+        """将文件加入索引及其版本分组"""
+        source_id, version = entry
+        self._file_index[filename] = entry
+        self._source_groups.setdefault(source_id, {})[filename] = version
+    
+    def _unindex_file(self, filename: str) -> Optional[Tuple[str, Any]]:
+        """将文件从索引及其版本分组中移除，返回旧的索引项"""
+        old_entry = self._file_index.pop(filename, None)
+        if old_entry:
+            group = self._source_groups.get(old_entry[0])
+            if group is not None:
+                group.pop(filename, None)
+        self.filename_to_hash.pop(filename, None)
+        return old_entry
+    
+    def _elect_latest(self, source_id: str) -> Optional[str]:
+        """重新选举分组内的最新版本并同步三张映射表
+        
+        版本号高者优先，版本号相同时按文件名排序，保证全量与增量结果一致。
+        """
+        doc_hash = generate_doc_hash(source_id)
+        if not doc_hash:
+            return None
+        
+        group = self._source_groups.get(source_id)
+        if not group:
+            self._source_groups.pop(source_id, None)
+            self.hash_to_filename.pop(doc_hash, None)
+            self.hash_to_versions.pop(doc_hash, None)
+            return doc_hash
+        
+        files = sorted(group.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        self.hash_to_filename[doc_hash] = files[0][0]
+        self.hash_to_versions[doc_hash] = [name for name, _ in files]
+        for name, _ in files:
+            self.filename_to_hash[name] = doc_hash
+        return doc_hash
+    
     def refresh_mapping(self, source_identifier: str, metadata_parser=None):
         """刷新指定文档的hash映射（Ultra完成后调用）
         
         Args:
             source_identifier: 内容来源标识符（video_url 或 content_identifier）
-            metadata_parser: 元数据解析函数，如果不提供则使用默认
+            metadata_parser: 元数据解析函数，如果不提供则从元数据索引读取
         """
         if not source_identifier or not config.OUTPUT_DIR.exists():
             return
         
-        # 使用默认解析器如果未提供
-        if metadata_parser is None:
-            from reinvent_insight.services.document.metadata_service import parse_metadata_from_md
-            metadata_parser = parse_metadata_from_md
-        
         doc_hash = generate_doc_hash(source_identifier)
         if not doc_hash:
             return
         
         # 重新扫描该标识符对应的所有版本
-        files = []
-        for md_file in config.OUTPUT_DIR.glob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                metadata = metadata_parser(content)
-                file_source_id = get_source_identifier(metadata)
-                if file_source_id == source_identifier:
-                    files.append({
-                        'filename': md_file.name,
-                        'version': metadata.get('version', 0)
-                    })
-            except Exception as e:
-                logger.warning(f"刷新映射时解析文件 {md_file.name} 失败: {e}")
+        entries, _ = self._collect_entries(metadata_parser)
+        files = [
+            {'filename': filename, 'version': entry[1]}
+            for filename, entry in entries.items()
+            if entry and entry[0] == source_identifier
+        ]
         
         if not files:
             return
         
-        # 按版本号排序，最新版本在前
-        files.sort(key=lambda x: x['version'], reverse=True)
-        latest_file = files[0]['filename']
-        
-        # 更新映射
-        self.hash_to_filename[doc_hash] = latest_file
-        self.hash_to_versions[doc_hash] = [f['filename'] for f in files]
-        for file_info in files:
-            self.filename_to_hash[file_info['filename']] = doc_hash
+        # 同步索引并重新选举最新版本
+        with self._lock:
+            for file_info in files:
+                self._unindex_file(file_info['filename'])
+                self._index_file(file_info['filename'], (source_identifier, file_info['version']))
+            self._elect_latest(source_identifier)
+            latest_file = self.hash_to_filename.get(doc_hash)
         
         logger.info(f"已刷新文档映射: {doc_hash} -> {latest_file} (共 {len(files)} 个版本)")
 
@@ -182,6 +298,11 @@ def init_hash_mappings():
     _registry.init_mappings()
 
 
+def apply_hash_mapping_change(filename: str) -> List[str]:
+    """按单个文件的变化增量更新哈希映射"""
+    return _registry.apply_file_change(filename)
+
+
 def refresh_doc_hash_mapping(video_url: str):
     """刷新文档哈希映射（向后兼容函数）"""
     _registry.refresh_mapping(video_url)
@@ -0,0 +1,366 @@
+"""文档元数据持久化索引
+
+解决性能问题：HashRegistry、SummaryCache、DocumentService 与 discover_versions
+各自遍历 OUTPUT_DIR，完整读取并解析每篇文档。文档数上千后，服务冷启动和每次
+列表刷新的耗时都与文档总数成正比。
+
+本模块维护一份 SQLite 索引（按 路径 + mtime + size 校验），保存解析后的
+front matter、标题和来源标识符。所有使用方从索引读取，只有 stat 发生变化的
+文件才会被重新解析，冷启动耗时与变化的文件数成正比。
+
+建立索引时只流式读取 front matter 和一级标题；字数、章节数等需要完整内容的
+派生统计在首次被请求时才计算，并随记录一起按 mtime 缓存。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from reinvent_insight.core import config
+from reinvent_insight.core.utils.file_utils import get_source_identifier
+
+logger = logging.getLogger(__name__)
+
+# 索引结构版本，解析规则变化时递增以使旧索引失效
+INDEX_SCHEMA_VERSION = 3
+
+
+@dataclass
+class DocumentRecord:
+    """单个 Markdown 文档的索引记录"""
+    filename: str                # 文件名
+    mtime_ns: int                # 文件修改时间（纳秒，用于失效检查）
+    size: int                    # 文件大小（字节，用于失效检查）
+    ctime: float                 # 文件创建/状态变更时间
+    mtime: float                 # 文件修改时间（秒）
+    metadata: Dict[str, Any]     # 解析出的 YAML front matter
+    title_cn: str                # 中文标题（已按 元数据 -> H1 -> 英文标题 -> 文件名 回退）
+    title_en: str                # 英文标题
+    source_id: str               # 内容来源标识符（content_identifier 或 video_url）
+    version: Any                 # 版本号
+    stats: Dict[str, Any] = field(default_factory=dict)  # 按需计算的派生统计（字数、章节数等）
+
+    def matches(self, stat) -> bool:
+        """判断记录是否与文件当前状态一致"""
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class MetadataIndex:
+    """文档元数据持久化索引
+
+    内存中保存全部记录以便快速查询，SQLite 负责跨进程重启持久化。
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化元数据索引
+
+        Args:
+            db_path: SQLite 索引文件路径
+        """
+        self.db_path = Path(db_path)
+
+        # 路径 -> 记录
+        self._records: Dict[str, DocumentRecord] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded = False
+        self._lock = threading.RLock()
+
+        # 批量模式下暂存待写入的记录，退出时一次性提交
+        self._batch_depth = 0
+        self._pending: Dict[str, Optional[DocumentRecord]] = {}
+
+    # ------------------------------------------------------------------
+    # 查询接口
+    # ------------------------------------------------------------------
+
+    def get(self, md_file: Path) -> Optional[DocumentRecord]:
+        """获取文件的索引记录，文件变化时重新解析
+
+        Args:
+            md_file: Markdown 文件路径
+
+        Returns:
+            索引记录，文件不存在时返回 None
+        """
+        md_file = Path(md_file)
+        key = str(md_file)
+
+        try:
+            stat = md_file.stat()
+        except FileNotFoundError:
+            self.discard(md_file)
+            return None
+
+        with self._lock:
+            self._ensure_loaded()
+            record = self._records.get(key)
+            if record and record.matches(stat):
+                return record
+
+        # 解析放在锁外，避免阻塞其他线程的查询
+        record = self._parse(md_file, stat)
+        with self._lock:
+            self._records[key] = record
+            self._stage(key, record)
+        return record
+
+    def scan(self, directory: Path) -> Dict[str, DocumentRecord]:
+        """扫描目录下所有 Markdown 文件，返回 文件名 -> 记录
+
+        只重新解析 stat 变化的文件，并清理已删除文件的记录。
+        单个文件解析失败时记录警告并跳过。
+
+        Args:
+            directory: 需要扫描的目录
+
+        Returns:
+            文件名到索引记录的映射
+        """
+        directory = Path(directory)
+        records: Dict[str, DocumentRecord] = {}
+
+        if not directory.exists():
+            return records
+
+        with self.batch():
+            for md_file in directory.glob("*.md"):
+                try:
+                    record = self.get(md_file)
+                    if record:
+                        records[md_file.name] = record
+                except Exception as e:
+                    logger.warning(f"索引文件 {md_file.name} 失败，已跳过: {e}")
+
+            # 清理目录中已不存在的文件
+            prefix = str(directory)
+            with self._lock:
+                stale = [
+                    key for key, record in self._records.items()
+                    if str(Path(key).parent) == prefix and record.filename not in records
+                ]
+                for key in stale:
+                    del self._records[key]
+                    self._stage(key, None)
+
+        return records
+
+    def get_stat(self, md_file: Path, name: str, compute: Callable[[str], Any]) -> Optional[Any]:
+        """获取需要完整内容才能计算的派生统计
+
+        首次请求时读取全文计算，结果随记录按 mtime 缓存并持久化；
+        文件变化后记录失效，统计会在下次请求时重新计算。
+
+        Args:
+            md_file: Markdown 文件路径
+            name: 统计项名称（计算规则变化时应更换名称）
+            compute: 根据文档内容计算统计值的函数
+
+        Returns:
+            统计值，文件不存在时返回 None
+        """
+        md_file = Path(md_file)
+        record = self.get(md_file)
+        if record is None:
+            return None
+        if name in record.stats:
+            return record.stats[name]
+
+        value = compute(md_file.read_text(encoding="utf-8"))
+        key = str(md_file)
+        with self._lock:
+            # 计算期间文件可能已被重新索引，只更新仍然有效的记录
+            if self._records.get(key) is record:
+                record.stats[name] = value
+                self._stage(key, record)
+        return value
+
+    def get_word_count(self, md_file: Path) -> Optional[int]:
+        """获取文档中文字数（按需计算并缓存）"""
+        return self.get_stat(md_file, "word_count", _count_words)
+
+    def discard(self, md_file: Path) -> None:
+        """移除文件的索引记录"""
+        key = str(Path(md_file))
+        with self._lock:
+            self._ensure_loaded()
+            if self._records.pop(key, None) is not None:
+                self._stage(key, None)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """批量模式：期间的写入合并为一次事务提交"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._flush()
+
+    # ------------------------------------------------------------------
+    # 解析
+    # ------------------------------------------------------------------
+
+    def _parse(self, md_file: Path, stat) -> DocumentRecord:
+        """流式读取 front matter 和标题，构建索引记录"""
+        from reinvent_insight.services.document.metadata_service import read_document_head
+
+        metadata, heading = read_document_head(md_file)
+        metadata = _json_safe(metadata)
+
+        title_cn = metadata.get("title_cn") or heading
+        title_en = metadata.get("title_en", metadata.get("title", ""))
+
+        if not title_cn:
+            title_cn = title_en if title_en else md_file.stem
+
+        return DocumentRecord(
+            filename=md_file.name,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            ctime=stat.st_ctime,
+            mtime=stat.st_mtime,
+            metadata=metadata,
+            title_cn=title_cn,
+            title_en=title_en,
+            source_id=get_source_identifier(metadata) or "",
+            version=metadata.get("version", 0),
+        )
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        """首次访问时从 SQLite 加载全部记录"""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        self._conn = self._open()
+        if self._conn is None:
+            return
+
+        try:
+            rows = self._conn.execute("SELECT path, record FROM documents").fetchall()
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"读取元数据索引失败，将重新建立: {e}")
+            return
+
+        for path, payload in rows:
+            try:
+                self._records[path] = DocumentRecord(**json.loads(payload))
+            except (TypeError, ValueError):
+                continue
+
+        logger.info(f"元数据索引已加载: {len(self._records)} 条记录")
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        """打开（必要时重建）索引数据库，失败时退化为纯内存模式"""
+        for attempt in range(2):
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+
+                schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if schema_version != INDEX_SCHEMA_VERSION:
+                    conn.execute("DROP TABLE IF EXISTS documents")
+                    conn.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS documents ("
+                    "path TEXT PRIMARY KEY, "
+                    "record TEXT NOT NULL)"
+                )
+                conn.commit()
+                return conn
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"元数据索引数据库不可用: {e}")
+                if attempt == 0:
+                    # 数据库损坏时删除后重建
+                    self.db_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"无法创建元数据索引数据库: {e}")
+                break
+
+        logger.warning("元数据索引将仅保存在内存中")
+        return None
+
+    def _stage(self, key: str, record: Optional[DocumentRecord]) -> None:
+        """记录待写入的变更（None 表示删除），非批量模式下立即提交"""
+        self._pending[key] = record
+        if self._batch_depth == 0:
+            self._flush()
+
+    def _flush(self) -> None:
+        """将暂存的变更写入 SQLite"""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        if self._conn is None:
+            return
+
+        upserts = [
+            (key, json.dumps(asdict(record), ensure_ascii=False))
+            for key, record in pending.items() if record is not None
+        ]
+        deletes = [(key,) for key, record in pending.items() if record is None]
+
+        try:
+            with self._conn:
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO documents (path, record) VALUES (?, ?)",
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM documents WHERE path = ?", deletes)
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"写入元数据索引失败: {e}")
+
+
+def _json_safe(value: Any) -> Any:
+    """
+    将 YAML 解析结果转换为 JSON 兼容类型
+
+    未加引号的日期会被解析为 date/datetime，统一转为 ISO 字符串，保证新解析的
+    记录与从 SQLite 重新加载的记录类型一致，也能直接序列化为响应。
+    """
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _count_words(content: str) -> int:
+    """统计文档正文的中文字数"""
+    from reinvent_insight.services.document.metadata_service import (
+        extract_text_from_markdown,
+        count_chinese_words,
+    )
+    return count_chinese_words(extract_text_from_markdown(content))
+
+
+# 全局单例
+_metadata_index = MetadataIndex(config.METADATA_INDEX_PATH)
+
+
+def get_metadata_index() -> MetadataIndex:
+    """获取元数据索引单例"""
+    return _metadata_index
@@ -3,11 +3,15 @@
 import re
 import yaml
 import logging
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 from zhon import hanzi
 
 logger = logging.getLogger(__name__)
 
+# 流式读取 front matter 时的最大字节数，超出后回退为完整读取
+FRONT_MATTER_MAX_BYTES = 64 * 1024
+
 
 def parse_metadata_from_md(md_content: str) -> Dict:
     """从 Markdown 文件内容中解析 YAML front matter
@@ -31,6 +35,90 @@ def parse_metadata_from_md(md_content: str) -> Dict:
     return {}
 
 
+def read_document_head(file_path: Path, max_bytes: int = FRONT_MATTER_MAX_BYTES) -> Tuple[Dict, Optional[str]]:
+    """流式读取文档开头的 YAML front matter 和第一个一级标题
+    
+    只读取到 front matter 结束标记和第一个 `# ` 标题为止，不加载整篇文档。
+    列表类接口只需要元数据和标题，对几百 KB 的报告可以节省绝大部分 I/O。
+    
+    Args:
+        file_path: Markdown 文件路径
+        max_bytes: 最多读取的字节数；front matter 在此范围内未闭合时回退为完整读取
+        
+    Returns:
+        (元数据字典, 一级标题)，没有 front matter 时元数据为空字典，没有标题时为 None
+    """
+    metadata: Dict = {}
+    heading = None
+    bytes_read = 0
+    
+    with open(file_path, 'rb') as f:
+        def next_line() -> Optional[str]:
+            nonlocal bytes_read
+            if bytes_read >= max_bytes:
+                return None
+            raw = f.readline(max_bytes - bytes_read)
+            if not raw:
+                return None
+            bytes_read += len(raw)
+            return raw.decode('utf-8', errors='replace')
+        
+        line = next_line()
+        if line is not None and line.rstrip() == '---' and line.endswith('\n'):
+            front_lines = []
+            closed = False
+            while True:
+                line = next_line()
+                if line is None:
+                    break
+                if line.rstrip() == '---' and line.endswith('\n'):
+                    closed = True
+                    break
+                front_lines.append(line)
+            
+            if not closed:
+                # 未在预算内找到结束标记（或文件已结束），与完整解析保持一致
+                logger.debug(f"front matter 超出读取预算，回退为完整读取: {file_path}")
+                content = Path(file_path).read_text(encoding="utf-8")
+                return parse_metadata_from_md(content), _find_heading(content)
+            
+            front_matter_str = ''.join(front_lines)
+            if front_matter_str.endswith('\n'):
+                front_matter_str = front_matter_str[:-1]
+            metadata = _load_front_matter(front_matter_str)
+            line = next_line()
+        
+        # 继续读取直到第一个一级标题
+        while line is not None:
+            stripped = line.strip()
+            if stripped.startswith('# '):
+                heading = stripped[2:].strip()
+                break
+            line = next_line()
+    
+    return metadata, heading
+
+
+def _load_front_matter(front_matter_str: str) -> Dict:
+    """解析 front matter 文本，失败时返回空字典"""
+    try:
+        metadata = yaml.safe_load(front_matter_str)
+        if isinstance(metadata, dict):
+            return metadata
+    except yaml.YAMLError as e:
+        logger.warning(f"解析 YAML front matter 失败: {e}")
+    return {}
+
+
+def _find_heading(content: str) -> Optional[str]:
+    """查找内容中的第一个一级标题"""
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('# '):
+            return stripped[2:].strip()
+    return None
+
+
 def extract_text_from_markdown(content: str) -> str:
     """从 Markdown 内容中提取纯文本，用于准确计算字数
     
@@ -199,7 +287,7 @@ def discover_versions(source_identifier: str, output_dir, metadata_parser=None)
     Args:
         source_identifier: 内容来源标识符（video_url 或 content_identifier）
         output_dir: 输出目录（Path对象）
-        metadata_parser: 元数据解析函数，如果不提供则使用默认
+        metadata_parser: 元数据解析函数，如果不提供则从元数据索引读取
         
     Returns:
         版本信息列表
@@ -209,9 +297,21 @@ def discover_versions(source_identifier: str, output_dir, metadata_parser=None)
     if not output_dir.exists():
         return versions
     
-    # 使用默认解析器如果未提供
+    # 未提供解析器时从持久化元数据索引读取，只有变化的文件会被重新解析
     if metadata_parser is None:
-        metadata_parser = parse_metadata_from_md
+        from reinvent_insight.services.document.metadata_index import get_metadata_index
+        
+        for filename, record in get_metadata_index().scan(output_dir).items():
+            if record.source_id == source_identifier:
+                versions.append({
+                    'filename': filename,
+                    'version': record.metadata.get('version', 0),
+                    'created_at': record.metadata.get('created_at', ''),
+                    'title_cn': record.metadata.get('title_cn', ''),
+                    'title_en': record.metadata.get('title_en', '')
+                })
+        versions.sort(key=lambda x: x['version'])
+        return versions
         
     # 扫描所有文件
     for md_file in output_dir.glob("*.md"):
@@ -0,0 +1,241 @@
+"""
+PDF 下载渲染服务
+
+下载 PDF 时不再同步启动 generate_pdfs.py 子进程（阻塞事件循环，且每次都要
+启动解释器、导入 WeasyPrint）。本服务在常驻的进程池中渲染：
+
+- 工作进程启动时导入 WeasyPrint 并解析 pdf_style.css，之后的渲染直接复用
+- 同一文档的并发请求共享一次渲染（single-flight），结果原子地替换到 PDF 目录
+- 生成的 PDF 修改时间与源 Markdown 对齐，源文件修改时间变化即视为过期
+- 统计排队深度、排队等待与渲染耗时
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from reinvent_insight.core import config
+
+logger = logging.getLogger(__name__)
+
+# 工作进程中的转换器（进程初始化时创建）
+_converter = None
+
+
+def _init_worker(css_paths: List[str]) -> None:
+    """工作进程初始化：导入 WeasyPrint 并预先解析样式表"""
+    global _converter
+    from reinvent_insight.tools.generate_pdfs import MarkdownToPDFConverter
+    _converter = MarkdownToPDFConverter(css_paths)
+    _converter.get_stylesheets()
+
+
+def _render_pdf(md_path: str, output_path: str) -> float:
+    """
+    在工作进程中渲染 PDF
+
+    Returns:
+        渲染耗时（秒）
+    """
+    started = time.monotonic()
+    with open(md_path, 'r', encoding='utf-8') as f:
+        markdown_content = f.read()
+    _converter.generate_pdf(markdown_content, output_path)
+    return time.monotonic() - started
+
+
+class PDFRenderService:
+    """常驻进程池的 PDF 渲染服务"""
+
+    def __init__(
+        self,
+        pdf_dir: Optional[Path] = None,
+        css_paths: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[Executor] = None
+    ):
+        """
+        初始化渲染服务（工作进程在首次渲染时启动）
+
+        Args:
+            pdf_dir: PDF 输出目录，默认 downloads/pdfs
+            css_paths: 样式表路径列表，默认 config.PDF_STYLE_PATH
+            max_workers: 工作进程数，默认 config.PDF_RENDER_WORKERS
+            timeout: 单个 PDF 的渲染超时（秒），默认 config.PDF_RENDER_TIMEOUT
+            executor: 自定义执行器（测试用）
+        """
+        self.pdf_dir = Path(pdf_dir or config.OUTPUT_DIR.parent / "pdfs")
+        self.css_paths = css_paths or [str(config.PDF_STYLE_PATH)]
+        self.max_workers = max(1, max_workers or config.PDF_RENDER_WORKERS)
+        self.timeout = timeout or config.PDF_RENDER_TIMEOUT
+        self._executor = executor
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.joined = 0
+        self.total_wait_seconds = 0.0
+        self.total_render_seconds = 0.0
+        self.max_render_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        """获取（必要时启动）进程池"""
+        with self._lock:
+            if self._executor is None:
+                # 使用 spawn 避免复制事件循环和线程状态
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.css_paths,)
+                )
+                logger.info(f"已启动 PDF 渲染进程池: {self.max_workers} 个进程")
+            return self._executor
+
+    def get_pdf_path(self, md_path: Path) -> Path:
+        """获取 Markdown 对应的 PDF 路径"""
+        return self.pdf_dir / f"{md_path.stem}.pdf"
+
+    @staticmethod
+    def is_fresh(md_path: Path, pdf_path: Path) -> bool:
+        """PDF 是否由当前版本的 Markdown 生成（修改时间一致）"""
+        try:
+            return pdf_path.stat().st_mtime_ns == md_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    async def render(self, md_path: Path) -> Path:
+        """
+        获取 Markdown 对应的最新 PDF，必要时渲染
+
+        同一文档的并发请求共享一次渲染；请求方断开不会取消渲染。
+
+        Args:
+            md_path: Markdown 文件路径
+
+        Returns:
+            PDF 文件路径
+        """
+        pdf_path = self.get_pdf_path(md_path)
+        if self.is_fresh(md_path, pdf_path):
+            self.cache_hits += 1
+            return pdf_path
+
+        key = md_path.name
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(md_path, pdf_path))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_render_done(key, t))
+        else:
+            self.joined += 1
+            logger.info(f"附加到进行中的PDF渲染: {key}")
+        return await asyncio.shield(task)
+
+    def _on_render_done(self, key: str, task: asyncio.Task) -> None:
+        """渲染结束后移除登记（并取走异常，避免无人等待时告警）"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _render(self, md_path: Path, pdf_path: Path) -> Path:
+        """在进程池中渲染到临时文件，再替换正式 PDF"""
+        source_mtime = md_path.stat().st_mtime_ns
+        self.pdf_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = pdf_path.with_name(f".{pdf_path.stem}.{uuid.uuid4().hex[:8]}.tmp")
+
+        logger.info(f"生成PDF文件: {pdf_path.name}")
+        submitted = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+        future = None
+        try:
+            future = self._get_executor().submit(_render_pdf, str(md_path), str(temp_path))
+            render_seconds = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+            os.utime(temp_path, ns=(source_mtime, source_mtime))
+            os.replace(temp_path, pdf_path)
+
+            elapsed = time.monotonic() - submitted
+            self.completed += 1
+            self.total_render_seconds += render_seconds
+            self.max_render_seconds = max(self.max_render_seconds, render_seconds)
+            self.total_wait_seconds += max(0.0, elapsed - render_seconds)
+            logger.info(f"PDF生成完成: {pdf_path.name}, 渲染 {render_seconds:.2f}s, 总耗时 {elapsed:.2f}s")
+            return pdf_path
+        except BrokenProcessPool:
+            # 工作进程异常退出后进程池不可再用，下次渲染时重新启动
+            self.failed += 1
+            with self._lock:
+                self._executor = None
+            raise RuntimeError("PDF渲染进程异常退出")
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            if future is not None and not future.done():
+                # 超时后已开始的渲染无法取消，工作进程仍会写入临时文件并占用名额，
+                # 等它实际结束后再清理临时文件和计数
+                logger.warning(f"PDF渲染超时，等待工作进程结束后清理: {pdf_path.name}")
+                future.add_done_callback(lambda _: self._release(temp_path))
+            else:
+                self._release(temp_path)
+
+    def _release(self, temp_path: Path) -> None:
+        """渲染结束（含超时后工作进程实际结束）时释放名额并删除临时文件"""
+        with self._lock:
+            self.in_flight -= 1
+        temp_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """关闭进程池（不等待进行中的渲染）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        """获取渲染统计信息"""
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cache_hits": self.cache_hits,
+            "joined": self.joined,
+            "avg_wait_ms": int(self.total_wait_seconds / self.completed * 1000) if self.completed else 0,
+            "avg_render_ms": int(self.total_render_seconds / self.completed * 1000) if self.completed else 0,
+            "max_render_ms": int(self.max_render_seconds * 1000),
+        }
+
+
+# 全局单例
+_service: Optional[PDFRenderService] = None
+
+
+def get_pdf_render_service() -> PDFRenderService:
+    """获取 PDF 渲染服务单例"""
+    global _service
+    if _service is None:
+        _service = PDFRenderService()
+    return _service
+
+
+def shutdown_pdf_render_service() -> None:
+    """关闭 PDF 渲染服务的进程池"""
+    if _service is not None:
+        _service.shutdown()
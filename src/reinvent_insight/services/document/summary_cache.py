@@ -12,7 +12,8 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 
 from reinvent_insight.core import config
-from reinvent_insight.core.utils.file_utils import generate_doc_hash, is_pdf_document, get_source_identifier
+from reinvent_insight.core.utils.file_utils import generate_doc_hash, is_pdf_document
+from reinvent_insight.services.document.metadata_index import DocumentRecord, get_metadata_index
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +23,7 @@ class SummaryCache:
     
     缓存策略：
     1. 启动时初始化完整缓存
-    2. 新增/更新文档时增量更新缓存
+    2. 新增/更新/删除文档时按文件增量更新缓存，并重新选举所在分组的最新版本
     3. 提供快速的列表查询接口
     """
     
@@ -41,11 +42,11 @@ class SummaryCache:
         if self._initialized:
             return
         
-        # 缓存数据：doc_hash -> summary_data
+        # 缓存数据：doc_hash -> summary_data（每个文档只保留最新版本）
         self._cache: Dict[str, Dict[str, Any]] = {}
         
-        # 文件名到 hash 的映射（快速查找）
-        self._filename_to_hash: Dict[str, str] = {}
+        # 所有版本文件的摘要：filename -> summary_data（用于增量更新时重新选举）
+        self._entries: Dict[str, Dict[str, Any]] = {}
         
         # 按 video_url 分组（用于版本去重）
         self._video_url_to_hash: Dict[str, str] = {}
@@ -59,6 +60,9 @@ class SummaryCache:
         # 文件修改时间记录（用于增量更新检测）
         self._file_mtimes: Dict[str, float] = {}
         
+        # 监控线程与请求线程可能并发更新缓存
+        self._update_lock = threading.RLock()
+        
         self._initialized = True
     
     @property
@@ -81,147 +85,183 @@ class SummaryCache:
         start_time = time.time()
         
         # 导入依赖（延迟导入避免循环依赖）
-        from reinvent_insight.services.document.metadata_service import (
-            parse_metadata_from_md,
-            extract_text_from_markdown,
-            count_chinese_words,
-        )
         from reinvent_insight.services.document.hash_registry import filename_to_hash
         
-        self._cache.clear()
-        self._filename_to_hash.clear()
-        self._video_url_to_hash.clear()
-        self._file_mtimes.clear()
+        with self._update_lock:
+            self._cache.clear()
+            self._entries.clear()
+            self._video_url_to_hash.clear()
+            self._file_mtimes.clear()
+            
+            if not config.OUTPUT_DIR.exists():
+                logger.warning("OUTPUT_DIR 不存在，跳过缓存初始化")
+                return
+            
+            processed = 0
+            errors = 0
+            
+            # 从持久化索引读取，只有变化的文件会被重新解析
+            index = get_metadata_index()
+            records = index.scan(config.OUTPUT_DIR)
+            
+            # 批量提交按需计算的字数统计
+            with index.batch():
+                for filename, record in records.items():
+                    try:
+                        # 获取 doc_hash
+                        doc_hash = filename_to_hash.get(filename)
+                        if not doc_hash:
+                            continue
+                        
+                        self._entries[filename] = self._build_summary(record, doc_hash)
+                        processed += 1
+                        
+                    except Exception as e:
+                        errors += 1
+                        logger.warning(f"缓存初始化: 处理文件 {filename} 失败: {e}")
+            
+            # 按 hash 注册表的版本顺序选出每个文档的最新版本
+            for doc_hash in {entry["hash"] for entry in self._entries.values()}:
+                self._elect_latest(doc_hash)
+            
+            self._touch()
         
-        if not config.OUTPUT_DIR.exists():
-            logger.warning("OUTPUT_DIR 不存在，跳过缓存初始化")
-            return
+        elapsed = time.time() - start_time
+        logger.info(
+            f"文档缓存初始化完成: {len(self._cache)} 篇文档, "
+            f"处理 {processed} 个文件, {errors} 个错误, 耗时 {elapsed:.2f}s"
+        )
+    
+    def apply_file_change(self, filename: str) -> bool:
+        """根据单个文件的新增/修改/删除增量更新缓存
         
-        # video_url/content_identifier 分组（用于版本去重，只保留最新版本）
-        source_id_map: Dict[str, Dict[str, Any]] = {}
-        processed = 0
-        errors = 0
+        需要在 hash 注册表完成同一文件的更新之后调用。只重新解析变化的文件，
+        并重新选举受影响文档的最新版本；失败时回退为全量重建。
         
-        for md_file in config.OUTPUT_DIR.glob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                metadata = parse_metadata_from_md(content)
-                
-                # 获取标题
-                title_cn = metadata.get("title_cn")
-                title_en = metadata.get("title_en", metadata.get("title", ""))
-                
-                if not title_cn:
-                    for line in content.splitlines():
-                        stripped = line.strip()
-                        if stripped.startswith('# '):
-                            title_cn = stripped[2:].strip()
-                            break
-                
-                if not title_cn:
-                    title_cn = title_en if title_en else md_file.stem
-                
-                # 获取 doc_hash
-                doc_hash = filename_to_hash.get(md_file.name)
-                if not doc_hash:
-                    continue
-                
-                # 计算字数
-                pure_text = extract_text_from_markdown(content)
-                word_count = count_chinese_words(pure_text)
-                
-                # 获取文件时间
-                stat = md_file.stat()
-                source_id = get_source_identifier(metadata)
-                is_pdf = is_pdf_document(source_id) if source_id else False
-                is_document = bool(metadata.get('content_identifier'))
-                
-                # 解析时间
-                created_at_value = stat.st_ctime
-                modified_at_value = stat.st_mtime
-                
-                if metadata.get("created_at"):
-                    try:
-                        dt = datetime.fromisoformat(metadata.get("created_at").replace('Z', '+00:00'))
-                        created_at_value = dt.timestamp()
-                        modified_at_value = created_at_value
-                    except (ValueError, AttributeError):
-                        pass
-                elif metadata.get("upload_date"):
-                    try:
-                        upload_date_str = str(metadata.get("upload_date")).replace('-', '')
-                        if len(upload_date_str) == 8:
-                            year = int(upload_date_str[0:4])
-                            month = int(upload_date_str[4:6])
-                            day = int(upload_date_str[6:8])
-                            dt = datetime(year, month, day)
-                            created_at_value = dt.timestamp()
-                            modified_at_value = created_at_value
-                    except (ValueError, AttributeError):
-                        pass
-                
-                summary_data = {
-                    "filename": md_file.name,
-                    "title_cn": title_cn,
-                    "title_en": title_en,
-                    "size": stat.st_size,
-                    "word_count": word_count,
-                    "created_at": created_at_value,
-                    "modified_at": modified_at_value,
-                    "upload_date": metadata.get("upload_date", "1970-01-01"),
-                    "video_url": metadata.get("video_url", ""),
-                    "content_identifier": metadata.get("content_identifier", ""),
-                    "is_reinvent": metadata.get("is_reinvent", False),
-                    "course_code": metadata.get("course_code"),
-                    "level": metadata.get("level"),
-                    "hash": doc_hash,
-                    "version": metadata.get("version", 0),
-                    "is_pdf": is_pdf,
-                    "is_document": is_document,
-                    "content_type": "文档" if is_document else ("PDF文档" if is_pdf else "YouTube视频")
-                }
-                
-                # 兼容处理：旧文档可能将文档标识符存储在 video_url 中
-                video_url_val = summary_data["video_url"]
-                if video_url_val and "://" in video_url_val and not video_url_val.startswith(("http://", "https://")):
-                    if not summary_data["content_identifier"]:
-                        summary_data["content_identifier"] = video_url_val
-                    summary_data["video_url"] = ""
+        Args:
+            filename: 发生变化的文件名（OUTPUT_DIR 下）
+            
+        Returns:
+            是否以增量方式完成更新
+        """
+        from reinvent_insight.services.document.hash_registry import filename_to_hash
+        
+        try:
+            with self._update_lock:
+                affected = set()
                 
-                # 记录文件修改时间
-                self._file_mtimes[md_file.name] = stat.st_mtime
-                self._filename_to_hash[md_file.name] = doc_hash
+                old_entry = self._entries.pop(filename, None)
+                self._file_mtimes.pop(filename, None)
+                if old_entry:
+                    affected.add(old_entry["hash"])
                 
-                # 按 source_id 分组，只保留最新版本
-                if source_id:
-                    if source_id not in source_id_map:
-                        source_id_map[source_id] = summary_data
-                    else:
-                        existing_version = source_id_map[source_id].get("version", 0)
-                        new_version = summary_data.get("version", 0)
-                        if new_version > existing_version:
-                            source_id_map[source_id] = summary_data
+                doc_hash = filename_to_hash.get(filename)
+                record = get_metadata_index().get(config.OUTPUT_DIR / filename) if doc_hash else None
+                if record:
+                    self._entries[filename] = self._build_summary(record, doc_hash)
+                    affected.add(doc_hash)
                 
-                processed += 1
+                for affected_hash in affected:
+                    self._elect_latest(affected_hash)
                 
-            except Exception as e:
-                errors += 1
-                logger.warning(f"缓存初始化: 处理文件 {md_file.name} 失败: {e}")
+                self._touch()
+            
+            logger.debug(f"文档缓存增量更新: {filename}")
+            return True
+        except Exception as e:
+            logger.warning(f"增量更新文档缓存失败 {filename}，回退为全量重建: {e}")
+            self.init_cache()
+            return False
+    
+    def _build_summary(self, record: DocumentRecord, doc_hash: str) -> Dict[str, Any]:
+        """根据索引记录构建摘要数据"""
+        metadata = record.metadata
+        word_count = get_metadata_index().get_word_count(config.OUTPUT_DIR / record.filename)
+        source_id = record.source_id
+        is_pdf = is_pdf_document(source_id) if source_id else False
+        is_document = bool(metadata.get('content_identifier'))
+        
+        # 解析时间
+        created_at_value = record.ctime
+        modified_at_value = record.mtime
+        
+        if metadata.get("created_at"):
+            try:
+                dt = datetime.fromisoformat(metadata.get("created_at").replace('Z', '+00:00'))
+                created_at_value = dt.timestamp()
+                modified_at_value = created_at_value
+            except (ValueError, AttributeError):
+                pass
+        elif metadata.get("upload_date"):
+            try:
+                upload_date_str = str(metadata.get("upload_date")).replace('-', '')
+                if len(upload_date_str) == 8:
+                    year = int(upload_date_str[0:4])
+                    month = int(upload_date_str[4:6])
+                    day = int(upload_date_str[6:8])
+                    dt = datetime(year, month, day)
+                    created_at_value = dt.timestamp()
+                    modified_at_value = created_at_value
+            except (ValueError, AttributeError):
+                pass
+        
+        summary_data = {
+            "filename": record.filename,
+            "title_cn": record.title_cn,
+            "title_en": record.title_en,
+            "size": record.size,
+            "word_count": word_count or 0,
+            "created_at": created_at_value,
+            "modified_at": modified_at_value,
+            "upload_date": metadata.get("upload_date", "1970-01-01"),
+            "video_url": metadata.get("video_url", ""),
+            "content_identifier": metadata.get("content_identifier", ""),
+            "is_reinvent": metadata.get("is_reinvent", False),
+            "course_code": metadata.get("course_code"),
+            "level": metadata.get("level"),
+            "hash": doc_hash,
+            "version": metadata.get("version", 0),
+            "is_pdf": is_pdf,
+            "is_document": is_document,
+            "content_type": "文档" if is_document else ("PDF文档" if is_pdf else "YouTube视频")
+        }
         
-        # 将去重后的结果存入缓存
-        for source_id, summary_data in source_id_map.items():
-            doc_hash = summary_data["hash"]
-            self._cache[doc_hash] = summary_data
-            self._video_url_to_hash[source_id] = doc_hash
+        # 兼容处理：旧文档可能将文档标识符存储在 video_url 中
+        video_url_val = summary_data["video_url"]
+        if video_url_val and "://" in video_url_val and not video_url_val.startswith(("http://", "https://")):
+            if not summary_data["content_identifier"]:
+                summary_data["content_identifier"] = video_url_val
+            summary_data["video_url"] = ""
         
+        # 记录文件修改时间
+        self._file_mtimes[record.filename] = record.mtime
+        
+        return summary_data
+    
+    def _elect_latest(self, doc_hash: str) -> None:
+        """按 hash 注册表的版本顺序（最新在前）选出文档的展示版本"""
+        from reinvent_insight.services.document.hash_registry import get_registry
+        
+        for filename in get_registry().get_versions(doc_hash):
+            summary_data = self._entries.get(filename)
+            if summary_data:
+                self._cache[doc_hash] = summary_data
+                source_id = summary_data.get("content_identifier") or summary_data.get("video_url")
+                if source_id:
+                    self._video_url_to_hash[source_id] = doc_hash
+                return
+        
+        # 分组内已无可用版本，移除该文档
+        removed = self._cache.pop(doc_hash, None)
+        if removed:
+            source_id = removed.get("content_identifier") or removed.get("video_url")
+            if source_id:
+                self._video_url_to_hash.pop(source_id, None)
+    
+    def _touch(self) -> None:
+        """递增缓存版本号并记录更新时间"""
         self._cache_version += 1
         self._last_updated = time.time()
-        
-        elapsed = time.time() - start_time
-        logger.info(
-            f"文档缓存初始化完成: {len(self._cache)} 篇文档, "
-            f"处理 {processed} 个文件, {errors} 个错误, 耗时 {elapsed:.2f}s"
-        )
     
     def get_all_summaries(self, sort_by: str = "upload_date", reverse: bool = True) -> List[Dict[str, Any]]:
         """获取所有文档摘要（已排序）
@@ -286,138 +326,23 @@ class SummaryCache:
         Args:
             filename: 文件名
         """
-        from reinvent_insight.services.document.metadata_service import (
-            parse_metadata_from_md,
-            extract_text_from_markdown,
-            count_chinese_words,
-        )
-        from reinvent_insight.services.document.hash_registry import filename_to_hash
-        
-        file_path = config.OUTPUT_DIR / filename
-        if not file_path.exists():
-            # 文件被删除，移除缓存
-            self.remove_document(filename)
-            return
-        
-        try:
-            content = file_path.read_text(encoding="utf-8")
-            metadata = parse_metadata_from_md(content)
-            
-            title_cn = metadata.get("title_cn")
-            title_en = metadata.get("title_en", metadata.get("title", ""))
-            
-            if not title_cn:
-                for line in content.splitlines():
-                    stripped = line.strip()
-                    if stripped.startswith('# '):
-                        title_cn = stripped[2:].strip()
-                        break
-            
-            if not title_cn:
-                title_cn = title_en if title_en else file_path.stem
-            
-            doc_hash = filename_to_hash.get(filename)
-            if not doc_hash:
-                return
-            
-            pure_text = extract_text_from_markdown(content)
-            word_count = count_chinese_words(pure_text)
-            stat = file_path.stat()
-            source_id = get_source_identifier(metadata)
-            is_pdf = is_pdf_document(source_id) if source_id else False
-            is_document = bool(metadata.get('content_identifier'))
-            
-            created_at_value = stat.st_ctime
-            modified_at_value = stat.st_mtime
-            
-            if metadata.get("created_at"):
-                try:
-                    dt = datetime.fromisoformat(metadata.get("created_at").replace('Z', '+00:00'))
-                    created_at_value = dt.timestamp()
-                    modified_at_value = created_at_value
-                except (ValueError, AttributeError):
-                    pass
-            elif metadata.get("upload_date"):
-                try:
-                    upload_date_str = str(metadata.get("upload_date")).replace('-', '')
-                    if len(upload_date_str) == 8:
-                        year = int(upload_date_str[0:4])
-                        month = int(upload_date_str[4:6])
-                        day = int(upload_date_str[6:8])
-                        dt = datetime(year, month, day)
-                        created_at_value = dt.timestamp()
-                        modified_at_value = created_at_value
-                except (ValueError, AttributeError):
-                    pass
-            
-            summary_data = {
-                "filename": filename,
-                "title_cn": title_cn,
-                "title_en": title_en,
-                "size": stat.st_size,
-                "word_count": word_count,
-                "created_at": created_at_value,
-                "modified_at": modified_at_value,
-                "upload_date": metadata.get("upload_date", "1970-01-01"),
-                "video_url": metadata.get("video_url", ""),
-                "content_identifier": metadata.get("content_identifier", ""),
-                "is_reinvent": metadata.get("is_reinvent", False),
-                "course_code": metadata.get("course_code"),
-                "level": metadata.get("level"),
-                "hash": doc_hash,
-                "version": metadata.get("version", 0),
-                "is_pdf": is_pdf,
-                "is_document": is_document,
-                "content_type": "文档" if is_document else ("PDF文档" if is_pdf else "YouTube视频")
-            }
-            
-            # 兼容处理：旧文档可能将文档标识符存储在 video_url 中
-            video_url_val = summary_data["video_url"]
-            if video_url_val and "://" in video_url_val and not video_url_val.startswith(("http://", "https://")):
-                if not summary_data["content_identifier"]:
-                    summary_data["content_identifier"] = video_url_val
-                summary_data["video_url"] = ""
-            
-            # 更新缓存
-            self._cache[doc_hash] = summary_data
-            self._filename_to_hash[filename] = doc_hash
-            self._file_mtimes[filename] = stat.st_mtime
-            
-            if source_id:
-                self._video_url_to_hash[source_id] = doc_hash
-            
-            self._cache_version += 1
-            self._last_updated = time.time()
-            
-            logger.info(f"文档缓存已更新: {filename}")
-            
-        except Exception as e:
-            logger.error(f"更新文档缓存失败 {filename}: {e}")
+        self.apply_file_change(filename)
+        logger.info(f"文档缓存已更新: {filename}")
     
     def remove_document(self, filename: str) -> None:
         """从缓存中移除文档
         
+        同一文档的其他版本仍存在时，会重新选举最新版本而不是整体移除。
+        
         Args:
             filename: 文件名
         """
-        doc_hash = self._filename_to_hash.get(filename)
-        if doc_hash and doc_hash in self._cache:
-            # 获取 source_id
-            cached_data = self._cache[doc_hash]
-            source_id = cached_data.get("content_identifier") or cached_data.get("video_url")
-            del self._cache[doc_hash]
-            
-            if source_id and source_id in self._video_url_to_hash:
-                del self._video_url_to_hash[source_id]
-        
-        if filename in self._filename_to_hash:
-            del self._filename_to_hash[filename]
-        
-        if filename in self._file_mtimes:
-            del self._file_mtimes[filename]
-        
-        self._cache_version += 1
-        self._last_updated = time.time()
+        with self._update_lock:
+            old_entry = self._entries.pop(filename, None)
+            self._file_mtimes.pop(filename, None)
+            if old_entry:
+                self._elect_latest(old_entry["hash"])
+            self._touch()
         
         logger.info(f"文档已从缓存移除: {filename}")
     
@@ -443,3 +368,8 @@ def get_summary_cache() -> SummaryCache:
 def init_summary_cache() -> None:
     """初始化摘要缓存"""
     _summary_cache.init_cache()
+
+
+def apply_summary_cache_change(filename: str) -> bool:
+    """按单个文件的变化增量更新摘要缓存"""
+    return _summary_cache.apply_file_change(filename)
@@ -0,0 +1,158 @@
+"""可视化 HTML 响应缓存
+
+可视化解读是体积最大的页面。原来每次请求都要读取整个 _visual.html、
+执行四次 CDN 替换并返回未压缩的内容。本模块按文件修改时间缓存处理后的
+响应：
+
+- CDN 链接替换为本地路径（磁盘上的文件保持原样，长图截图通过 file://
+  加载时仍使用 CDN）
+- 预先生成 gzip 和 brotli 压缩版本（brotli 为项目依赖；未安装时只提供 gzip）
+- 每种表示形式都有强 ETag，用于 If-None-Match 条件请求
+
+文件更新后下次请求按新的修改时间重新生成；生成可视化解读后也会预先填充。
+"""
+
+import gzip
+import logging
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from reinvent_insight.core import config
+from reinvent_insight.core.utils.http_utils import make_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# CDN 链接 -> 本地路径
+CDN_REWRITES = [
+    # Chart.js
+    (re.compile(r'https://cdn\.bootcdn\.net/ajax/libs/Chart\.js/[\d.]+/chart\.umd\.min\.js'),
+     '/js/vendor/chart.umd.min.js'),
+    (re.compile(r'https://cdn\.jsdelivr\.net/npm/chart\.js@[\d.]+/dist/chart\.umd\.min\.js'),
+     '/js/vendor/chart.umd.min.js'),
+    # Font Awesome CSS
+    (re.compile(r'https://cdn\.bootcdn\.net/ajax/libs/font-awesome/[\d.]+/css/all\.min\.css'),
+     '/css/vendor/fontawesome/all.min.css'),
+    (re.compile(r'https://cdnjs\.cloudflare\.com/ajax/libs/font-awesome/[\d.]+/css/all\.min\.css'),
+     '/css/vendor/fontawesome/all.min.css'),
+]
+
+# brotli 压缩等级（预先压缩，使用最高等级）
+BROTLI_QUALITY = 11
+
+
+def rewrite_cdn_links(html_content: str) -> str:
+    """将 CDN 链接替换为本地路径，加快加载速度"""
+    for pattern, replacement in CDN_REWRITES:
+        html_content = pattern.sub(replacement, html_content)
+    return html_content
+
+
+class VisualHTMLEntry:
+    """一个可视化 HTML 文件处理后的响应"""
+
+    def __init__(self, mtime_ns: int, size: int, body: bytes):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.etag = make_etag(body)
+
+        # 压缩格式 -> 内容（None 表示未压缩）
+        self.bodies: Dict[Optional[str], bytes] = {None: body}
+        self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    @property
+    def encodings(self):
+        """可用的压缩格式（按优先级）"""
+        return [encoding for encoding in ("br", "gzip") if encoding in self.bodies]
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """指定表示形式的 ETag（不同压缩格式的字节不同，ETag 也不同）"""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    @property
+    def etags(self):
+        """所有表示形式的 ETag"""
+        return [self.etag_for(encoding) for encoding in self.bodies]
+
+
+class VisualHTMLCache:
+    """按文件修改时间缓存的可视化 HTML（LRU）"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: 最多缓存的文件数，默认取 config.VISUAL_HTML_CACHE_SIZE
+        """
+        self.max_entries = max_entries or config.VISUAL_HTML_CACHE_SIZE
+        self._entries: "OrderedDict[Path, VisualHTMLEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, path: Path) -> Optional[VisualHTMLEntry]:
+        """
+        获取与文件当前版本一致的缓存（不读取文件内容）
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        stat = path.stat()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry
+
+    def load(self, path: Path) -> VisualHTMLEntry:
+        """
+        获取缓存，文件变化时重新处理（读取、替换 CDN、压缩，耗时操作）
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        entry = self.peek(path)
+        if entry is not None:
+            return entry
+
+        stat = path.stat()
+        html_content = path.read_text(encoding="utf-8")
+        entry = VisualHTMLEntry(stat.st_mtime_ns, stat.st_size, rewrite_cdn_links(html_content).encode("utf-8"))
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.debug(
+            f"已缓存可视化 HTML: {path.name}, "
+            + ", ".join(f"{encoding or 'identity'}={len(body)}" for encoding, body in entry.bodies.items())
+        )
+        return entry
+
+    def invalidate(self, path: Path) -> None:
+        """移除指定文件的缓存"""
+        with self._lock:
+            self._entries.pop(path, None)
+
+
+# 全局单例
+_cache: Optional[VisualHTMLCache] = None
+
+
+def get_visual_html_cache() -> VisualHTMLCache:
+    """获取可视化 HTML 缓存单例"""
+    global _cache
+    if _cache is None:
+        _cache = VisualHTMLCache()
+    return _cache
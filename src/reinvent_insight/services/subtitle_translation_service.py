@@ -3,10 +3,16 @@
 
 将英文字幕分段翻译为中文，同时纠正机器生成字幕的错误。
 使用 Gemini low thinking 模式进行高效翻译。
+
+每个翻译成功的片段按"片段字幕内容哈希 + 提示词版本"保存到视频的工作目录，
+失败重试或强制重新翻译时只翻译内容变化或缺失的片段。
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import os
 import re
 import yaml
 from pathlib import Path
@@ -15,7 +21,11 @@ from dataclasses import dataclass
 
 from reinvent_insight.infrastructure.ai.model_config import get_model_client
 from reinvent_insight.core import config as app_config
-from reinvent_insight.domain.prompts.subtitle import build_translation_prompt, build_correction_prompt
+from reinvent_insight.domain.prompts.subtitle import (
+    SUBTITLE_PROMPT_VERSION,
+    build_translation_prompt,
+    build_correction_prompt,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -65,9 +75,19 @@ class SubtitleTranslationService:
             return {}
     
     @property
-    def concurrent_delay(self) -> float:
-        """并发调用间隔（秒）"""
-        return self._translation_config.get('concurrent_delay', 1.0)
+    def max_concurrency(self) -> int:
+        """同时在途的翻译片段数上限"""
+        return max(1, int(self._translation_config.get('max_concurrency', 4)))
+    
+    @property
+    def max_retries(self) -> int:
+        """单个片段翻译失败后的重试次数"""
+        return int(self._translation_config.get('max_retries', 2))
+    
+    @property
+    def retry_backoff(self) -> float:
+        """片段重试的退避基数（秒），第 n 次重试等待 retry_backoff * 2^(n-1)"""
+        return float(self._translation_config.get('retry_backoff', 2.0))
     
     @property
     def chunk_size(self) -> int:
@@ -149,79 +169,80 @@ class SubtitleTranslationService:
         1. 前缀扩展："hello" -> "hello everyone" -> "hello everyone I'm"
         2. 后半段重叠："A and B" -> "B and C" (后一条以前一条的后半部分开头)
         
-        策略：检测重叠部分，从后一条中移除重叠内容
-        """
-        if not raw_cues:
-            return []
+        策略：逐轮线性遍历（见 _merge_rolling_pass），某一轮条目数不再减少时结束。
+        用循环代替递归，避免长字幕触发递归深度限制；每轮的重叠查找不再枚举
+        所有后缀长度。
         
+        注意不能把多轮合并为一次遍历：是否再跑一轮取决于整份字幕中是否有条目
+        被合并，而下一轮会对已移除过重叠的相邻字幕再次移除重叠，结果依赖全局，
+        只有逐轮执行才能与原有结果保持一致。实际的滚动字幕通常 3 轮内收敛。
+        """
         MIN_OVERLAP = 15  # 最小重叠字符数
         
-        result = []
-        i = 0
+        cues = raw_cues
+        while True:
+            result = self._merge_rolling_pass(cues, MIN_OVERLAP)
+            if len(result) >= len(cues):
+                return result
+            cues = result
+    
+    def _merge_rolling_pass(self, cues: List[Dict], min_overlap: int) -> List[Dict]:
+        """
+        滚动字幕去重的一轮遍历
         
-        while i < len(raw_cues):
-            current = raw_cues[i]
-            current_text = current['text']
+        下一条以当前字幕开头时合并（继承开始时间）；否则保留当前字幕，并从
+        下一条中移除与它重叠的前缀。移除后为空的字幕在下一轮被后一条合并。
+        """
+        result: List[Dict] = []
+        current: Optional[Dict] = None
+        for cue in cues:
+            next_text = cue['text']
+            if current is None:
+                current = {'start': cue['start'], 'end': cue['end'], 'text': next_text}
+                continue
             
-            # 检查是否与下一条有重叠
-            if i + 1 < len(raw_cues):
-                next_cue = raw_cues[i + 1]
-                next_text = next_cue['text']
-                
-                # 检查前缀扩展：下一条以当前开头
-                if next_text.startswith(current_text):
-                    # 跳过当前，使用更完整的下一条，但继承当前的开始时间
-                    raw_cues[i + 1] = {
-                        'start': current['start'],  # 继承当前的开始时间
-                        'end': next_cue['end'],
-                        'text': next_text
-                    }
-                    i += 1
-                    continue
-                
-                # 检查后半段重叠：当前的后半部分是下一条的前缀
-                overlap = self._find_overlap(current_text, next_text, MIN_OVERLAP)
-                if overlap:
-                    # 保留当前，修改下一条移除重叠部分
-                    result.append(current)
-                    # 修改下一条，移除重叠前缀
-                    raw_cues[i + 1] = {
-                        'start': next_cue['start'],
-                        'end': next_cue['end'],
-                        'text': next_text[len(overlap):].strip()
-                    }
-                    i += 1
-                    continue
+            # 检查前缀扩展：下一条以当前开头，使用更完整的下一条并继承开始时间
+            if next_text.startswith(current['text']):
+                current = {'start': current['start'], 'end': cue['end'], 'text': next_text}
+                continue
+            
+            # 检查后半段重叠：当前的后半部分是下一条的前缀，从下一条移除重叠部分
+            overlap = self._find_overlap(current['text'], next_text, min_overlap)
+            if overlap:
+                next_text = next_text[len(overlap):].strip()
             
-            # 无重叠，直接保留
             result.append(current)
-            i += 1
-        
-        # 过滤空字幕
-        result = [c for c in result if c['text'].strip()]
+            current = {'start': cue['start'], 'end': cue['end'], 'text': next_text}
         
-        # 递归处理，直到没有更多可合并的
-        if len(result) < len(raw_cues):
-            return self._deduplicate_rolling_subtitles(result)
+        if current is not None:
+            result.append(current)
         
-        return result
+        # 过滤空字幕
+        return [c for c in result if c['text'].strip()]
     
     def _find_overlap(self, text1: str, text2: str, min_overlap: int = 10) -> Optional[str]:
         """
-        查找 text1 的后缀和 text2 的前缀的重叠部分
+        查找 text1 的后缀和 text2 的前缀的最长重叠部分
+        
+        重叠部分必须以 text2 的前 min_overlap 个字符开头，用 str.find 定位
+        这些候选起点后逐个比较，不再枚举每个后缀长度。普通字幕中候选起点
+        很少；高度重复的文本中每个候选都要比较一次，最坏情况仍为 O(L²)。
         
         例如：
         text1 = "hello everyone I'm SAA Ramis and I lead product for elastic load balancing and"
         text2 = "product for elastic load balancing and API Gateway"
         返回："product for elastic load balancing and"
         """
-        # 从最长可能的重叠开始查找
-        max_overlap = min(len(text1), len(text2))
+        if min(len(text1), len(text2)) < min_overlap:
+            return None
         
-        for length in range(max_overlap, min_overlap - 1, -1):
-            suffix = text1[-length:]
-            if text2.startswith(suffix):
-                return suffix
+        head = text2[:min_overlap]
+        # 重叠不超过 text2 的长度，从最靠前（最长）的候选开始
+        pos = text1.find(head, max(0, len(text1) - len(text2)))
+        while pos != -1:
+            if text2.startswith(text1[pos:]):
+                return text1[pos:]
+            pos = text1.find(head, pos + 1)
         
         return None
     
@@ -585,70 +606,173 @@ class SubtitleTranslationService:
         except Exception as e:
             logger.warning(f"保存分片调试文件失败: {e}")
 
+    def _chunk_checkpoint_key(self, cues: List[SubtitleCue]) -> str:
+        """片段检查点键：片段字幕内容、语言和提示词版本的哈希"""
+        digest = hashlib.sha256()
+        digest.update(
+            f"{SUBTITLE_PROMPT_VERSION}|{self.source_language}|{self.target_language}".encode("utf-8")
+        )
+        for cue in cues:
+            digest.update(f"\n{cue.start}|{cue.end}|{cue.text}".encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def _load_chunk_checkpoint(self, video_id: str, key: str) -> Optional[List[SubtitleCue]]:
+        """读取已保存的片段翻译，不存在或损坏时返回 None"""
+        path = CHECKPOINT_DIR / video_id / f"{key}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return [
+                SubtitleCue(
+                    index=item['index'],
+                    start=item['start'],
+                    end=item['end'],
+                    text='',
+                    translated_text=item['translated_text']
+                )
+                for item in data['cues']
+            ]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"片段检查点损坏，重新翻译: {path.name}, {e}")
+            return None
+
+    def _save_chunk_checkpoint(self, video_id: str, key: str, translated_cues: List[SubtitleCue]) -> None:
+        """原子地保存片段翻译结果"""
+        chunk_dir = CHECKPOINT_DIR / video_id
+        path = chunk_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            chunk_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps({
+                'prompt_version': SUBTITLE_PROMPT_VERSION,
+                'cues': [
+                    {
+                        'index': cue.index,
+                        'start': cue.start,
+                        'end': cue.end,
+                        'translated_text': cue.translated_text
+                    }
+                    for cue in translated_cues
+                ]
+            }, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"保存片段检查点失败: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _prune_chunk_checkpoints(self, video_id: str, keep: set) -> None:
+        """删除不属于本次翻译的片段检查点（字幕或提示词已变化）"""
+        chunk_dir = CHECKPOINT_DIR / video_id
+        if not chunk_dir.exists():
+            return
+        removed = 0
+        for path in chunk_dir.iterdir():
+            if path.stem not in keep:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info(f"清理过期片段检查点: video_id={video_id}, {removed} 个")
+
     async def translate_chunk(self, cues: List[SubtitleCue], chunk_index: int, total_chunks: int, video_id: str = None) -> List[SubtitleCue]:
-        """翻译一个字幕片段，返回合并后的字幕列表（含分片校验和修正）"""
+        """
+        翻译一个字幕片段，失败时按指数退避重试，重试耗尽后保留原文
+
+        指定 video_id 时先查找片段检查点，命中则直接复用；翻译成功且最终质量分
+        达标时保存检查点，未达标的结果只用于本次输出，下次翻译时重新生成。
+        """
+        key = self._chunk_checkpoint_key(cues) if video_id else None
+        if key:
+            checkpoint = self._load_chunk_checkpoint(video_id, key)
+            if checkpoint is not None:
+                logger.info(f"片段 {chunk_index + 1}/{total_chunks} 复用已翻译的检查点")
+                return checkpoint
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                translated_cues, quality_score = await self._translate_chunk_once(
+                    cues, chunk_index, total_chunks, video_id
+                )
+                if key and quality_score >= self.CHUNK_QUALITY_THRESHOLD:
+                    self._save_chunk_checkpoint(video_id, key, translated_cues)
+                return translated_cues
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"翻译片段 {chunk_index + 1} 失败: {e}")
+                    break
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(
+                    f"翻译片段 {chunk_index + 1} 失败，{delay:.1f}秒后进行第 {attempt + 1} 次重试: {e}"
+                )
+                await asyncio.sleep(delay)
+        
+        # 失败时保留原文
+        for cue in cues:
+            cue.translated_text = cue.text
+        return cues
+    
+    async def _translate_chunk_once(
+        self,
+        cues: List[SubtitleCue],
+        chunk_index: int,
+        total_chunks: int,
+        video_id: str = None
+    ) -> Tuple[List[SubtitleCue], float]:
+        """翻译一次字幕片段（含分片校验和修正），返回合并后的字幕列表与最终质量分，失败时抛出异常"""
         logger.info(f"翻译字幕片段 {chunk_index + 1}/{total_chunks}，输入 {len(cues)} 条")
         
         prompt = self._build_translation_prompt(cues)
         
-        try:
-            client = get_model_client(self.TASK_TYPE)
-            response = await client.generate_content(prompt)
-            
-            # 解析大模型输出的合并后字幕
-            translated_cues = self._parse_translation_response(response)
+        client = get_model_client(self.TASK_TYPE)
+        response = await client.generate_content(prompt)
+        
+        # 解析大模型输出的合并后字幕
+        translated_cues = self._parse_translation_response(response)
+        
+        logger.info(f"片段 {chunk_index + 1} 初次翻译完成，{len(cues)} 条 -> {len(translated_cues)} 条")
+        
+        # 分片级别校验
+        diagnosis_report, quality_score = self._diagnose_chunk_issues(cues, translated_cues)
+        logger.info(f"片段 {chunk_index + 1} 质量评分: {quality_score:.1f}")
+        
+        # 保存分片调试文件
+        self._save_chunk_debug(
+            video_id, chunk_index, cues, translated_cues,
+            diagnosis_report, quality_score, retry_count=0
+        )
+        
+        # 如果质量不达标，触发修正
+        retry_count = 0
+        while quality_score < self.CHUNK_QUALITY_THRESHOLD and retry_count < self.MAX_CORRECTION_RETRIES:
+            retry_count += 1
+            logger.warning(
+                f"片段 {chunk_index + 1} 质量不达标 ({quality_score:.1f} < {self.CHUNK_QUALITY_THRESHOLD})，"
+                f"进行第 {retry_count} 次修正"
+            )
+            logger.info(f"诊断报告:\n{diagnosis_report}")
             
-            logger.info(f"片段 {chunk_index + 1} 初次翻译完成，{len(cues)} 条 -> {len(translated_cues)} 条")
+            # 执行修正
+            translated_cues = await self._correct_chunk(
+                cues, translated_cues, diagnosis_report, chunk_index
+            )
             
-            # 分片级别校验
+            # 重新校验
             diagnosis_report, quality_score = self._diagnose_chunk_issues(cues, translated_cues)
-            logger.info(f"片段 {chunk_index + 1} 质量评分: {quality_score:.1f}")
+            logger.info(f"片段 {chunk_index + 1} 修正后质量评分: {quality_score:.1f}")
             
-            # 保存分片调试文件
+            # 保存修正后的分片
             self._save_chunk_debug(
                 video_id, chunk_index, cues, translated_cues,
-                diagnosis_report, quality_score, retry_count=0
+                diagnosis_report, quality_score, retry_count=retry_count
             )
-            
-            # 如果质量不达标，触发修正
-            retry_count = 0
-            while quality_score < self.CHUNK_QUALITY_THRESHOLD and retry_count < self.MAX_CORRECTION_RETRIES:
-                retry_count += 1
-                logger.warning(
-                    f"片段 {chunk_index + 1} 质量不达标 ({quality_score:.1f} < {self.CHUNK_QUALITY_THRESHOLD})，"
-                    f"进行第 {retry_count} 次修正"
-                )
-                logger.info(f"诊断报告:\n{diagnosis_report}")
-                
-                # 执行修正
-                translated_cues = await self._correct_chunk(
-                    cues, translated_cues, diagnosis_report, chunk_index
-                )
-                
-                # 重新校验
-                diagnosis_report, quality_score = self._diagnose_chunk_issues(cues, translated_cues)
-                logger.info(f"片段 {chunk_index + 1} 修正后质量评分: {quality_score:.1f}")
-                
-                # 保存修正后的分片
-                self._save_chunk_debug(
-                    video_id, chunk_index, cues, translated_cues,
-                    diagnosis_report, quality_score, retry_count=retry_count
-                )
-            
-            if quality_score < self.CHUNK_QUALITY_THRESHOLD:
-                logger.warning(
-                    f"片段 {chunk_index + 1} 经过 {self.MAX_CORRECTION_RETRIES} 次修正仍未达标 "
-                    f"({quality_score:.1f})，使用当前结果"
-                )
-            
-            return translated_cues
-            
-        except Exception as e:
-            logger.error(f"翻译片段 {chunk_index + 1} 失败: {e}")
-            # 失败时保留原文
-            for cue in cues:
-                cue.translated_text = cue.text
-            return cues
+        
+        if quality_score < self.CHUNK_QUALITY_THRESHOLD:
+            logger.warning(
+                f"片段 {chunk_index + 1} 经过 {self.MAX_CORRECTION_RETRIES} 次修正仍未达标 "
+                f"({quality_score:.1f})，使用当前结果"
+            )
+        
+        return translated_cues, quality_score
     
     async def translate_subtitles(
         self, 
@@ -663,8 +787,8 @@ class SubtitleTranslationService:
         Args:
             vtt_content: VTT 字幕内容
             article_content: 可选，解读文章全文（提供全局上下文理解）
-            progress_callback: 进度回调函数，接收 (current, total) 参数
-            video_id: 视频 ID（仅用于日志）
+            progress_callback: 进度回调函数，每完成一个片段接收 (已完成片段数, 总片段数)
+            video_id: 视频 ID（用于片段检查点和调试文件）
             
         Returns:
             (翻译后的字幕列表, 翻译后的 VTT 内容)
@@ -685,44 +809,47 @@ class SubtitleTranslationService:
         chunks = [cues[i:i + self.chunk_size] for i in range(0, len(cues), self.chunk_size)]
         total_chunks = len(chunks)
         
-        logger.info(f"字幕分为 {total_chunks} 段进行并发翻译，间隔: {self.concurrent_delay}秒")
+        concurrency = min(self.max_concurrency, total_chunks)
+        logger.info(f"字幕分为 {total_chunks} 段进行并发翻译，最多同时 {concurrency} 段")
         
-        # 并发翻译，每个任务间隔启动
-        async def translate_with_delay(chunk: List[SubtitleCue], idx: int) -> Tuple[int, List[SubtitleCue]]:
-            """带延迟的翻译任务"""
-            # 根据索引计算延迟时间
-            delay = idx * self.concurrent_delay
-            if delay > 0:
-                await asyncio.sleep(delay)
-            
-            result = await self.translate_chunk(chunk, idx, total_chunks, video_id=video_id)
-            
-            if progress_callback:
+        # 工作队列：固定数量的 worker 依次领取片段，一个片段完成后立即开始下一个
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(chunks):
+            queue.put_nowait(item)
+        results: List[Optional[List[SubtitleCue]]] = [None] * total_chunks
+        completed = 0
+        
+        async def worker() -> None:
+            nonlocal completed
+            while True:
                 try:
-                    await progress_callback(idx + 1, total_chunks)
-                except Exception:
-                    pass
-            
-            return idx, result
-        
-        # 创建所有翻译任务
-        tasks = [
-            translate_with_delay(chunk, i) 
-            for i, chunk in enumerate(chunks)
-        ]
-        
-        # 并发执行所有任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 按索引顺序收集结果
-        translated_cues = []
-        for result in sorted(results, key=lambda x: x[0] if isinstance(x, tuple) else float('inf')):
-            if isinstance(result, tuple):
-                _, cue_list = result
-                translated_cues.extend(cue_list)
-            else:
-                # 异常情况，记录错误
-                logger.error(f"翻译任务异常: {result}")
+                    idx, chunk = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                
+                results[idx] = await self.translate_chunk(chunk, idx, total_chunks, video_id=video_id)
+                completed += 1
+                
+                # 按完成顺序汇报进度
+                if progress_callback:
+                    try:
+                        await progress_callback(completed, total_chunks)
+                    except Exception as e:
+                        logger.warning(f"翻译进度回调失败: {e}")
+        
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+        
+        # 按片段顺序组装结果
+        translated_cues = [cue for chunk_result in results for cue in chunk_result]
+        
+        if video_id:
+            self._prune_chunk_checkpoints(video_id, {self._chunk_checkpoint_key(chunk) for chunk in chunks})
         
         # 规范化时间轴，确保无重叠
         translated_cues = self._normalize_timeline(translated_cues)
@@ -927,6 +1054,9 @@ _translating_videos: set = set()
 TRANSLATED_SUBTITLE_DIR = app_config.SUBTITLE_DIR / "translated"
 TRANSLATED_SUBTITLE_DIR.mkdir(exist_ok=True)
 
+# 分片翻译检查点目录（每个视频一个子目录）
+CHECKPOINT_DIR = TRANSLATED_SUBTITLE_DIR / "work"
+
 # 分片调试目录（使用 config 中的缓存目录）
 CHUNK_DEBUG_DIR = app_config.CHUNK_DEBUG_DIR
 
@@ -974,7 +1104,7 @@ async def trigger_subtitle_translation(
     Args:
         video_id: YouTube 视频 ID
         article_content: 解读文章内容（作为翻译上下文）
-        force: 是否强制重新翻译
+        force: 是否强制重新翻译（仍复用内容未变化的片段检查点）
         
     Returns:
         True 表示已触发或已完成，False 表示失败
@@ -0,0 +1,268 @@
+"""
+TTS 音频生成去重（single-flight）
+
+多个听众同时打开同一篇文章时，/api/tts/generate、/api/tts/stream 和预生成
+服务会针对同一个音频哈希各自调用 generate_audio_stream。本模块按音频哈希
+登记进行中的生成：第一个请求方启动生成，之后的请求方附加到同一次生成上，
+先回放已生成的 PCM，再跟随新生成的片段。
+
+生成的 PCM 追加写入缓存目录中的部分音频文件（{audio_hash}_partial.wav），
+订阅方从文件按片段边界读取，内存中不保留已生成的音频。生成完成后部分文件
+被原子地重命名为正式缓存文件。
+"""
+
+import asyncio
+import logging
+import shutil
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+
+from reinvent_insight.infrastructure.audio.audio_utils import (
+    WAV_HEADER_SIZE,
+    StreamingWavWriter,
+    decode_base64_pcm,
+)
+from .audio_cache import AudioCache
+
+logger = logging.getLogger(__name__)
+
+
+class AudioGeneration:
+    """一次进行中的音频生成"""
+
+    def __init__(self, audio_hash: str, audio_cache: AudioCache):
+        """
+        创建部分音频文件
+
+        Args:
+            audio_hash: 音频哈希值
+            audio_cache: 生成结果写入的音频缓存
+        """
+        self.audio_hash = audio_hash
+        self.audio_cache = audio_cache
+        self.writer = StreamingWavWriter(audio_cache.get_file_path(f"{audio_hash}_partial"))
+        self.path: Path = self.writer.path
+        self.final_path: Optional[Path] = None
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+        # 每个片段结束位置（PCM 字节偏移），订阅方按此边界回放
+        self._offsets: List[int] = []
+        # 每次状态变化时替换，等待方只需等待当前事件
+        self._changed = asyncio.Event()
+
+    @property
+    def chunk_count(self) -> int:
+        """已生成的片段数"""
+        return len(self._offsets)
+
+    @property
+    def duration(self) -> float:
+        """已生成音频的时长（秒）"""
+        return self.writer.duration
+
+    def _notify(self) -> None:
+        """唤醒所有等待中的订阅方"""
+        changed = self._changed
+        self._changed = asyncio.Event()
+        changed.set()
+
+    def append(self, pcm_data: bytes) -> None:
+        """追加一个 PCM 片段"""
+        self.writer.append(pcm_data)
+        self.writer.flush()
+        self._offsets.append(self.writer.pcm_size)
+        self._notify()
+
+    def checkpoint(self) -> None:
+        """回写部分音频文件的 WAV 头，使其可以直接播放"""
+        if not self.done and self.error is None:
+            self.writer.checkpoint()
+
+    def finish(self) -> Path:
+        """生成完成，将部分音频文件重命名为正式缓存文件"""
+        self.final_path = self.writer.finalize(self.audio_cache.get_file_path(self.audio_hash))
+        self.done = True
+        self._notify()
+        return self.final_path
+
+    def fail(self, error: BaseException) -> None:
+        """生成失败，删除部分音频文件"""
+        self.writer.abort()
+        self.error = error
+        self._notify()
+
+    def subscribe(self) -> AsyncIterator[bytes]:
+        """
+        订阅生成的 PCM 片段：先回放已生成的部分，再跟随新片段直到结束
+
+        文件在调用时立即打开，之后的重命名不影响读取。
+
+        Raises:
+            生成失败时抛出原始异常
+        """
+        if self.error is not None:
+            raise self.error
+        f = open(self.final_path if self.done else self.path, 'rb')
+        return self._replay(f)
+
+    async def _replay(self, f: BinaryIO) -> AsyncIterator[bytes]:
+        """按片段边界从文件读取 PCM"""
+        try:
+            index = 0
+            start = 0
+            while True:
+                changed = self._changed
+                while index < len(self._offsets):
+                    end = self._offsets[index]
+                    f.seek(WAV_HEADER_SIZE + start)
+                    data = f.read(end - start)
+                    start = end
+                    index += 1
+                    yield data
+                if self.error is not None:
+                    raise self.error
+                if self.done:
+                    return
+                await changed.wait()
+        finally:
+            f.close()
+
+    async def wait(self) -> Path:
+        """
+        等待生成结束
+
+        Returns:
+            正式缓存文件路径
+
+        Raises:
+            生成失败时抛出原始异常
+        """
+        while not self.done:
+            if self.error is not None:
+                raise self.error
+            await self._changed.wait()
+        return self.final_path
+
+    def store_in(self, audio_cache: AudioCache, **metadata) -> Path:
+        """
+        将生成结果登记到指定缓存（可补充文章哈希等元数据）
+
+        缓存目录与生成时不同时先复制文件（生成缓存已压缩时复制压缩文件）。
+        登记后按目标缓存的配置在后台压缩。
+
+        Args:
+            audio_cache: 目标音频缓存
+            **metadata: 传给 AudioCache.register 的元数据（text_hash、voice、language 等）
+
+        Returns:
+            目标缓存中的文件路径
+        """
+        source = self.audio_cache.locate(self.audio_hash) or self.final_path
+        file_path = audio_cache.get_file_path(self.audio_hash).with_suffix(source.suffix)
+        if file_path != source:
+            shutil.copyfile(source, file_path)
+        file_path = audio_cache.register(
+            audio_hash=self.audio_hash,
+            file_path=file_path,
+            duration=self.duration,
+            **metadata
+        )
+        audio_cache.schedule_compress(self.audio_hash)
+        return file_path
+
+
+class TTSGenerationRegistry:
+    """按音频哈希登记进行中的生成"""
+
+    def __init__(self):
+        self._inflight: Dict[str, AudioGeneration] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def get(self, audio_hash: str) -> Optional[AudioGeneration]:
+        """获取进行中的生成"""
+        return self._inflight.get(audio_hash)
+
+    def start(
+        self,
+        tts_service,
+        audio_cache: AudioCache,
+        audio_hash: str,
+        text: str,
+        voice: str,
+        language: str,
+        skip_code_blocks: bool = True
+    ) -> AudioGeneration:
+        """
+        获取同一音频哈希进行中的生成，不存在时启动新的生成
+
+        生成在后台任务中运行，所有订阅方断开后仍会完成并写入缓存。
+
+        Args:
+            tts_service: TTS 服务
+            audio_cache: 生成结果写入的音频缓存
+            audio_hash: 音频哈希值（tts_service.calculate_hash(text, voice, language)）
+            text: 文本内容
+            voice: 音色名称
+            language: 语言类型
+            skip_code_blocks: 是否跳过代码块
+
+        Returns:
+            进行中的生成
+        """
+        generation = self._inflight.get(audio_hash)
+        if generation is not None:
+            logger.info(f"附加到进行中的TTS生成: {audio_hash}, 已生成 {generation.chunk_count} 个片段")
+            return generation
+
+        generation = AudioGeneration(audio_hash, audio_cache)
+        self._inflight[audio_hash] = generation
+        self._tasks[audio_hash] = asyncio.create_task(
+            self._run(generation, tts_service, text, voice, language, skip_code_blocks)
+        )
+        return generation
+
+    async def _run(
+        self,
+        generation: AudioGeneration,
+        tts_service,
+        text: str,
+        voice: str,
+        language: str,
+        skip_code_blocks: bool
+    ) -> None:
+        """驱动一次生成直到结束，并把结果登记到缓存"""
+        audio_hash = generation.audio_hash
+        try:
+            async for chunk in tts_service.generate_audio_stream(text, voice, language, skip_code_blocks):
+                generation.append(decode_base64_pcm(chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk))
+            generation.finish()
+            generation.store_in(
+                generation.audio_cache,
+                text_hash=tts_service.calculate_hash(text, "", ""),
+                voice=voice,
+                language=language
+            )
+        except asyncio.CancelledError:
+            generation.fail(RuntimeError("TTS生成已取消"))
+            raise
+        except Exception as e:
+            logger.error(f"TTS生成失败: {audio_hash}, 错误: {e}")
+            if not generation.done:
+                generation.fail(e)
+        finally:
+            if self._inflight.get(audio_hash) is generation:
+                del self._inflight[audio_hash]
+                self._tasks.pop(audio_hash, None)
+
+
+# 全局单例
+_registry: Optional[TTSGenerationRegistry] = None
+
+
+def get_generation_registry() -> TTSGenerationRegistry:
+    """获取 TTS 生成登记表单例"""
+    global _registry
+    if _registry is None:
+        _registry = TTSGenerationRegistry()
+    return _registry
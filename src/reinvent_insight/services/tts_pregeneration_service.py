@@ -26,7 +26,7 @@ from reinvent_insight.core.config import (
 from .tts_text_preprocessor import TTSTextPreprocessor
 from .tts_service import TTSService
 from .audio_cache import AudioCache
-from reinvent_insight.infrastructure.audio.audio_utils import assemble_wav, decode_base64_pcm, calculate_audio_duration
+from .tts_generation import get_generation_registry
 
 logger = logging.getLogger(__name__)
 
@@ -241,7 +241,6 @@ class TTSPregenerationService:
             
             # 3. 生成音频
             logger.info(f"任务 {task.task_id}: 开始生成音频")
-            audio_chunks = []
             chunk_count = 0
             
             # 从配置获取默认音色和语言
@@ -255,96 +254,83 @@ class TTSPregenerationService:
                 default_language
             )
             
-            # 渐进式缓存：每 10 个片段保存一次部分音频（约 6-10 秒音频）
+            # 渐进式缓存：PCM 追加到部分音频文件，每 10 个片段（约 6-10 秒音频）
+            # 回写一次 WAV 头并登记，生成结束后原子地重命名为完整音频。
+            # 同一音频正在由其他请求生成时直接附加到该次生成上。
             PARTIAL_SAVE_INTERVAL = 10
-            
-            async for chunk in self.tts_service.generate_audio_stream(
+            partial_hash = f"{audio_hash}_partial"
+            cache_kwargs = dict(
+                text_hash=preprocess_result.article_hash,
+                voice=default_voice,
+                language=default_language,
+                article_hash=preprocess_result.article_hash,
+                source_file=task.source_file,
+                preprocessing_version=TTS_PREPROCESSING_VERSION
+            )
+            generation = get_generation_registry().start(
+                self.tts_service,
+                self.audio_cache,
+                audio_hash,
                 preprocess_result.text,
-                voice=None,  # 使用配置默认值
-                language=None,  # 使用配置默认值
+                default_voice,
+                default_language,
                 skip_code_blocks=True
-            ):
-                # 解码 Base64
-                pcm_data = decode_base64_pcm(chunk)
-                audio_chunks.append(pcm_data)
-                chunk_count += 1
-                
-                # 更新任务进度
-                task.chunks_generated = chunk_count
-                
-                # 每 N 个片段保存一次部分音频
-                if chunk_count % PARTIAL_SAVE_INTERVAL == 0:
-                    try:
-                        partial_wav = assemble_wav(audio_chunks, sample_rate=24000)
-                        partial_duration = calculate_audio_duration(len(partial_wav) - 44)
-                        
-                        # 使用 article_hash + "_partial" 作为部分音频的 hash
-                        partial_hash = f"{audio_hash}_partial"
-                        
-                        # 缓存部分音频
-                        self.audio_cache.put(
-                            audio_hash=partial_hash,
-                            audio_data=partial_wav,
-                            text_hash=preprocess_result.article_hash,
-                            voice=default_voice,
-                            language=default_language,
-                            duration=partial_duration,
-                            article_hash=preprocess_result.article_hash,
-                            source_file=task.source_file,
-                            preprocessing_version=TTS_PREPROCESSING_VERSION,
-                            is_pregenerated=False  # 标记为部分音频
-                        )
-                        
-                        task.partial_audio_hash = partial_hash
-                        self._save_tasks()
-                        
-                        logger.info(
-                            f"任务 {task.task_id}: 保存部分音频 {chunk_count} 片段, "
-                            f"时长 {partial_duration:.2f}s"
-                        )
-                    except Exception as e:
-                        logger.warning(f"保存部分音频失败: {e}")
+            )
+            # 部分音频只能登记到生成文件所在的缓存
+            can_save_partial = generation.audio_cache.cache_dir == self.audio_cache.cache_dir
+            
+            try:
+                async for _ in generation.subscribe():
+                    chunk_count += 1
+                    
+                    # 更新任务进度
+                    task.chunks_generated = chunk_count
+                    
+                    # 每 N 个片段保存一次部分音频
+                    if can_save_partial and chunk_count % PARTIAL_SAVE_INTERVAL == 0:
+                        try:
+                            generation.checkpoint()
+                            self.audio_cache.register(
+                                audio_hash=partial_hash,
+                                file_path=generation.path,
+                                duration=generation.duration,
+                                is_pregenerated=False,  # 标记为部分音频
+                                **cache_kwargs
+                            )
+                            
+                            task.partial_audio_hash = partial_hash
+                            self._save_tasks()
+                            
+                            logger.info(
+                                f"任务 {task.task_id}: 保存部分音频 {chunk_count} 片段, "
+                                f"时长 {generation.duration:.2f}s"
+                            )
+                        except Exception as e:
+                            logger.warning(f"保存部分音频失败: {e}")
+                    
+                    if chunk_count % 10 == 0:
+                        logger.debug(f"任务 {task.task_id}: 已生成 {chunk_count} 个音频块")
                 
-                if chunk_count % 10 == 0:
-                    logger.debug(f"任务 {task.task_id}: 已生成 {chunk_count} 个音频块")
+                # 4. 等待完整 WAV 文件替换部分缓存
+                await generation.wait()
+            finally:
+                # 生成结束后部分音频文件已被重命名或删除，移除其缓存记录
+                generation_finished = generation.done or generation.error is not None
+                if generation_finished and task.partial_audio_hash and \
+                        self.audio_cache.invalidate(task.partial_audio_hash):
+                    logger.info(f"已删除部分缓存: {task.partial_audio_hash}")
             
             # 记录总片段数
             task.total_chunks = chunk_count
-            logger.info(f"任务 {task.task_id}: 音频流生成完成，共 {chunk_count} 块")
-            
-            # 4. 组装 WAV 文件
-            wav_data = assemble_wav(audio_chunks, sample_rate=24000)
-            duration = calculate_audio_duration(len(wav_data) - 44)  # 减去 WAV 头
-            
+            duration = generation.duration
             logger.info(
-                f"任务 {task.task_id}: WAV 文件组装完成, "
-                f"大小 {len(wav_data) / 1024:.2f}KB, "
+                f"任务 {task.task_id}: 音频流生成完成，共 {chunk_count} 块, "
+                f"大小 {generation.writer.file_size / 1024:.2f}KB, "
                 f"时长 {duration:.2f}s"
             )
             
-            # 5. 缓存完整音频（替换部分缓存）
-            self.audio_cache.put(
-                audio_hash=audio_hash,
-                audio_data=wav_data,
-                text_hash=preprocess_result.article_hash,
-                voice=default_voice,
-                language=default_language,
-                duration=duration,
-                article_hash=preprocess_result.article_hash,
-                source_file=task.source_file,
-                preprocessing_version=TTS_PREPROCESSING_VERSION,
-                is_pregenerated=True
-            )
-            
-            # 删除部分缓存（如果存在）
-            if task.partial_audio_hash:
-                try:
-                    partial_path = self.audio_cache.cache_dir / f"{task.partial_audio_hash}.wav"
-                    if partial_path.exists():
-                        partial_path.unlink()
-                        logger.info(f"已删除部分缓存: {task.partial_audio_hash}")
-                except Exception as e:
-                    logger.warning(f"删除部分缓存失败: {e}")
+            # 5. 登记完整音频
+            generation.store_in(self.audio_cache, is_pregenerated=True, **cache_kwargs)
             
             # 6. 更新任务状态
             task.status = TaskStatus.COMPLETED
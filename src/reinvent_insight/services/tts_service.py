@@ -239,6 +239,9 @@ class TTSService:
         """
         生成音频流
         
+        长文本不再按 max_output_tokens 分块逐块调用：客户端的片段流水线
+        覆盖全文，各片段按顺序输出。
+        
         Args:
             text: 原始文本
             voice: 音色名称，None 则使用配置默认值
@@ -267,24 +270,12 @@ class TTSService:
         
         logger.info(f"开始生成音频流，文本长度: {len(cleaned_text)}，音色: {voice}")
         
-        # 如果文本超过限制，分块处理
-        max_chars = self.config.max_output_tokens
-        if len(cleaned_text) > max_chars:
-            chunks = self.chunk_text(cleaned_text, max_chars)
-            logger.info(f"文本过长，分为 {len(chunks)} 块处理")
-            
-            for i, chunk in enumerate(chunks):
-                logger.info(f"处理第 {i + 1}/{len(chunks)} 块")
-                async for audio_chunk in self.client.generate_tts_stream(
-                    chunk, voice, language
-                ):
-                    yield audio_chunk
-        else:
-            # 直接生成
-            async for audio_chunk in self.client.generate_tts_stream(
-                cleaned_text, voice, language
-            ):
-                yield audio_chunk
+        # 客户端会按句子切分为短片段并以流水线方式合成，全文一次交给客户端，
+        # 流水线贯穿整篇文本，不会在分块边界处排空
+        async for audio_chunk in self.client.generate_tts_stream(
+            cleaned_text, voice, language
+        ):
+            yield audio_chunk
     
     async def generate_audio(
         self,
@@ -10,14 +10,18 @@ import markdown
 import os
 import re
 import argparse
+import hashlib
+import json
 import sys
+import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from bs4 import BeautifulSoup, NavigableString
 from weasyprint import HTML, CSS
 from weasyprint.text.fonts import FontConfiguration
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 def parse_front_matter(markdown_text: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], str]:
@@ -68,12 +72,33 @@ class MarkdownToPDFConverter:
         """
         self.css_paths = css_paths
         self._validate_css_files()
+
+        # 解析后的样式表缓存：(CSS 修改时间, 样式表列表, 字体配置)
+        self._stylesheet_cache: Optional[Tuple[Tuple[float, ...], List[CSS], FontConfiguration]] = None
         
     def _validate_css_files(self):
         """验证CSS文件是否存在"""
         for css_path in self.css_paths:
             if not os.path.exists(css_path):
                 raise FileNotFoundError(f"CSS文件不存在: {css_path}")
+
+    def get_stylesheets(self) -> Tuple[List[CSS], FontConfiguration]:
+        """
+        获取解析后的样式表，CSS 文件未修改时复用上次的解析结果
+
+        Returns:
+            (样式表列表, 字体配置)
+        """
+        mtimes = tuple(os.path.getmtime(css_path) for css_path in self.css_paths)
+        if self._stylesheet_cache is None or self._stylesheet_cache[0] != mtimes:
+            font_config = FontConfiguration()
+            stylesheets = []
+            for css_path in self.css_paths:
+                with open(css_path, 'r', encoding='utf-8') as f:
+                    css_string = f.read()
+                stylesheets.append(CSS(string=css_string, font_config=font_config))
+            self._stylesheet_cache = (mtimes, stylesheets, font_config)
+        return self._stylesheet_cache[1], self._stylesheet_cache[2]
     
     @staticmethod
     def markdown_to_custom_html(markdown_text: str) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
@@ -184,14 +209,8 @@ class MarkdownToPDFConverter:
         </html>
         '''
 
-        # 读取和准备CSS样式表
-        stylesheets = []
-        font_config = FontConfiguration()
-        
-        for css_path in self.css_paths:
-            with open(css_path, 'r', encoding='utf-8') as f:
-                css_string = f.read()
-            stylesheets.append(CSS(string=css_string, font_config=font_config))
+        # 获取解析后的CSS样式表（多次调用复用）
+        stylesheets, font_config = self.get_stylesheets()
         
         # 创建WeasyPrint HTML对象
         base_url = os.path.dirname(os.path.abspath(self.css_paths[0])) if self.css_paths else '.'
@@ -205,20 +224,83 @@ class MarkdownToPDFConverter:
         )
 
 
+# 批量模式下工作进程中的转换器（进程初始化时创建）
+_worker_converter: Optional[MarkdownToPDFConverter] = None
+
+
+def _init_worker(css_paths: List[str]) -> None:
+    """工作进程初始化：创建转换器并预先解析样式表"""
+    global _worker_converter
+    _worker_converter = MarkdownToPDFConverter(css_paths)
+    _worker_converter.get_stylesheets()
+
+
+def _render_in_worker(md_file: str, output_pdf: str) -> float:
+    """在工作进程中渲染单个文件"""
+    return render_markdown_file(_worker_converter, md_file, output_pdf)
+
+
+def render_markdown_file(converter: MarkdownToPDFConverter, md_file: str, output_pdf: str) -> float:
+    """
+    渲染单个Markdown文件
+
+    先写入临时文件再替换，中断时不会留下不完整的PDF；
+    PDF修改时间与源文件对齐，与下载接口的过期判断一致。
+
+    Returns:
+        渲染耗时（秒）
+    """
+    start_time = time.monotonic()
+    source_stat = os.stat(md_file)
+    with open(md_file, 'r', encoding='utf-8') as f:
+        markdown_content = f.read()
+
+    temp_pdf = f"{output_pdf}.{os.getpid()}.tmp"
+    try:
+        converter.generate_pdf(markdown_content, temp_pdf)
+        os.utime(temp_pdf, ns=(source_stat.st_mtime_ns, source_stat.st_mtime_ns))
+        os.replace(temp_pdf, output_pdf)
+    finally:
+        if os.path.exists(temp_pdf):
+            os.remove(temp_pdf)
+    return time.monotonic() - start_time
+
+
+def _hash_files(paths: List[str]) -> str:
+    """计算文件内容的SHA256"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
 class PDFBatchGenerator:
     """PDF批量生成器类"""
     
-    def __init__(self, converter: MarkdownToPDFConverter):
+    # 输出目录中记录已生成文件的清单（用于跳过未变化的文件和中断后续跑）
+    MANIFEST_NAME = '.pdf_manifest.json'
+    
+    def __init__(self, converter: MarkdownToPDFConverter, jobs: int = 1):
         """
         初始化批量生成器
         
         Args:
             converter: Markdown到PDF转换器实例
+            jobs: 并行渲染的进程数（1 表示在当前进程中逐个渲染）
         """
         self.converter = converter
+        self.jobs = max(1, jobs)
         self.success_count = 0
+        self.skip_count = 0
         self.error_count = 0
         self.errors: List[Tuple[str, str]] = []
+        self.timings: List[Tuple[str, float]] = []
+        self.elapsed = 0.0
+        
+        self.style_hash = _hash_files(converter.css_paths)
+        self.manifest: Dict[str, Dict] = {}
+        self.manifest_path: Optional[str] = None
         
     def process_directory(self, input_dir: str, output_dir: str, 
                          overwrite: bool = False) -> None:
@@ -242,11 +324,11 @@ class PDFBatchGenerator:
             
         print(f"📁 找到 {len(md_files)} 个Markdown文件待处理")
         print(f"📂 输出目录: {output_dir}")
+        if self.jobs > 1:
+            print(f"⚙️  并行进程数: {self.jobs}")
         print("-" * 60)
         
-        # 处理每个文件
-        for i, md_file in enumerate(md_files, 1):
-            self._process_single_file(md_file, output_dir, overwrite, i, len(md_files))
+        self._process_files(md_files, output_dir, overwrite)
             
         # 打印总结
         self._print_summary()
@@ -262,7 +344,7 @@ class PDFBatchGenerator:
             overwrite: 是否覆盖已存在的PDF文件
         """
         os.makedirs(output_dir, exist_ok=True)
-        self._process_single_file(input_file, output_dir, overwrite, 1, 1)
+        self._process_files([input_file], output_dir, overwrite)
         self._print_summary()
         
     def _find_markdown_files(self, directory: str) -> List[str]:
@@ -272,47 +354,184 @@ class PDFBatchGenerator:
             if file.endswith('.md'):
                 md_files.append(os.path.join(directory, file))
         return md_files
+    
+    def _load_manifest(self, output_dir: str) -> None:
+        """读取输出目录中的生成清单"""
+        self.manifest_path = os.path.join(output_dir, self.MANIFEST_NAME)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️  生成清单读取失败，将重新判断: {e}")
+    
+    def _save_manifest(self) -> None:
+        """原子地写回生成清单"""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
+    
+    def _check_up_to_date(self, md_file: str, output_pdf: str, 
+                          overwrite: bool) -> Tuple[Optional[str], Optional[str]]:
+        """
+        判断PDF是否需要重新生成
         
-    def _process_single_file(self, md_file: str, output_dir: str, 
-                            overwrite: bool, current: int, total: int) -> None:
-        """处理单个文件的内部方法"""
-        # 获取文件名（不含扩展名）
-        base_name = os.path.splitext(os.path.basename(md_file))[0]
-        output_pdf = os.path.join(output_dir, f"{base_name}.pdf")
+        没有清单记录的已有PDF沿用原来的行为（跳过，除非 --overwrite）；
+        有记录的PDF在样式表或源文件内容变化时重新生成。
+        
+        Returns:
+            (跳过原因, 源文件哈希)；跳过原因为 None 表示需要生成
+        """
+        base_name = os.path.basename(output_pdf)
+        if overwrite or not os.path.exists(output_pdf):
+            return None, None
+        
+        entry = self.manifest.get(base_name)
+        if entry is None:
+            return "已存在", None
+        if entry.get('style_hash') != self.style_hash:
+            return None, None
+        
+        source_stat = os.stat(md_file)
+        if entry.get('mtime_ns') == source_stat.st_mtime_ns and entry.get('size') == source_stat.st_size:
+            return "未变化", None
+        
+        # 修改时间变化但内容相同（如重新同步的文件）时只更新记录
+        source_hash = _hash_files([md_file])
+        if entry.get('source_hash') == source_hash:
+            entry['mtime_ns'] = source_stat.st_mtime_ns
+            entry['size'] = source_stat.st_size
+            return "内容未变化", source_hash
+        return None, source_hash
+        
+    def _process_files(self, md_files: List[str], output_dir: str, overwrite: bool) -> None:
+        """跳过已是最新的文件，渲染其余文件"""
+        self._load_manifest(output_dir)
+        start_time = time.monotonic()
+        
+        pending = []
+        total = len(md_files)
+        for i, md_file in enumerate(md_files, 1):
+            base_name = os.path.splitext(os.path.basename(md_file))[0]
+            output_pdf = os.path.join(output_dir, f"{base_name}.pdf")
+            skip_reason, source_hash = self._check_up_to_date(md_file, output_pdf, overwrite)
+            if skip_reason:
+                print(f"⏭️  [{i}/{total}] 跳过（{skip_reason}）: {base_name}")
+                self.skip_count += 1
+            else:
+                # 渲染前记录源文件状态，渲染期间源文件再次修改时下次运行会重新生成
+                source_stat = os.stat(md_file)
+                pending.append((md_file, output_pdf, {
+                    'source_hash': source_hash or _hash_files([md_file]),
+                    'mtime_ns': source_stat.st_mtime_ns,
+                    'size': source_stat.st_size,
+                }))
         
-        # 检查是否需要跳过
-        if os.path.exists(output_pdf) and not overwrite:
-            print(f"⏭️  [{current}/{total}] 跳过（已存在）: {base_name}")
-            return
-            
         try:
-            # 读取Markdown文件
-            with open(md_file, 'r', encoding='utf-8') as f:
-                markdown_content = f.read()
-                
-            # 生成PDF
-            print(f"🔄 [{current}/{total}] 正在处理: {base_name}")
-            start_time = datetime.now()
-            
-            self.converter.generate_pdf(markdown_content, output_pdf)
-            
-            duration = (datetime.now() - start_time).total_seconds()
-            print(f"✅ [{current}/{total}] 完成: {base_name} (耗时 {duration:.2f}秒)")
-            self.success_count += 1
+            if self.jobs > 1 and len(pending) > 1:
+                self._render_parallel(pending)
+            else:
+                self._render_sequential(pending)
+        except KeyboardInterrupt:
+            print("\n⚠️  已中断：完成的文件已记录，重新运行将从中断处继续")
+            raise
+        finally:
+            self.elapsed = time.monotonic() - start_time
+            self._save_manifest()
+    
+    def _render_sequential(self, pending: List[Tuple[str, str, Dict]]) -> None:
+        """在当前进程中逐个渲染"""
+        for i, (md_file, output_pdf, entry) in enumerate(pending, 1):
+            base_name = os.path.splitext(os.path.basename(output_pdf))[0]
+            print(f"🔄 [{i}/{len(pending)}] 正在处理: {base_name}")
+            try:
+                duration = render_markdown_file(self.converter, md_file, output_pdf)
+            except Exception as e:
+                self._record_failure(base_name, e, i, len(pending))
+            else:
+                self._record_success(output_pdf, entry, duration, i, len(pending))
+    
+    def _render_parallel(self, pending: List[Tuple[str, str, Dict]]) -> None:
+        """在进程池中并行渲染，每个工作进程只解析一次样式表"""
+        workers = min(self.jobs, len(pending))
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.converter.css_paths,)
+        )
+        try:
+            futures = {
+                executor.submit(_render_in_worker, md_file, output_pdf): (output_pdf, entry)
+                for md_file, output_pdf, entry in pending
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                output_pdf, entry = futures[future]
+                base_name = os.path.splitext(os.path.basename(output_pdf))[0]
+                try:
+                    duration = future.result()
+                except Exception as e:
+                    self._record_failure(base_name, e, i, len(pending))
+                else:
+                    self._record_success(output_pdf, entry, duration, i, len(pending))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _record_success(self, output_pdf: str, entry: Dict, duration: float,
+                        current: int, total: int) -> None:
+        """记录生成成功的文件并写回清单"""
+        base_name = os.path.splitext(os.path.basename(output_pdf))[0]
+        self.manifest[os.path.basename(output_pdf)] = {
+            **entry,
+            'style_hash': self.style_hash,
+            'duration': round(duration, 3),
+            'generated_at': datetime.now().isoformat(),
+        }
+        self._save_manifest()
+        print(f"✅ [{current}/{total}] 完成: {base_name} (耗时 {duration:.2f}秒)")
+        self.success_count += 1
+        self.timings.append((base_name, duration))
+    
+    def _record_failure(self, base_name: str, error: Exception, current: int, total: int) -> None:
+        """记录生成失败的文件"""
+        print(f"❌ [{current}/{total}] 失败: {base_name}")
+        print(f"   错误: {str(error)}")
+        self.error_count += 1
+        self.errors.append((base_name, str(error)))
             
-        except Exception as e:
-            print(f"❌ [{current}/{total}] 失败: {base_name}")
-            print(f"   错误: {str(e)}")
-            self.error_count += 1
-            self.errors.append((base_name, str(e)))
+    def write_report(self, report_path: str) -> None:
+        """将每个文件的耗时写入JSON报告"""
+        report = {
+            'jobs': self.jobs,
+            'elapsed': round(self.elapsed, 3),
+            'success': self.success_count,
+            'skipped': self.skip_count,
+            'failed': self.error_count,
+            'files': [{'name': name, 'duration': round(duration, 3)} for name, duration in self.timings],
+            'errors': [{'name': name, 'error': error} for name, error in self.errors],
+        }
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📝 耗时报告已写入: {report_path}")
             
     def _print_summary(self) -> None:
         """打印处理总结"""
         print("-" * 60)
         print(f"📊 处理总结:")
         print(f"   ✅ 成功: {self.success_count} 个文件")
+        print(f"   ⏭️  跳过: {self.skip_count} 个文件")
         print(f"   ❌ 失败: {self.error_count} 个文件")
         
+        if self.timings:
+            render_total = sum(duration for _, duration in self.timings)
+            print(f"   ⏱️  总耗时 {self.elapsed:.2f}秒，渲染累计 {render_total:.2f}秒，"
+                  f"平均每个 {render_total / len(self.timings):.2f}秒")
+            slowest = sorted(self.timings, key=lambda item: item[1], reverse=True)[:5]
+            print("\n🐢 最慢的文件:")
+            for name, duration in slowest:
+                print(f"   - {name}: {duration:.2f}秒")
+        
         if self.errors:
             print("\n❌ 错误详情:")
             for filename, error in self.errors:
@@ -337,6 +556,12 @@ def main():
   
   # 覆盖已存在的PDF文件
   python generate_pdfs.py --overwrite
+  
+  # 使用 4 个进程并行生成，并输出每个文件的耗时报告
+  python generate_pdfs.py -j 4 --report pdf_report.json
+  
+生成记录保存在输出目录的 .pdf_manifest.json 中：样式表或源文件内容变化时
+重新生成，其余文件跳过；中断后重新运行会从中断处继续。
         """
     )
     
@@ -368,6 +593,18 @@ def main():
         help='自定义CSS文件路径（可选）'
     )
     
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='并行渲染的进程数（默认: 1）'
+    )
+    
+    parser.add_argument(
+        '--report',
+        help='将每个文件的渲染耗时写入JSON报告（可选）'
+    )
+    
     args = parser.parse_args()
     
     # 获取项目根目录
@@ -386,7 +623,7 @@ def main():
         converter = MarkdownToPDFConverter(css_paths)
         
         # 创建批量生成器
-        generator = PDFBatchGenerator(converter)
+        generator = PDFBatchGenerator(converter, jobs=args.jobs)
         
         # 处理文件
         if args.file:
@@ -401,7 +638,12 @@ def main():
                 print(f"❌ 错误: 输入目录不存在 - {args.input_dir}")
                 sys.exit(1)
             generator.process_directory(args.input_dir, args.output_dir, args.overwrite)
+        
+        if args.report:
+            generator.write_report(args.report)
             
+    except KeyboardInterrupt:
+        sys.exit(130)
     except Exception as e:
         print(f"❌ 致命错误: {str(e)}")
         sys.exit(1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+音频缓存元数据存储测试
+
+验证旧版 metadata.json 自动导入、访问记录批量写回、按最后访问时间的
+LRU 淘汰、多个 AudioCache 实例共享同一份元数据，以及 WAV 压缩转码后
+元数据指向压缩文件、缺少编码器时保留 WAV。
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.services import audio_cache as audio_cache_module
+from reinvent_insight.core import config
+from reinvent_insight.infrastructure.audio.audio_utils import StreamingWavWriter
+from reinvent_insight.services.audio_cache import AudioCache
+
+
+def _put(cache, audio_hash, size=1000, article_hash=""):
+    return cache.put(audio_hash, b"x" * size, "t", "Kai", "Chinese", 1.0, article_hash=article_hash)
+
+
+def test_migrates_legacy_json(tmp_path):
+    """首次打开时导入 metadata.json，并保留统计信息"""
+    (tmp_path / "a.wav").write_bytes(b"x" * 10)
+    legacy = {
+        "a": {
+            "hash": "a", "text_hash": "t", "voice": "Kai", "language": "Chinese",
+            "duration": 1.5, "file_size": 10, "file_path": str(tmp_path / "a.wav"),
+            "created_at": "2025-01-01T00:00:00", "last_accessed": "2025-01-01T00:00:00",
+            "access_count": 3, "article_hash": "doc", "is_pregenerated": True,
+        }
+    }
+    (tmp_path / "metadata.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    cache = AudioCache(tmp_path)
+    assert not (tmp_path / "metadata.json").exists()
+    assert cache.get_stats()["total_files"] == 1
+    assert cache.get_cache_size() == 10
+    metadata = cache.find_by_article_hash("doc")
+    assert metadata.access_count == 3 and metadata.is_pregenerated is True
+
+    # 重新打开不会重复导入
+    cache.close()
+    assert AudioCache(tmp_path).get_cache_size() == 10
+
+
+def test_access_updates_are_batched(tmp_path, monkeypatch):
+    """命中只在内存中累积访问次数，达到批量条数后写库"""
+    monkeypatch.setattr(audio_cache_module, "ACCESS_FLUSH_BATCH", 2)
+    monkeypatch.setattr(audio_cache_module, "ACCESS_FLUSH_INTERVAL", 3600)
+    cache = AudioCache(tmp_path)
+    _put(cache, "a")
+    _put(cache, "b")
+
+    for _ in range(3):
+        assert cache.get("a") is not None
+    # 未写回时其他实例看不到访问次数，本实例可以看到
+    assert AudioCache(tmp_path).get_metadata("a").access_count == 0
+    assert cache.get_metadata("a").access_count == 3
+
+    cache.get("b")
+    assert AudioCache(tmp_path).get_metadata("a").access_count == 3
+
+
+def test_close_audio_caches_flushes_pending_access(tmp_path, monkeypatch):
+    """服务关闭时写回所有实例中尚未写回的访问记录"""
+    monkeypatch.setattr(audio_cache_module, "ACCESS_FLUSH_INTERVAL", 3600)
+    cache = AudioCache(tmp_path)
+    _put(cache, "a")
+    cache.get("a")
+    assert AudioCache(tmp_path).get_metadata("a").access_count == 0
+
+    audio_cache_module.close_audio_caches()
+    assert cache not in audio_cache_module._open_caches
+    cache.close()
+    assert AudioCache(tmp_path).get_metadata("a").access_count == 1
+
+
+def test_evicts_least_recently_accessed(tmp_path):
+    """超出容量时按最后访问时间淘汰到 80%"""
+    cache = AudioCache(tmp_path, max_size_mb=1)
+    size = 300 * 1024
+    for audio_hash in ("old", "mid", "new"):
+        _put(cache, audio_hash, size)
+    cache.get("old")
+
+    _put(cache, "extra", size)
+    assert cache.get_metadata("mid") is None
+    assert not (tmp_path / "mid.wav").exists()
+    assert {h for h in ("old", "new", "extra") if cache.get_metadata(h)} == {"old", "new", "extra"}
+    assert cache.get_cache_size() == 3 * size
+
+
+def test_shared_between_instances(tmp_path):
+    """同一目录的多个实例读写同一份元数据，统计随增删同步"""
+    writer = AudioCache(tmp_path)
+    reader = AudioCache(tmp_path)
+    _put(writer, "a", 100, article_hash="doc")
+    assert reader.get("a") == tmp_path / "a.wav"
+    assert reader.find_by_article_hash("doc").hash == "a"
+
+    assert reader.invalidate("a")
+    assert writer.get("a") is None
+    assert writer.get_stats()["total_files"] == 0
+    assert writer.get_cache_size() == 0
+
+
+
+def _fake_encoder(tmp_path):
+    """模拟 ffmpeg：把输入文件的前一半写到输出路径"""
+    script = tmp_path / "fake-ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "data = open(sys.argv[sys.argv.index('-i') + 1], 'rb').read()\n"
+        "open(sys.argv[-1], 'wb').write(data[:len(data) // 2])\n",
+        encoding="utf-8"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+def _register_wav(cache, audio_hash, seconds=1.0):
+    writer = StreamingWavWriter(cache.get_file_path(audio_hash))
+    writer.append(b"\x01\x02" * int(24000 * seconds))
+    path = writer.finalize(cache.get_file_path(audio_hash))
+    cache.register(audio_hash, path, "t", "Kai", "Chinese", duration=writer.duration)
+    return path
+
+
+def test_compress_replaces_wav(tmp_path, monkeypatch):
+    """压缩后元数据指向压缩文件，大小统计更新，时长保持生成时的值"""
+    monkeypatch.setattr(config, "TTS_AUDIO_ENCODER", _fake_encoder(tmp_path))
+    cache = AudioCache(tmp_path / "cache", audio_format="mp3")
+    wav_path = _register_wav(cache, "a", seconds=2.0)
+    wav_size = wav_path.stat().st_size
+
+    compressed = cache.schedule_compress("a").result()
+    assert compressed == tmp_path / "cache" / "a.mp3"
+    assert not wav_path.exists()
+    assert cache.get("a") == compressed
+    metadata = cache.get_metadata("a")
+    assert metadata.duration == 2.0
+    assert metadata.file_size == wav_size // 2
+    assert cache.get_cache_size() == wav_size // 2
+
+    # 压缩完成后以原 WAV 路径重新登记，只刷新元数据
+    assert cache.register("a", wav_path, "t", "Kai", "Chinese", duration=2.0, article_hash="doc") == compressed
+    assert cache.find_by_article_hash("doc").file_path == str(compressed)
+    assert cache.compress("a") is None
+    cache.close()
+
+
+def test_missing_encoder_keeps_wav(tmp_path, monkeypatch):
+    """找不到编码器时不压缩，缓存继续使用 WAV"""
+    monkeypatch.setattr(config, "TTS_AUDIO_ENCODER", str(tmp_path / "missing-ffmpeg"))
+    cache = AudioCache(tmp_path / "cache", audio_format="opus")
+    wav_path = _register_wav(cache, "a")
+
+    assert cache.compress("a") is None
+    assert cache.audio_format == "wav"
+    assert cache.schedule_compress("a") is None
+    assert cache.get("a") == wav_path
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要本地 ffmpeg")
+@pytest.mark.parametrize("audio_format", ["opus", "mp3"])
+def test_compress_with_ffmpeg(tmp_path, monkeypatch, audio_format):
+    """使用真实 ffmpeg 转码，压缩文件明显小于 WAV"""
+    monkeypatch.setattr(config, "TTS_AUDIO_ENCODER", "ffmpeg")
+    cache = AudioCache(tmp_path, audio_format=audio_format)
+    wav_size = _register_wav(cache, "a", seconds=5.0).stat().st_size
+
+    compressed = cache.compress("a")
+    assert compressed.suffix == f".{audio_format}"
+    assert cache.get_metadata("a").file_size < wav_size / 4
+    cache.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and func.__code__.co_argcount == 1:
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✓ {name}")
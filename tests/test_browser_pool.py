@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+浏览器池测试
+
+使用模拟的 Playwright 对象验证：浏览器只启动一次并在多个任务间复用、
+每个任务使用独立上下文并在结束后关闭、断开连接的浏览器被替换、服务
+指定页面数后回收，以及 Cookie 只在文件变化时重新读取。
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.infrastructure.media import browser_pool as browser_pool_module
+from reinvent_insight.infrastructure.media.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, options):
+        self.options = options
+        self.cookies = []
+        self.closed = False
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.timeout = None
+
+    def set_default_timeout(self, timeout):
+        self.timeout = timeout
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected and not self.closed
+
+    async def new_context(self, **options):
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.launched = []
+        self.stopped = False
+        self.chromium = self
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+def _fake_playwright(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(browser_pool_module, "async_playwright", lambda: playwright)
+    return playwright
+
+
+def test_reuses_browser_with_isolated_contexts(monkeypatch):
+    """多个任务复用同一个浏览器，每个任务独立上下文且结束后关闭"""
+    playwright = _fake_playwright(monkeypatch)
+    pool = BrowserPool("render", size=1, max_pages=100)
+
+    async def task(i):
+        async with pool.page(viewport={'width': 800, 'height': 600}, timeout=5000) as page:
+            await asyncio.sleep(0.01)
+            return page
+
+    async def run():
+        pages = await asyncio.gather(*(task(i) for i in range(5)))
+        await pool.close()
+        return pages
+
+    pages = asyncio.run(run())
+    assert len(playwright.launched) == 1
+    assert len({id(page.context) for page in pages}) == 5
+    assert all(page.context.closed for page in pages)
+    assert all(page.timeout == 5000 for page in pages)
+    assert pages[0].context.options == {'viewport': {'width': 800, 'height': 600}, 'device_scale_factor': 1}
+    assert playwright.stopped
+
+
+def test_replaces_disconnected_browser(monkeypatch):
+    """浏览器断开连接后，下一个任务使用新启动的浏览器"""
+    playwright = _fake_playwright(monkeypatch)
+    pool = BrowserPool("web", size=1, max_pages=100)
+
+    async def run():
+        async with pool.page():
+            pass
+        playwright.launched[0].connected = False
+        async with pool.page():
+            pass
+
+    asyncio.run(run())
+    assert len(playwright.launched) == 2
+    assert pool.browser_count == 1
+
+
+def test_recycles_after_max_pages(monkeypatch):
+    """浏览器服务指定页面数后，等在途任务结束再关闭并由新浏览器替换"""
+    playwright = _fake_playwright(monkeypatch)
+    pool = BrowserPool("web", size=1, max_pages=3)
+
+    async def run():
+        for _ in range(3):
+            async with pool.page():
+                pass
+        first = playwright.launched[0]
+        async with pool.page():
+            pass
+        return first
+
+    first = asyncio.run(run())
+    assert first.closed
+    assert len(first.contexts) == 3
+    assert len(playwright.launched) == 2
+    assert not playwright.launched[1].closed
+
+
+def test_run_with_browser_pools_closes_on_exit(monkeypatch):
+    """命令行入口的任务结束（包括出错）后关闭本事件循环中的浏览器池"""
+    playwright = _fake_playwright(monkeypatch)
+
+    async def work():
+        async with browser_pool_module.get_browser_pool("render").page():
+            pass
+        raise RuntimeError("任务失败")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(browser_pool_module.run_with_browser_pools(work()))
+    assert playwright.launched[0].closed
+    assert playwright.stopped
+
+
+def test_cookies_loaded_once(monkeypatch, tmp_path):
+    """Cookie 转换为 Playwright 格式，文件未变化时不重复读取"""
+    _fake_playwright(monkeypatch)
+    store_path = tmp_path / "cookies.json"
+    store_path.write_text(json.dumps({"cookies": [
+        {"name": "SID", "value": "1", "domain": ".youtube.com", "path": "/", "expires": 0, "secure": True},
+    ]}))
+
+    from reinvent_insight.services.cookie import cookie_store
+    loads = []
+    original_load = cookie_store.CookieStore.load_cookies
+
+    class CountingStore(cookie_store.CookieStore):
+        def __init__(self):
+            super().__init__(store_path=store_path, netscape_path=tmp_path / "cookies.txt")
+
+        def load_cookies(self):
+            loads.append(1)
+            return original_load(self)
+
+    monkeypatch.setattr(cookie_store, "CookieStore", CountingStore)
+    pool = BrowserPool("web", size=1)
+
+    async def run():
+        contexts = []
+        for _ in range(3):
+            async with pool.page(load_cookies=True) as page:
+                contexts.append(page.context)
+        return contexts
+
+    contexts = asyncio.run(run())
+    assert len(loads) == 1
+    assert all(
+        context.cookies == [{"name": "SID", "value": "1", "domain": ".youtube.com", "path": "/", "secure": True}]
+        for context in contexts
+    )
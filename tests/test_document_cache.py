@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+文档详情响应缓存测试
+
+验证 /api/public/summaries/{filename} 与 /api/public/doc/{doc_hash} 的响应
+按文件修改时间缓存、If-None-Match 命中时返回 304、版本列表取自哈希注册表
+（不扫描全部文档），以及新增版本后同一文档其他版本的缓存失效。
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.api.routes import documents, versions
+from reinvent_insight.core import config
+from reinvent_insight.core.utils.file_utils import generate_doc_hash
+from reinvent_insight.services.document import document_cache, metadata_index
+from reinvent_insight.services.document.document_cache import DocumentEntry, DocumentResponseCache
+from reinvent_insight.services.document.hash_registry import get_registry
+from reinvent_insight.services.document.metadata_index import MetadataIndex
+
+VIDEO_URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+def write_doc(output_dir: Path, filename: str, version: int, title: str):
+    """写入一篇带 YAML front matter 的测试文档"""
+    content = f"""---
+title_cn: {title}
+title_en: Test Document
+video_url: {VIDEO_URL}
+version: {version}
+---
+
+# {title}
+
+正文内容。
+"""
+    (output_dir / filename).write_text(content, encoding="utf-8")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "summaries"
+    docs_dir.mkdir()
+    monkeypatch.setattr(config, "OUTPUT_DIR", docs_dir)
+    monkeypatch.setattr(metadata_index, "_metadata_index", MetadataIndex(tmp_path / "index.db"))
+    cache = DocumentResponseCache(max_entries=8)
+    monkeypatch.setattr(document_cache, "_cache", cache)
+
+    write_doc(docs_dir, "talk.md", 0, "原始版本")
+    get_registry().init_mappings()
+
+    app = FastAPI()
+    app.include_router(documents.router)
+    app.include_router(versions.router)
+    yield TestClient(app), cache, docs_dir
+
+    # 恢复全局单例的状态，避免影响其他测试
+    monkeypatch.undo()
+    get_registry().init_mappings()
+
+
+def test_not_modified_until_file_changes(client):
+    """If-None-Match 命中时返回 304，文件更新后返回新内容"""
+    client, cache, docs_dir = client
+    first = client.get("/api/public/summaries/talk")
+    assert first.status_code == 200
+    assert first.json()["title_cn"] == "原始版本"
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/public/summaries/talk.md", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    doc_hash = generate_doc_hash(VIDEO_URL)
+    by_hash = client.get(f"/api/public/doc/{doc_hash}")
+    assert by_hash.content == first.content
+    assert cache.misses == 1
+
+    path = docs_dir / "talk.md"
+    write_doc(docs_dir, "talk.md", 0, "修改后")
+    mtime = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+    updated = client.get("/api/public/summaries/talk.md", headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json()["title_cn"] == "修改后"
+    assert updated.headers["etag"] != etag
+
+
+def test_versions_from_registry(client, monkeypatch):
+    """版本列表取自哈希注册表；新增版本后同一文档其他版本的缓存失效"""
+    client, cache, docs_dir = client
+
+    def fail(*args, **kwargs):
+        raise AssertionError("不应扫描全部文档")
+
+    monkeypatch.setattr(document_cache, "discover_versions", fail)
+    monkeypatch.setattr(versions, "discover_versions", fail)
+
+    assert [v["version"] for v in client.get("/api/public/summaries/talk.md").json()["versions"]] == [0]
+
+    write_doc(docs_dir, "talk_v1.md", 1, "新版本")
+    affected = get_registry().apply_file_change("talk_v1.md")
+    document_cache.apply_document_cache_change("talk_v1.md", affected)
+    assert cache.get_stats()["entries"] == 0
+
+    old = client.get("/api/public/summaries/talk.md").json()
+    assert [v["filename"] for v in old["versions"]] == ["talk.md", "talk_v1.md"]
+
+    doc_hash = generate_doc_hash(VIDEO_URL)
+    assert client.get(f"/api/public/doc/{doc_hash}").json()["title_cn"] == "新版本"
+    assert client.get(f"/api/public/doc/{doc_hash}/0").json()["title_cn"] == "原始版本"
+
+
+def test_missing_and_invalid_filename(client):
+    client, _, _ = client
+    assert client.get("/api/public/summaries/missing.md").status_code == 404
+    assert client.get("/api/public/summaries/..%5Csecret").status_code == 400
+    assert client.get("/api/public/doc/unknown").status_code == 404
+
+
+def test_datetime_front_matter(client):
+    """front matter 中未加引号的时间戳可以正常序列化"""
+    client, _, docs_dir = client
+    (docs_dir / "dated.md").write_text(f"""---
+title_cn: 带时间戳
+video_url: https://www.youtube.com/watch?v=zyxwvutsrqp
+created_at: 2024-12-01 10:00:00
+version: 0
+---
+
+# 带时间戳
+""", encoding="utf-8")
+
+    # 注册表尚未收录时回退为目录扫描，收录后从注册表读取版本列表
+    response = client.get("/api/public/summaries/dated.md")
+    assert response.status_code == 200
+    assert response.json()["versions"][0]["created_at"] == "2024-12-01T10:00:00"
+
+    affected = get_registry().apply_file_change("dated.md")
+    document_cache.apply_document_cache_change("dated.md", affected)
+    response = client.get("/api/public/summaries/dated.md")
+    assert response.status_code == 200
+    assert response.json()["versions"][0]["created_at"] == "2024-12-01T10:00:00"
+
+    doc_hash = generate_doc_hash("https://www.youtube.com/watch?v=zyxwvutsrqp")
+    assert client.get(f"/api/public/doc/{doc_hash}").status_code == 200
+
+    # 直接解析的元数据中的日期类型同样可以序列化
+    entry = DocumentEntry(0, 0, {
+        "content_identifier": "",
+        "video_url": "",
+        "versions": [{"created_at": datetime(2024, 12, 1, 10, 0)}],
+    })
+    assert json.loads(entry.body)["versions"][0]["created_at"] == "2024-12-01T10:00:00"
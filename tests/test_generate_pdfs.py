@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+PDF 批量生成测试
+
+用模拟的 generate_pdf 代替 WeasyPrint 渲染，验证生成清单：未变化的文件
+跳过、源文件内容或样式表变化时重新生成、并行模式结果与逐个生成一致。
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    from reinvent_insight.tools import generate_pdfs
+except (ImportError, OSError) as e:  # WeasyPrint 依赖 pango 等系统库
+    pytest.skip(f"WeasyPrint 不可用: {e}", allow_module_level=True)
+
+
+def fake_generate_pdf(self, markdown_content, output_pdf_path):
+    with open(output_pdf_path, "w", encoding="utf-8") as f:
+        f.write(f"PDF:{markdown_content}")
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """三篇文章、一个样式表和输出目录"""
+    monkeypatch.setattr(generate_pdfs.MarkdownToPDFConverter, "generate_pdf", fake_generate_pdf)
+    input_dir = tmp_path / "summaries"
+    input_dir.mkdir()
+    for name in ("a", "b", "c"):
+        (input_dir / f"{name}.md").write_text(f"# {name}", encoding="utf-8")
+    css = tmp_path / "style.css"
+    css.write_text("body { color: black; }", encoding="utf-8")
+    return input_dir, tmp_path / "pdfs", css
+
+
+def _run(input_dir, output_dir, css, jobs=1):
+    generator = generate_pdfs.PDFBatchGenerator(
+        generate_pdfs.MarkdownToPDFConverter([str(css)]), jobs=jobs
+    )
+    generator.process_directory(str(input_dir), str(output_dir))
+    return generator
+
+
+def test_skips_unchanged_and_rerenders_changed(library):
+    """第二次运行跳过所有文件；源文件或样式表变化时重新生成"""
+    input_dir, output_dir, css = library
+    first = _run(input_dir, output_dir, css)
+    assert first.success_count == 3
+    manifest = json.loads((output_dir / ".pdf_manifest.json").read_text(encoding="utf-8"))
+    assert sorted(manifest) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert os.stat(output_dir / "a.pdf").st_mtime_ns == os.stat(input_dir / "a.md").st_mtime_ns
+
+    second = _run(input_dir, output_dir, css)
+    assert (second.success_count, second.skip_count) == (0, 3)
+
+    # 只修改时间变化、内容不变时不重新生成
+    os.utime(input_dir / "a.md")
+    (input_dir / "b.md").write_text("# b v2", encoding="utf-8")
+    third = _run(input_dir, output_dir, css)
+    assert [name for name, _ in third.timings] == ["b"]
+    assert (output_dir / "b.pdf").read_text(encoding="utf-8") == "PDF:# b v2"
+
+    css.write_text("body { color: red; }", encoding="utf-8")
+    fourth = _run(input_dir, output_dir, css)
+    assert fourth.success_count == 3
+
+
+def test_parallel_matches_sequential(library, tmp_path):
+    """并行模式生成的文件与逐个生成一致，并输出耗时报告"""
+    input_dir, output_dir, css = library
+    generator = _run(input_dir, output_dir, css, jobs=2)
+    assert generator.success_count == 3
+    assert sorted(p.name for p in output_dir.iterdir()) == [".pdf_manifest.json", "a.pdf", "b.pdf", "c.pdf"]
+    assert (output_dir / "c.pdf").read_text(encoding="utf-8") == "PDF:# c"
+
+    report = tmp_path / "report.json"
+    generator.write_report(str(report))
+    data = json.loads(report.read_text(encoding="utf-8"))
+    assert sorted(item["name"] for item in data["files"]) == ["a", "b", "c"]
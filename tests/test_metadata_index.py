@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+文档元数据索引测试
+
+验证索引只在文件 stat 变化时重新解析，并且能够跨进程重启复用；
+建立索引时只读取文档头部，派生统计按需计算。
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from reinvent_insight.services.document.metadata_index import MetadataIndex
+from reinvent_insight.services.document.metadata_service import (
+    count_toc_chapters,
+    parse_metadata_from_md,
+    read_document_head,
+)
+
+
+SAMPLE_DOC = """---
+title_cn: 无服务器架构
+title_en: Serverless Architecture
+video_url: https://www.youtube.com/watch?v=abcdefghijk
+upload_date: '20241201'
+version: 2
+---
+
+# 无服务器架构
+
+### 主要目录
+
+1. 第一章
+2. 第二章
+
+### 第一章
+
+正文内容。
+"""
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    directory = tmp_path / "summaries"
+    directory.mkdir()
+    (directory / "talk.md").write_text(SAMPLE_DOC, encoding="utf-8")
+    return directory
+
+
+def test_record_fields(docs_dir, tmp_path):
+    """索引记录包含元数据、标题和派生统计"""
+    index = MetadataIndex(tmp_path / "index.db")
+    record = index.get(docs_dir / "talk.md")
+
+    assert record.title_cn == "无服务器架构"
+    assert record.title_en == "Serverless Architecture"
+    assert record.source_id == "https://www.youtube.com/watch?v=abcdefghijk"
+    assert record.version == 2
+    assert record.stats == {}
+
+    # 派生统计按需计算，并随记录持久化
+    assert index.get_stat(docs_dir / "talk.md", "chapter_count", count_toc_chapters) == 2
+    word_count = index.get_word_count(docs_dir / "talk.md")
+    assert word_count > 0
+    reopened = MetadataIndex(tmp_path / "index.db").get(docs_dir / "talk.md")
+    assert reopened.stats == {"chapter_count": 2, "word_count": word_count}
+
+
+def test_head_reader_stops_after_front_matter(tmp_path):
+    """只读取 front matter 和标题，结果与完整解析一致"""
+    doc = tmp_path / "long.md"
+    doc.write_text(SAMPLE_DOC + "正文" * 500_000, encoding="utf-8")
+
+    metadata, heading = read_document_head(doc, max_bytes=4096)
+    assert metadata == parse_metadata_from_md(SAMPLE_DOC)
+    assert heading == "无服务器架构"
+
+    # 未闭合的 front matter 退回完整解析
+    broken = tmp_path / "broken.md"
+    broken.write_text("---\ntitle_cn: 测试\n", encoding="utf-8")
+    assert read_document_head(broken) == (parse_metadata_from_md("---\ntitle_cn: 测试\n"), None)
+
+
+def test_persisted_records_are_reused(docs_dir, tmp_path, monkeypatch):
+    """重启后未变化的文件直接从索引读取，不再解析"""
+    MetadataIndex(tmp_path / "index.db").scan(docs_dir)
+
+    reopened = MetadataIndex(tmp_path / "index.db")
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("未变化的文件不应被重新解析")
+
+    monkeypatch.setattr(reopened, "_parse", fail_parse)
+    records = reopened.scan(docs_dir)
+    assert records["talk.md"].title_cn == "无服务器架构"
+
+
+def test_changed_and_deleted_files(docs_dir, tmp_path):
+    """文件变化时重新解析，删除后从索引中移除"""
+    index = MetadataIndex(tmp_path / "index.db")
+    index.scan(docs_dir)
+
+    doc = docs_dir / "talk.md"
+    doc.write_text(SAMPLE_DOC.replace("version: 2", "version: 10"), encoding="utf-8")
+    assert index.scan(docs_dir)["talk.md"].version == 10
+
+    doc.unlink()
+    assert index.scan(docs_dir) == {}
+    assert MetadataIndex(tmp_path / "index.db").scan(docs_dir) == {}
+
+
+def test_yaml_dates_normalized(docs_dir, tmp_path):
+    """未加引号的 YAML 日期统一转为 ISO 字符串，首次解析与重启加载结果一致"""
+    doc = docs_dir / "dated.md"
+    doc.write_text(
+        "---\ntitle_cn: 带日期\ncreated_at: 2024-12-01 10:00:00\nupload_date: 2024-11-30\n"
+        "tags:\n  - 2024-01-02\n---\n\n# 带日期\n",
+        encoding="utf-8"
+    )
+
+    fresh = MetadataIndex(tmp_path / "index.db").get(doc).metadata
+    assert fresh["created_at"] == "2024-12-01T10:00:00"
+    assert fresh["upload_date"] == "2024-11-30"
+    assert fresh["tags"] == ["2024-01-02"]
+
+    assert MetadataIndex(tmp_path / "index.db").get(doc).metadata == fresh
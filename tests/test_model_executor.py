@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+模型 SDK 线程池测试
+
+验证 provider 专用线程池有界、统计排队与调用耗时，
+以及超时后排队中的调用会被移除、不再占用线程。
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from reinvent_insight.infrastructure.ai.executor import ModelExecutor
+
+
+def test_bounded_pool_records_wait_and_call_time():
+    """超出线程数的调用排队等待，并分别统计等待与调用耗时"""
+    executor = ModelExecutor("test", max_workers=2)
+
+    async def run():
+        return await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(4)))
+
+    asyncio.run(run())
+    stats = executor.get_stats()
+    assert stats["completed"] == 4
+    assert stats["running"] == 0 and stats["queued"] == 0
+    assert stats["max_wait_ms"] >= 40
+    assert stats["avg_call_ms"] >= 40
+    executor.shutdown()
+
+
+def test_timeout_removes_queued_call():
+    """超时时尚未开始的调用从队列移除，不会再执行"""
+    executor = ModelExecutor("test", max_workers=1)
+    release = threading.Event()
+    executed = []
+
+    def blocker():
+        release.wait(2)
+
+    async def run():
+        first = asyncio.create_task(executor.run(blocker))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(executed.append, "queued", timeout=0.05)
+        release.set()
+        await first
+        # 线程被释放后新的调用可以立即执行
+        await executor.run(executed.append, "next", timeout=1)
+
+    asyncio.run(run())
+    stats = executor.get_stats()
+    assert executed == ["next"]
+    assert stats["cancelled_before_start"] == 1
+    assert stats["queued"] == 0
+    executor.shutdown()
+
+
+def test_timeout_of_running_call_is_tracked():
+    """执行中的调用超时后计入 abandoned，结束后线程归还"""
+    executor = ModelExecutor("test", max_workers=1)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 0.2, timeout=0.05)
+        assert executor.get_stats()["abandoned"] == 1
+        await executor.run(time.sleep, 0, timeout=1)
+
+    asyncio.run(run())
+    stats = executor.get_stats()
+    assert stats["running"] == 0
+    assert stats["completed"] == 2
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+PDF 渲染服务测试
+
+使用线程池和模拟渲染函数（不依赖 WeasyPrint）验证：同一文档的并发请求
+只渲染一次、源文件修改时间未变化时直接复用 PDF、源文件修改后重新渲染，
+渲染失败时不留下临时文件，以及超时后等工作进程实际结束再清理。
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.services.document import pdf_render_service
+from reinvent_insight.services.document.pdf_render_service import PDFRenderService
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """替换渲染函数，记录每次渲染的源文件"""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_render(md_path, output_path):
+        with lock:
+            calls.append(Path(md_path).name)
+        time.sleep(0.05)
+        if "broken" in md_path:
+            raise ValueError("渲染失败")
+        Path(output_path).write_bytes(b"%PDF-" + Path(md_path).read_bytes())
+        return 0.05
+
+    monkeypatch.setattr(pdf_render_service, "_render_pdf", fake_render)
+    return calls
+
+
+def _service(tmp_path):
+    return PDFRenderService(
+        pdf_dir=tmp_path / "pdfs",
+        css_paths=["unused.css"],
+        max_workers=2,
+        executor=ThreadPoolExecutor(max_workers=2)
+    )
+
+
+def test_concurrent_requests_share_one_render(tmp_path, renders):
+    """同一文档的并发请求共享一次渲染，PDF 修改时间与源文件一致"""
+    md_path = tmp_path / "article.md"
+    md_path.write_text("# 标题", encoding="utf-8")
+    service = _service(tmp_path)
+
+    async def run():
+        return await asyncio.gather(*(service.render(md_path) for _ in range(5)))
+
+    paths = asyncio.run(run())
+    assert renders == ["article.md"]
+    assert len(set(paths)) == 1
+    assert paths[0].read_bytes() == "%PDF-# 标题".encode("utf-8")
+    assert paths[0].stat().st_mtime_ns == md_path.stat().st_mtime_ns
+    assert [p.name for p in (tmp_path / "pdfs").iterdir()] == ["article.pdf"]
+
+    stats = service.get_stats()
+    assert stats["completed"] == 1
+    assert stats["joined"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_reuses_until_source_changes(tmp_path, renders):
+    """源文件修改时间未变化时复用 PDF，修改后重新渲染"""
+    md_path = tmp_path / "article.md"
+    md_path.write_text("v1", encoding="utf-8")
+    service = _service(tmp_path)
+
+    asyncio.run(service.render(md_path))
+    asyncio.run(service.render(md_path))
+    assert renders == ["article.md"]
+    assert service.get_stats()["cache_hits"] == 1
+
+    md_path.write_text("v2", encoding="utf-8")
+    mtime = md_path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(md_path, ns=(mtime, mtime))
+    pdf_path = asyncio.run(service.render(md_path))
+    assert renders == ["article.md", "article.md"]
+    assert pdf_path.read_bytes() == b"%PDF-v2"
+
+
+def test_failed_render_leaves_no_files(tmp_path, renders):
+    """渲染失败时所有等待方收到异常，且不留下临时文件"""
+    md_path = tmp_path / "broken.md"
+    md_path.write_text("x", encoding="utf-8")
+    service = _service(tmp_path)
+
+    async def run():
+        return await asyncio.gather(*(service.render(md_path) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert renders == ["broken.md"]
+    assert list((tmp_path / "pdfs").iterdir()) == []
+    assert service.get_stats()["failed"] == 1
+
+
+def test_timeout_releases_after_worker_finishes(tmp_path, monkeypatch):
+    """超时后立即返回错误，工作进程结束前仍计入在途数，结束后删除临时文件"""
+    release = threading.Event()
+    temp_files = []
+
+    def slow_render(md_path, output_path):
+        temp_files.append(Path(output_path))
+        Path(output_path).write_bytes(b"%PDF-partial")
+        release.wait(5)
+        return 1.0
+
+    monkeypatch.setattr(pdf_render_service, "_render_pdf", slow_render)
+    md_path = tmp_path / "slow.md"
+    md_path.write_text("x", encoding="utf-8")
+    executor = ThreadPoolExecutor(max_workers=1)
+    service = PDFRenderService(
+        pdf_dir=tmp_path / "pdfs", css_paths=["unused.css"], timeout=0.05, executor=executor
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service.render(md_path))
+    assert service.get_stats()["in_flight"] == 1
+    assert temp_files[0].exists()
+
+    release.set()
+    executor.shutdown(wait=True)
+    assert service.get_stats()["in_flight"] == 0
+    assert service.get_stats()["failed"] == 1
+    assert list((tmp_path / "pdfs").iterdir()) == []
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+任务队列持久化测试
+
+验证入队/执行/结束状态写入 SQLite，重启后恢复排队中和被中断的任务，
+以及续跑的工作流复用任务目录中已生成的章节。
+"""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.core.config import GenerationMode
+from reinvent_insight.services.analysis import queue_store
+from reinvent_insight.services.analysis.queue_store import QueueStore
+from reinvent_insight.services.analysis.task_manager import manager
+from reinvent_insight.services.analysis.worker_pool import TaskPriority, WorkerPool, WorkerTask
+
+
+def _dead_owner() -> str:
+    """返回一个已退出进程的实例标识，模拟重启前的旧进程"""
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return f"{socket.gethostname()}:{proc.pid}"
+
+
+def test_payload_round_trip():
+    """WorkerTask 可以从持久化参数重建"""
+    task = WorkerTask(
+        priority=-2, task_id="t1", task_type="youtube", url_or_path="https://youtu.be/x",
+        is_ultra_mode=True, generation_mode=GenerationMode.SEQUENTIAL
+    )
+    rebuilt = WorkerTask.from_payload("t1", -2, task.to_payload())
+    assert rebuilt.url_or_path == task.url_or_path
+    assert rebuilt.is_ultra_mode is True
+    assert rebuilt.generation_mode is GenerationMode.SEQUENTIAL
+
+
+def test_recover_queued_and_interrupted(tmp_path, monkeypatch):
+    """排队中的任务和所属进程已退出的执行中任务被恢复，已完成的任务不会重跑"""
+    store = QueueStore(tmp_path / "queue.db")
+    for task_id in ("done", "running", "queued-high", "queued-low"):
+        priority = -TaskPriority.HIGH.value if task_id == "queued-high" else -TaskPriority.NORMAL.value
+        store.enqueue(task_id, priority, {"task_type": "youtube", "url_or_path": task_id})
+
+    store.mark_started("done")
+    store.mark_finished("done", True)
+    store.mark_started("running")
+
+    # 当前进程仍在执行时不恢复
+    assert [r["task_id"] for r in store.recover(stale_after=60, max_attempts=3)] == ["queued-high", "queued-low"]
+
+    # 模拟重启：任务由已退出的进程启动
+    monkeypatch.setattr(queue_store, "INSTANCE_ID", _dead_owner())
+    store.mark_started("running")
+    monkeypatch.undo()
+    records = store.recover(stale_after=60, max_attempts=3)
+    assert [r["task_id"] for r in records] == ["queued-high", "running", "queued-low"]
+    assert next(r for r in records if r["task_id"] == "running")["attempts"] == 2
+    assert store.get_status("running") == queue_store.STATUS_QUEUED
+    assert store.get_status("done") == queue_store.STATUS_DONE
+
+
+def test_stale_heartbeat_and_max_attempts(tmp_path):
+    """心跳过期的任务被重新排队，超过最大次数后标记失败"""
+    store = QueueStore(tmp_path / "queue.db")
+    store.enqueue("t", 0, {"task_type": "youtube", "url_or_path": "u"})
+    store.mark_started("t")
+    time.sleep(0.05)
+    assert [r["task_id"] for r in store.recover(stale_after=0.01, max_attempts=2)] == ["t"]
+
+    store.mark_started("t")
+    time.sleep(0.05)
+    assert store.recover(stale_after=0.01, max_attempts=2) == []
+    assert store.get_status("t") == queue_store.STATUS_FAILED
+
+
+def test_pool_restores_tasks_on_start(tmp_path, monkeypatch):
+    """新的 WorkerPool 启动时从存储恢复任务并标记续跑"""
+    store = QueueStore(tmp_path / "queue.db")
+    store.enqueue("restored-1", -1, {"task_type": "youtube", "url_or_path": "https://youtu.be/a"})
+    monkeypatch.setattr(queue_store, "INSTANCE_ID", _dead_owner())
+    store.mark_started("restored-1")
+    monkeypatch.undo()
+    store.enqueue("restored-2", -1, {"task_type": "youtube", "url_or_path": "https://youtu.be/b"})
+
+    pool = WorkerPool(max_workers=1, max_queue_size=1, store=store)
+
+    async def run():
+        assert pool._recover_tasks() == 2
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert pool.queue.qsize() == 2
+    assert manager.tasks["restored-1"].resumed is True
+    assert manager.tasks["restored-2"].resumed is False
+    for task_id in ("restored-1", "restored-2"):
+        manager.tasks.pop(task_id, None)
+
+
+def test_resumed_workflow_reuses_chapters(tmp_path, monkeypatch):
+    """续跑时复用任务目录中已有的章节文件"""
+    from reinvent_insight.domain.workflows import base
+    from reinvent_insight.domain.workflows.youtube_workflow import YouTubeAnalysisWorkflow
+
+    monkeypatch.setattr(base, "TASKS_ROOT_DIR", str(tmp_path))
+    task_dir = tmp_path / "20250101" / "0900-abcdefgh-youtube"
+    task_dir.mkdir(parents=True)
+    (task_dir / "chapter_1.md").write_text("# 1. 已生成", encoding="utf-8")
+
+    assert base.get_task_dir_path("abcdefgh-1234", "youtube", reuse_existing=True) == str(task_dir)
+    assert base.get_task_dir_path("abcdefgh-1234", "youtube") != str(task_dir)
+
+    workflow = YouTubeAnalysisWorkflow.__new__(YouTubeAnalysisWorkflow)
+    workflow.task_id = "abcdefgh-1234"
+    workflow.task_dir = str(task_dir)
+    workflow.resumed = True
+    assert workflow._load_task_file("chapter_1.md") == "# 1. 已生成"
+    assert workflow._load_task_file("chapter_2.md") is None
+
+    workflow.resumed = False
+    assert workflow._load_task_file("chapter_1.md") is None
+
+
+def test_resumed_worker_passes_task_dir_to_workflow(tmp_path, monkeypatch):
+    """续跑的 YouTube 任务从 worker 到工作流都使用保存了大纲的原任务目录"""
+    from reinvent_insight.domain.workflows import base
+    from reinvent_insight.domain.workflows.youtube_workflow import YouTubeAnalysisWorkflow
+    from reinvent_insight.infrastructure.media.youtube_downloader import VideoMetadata
+    from reinvent_insight.services.analysis import worker
+    from reinvent_insight.services.analysis.task_manager import TaskState
+
+    monkeypatch.setattr(base, "TASKS_ROOT_DIR", str(tmp_path))
+    task_id = "resumeab-5678"
+    task_dir = tmp_path / "20250101" / "0900-resumeab-youtube"
+    task_dir.mkdir(parents=True)
+    (task_dir / "outline.md").write_text("# 已生成的大纲", encoding="utf-8")
+    # 重启前的另一次启动留下的空目录（排序更靠前）
+    (tmp_path / "20250102" / "0800-resumeab-youtube").mkdir(parents=True)
+
+    class FakeDownloader:
+        def __init__(self, url):
+            self.url = url
+
+        def download(self):
+            metadata = VideoMetadata(title="测试视频", upload_date="20250101", video_url=self.url)
+            return "字幕内容", metadata, None
+
+    seen = {}
+
+    async def fake_run(self):
+        seen["task_dir"] = self.task_dir
+        seen["outline"] = self._load_task_file("outline.md")
+
+    monkeypatch.setattr(worker.downloader, "SubtitleDownloader", FakeDownloader)
+    monkeypatch.setattr(YouTubeAnalysisWorkflow, "_get_model_client", lambda self: None)
+    monkeypatch.setattr(YouTubeAnalysisWorkflow, "run", fake_run)
+    manager.tasks[task_id] = TaskState(task_id=task_id, status="running", resumed=True)
+    try:
+        asyncio.run(worker.summary_task_worker_async("https://youtu.be/abcdefghijk", task_id))
+    finally:
+        manager.tasks.pop(task_id, None)
+
+    assert seen == {"task_dir": str(task_dir), "outline": "# 已生成的大纲"}
+    assert (task_dir / "video_title.txt").read_text(encoding="utf-8") == "测试视频"
+    # 不再为续跑任务新建目录
+    assert sorted(p.name for p in tmp_path.glob("*/*-resumeab-youtube")) == [
+        "0800-resumeab-youtube", "0900-resumeab-youtube"
+    ]
+
+
+if __name__ == "__main__":
+    test_payload_round_trip()
+    print("✓ test_payload_round_trip")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+速率限制器测试
+
+验证令牌桶限速、并发上限，以及不同 provider/model 的限制器互不阻塞；
+以及根据限流反馈自适应调整并发（AIMD）和按错误类型重试。
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from reinvent_insight.infrastructure.ai import adaptive_control
+from reinvent_insight.infrastructure.ai.adaptive_control import (
+    ErrorKind,
+    classify_error,
+    extract_retry_after,
+)
+from reinvent_insight.infrastructure.ai.base_client import BaseModelClient
+from reinvent_insight.infrastructure.ai.config_models import (
+    APIError,
+    ConfigurationError,
+    ModelConfig,
+    RateLimitPolicy,
+)
+from reinvent_insight.infrastructure.ai.rate_limiter import RateLimiter
+
+
+def test_independent_keys_do_not_block():
+    """一个键上的限流等待不影响其他键"""
+    slow = RateLimiter(RateLimitPolicy(interval=1.0), "gemini/slow")
+    fast = RateLimiter(RateLimitPolicy(), "dashscope/fast")
+
+    async def run():
+        await slow.acquire()  # 消耗突发容量
+        slow_task = asyncio.create_task(slow.acquire())
+        await asyncio.sleep(0)
+
+        start = time.monotonic()
+        for _ in range(10):
+            await fast.acquire()
+        fast_elapsed = time.monotonic() - start
+
+        waited = await slow_task
+        return fast_elapsed, waited
+
+    fast_elapsed, waited = asyncio.run(run())
+    assert fast_elapsed < 0.1
+    assert 0.8 < waited <= 1.0
+
+
+def test_token_bucket_burst_and_rate():
+    """突发容量内立即放行，超出部分按速率排队且并发等待"""
+    limiter = RateLimiter(RateLimitPolicy(requests_per_minute=600, burst=3), "gemini/model")
+
+    async def run():
+        start = time.monotonic()
+        delays = await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+        return delays, time.monotonic() - start
+
+    delays, elapsed = asyncio.run(run())
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    # 每秒 10 个请求：第 4~6 个分别在约 0.1/0.2/0.3 秒后放行
+    assert 0.25 < elapsed < 0.45
+
+
+def test_tokens_per_minute():
+    """按 token 数扣减，大请求需要等待补充"""
+    limiter = RateLimiter(RateLimitPolicy(tokens_per_minute=6000), "gemini/model")
+
+    async def run():
+        first = await limiter.acquire(tokens=6000)
+        second = await limiter.acquire(tokens=20)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == 0.0
+    assert 0.15 < second <= 0.25
+
+
+def test_max_concurrency():
+    """在途请求数不超过 max_concurrency"""
+    limiter = RateLimiter(RateLimitPolicy(max_concurrency=2), "gemini/model")
+    peak = 0
+    active = 0
+
+    async def call():
+        nonlocal peak, active
+        async with limiter.limit():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(8)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_releases_slot():
+    """等待名额时被取消不会泄漏并发名额"""
+    limiter = RateLimiter(RateLimitPolicy(max_concurrency=1), "gemini/model")
+
+    async def hold(duration):
+        async with limiter.limit():
+            await asyncio.sleep(duration)
+
+    async def run():
+        holder = asyncio.create_task(hold(0.05))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(0))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await holder
+        await asyncio.wait_for(hold(0), timeout=1)
+
+    asyncio.run(run())
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+class QuotaError(Exception):
+    """模拟 SDK 的限流异常"""
+    code = 429
+
+
+def test_classify_error():
+    """按状态码和错误信息分类"""
+    assert classify_error(QuotaError("quota exceeded")) is ErrorKind.RATE_LIMIT
+    assert classify_error(APIError("DashScope API 返回错误: Throttling.RateQuota - Requests rate limit exceeded")) \
+        is ErrorKind.RATE_LIMIT
+    assert classify_error(APIError("API 调用超时（超过 300 秒）")) is ErrorKind.TIMEOUT
+    assert classify_error(asyncio.TimeoutError()) is ErrorKind.TIMEOUT
+    assert classify_error(Exception("400 INVALID_ARGUMENT")) is ErrorKind.FATAL
+    assert classify_error(ConfigurationError("API Key 未配置")) is ErrorKind.FATAL
+    assert classify_error(APIError("API 返回的内容为空文本")) is ErrorKind.TRANSIENT
+
+
+def test_extract_retry_after():
+    """识别 Gemini retryDelay 和 Retry-After 提示"""
+    gemini = Exception("429 RESOURCE_EXHAUSTED. {'details': [{'retryDelay': '31s'}]}")
+    assert extract_retry_after(gemini) == 31.0
+    assert extract_retry_after(Exception("Retry-After: 7")) == 7.0
+    assert extract_retry_after(Exception("quota exceeded")) is None
+
+
+def test_aimd_shrinks_and_grows(monkeypatch):
+    """限流时并发上限减半，成功后逐步恢复"""
+    monkeypatch.setattr(adaptive_control, "MIN_DECREASE_INTERVAL", 0)
+    limiter = RateLimiter(RateLimitPolicy(max_concurrency=8), "gemini/model")
+
+    limiter.report_throttle(0)
+    limiter.report_throttle(0)
+    assert limiter.get_stats()["adaptive_limit"] == 2
+
+    for _ in range(2 + 3):
+        limiter.report_success()
+    assert limiter.get_stats()["adaptive_limit"] == 4
+
+    for _ in range(100):
+        limiter.report_success()
+    assert limiter.get_stats()["adaptive_limit"] == 8
+
+
+def test_throttle_burst_decreases_once():
+    """同一波限流只触发一次乘性下降"""
+    limiter = RateLimiter(RateLimitPolicy(max_concurrency=8), "gemini/model")
+    for _ in range(5):
+        limiter.report_throttle(0)
+    stats = limiter.get_stats()
+    assert stats["adaptive_limit"] == 4
+    assert stats["throttle_count"] == 5
+
+
+class FakeClient(BaseModelClient):
+    """按预设结果依次返回或抛出异常的测试客户端"""
+
+    def __init__(self, outcomes, max_retries=3):
+        super().__init__(ModelConfig(
+            task_type="test",
+            provider="fake",
+            model_name=f"model-{id(outcomes)}",
+            api_key="",
+            max_retries=max_retries,
+            retry_backoff_base=0.01,
+            rate_limit_policy=RateLimitPolicy(max_concurrency=4),
+        ))
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def generate_content(self, prompt, is_json=False):
+        async def _call():
+            self.calls += 1
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return await self._retry_with_backoff(self._rate_limited(_call, prompt))
+
+    async def generate_content_with_file(self, prompt, file_info, is_json=False):
+        raise NotImplementedError
+
+
+def test_retry_honors_retry_after():
+    """限流后按 Retry-After 暂停，随后重试成功"""
+    client = FakeClient([QuotaError("retryDelay: '0.2s'"), "ok"])
+
+    start = time.monotonic()
+    assert asyncio.run(client.generate_content("hi")) == "ok"
+    assert time.monotonic() - start >= 0.2
+    stats = client.rate_limiter.get_stats()
+    assert stats["throttle_count"] == 1
+    assert stats["adaptive_limit"] == 2
+
+
+def test_fatal_errors_are_not_retried():
+    """致命错误不重试"""
+    client = FakeClient([Exception("API key not valid"), "ok"])
+    with pytest.raises(Exception, match="API key not valid"):
+        asyncio.run(client.generate_content("hi"))
+    assert client.calls == 1
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and func.__code__.co_argcount == 0:
+            func()
+            print(f"✓ {name}")
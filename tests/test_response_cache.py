@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+模型响应缓存测试
+
+验证缓存键对参数和输入文件敏感、TTL 过期、按最近访问淘汰，
+以及客户端命中缓存时跳过实际调用。
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.core import config
+from reinvent_insight.infrastructure.ai import response_cache
+from reinvent_insight.infrastructure.ai.base_client import BaseModelClient
+from reinvent_insight.infrastructure.ai.config_models import ModelConfig
+from reinvent_insight.infrastructure.ai.response_cache import (
+    ResponseCache,
+    file_fingerprint,
+    make_cache_key,
+)
+
+
+def test_cache_key_depends_on_inputs(tmp_path):
+    """提示词、生成参数和文件内容变化都会改变缓存键"""
+    base = make_cache_key("gemini", "m", "generate_content", {"is_json": False}, "hello")
+    assert base == make_cache_key("gemini", "m", "generate_content", {"is_json": False}, "hello")
+    assert base != make_cache_key("gemini", "m", "generate_content", {"is_json": True}, "hello")
+    assert base != make_cache_key("gemini", "m", "generate_content", {"is_json": False}, "hello!")
+    assert base != make_cache_key("dashscope", "m", "generate_content", {"is_json": False}, "hello")
+
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"v1")
+    first = file_fingerprint({"uri": str(pdf), "local_file": True})
+    pdf.write_bytes(b"v2")
+    assert first != file_fingerprint({"uri": str(pdf), "local_file": True})
+    assert file_fingerprint(None) == ""
+
+
+def test_ttl_expiry(tmp_path):
+    """超过有效期的条目不再命中"""
+    cache = ResponseCache(tmp_path / "cache.db", max_size_bytes=1024 * 1024, ttl_seconds=0.05)
+    cache.put("k", "value")
+    assert cache.get("k") == "value"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.get_stats()["size_mb"] == 0
+
+
+def test_lru_eviction(tmp_path):
+    """超过上限时淘汰最久未访问的条目"""
+    cache = ResponseCache(tmp_path / "cache.db", max_size_bytes=300, ttl_seconds=3600)
+    cache.put("a", "x" * 100)
+    time.sleep(0.01)
+    cache.put("b", "y" * 100)
+    time.sleep(0.01)
+    assert cache.get("a")  # a 变为最近访问
+    time.sleep(0.01)
+    cache.put("c", "z" * 150)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 100
+    assert cache.get("c") == "z" * 150
+
+
+def test_persists_across_instances(tmp_path):
+    """重启后缓存仍然可用"""
+    ResponseCache(tmp_path / "cache.db", max_size_bytes=1024, ttl_seconds=3600).put("k", "v")
+    reopened = ResponseCache(tmp_path / "cache.db", max_size_bytes=1024, ttl_seconds=3600)
+    assert reopened.get("k") == "v"
+
+
+class FakeClient(BaseModelClient):
+    """统计实际调用次数的测试客户端"""
+
+    def __init__(self):
+        super().__init__(ModelConfig(
+            task_type="test",
+            provider="fake",
+            model_name="cache-model",
+            api_key="",
+        ))
+        self.calls = 0
+
+    async def generate_content(self, prompt, is_json=False):
+        async def _call():
+            self.calls += 1
+            return f"answer-{self.calls}"
+        return await self._with_response_cache(
+            "generate_content", prompt, {"is_json": is_json},
+            lambda: self._retry_with_backoff(self._rate_limited(_call, prompt))
+        )
+
+    async def generate_content_with_file(self, prompt, file_info, is_json=False):
+        raise NotImplementedError
+
+
+def test_client_hit_skips_call(tmp_path, monkeypatch):
+    """相同请求第二次直接命中缓存"""
+    monkeypatch.setattr(config, "MODEL_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(response_cache, "_response_cache",
+                        ResponseCache(tmp_path / "cache.db", max_size_bytes=1024 * 1024, ttl_seconds=3600))
+    client = FakeClient()
+
+    async def run():
+        first = await client.generate_content("prompt")
+        second = await client.generate_content("prompt")
+        third = await client.generate_content("prompt", is_json=True)
+        return first, second, third
+
+    assert asyncio.run(run()) == ("answer-1", "answer-1", "answer-2")
+    assert client.calls == 2
+
+
+def test_client_without_cache(monkeypatch):
+    """未启用缓存时每次都执行调用"""
+    monkeypatch.setattr(config, "MODEL_RESPONSE_CACHE_ENABLED", False)
+    client = FakeClient()
+
+    async def run():
+        await client.generate_content("prompt")
+        await client.generate_content("prompt")
+
+    asyncio.run(run())
+    assert client.calls == 2
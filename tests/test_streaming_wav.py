@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+流式 WAV 写入测试
+
+验证追加写入的文件在每次 checkpoint 后都是合法 WAV、最终内容与一次性
+组装的结果一致，以及写入完成后原子地替换为缓存中的完整音频。
+"""
+
+import sys
+import wave
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.infrastructure.audio.audio_utils import StreamingWavWriter, assemble_wav
+from reinvent_insight.services.audio_cache import AudioCache
+
+
+CHUNKS = [bytes([i]) * 4800 for i in range(1, 6)]
+
+
+def test_checkpoint_produces_valid_wav(tmp_path):
+    """checkpoint 之后文件头长度与已写入数据一致"""
+    writer = StreamingWavWriter(tmp_path / "partial.wav")
+    writer.append(CHUNKS[0])
+    writer.append(CHUNKS[1])
+    writer.checkpoint()
+
+    with wave.open(str(writer.path), "rb") as wav:
+        assert wav.getframerate() == 24000
+        assert wav.getnframes() == len(CHUNKS[0] + CHUNKS[1]) // 2
+    assert writer.duration == 0.2
+    writer.abort()
+    assert not (tmp_path / "partial.wav").exists()
+
+
+def test_finalize_matches_assemble_wav(tmp_path):
+    """流式写入的最终文件与 assemble_wav 字节一致，并替换已有目标文件"""
+    target = tmp_path / "final.wav"
+    target.write_bytes(b"stale")
+
+    writer = StreamingWavWriter(tmp_path / "partial.wav")
+    for chunk in CHUNKS:
+        writer.append(chunk)
+    assert writer.finalize(target) == target
+
+    assert target.read_bytes() == assemble_wav(CHUNKS)
+    assert not (tmp_path / "partial.wav").exists()
+
+
+def test_register_streamed_file(tmp_path):
+    """缓存登记流式写入的文件，重复登记刷新大小且保留访问计数"""
+    cache = AudioCache(tmp_path / "cache", max_size_mb=1)
+    writer = StreamingWavWriter(cache.get_file_path("h_partial"))
+    writer.append(CHUNKS[0])
+    writer.checkpoint()
+    cache.register("h_partial", writer.path, "t", "Kai", "Chinese", duration=writer.duration)
+    assert cache.get("h_partial") == writer.path
+
+    writer.append(CHUNKS[1])
+    writer.checkpoint()
+    cache.register("h_partial", writer.path, "t", "Kai", "Chinese", duration=writer.duration)
+    metadata = cache.get_metadata("h_partial")
+    assert metadata.file_size == writer.file_size
+    assert metadata.access_count == 1
+
+    final_path = writer.finalize(cache.get_file_path("h"))
+    cache.register("h", final_path, "t", "Kai", "Chinese", duration=writer.duration, is_pregenerated=True)
+    assert cache.invalidate("h_partial")
+    assert cache.get("h") == final_path
+    assert cache.get_cache_size() == writer.file_size
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✓ {name}")
@@ -2,17 +2,29 @@
 """
 字幕翻译功能测试脚本
 
-测试分段翻译英文字幕为中文的完整流程。
+测试分段翻译英文字幕为中文的完整流程、滚动式自动字幕去重与旧版逐轮合并
+算法结果一致，片段翻译调度的并发上限、失败重试和按序组装，以及重新翻译时
+只翻译内容变化或缺失的片段。
+
+直接运行本脚本会先输出去重的基准数据，再调用模型测试翻译：
+    python tests/test_subtitle_translation.py
 """
 
 import asyncio
+import random
 import sys
+import time
 from pathlib import Path
+from typing import Dict, List, Optional
 
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from reinvent_insight.services.subtitle_translation_service import get_subtitle_translation_service
+from reinvent_insight.services import subtitle_translation_service as translation_module
+from reinvent_insight.services.subtitle_translation_service import (
+    SubtitleTranslationService,
+    get_subtitle_translation_service,
+)
 
 
 # 测试用的简短 VTT 字幕
@@ -35,6 +47,287 @@ Lambda, API Gateway, and DynamoDB.
 """
 
 
+# YouTube 自动字幕：每条包含上一行和新的一行，中间夹着只含当前行的瞬时条目
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.160 --> 00:00:03.110 align:start position:0%
+ 
+hello<00:00:00.640><c> everyone</c><00:00:01.040><c> I'm</c><00:00:01.280><c> SAA</c><00:00:01.680><c> Ramis</c>
+
+00:00:03.110 --> 00:00:03.120 align:start position:0%
+hello everyone I'm SAA Ramis
+ 
+
+00:00:03.120 --> 00:00:06.230 align:start position:0%
+hello everyone I'm SAA Ramis
+and<00:00:03.360><c> I</c><00:00:03.480><c> lead</c><00:00:03.720><c> product</c><00:00:04.000><c> for</c><00:00:04.280><c> elastic</c><00:00:04.720><c> load</c><00:00:05.000><c> balancing</c>
+
+00:00:06.230 --> 00:00:06.240 align:start position:0%
+and I lead product for elastic load balancing
+ 
+
+00:00:06.240 --> 00:00:09.870 align:start position:0%
+and I lead product for elastic load balancing
+product for elastic load balancing and API Gateway today
+
+00:00:09.870 --> 00:00:09.880 align:start position:0%
+product for elastic load balancing and API Gateway today
+ 
+
+00:00:09.880 --> 00:00:12.500 align:start position:0%
+product for elastic load balancing and API Gateway today
+we'll<00:00:10.120><c> talk</c><00:00:10.400><c> about</c><00:00:10.680><c> serverless</c>
+"""
+
+
+def _legacy_find_overlap(text1: str, text2: str, min_overlap: int) -> Optional[str]:
+    """旧版重叠查找：从最长后缀开始逐个比较"""
+    for length in range(min(len(text1), len(text2)), min_overlap - 1, -1):
+        if text2.startswith(text1[-length:]):
+            return text1[-length:]
+    return None
+
+
+def _legacy_deduplicate(raw_cues: List[Dict]) -> List[Dict]:
+    """旧版滚动字幕去重：逐轮合并，直到某一轮不再减少条目"""
+    raw_cues = [dict(c) for c in raw_cues]
+    result = []
+    i = 0
+    while i < len(raw_cues):
+        current = raw_cues[i]
+        if i + 1 < len(raw_cues):
+            next_cue = raw_cues[i + 1]
+            if next_cue['text'].startswith(current['text']):
+                raw_cues[i + 1] = {'start': current['start'], 'end': next_cue['end'], 'text': next_cue['text']}
+                i += 1
+                continue
+            overlap = _legacy_find_overlap(current['text'], next_cue['text'], 15)
+            if overlap:
+                result.append(current)
+                raw_cues[i + 1] = {
+                    'start': next_cue['start'], 'end': next_cue['end'],
+                    'text': next_cue['text'][len(overlap):].strip()
+                }
+                i += 1
+                continue
+        result.append(current)
+        i += 1
+    result = [c for c in result if c['text'].strip()]
+    if len(result) < len(raw_cues):
+        return _legacy_deduplicate(result)
+    return result
+
+
+def _rolling_cues(lines: int, seed: int = 0) -> List[Dict]:
+    """生成 YouTube 风格的滚动字幕条目（约 3 秒一行）"""
+    rng = random.Random(seed)
+    words = ("lambda api gateway dynamodb serverless latency throughput region cluster "
+             "customers scale the and we our of to in for with build").split()
+
+    def ts(ms):
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+    cues = []
+    previous = ""
+    for k in range(lines):
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(5, 10)))
+        start = k * 3000
+        # 逐词出现的扩展条目
+        tokens = line.split()
+        for n in range(1, len(tokens) + 1, 3):
+            text = f"{previous} {' '.join(tokens[:n])}".strip()
+            cues.append({'start': ts(start), 'end': ts(start + 2990), 'text': text})
+        cues.append({'start': ts(start), 'end': ts(start + 2990), 'text': f"{previous} {line}".strip()})
+        cues.append({'start': ts(start + 2990), 'end': ts(start + 3000), 'text': line})
+        previous = line
+    return cues
+
+
+def test_rolling_dedup_matches_legacy():
+    """滚动字幕去重结果与旧版逐轮合并一致"""
+    service = SubtitleTranslationService()
+    # 关闭去重，取得解析后的原始条目
+    raw_parser = SubtitleTranslationService()
+    raw_parser._deduplicate_rolling_subtitles = lambda cues: cues
+    for vtt in (TEST_VTT, ROLLING_VTT):
+        raw = [{'start': c.start, 'end': c.end, 'text': c.text} for c in raw_parser.parse_vtt(vtt)]
+        assert service._deduplicate_rolling_subtitles(raw) == _legacy_deduplicate(raw)
+
+    cues = service.parse_vtt(ROLLING_VTT)
+    assert [c.text for c in cues] == [
+        "hello everyone I'm SAA Ramis and I lead product for elastic load balancing",
+        "and API Gateway today we'll talk about serverless",
+    ]
+    assert [(c.start, c.end) for c in cues] == [
+        ("00:00:03.110", "00:00:06.230"),
+        ("00:00:06.230", "00:00:12.500"),
+    ]
+
+    for seed in range(5):
+        raw = _rolling_cues(200, seed)
+        assert service._deduplicate_rolling_subtitles(raw) == _legacy_deduplicate(raw)
+
+    # 旧版在没有条目被合并时不再进行下一轮，已移除过重叠的字幕不会被再次截断
+    raw = [
+        {'start': str(i), 'end': str(i), 'text': text}
+        for i, text in enumerate([
+            'ab ab x x ab ab cd ab ab ab ab cd ab ab',
+            'b ab ab ab cd ab ab ab ab ab cd ab ab',
+            'b ab cd ab x ab ab ab',
+        ])
+    ]
+    deduplicated = service._deduplicate_rolling_subtitles(raw)
+    assert deduplicated == _legacy_deduplicate(raw)
+    assert [c['text'] for c in deduplicated][1] == 'ab ab ab cd ab ab'
+
+
+def test_find_overlap_matches_legacy():
+    """重叠查找返回最长的后缀-前缀重叠，与逐个后缀比较一致"""
+    service = SubtitleTranslationService()
+    cases = [
+        ("hello everyone I'm SAA Ramis and I lead product for elastic load balancing and",
+         "product for elastic load balancing and API Gateway"),
+        ("abc abc abc abc abc abc", "abc abc abc abc abc abc abc"),
+        ("short", "short text"),
+        ("no overlap at all here", "completely different text"),
+    ]
+    for text1, text2 in cases:
+        assert service._find_overlap(text1, text2, 15) == _legacy_find_overlap(text1, text2, 15)
+
+
+class ScheduledTranslationService(SubtitleTranslationService):
+    """模拟每个片段耗时不同、可指定失败次数的翻译服务"""
+
+    def __init__(self, latency=0.02, failures=None, scores=None, **translation_config):
+        super().__init__()
+        self._translation_config = {'chunk_size': 1, 'retry_backoff': 0.001, **translation_config}
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.scores = dict(scores or {})
+        self.attempts = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def _translate_chunk_once(self, cues, chunk_index, total_chunks, video_id=None):
+        self.attempts[chunk_index] = self.attempts.get(chunk_index, 0) + 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+            if self.failures.get(chunk_index, 0) > 0:
+                self.failures[chunk_index] -= 1
+                raise RuntimeError(f"片段 {chunk_index} 翻译失败")
+            for cue in cues:
+                cue.translated_text = f"译:{cue.text}"
+            return cues, self.scores.get(chunk_index, 100.0)
+        finally:
+            self.in_flight -= 1
+
+
+def _numbered_vtt(count: int) -> str:
+    blocks = [
+        f"00:{i // 60:02d}:{i % 60:02d}.000 --> 00:{i // 60:02d}:{i % 60:02d}.900\nline number {i}\n"
+        for i in range(count)
+    ]
+    return "WEBVTT\n\n" + "\n".join(blocks)
+
+
+def test_scheduler_bounded_and_ordered():
+    """在途片段数不超过上限，进度按完成顺序递增，结果按片段顺序组装"""
+    service = ScheduledTranslationService(max_concurrency=3)
+    progress = []
+
+    async def on_progress(current, total):
+        progress.append((current, total))
+
+    cues, _ = asyncio.run(service.translate_subtitles(_numbered_vtt(12), progress_callback=on_progress))
+    assert [c.translated_text for c in cues] == [f"译:line number {i}" for i in range(12)]
+    assert service.peak_in_flight == 3
+    assert progress == [(i, 12) for i in range(1, 13)]
+
+
+def test_scheduler_retries_failed_chunk():
+    """失败的片段单独重试，重试耗尽后保留原文"""
+    service = ScheduledTranslationService(max_concurrency=2, max_retries=2, failures={1: 2, 4: 5})
+    cues, _ = asyncio.run(service.translate_subtitles(_numbered_vtt(6)))
+    assert service.attempts == {0: 1, 1: 3, 2: 1, 3: 1, 4: 3, 5: 1}
+    assert cues[1].translated_text == "译:line number 1"
+    assert cues[4].translated_text == "line number 4"
+
+
+def test_scheduler_tracks_throughput():
+    """总耗时约为 片段数 / 并发上限 × 单片段耗时，不随片段序号线性增加启动等待"""
+    service = ScheduledTranslationService(latency=0.05, max_concurrency=4)
+    start = time.perf_counter()
+    asyncio.run(service.translate_subtitles(_numbered_vtt(16)))
+    elapsed = time.perf_counter() - start
+    # 16 段 / 4 并发 × 约 50ms ≈ 200ms；逐个执行约 800ms
+    assert elapsed < 0.5, f"elapsed={elapsed:.3f}s"
+
+
+def test_resume_from_chunk_checkpoints(tmp_path, monkeypatch):
+    """重新翻译时复用已成功的片段，只翻译失败或内容变化的片段，并清理过期检查点"""
+    monkeypatch.setattr(translation_module, "CHECKPOINT_DIR", tmp_path)
+    vtt = _numbered_vtt(6)
+
+    service = ScheduledTranslationService(max_concurrency=2, max_retries=0, failures={2: 1})
+    cues, _ = asyncio.run(service.translate_subtitles(vtt, video_id="vid"))
+    assert cues[2].translated_text == "line number 2"
+    assert len(list((tmp_path / "vid").iterdir())) == 5
+
+    # 失败后重试：只翻译上次失败的片段
+    service = ScheduledTranslationService(max_concurrency=2)
+    cues, _ = asyncio.run(service.translate_subtitles(vtt, video_id="vid"))
+    assert service.attempts == {2: 1}
+    assert [c.translated_text for c in cues] == [f"译:line number {i}" for i in range(6)]
+
+    # 字幕内容变化：只翻译变化的片段，旧检查点被清理
+    service = ScheduledTranslationService(max_concurrency=2)
+    asyncio.run(service.translate_subtitles(vtt.replace("line number 4", "line number four"), video_id="vid"))
+    assert service.attempts == {4: 1}
+    assert len(list((tmp_path / "vid").iterdir())) == 6
+
+    # 提示词版本变化：全部重新翻译
+    monkeypatch.setattr(translation_module, "SUBTITLE_PROMPT_VERSION", "next")
+    service = ScheduledTranslationService(max_concurrency=2)
+    asyncio.run(service.translate_subtitles(vtt, video_id="vid"))
+    assert len(service.attempts) == 6
+
+
+def test_low_quality_chunk_not_checkpointed(tmp_path, monkeypatch):
+    """修正后仍未达标的片段照常输出，但不保存检查点，下次翻译时重新生成"""
+    monkeypatch.setattr(translation_module, "CHECKPOINT_DIR", tmp_path)
+    vtt = _numbered_vtt(4)
+
+    service = ScheduledTranslationService(max_concurrency=2, scores={1: 60.0})
+    cues, _ = asyncio.run(service.translate_subtitles(vtt, video_id="vid"))
+    assert cues[1].translated_text == "译:line number 1"
+    assert len(list((tmp_path / "vid").iterdir())) == 3
+
+    service = ScheduledTranslationService(max_concurrency=2)
+    asyncio.run(service.translate_subtitles(vtt, video_id="vid"))
+    assert service.attempts == {1: 1}
+    assert len(list((tmp_path / "vid").iterdir())) == 4
+
+
+def benchmark_deduplication(lines: int = 1200) -> None:
+    """对比约一小时滚动字幕的去重耗时"""
+    service = SubtitleTranslationService()
+    raw = _rolling_cues(lines)
+    timings = {}
+    for name, dedup in (("旧版逐轮合并", _legacy_deduplicate),
+                        ("单次遍历", service._deduplicate_rolling_subtitles)):
+        start = time.perf_counter()
+        for _ in range(3):
+            deduplicated = dedup(raw)
+        timings[name] = (time.perf_counter() - start) / 3
+    print(f"滚动字幕去重: {len(raw)} 条 -> {len(deduplicated)} 条")
+    for name, elapsed in timings.items():
+        print(f"  {name}: {elapsed * 1000:.1f}ms")
+
+
 async def test_vtt_parsing():
     """测试 VTT 解析"""
     print("=" * 60)
@@ -102,6 +395,9 @@ async def main():
     """运行所有测试"""
     print("\n🚀 开始字幕翻译功能测试\n")
     
+    benchmark_deduplication()
+    print()
+    
     try:
         # 测试解析
         await test_vtt_parsing()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+文档缓存增量更新测试
+
+验证 HashRegistry / SummaryCache 按单个文件增量更新的正确性（包括版本重选），
+并通过基准测试确认单次更新的耗时与文档总数无关。
+
+直接运行本脚本可输出不同规模下的基准数据：
+    python tests/test_summary_cache_incremental.py
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from reinvent_insight.core import config
+from reinvent_insight.core.utils.file_utils import generate_doc_hash
+from reinvent_insight.services.document import metadata_index
+from reinvent_insight.services.document.metadata_index import MetadataIndex
+from reinvent_insight.services.document.hash_registry import get_registry
+from reinvent_insight.services.document.summary_cache import get_summary_cache
+
+
+def write_doc(output_dir: Path, filename: str, video_id: str, version: int = 0, title: str = "测试文档"):
+    """写入一篇带 YAML front matter 的测试文档"""
+    content = f"""---
+title_cn: {title}
+title_en: Test Document
+video_url: https://www.youtube.com/watch?v={video_id}
+upload_date: '2024-12-01'
+version: {version}
+---
+
+# {title}
+
+### 引言
+
+这是一段用于测试字数统计的中文内容。
+"""
+    (output_dir / filename).write_text(content, encoding="utf-8")
+
+
+def build_corpus(output_dir: Path, size: int):
+    """生成指定数量的测试文档"""
+    for i in range(size):
+        write_doc(output_dir, f"doc_{i:05d}.md", f"vid{i:08d}")
+
+
+def rebuild():
+    get_registry().init_mappings()
+    get_summary_cache().init_cache()
+
+
+def sorted_summaries():
+    """按文件名排序的摘要列表（测试文档标题相同，不能依赖标题排序）"""
+    return sorted(get_summary_cache().get_all_summaries(), key=lambda s: s["filename"])
+
+
+def apply_change(filename: str):
+    get_registry().apply_file_change(filename)
+    get_summary_cache().apply_file_change(filename)
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "summaries"
+    docs_dir.mkdir()
+    monkeypatch.setattr(config, "OUTPUT_DIR", docs_dir)
+    monkeypatch.setattr(metadata_index, "_metadata_index", MetadataIndex(tmp_path / "index.db"))
+    yield docs_dir
+    # 恢复全局单例的状态，避免影响其他测试
+    monkeypatch.undo()
+    rebuild()
+
+
+def test_version_reelection(output_dir):
+    """新增、删除版本时重新选举最新版本"""
+    write_doc(output_dir, "talk.md", "abcdefghijk", version=0, title="原始版本")
+    rebuild()
+
+    doc_hash = generate_doc_hash("https://www.youtube.com/watch?v=abcdefghijk")
+    registry = get_registry()
+    cache = get_summary_cache()
+    assert registry.get_filename(doc_hash) == "talk.md"
+
+    # 新增更高版本
+    write_doc(output_dir, "talk_v1.md", "abcdefghijk", version=1, title="新版本")
+    apply_change("talk_v1.md")
+    assert registry.get_filename(doc_hash) == "talk_v1.md"
+    assert registry.get_versions(doc_hash) == ["talk_v1.md", "talk.md"]
+    assert cache._cache[doc_hash]["title_cn"] == "新版本"
+    assert cache.document_count == 1
+
+    # 删除最新版本后回退到旧版本
+    (output_dir / "talk_v1.md").unlink()
+    apply_change("talk_v1.md")
+    assert registry.get_filename(doc_hash) == "talk.md"
+    assert cache._cache[doc_hash]["title_cn"] == "原始版本"
+
+    # 删除最后一个版本后文档消失
+    (output_dir / "talk.md").unlink()
+    apply_change("talk.md")
+    assert registry.get_filename(doc_hash) == ""
+    assert registry.get_hash("talk.md") == ""
+    assert doc_hash not in cache._cache
+
+
+def test_incremental_matches_full_rebuild(output_dir):
+    """增量更新的结果与全量重建一致"""
+    build_corpus(output_dir, 20)
+    rebuild()
+
+    write_doc(output_dir, "doc_00003_v2.md", "vid00000003", version=2, title="第二版")
+    apply_change("doc_00003_v2.md")
+    (output_dir / "doc_00007.md").unlink()
+    apply_change("doc_00007.md")
+
+    registry = get_registry()
+    incremental = (dict(registry.hash_to_filename), dict(registry.hash_to_versions))
+    incremental_summaries = sorted_summaries()
+
+    rebuild()
+    assert (dict(registry.hash_to_filename), dict(registry.hash_to_versions)) == incremental
+    assert sorted_summaries() == incremental_summaries
+
+
+def measure_update_cost(output_dir: Path, size: int, rounds: int = 20) -> float:
+    """返回在给定规模的语料上单次增量更新的平均耗时（秒）"""
+    for old_file in output_dir.glob("*.md"):
+        old_file.unlink()
+    build_corpus(output_dir, size)
+    rebuild()
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        filename = f"bench_{i}.md"
+        write_doc(output_dir, filename, f"bench{i:06d}")
+        apply_change(filename)
+    return (time.perf_counter() - start) / rounds
+
+
+def test_update_cost_independent_of_corpus_size(output_dir):
+    """单文件更新的耗时不随文档总数增长"""
+    small = measure_update_cost(output_dir, 50)
+    large = measure_update_cost(output_dir, 1000)
+    # 全量重建会带来约 20 倍的差距，这里留出充足的抖动余量
+    assert large < small * 5 + 0.005, f"small={small * 1000:.2f}ms large={large * 1000:.2f}ms"
+
+
+def main():
+    """输出不同规模下增量更新与全量重建的耗时对比"""
+    original_dir = config.OUTPUT_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        config.OUTPUT_DIR = Path(tmp) / "summaries"
+        config.OUTPUT_DIR.mkdir()
+        metadata_index._metadata_index = MetadataIndex(Path(tmp) / "index.db")
+        try:
+            print(f"{'文档数':>8} {'增量更新(ms)':>14} {'全量重建(ms)':>14}")
+            for size in (100, 1000, 3000):
+                incremental = measure_update_cost(config.OUTPUT_DIR, size)
+                start = time.perf_counter()
+                rebuild()
+                full = time.perf_counter() - start
+                print(f"{size:>8} {incremental * 1000:>14.2f} {full * 1000:>14.2f}")
+        finally:
+            config.OUTPUT_DIR = original_dir
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+任务事件推送测试
+
+验证多个订阅者同时接收同一任务的事件、Last-Event-ID 断线续传、
+环形缓冲限制历史长度，以及无事件时订阅者只产出心跳；
+已结束任务按保留策略移出内存后仍可查询摘要。
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.services.analysis import task_manager as task_manager_module
+from reinvent_insight.services.analysis.task_history import TaskHistoryStore
+from reinvent_insight.services.analysis.task_manager import TaskManager, TaskState
+
+
+def _new_manager(task_id="t1"):
+    manager = TaskManager()
+    manager.tasks[task_id] = TaskState(task_id=task_id, status="running")
+    return manager
+
+
+async def _collect(manager, task_id, last_event_id=0, heartbeat_interval=5.0):
+    events = []
+    async for event_id, payload in manager.subscribe(task_id, last_event_id, heartbeat_interval):
+        events.append((event_id, payload))
+    return events
+
+
+def test_fan_out_to_all_subscribers():
+    """同一任务的所有订阅者都收到全部事件，并在结果事件后结束"""
+    manager = _new_manager()
+
+    async def run():
+        subscribers = [asyncio.create_task(_collect(manager, "t1")) for _ in range(3)]
+        await asyncio.sleep(0)
+        await manager.send_message("step 1", "t1")
+        await manager.update_progress("t1", 50, "half")
+        await manager.send_result("标题", "正文", "t1", filename="a.md", doc_hash="abc")
+        return await asyncio.wait_for(asyncio.gather(*subscribers), timeout=1)
+
+    results = asyncio.run(run())
+    for events in results:
+        assert [payload["type"] for _, payload in events] == ["log", "progress", "result"]
+        assert [event_id for event_id, _ in events] == [1, 2, 3]
+        assert events[-1][1]["hash"] == "abc"
+    assert manager.tasks["t1"].subscribers == 0
+
+
+def test_resume_from_last_event_id():
+    """携带 Last-Event-ID 时只回放之后的事件"""
+    manager = _new_manager()
+
+    async def run():
+        for i in range(5):
+            await manager.send_message(f"log {i}", "t1")
+        await manager.set_task_error("t1", "失败")
+        return await _collect(manager, "t1", last_event_id=3)
+
+    events = asyncio.run(run())
+    assert [event_id for event_id, _ in events] == [4, 5, 6]
+    assert events[-1][1]["type"] == "error"
+
+
+def test_finished_task_with_cursor_at_end():
+    """客户端已收到结束事件后重连，订阅立即结束"""
+    manager = _new_manager()
+
+    async def run():
+        await manager.set_task_completed("t1", "/tmp/out.html")
+        return await asyncio.wait_for(_collect(manager, "t1", last_event_id=1), timeout=1)
+
+    assert asyncio.run(run()) == []
+
+
+def test_ring_buffer_bounds_history(monkeypatch):
+    """日志和事件历史有上限，超出后只保留最新部分"""
+    monkeypatch.setattr(task_manager_module, "TASK_EVENT_HISTORY", 10)
+    monkeypatch.setattr(task_manager_module, "TASK_LOG_HISTORY", 10)
+    manager = _new_manager()
+
+    async def run():
+        for i in range(50):
+            await manager.send_message(f"log {i}", "t1")
+        await manager.set_task_completed("t1")
+        return await _collect(manager, "t1")
+
+    events = asyncio.run(run())
+    state = manager.tasks["t1"]
+    assert len(state.logs) == 10 and state.logs[-1] == "log 49"
+    assert len(events) == 10
+    assert events[0][0] == 42 and events[-1][1]["type"] == "result"
+
+
+def test_idle_subscriber_only_heartbeats():
+    """没有新事件时只产出心跳，不轮询任务状态"""
+    manager = _new_manager()
+
+    async def run():
+        events = []
+        async for event_id, payload in manager.subscribe("t1", heartbeat_interval=0.02):
+            events.append((event_id, payload))
+            if len(events) == 3:
+                break
+        return events
+
+    events = asyncio.run(run())
+    assert events == [(None, {"type": "heartbeat"})] * 3
+
+
+def _use_history(monkeypatch, tmp_path):
+    store = TaskHistoryStore(tmp_path / "history.db", retention_days=1)
+    monkeypatch.setattr(task_manager_module, "get_task_history", lambda: store)
+    return store
+
+
+def test_evicts_oldest_finished_tasks(monkeypatch, tmp_path):
+    """已结束任务超过数量上限时，最早结束的任务被移出内存并保存摘要"""
+    store = _use_history(monkeypatch, tmp_path)
+    manager = TaskManager()
+    manager.max_finished_tasks = 2
+
+    async def run():
+        for i in range(4):
+            task_id = f"t{i}"
+            manager.tasks[task_id] = TaskState(task_id=task_id, status="running")
+            await manager.send_message(f"working {i}", task_id)
+            await manager.send_result(f"标题 {i}", "正文", task_id, filename=f"{i}.md", doc_hash=f"h{i}")
+        manager.tasks["running"] = TaskState(task_id="running", status="running")
+
+    asyncio.run(run())
+    assert set(manager.tasks) == {"t2", "t3", "running"}
+
+    summary = store.get("t0")
+    assert summary["status"] == "completed"
+    assert summary["logs"] == ["working 0"]
+    assert summary["final_event"]["hash"] == "h0"
+    assert manager.get_task_summary("t1")["result_title"] == "标题 1"
+    assert manager.get_task_summary("missing") is None
+
+
+def test_evicts_finished_tasks_by_age(monkeypatch, tmp_path):
+    """超过保留时间的已结束任务被移出，运行中的任务不受影响"""
+    _use_history(monkeypatch, tmp_path)
+    manager = TaskManager()
+    manager.max_finished_age = 60
+
+    async def run():
+        for task_id in ("done", "active"):
+            manager.tasks[task_id] = TaskState(task_id=task_id, status="running")
+        await manager.set_task_error("done", "失败")
+
+    asyncio.run(run())
+    assert manager.evict_finished_tasks(now=manager.tasks["done"].finished_at + 61) == ["done"]
+    assert set(manager.tasks) == {"active"}
+    assert manager.get_task_summary("done")["final_event"]["type"] == "error"
+
+
+def test_cancelled_task_is_evicted(monkeypatch, tmp_path):
+    """被取消的任务推送结束事件并记录结束时间，之后按保留策略移出内存"""
+    _use_history(monkeypatch, tmp_path)
+    manager = TaskManager()
+    manager.max_finished_age = 60
+
+    async def run():
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(10)
+
+        manager.create_task("visual", work())
+        await started.wait()
+        subscriber = asyncio.create_task(_collect(manager, "visual"))
+        await asyncio.sleep(0)
+        manager.tasks["visual"].task.cancel()
+        return await asyncio.wait_for(subscriber, timeout=1)
+
+    events = asyncio.run(run())
+    assert events[-1][1]["error_type"] == "cancelled"
+
+    state = manager.tasks["visual"]
+    assert state.status == "cancelled"
+    assert manager.evict_finished_tasks(now=state.finished_at + 61) == ["visual"]
+    assert manager.get_task_summary("visual")["status"] == "cancelled"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and func.__code__.co_argcount == 0:
+            func()
+            print(f"✓ {name}")
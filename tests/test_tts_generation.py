@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+TTS 生成去重测试
+
+验证同一音频哈希的并发请求只触发一次生成、后加入的订阅方先回放已生成的
+片段再跟随新片段，以及生成失败时所有订阅方都收到错误。
+"""
+
+import asyncio
+import base64
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.infrastructure.audio.audio_utils import assemble_wav
+from reinvent_insight.services.audio_cache import AudioCache
+from reinvent_insight.services.tts_generation import TTSGenerationRegistry
+
+PCM_CHUNKS = [bytes([i]) * 480 for i in range(1, 5)]
+
+
+class GatedTTSService:
+    """每个片段都等待放行的 TTS 服务，用于控制生成进度"""
+
+    def __init__(self, fail_after=None):
+        self.calls = 0
+        self.fail_after = fail_after
+        self.gate = asyncio.Semaphore(0)
+
+    def calculate_hash(self, text, voice, language):
+        return f"{text}-{voice}-{language}"
+
+    async def generate_audio_stream(self, text, voice=None, language=None, skip_code_blocks=True):
+        self.calls += 1
+        for i, chunk in enumerate(PCM_CHUNKS):
+            await self.gate.acquire()
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("模型调用失败")
+            yield base64.b64encode(chunk).decode()
+
+
+async def _collect(generation):
+    return [chunk async for chunk in generation.subscribe()]
+
+
+def test_concurrent_requests_share_one_generation(tmp_path):
+    """后加入的请求回放已有片段并跟随生成，只调用一次模型"""
+    cache = AudioCache(tmp_path)
+    registry = TTSGenerationRegistry()
+
+    async def run():
+        service = GatedTTSService()
+        first = registry.start(service, cache, "h", "text", "Kai", "Chinese")
+        early = asyncio.create_task(_collect(first))
+        for _ in range(2):
+            service.gate.release()
+        while first.chunk_count < 2:
+            await asyncio.sleep(0)
+
+        second = registry.start(service, cache, "h", "text", "Kai", "Chinese")
+        assert second is first
+        late = asyncio.create_task(_collect(second))
+        for _ in range(2):
+            service.gate.release()
+        results = await asyncio.gather(early, late)
+        await first.wait()
+        return service, first, results
+
+    service, generation, results = asyncio.run(run())
+    assert service.calls == 1
+    assert results == [PCM_CHUNKS, PCM_CHUNKS]
+    assert registry.get("h") is None
+    assert cache.get("h").read_bytes() == assemble_wav(PCM_CHUNKS)
+    assert not generation.path.exists()
+
+
+def test_failure_reaches_all_subscribers(tmp_path):
+    """生成失败时订阅方和等待方都收到异常，部分文件被删除"""
+    cache = AudioCache(tmp_path)
+    registry = TTSGenerationRegistry()
+
+    async def run():
+        service = GatedTTSService(fail_after=2)
+        generation = registry.start(service, cache, "h", "text", "Kai", "Chinese")
+        subscribers = [asyncio.create_task(_collect(generation)) for _ in range(2)]
+        for _ in range(3):
+            service.gate.release()
+        results = await asyncio.gather(*subscribers, generation.wait(), return_exceptions=True)
+        return generation, results
+
+    generation, results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not generation.path.exists()
+    assert registry.get("h") is None
+    assert cache.get("h") is None
+
+
+def test_store_in_other_cache(tmp_path):
+    """结果可以登记到另一个缓存目录并补充元数据"""
+    cache = AudioCache(tmp_path / "a")
+    other = AudioCache(tmp_path / "b")
+    registry = TTSGenerationRegistry()
+
+    async def run():
+        service = GatedTTSService()
+        generation = registry.start(service, cache, "h", "text", "Kai", "Chinese")
+        for _ in PCM_CHUNKS:
+            service.gate.release()
+        await generation.wait()
+        return generation
+
+    generation = asyncio.run(run())
+    path = generation.store_in(other, text_hash="t", voice="Kai", language="Chinese", article_hash="doc")
+    assert path.parent == tmp_path / "b"
+    assert other.find_by_article_hash("doc").duration == generation.duration
+    assert cache.get("h") is not None
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            with tempfile.TemporaryDirectory() as tmp:
+                func(Path(tmp))
+            print(f"✓ {name}")
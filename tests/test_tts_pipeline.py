@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+TTS 片段流水线合成测试
+
+验证多个片段同时在途时仍严格按顺序输出、在途数不超过上限、失败片段单独重试，
+并通过基准测试对比流水线与逐个合成的总耗时。
+
+直接运行本脚本可输出不同并发度下的基准数据：
+    python tests/test_tts_pipeline.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from reinvent_insight.infrastructure.ai.base_client import BaseModelClient
+from reinvent_insight.infrastructure.ai.config_models import APIError, ModelConfig, RateLimitPolicy
+from reinvent_insight.services.tts_service import TTSService
+
+
+class PipelineClient(BaseModelClient):
+    """模拟每个片段耗时不同的 TTS 客户端"""
+
+    def __init__(self, latency=0.02, failures=None, max_retries=3):
+        super().__init__(ModelConfig(
+            task_type="text_to_speech",
+            provider="fake",
+            model_name=f"tts-{id(self)}",
+            api_key="",
+            max_retries=max_retries,
+            retry_backoff_base=0.01,
+            rate_limit_policy=RateLimitPolicy(max_concurrency=16),
+        ))
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.calls = []
+        self.tts_calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def synthesize(self, segment):
+        self.calls.append(segment)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            # 片段耗时随机，后面的片段可能先完成
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+            if self.failures.get(segment, 0) > 0:
+                self.failures[segment] -= 1
+                raise RuntimeError(f"片段 {segment} 合成失败")
+            return f"audio:{segment}"
+        finally:
+            self.in_flight -= 1
+
+    async def run(self, segments, concurrency):
+        return [
+            (index, result)
+            async for index, result in self._pipeline_segments(segments, self.synthesize, concurrency)
+        ]
+
+    async def generate_tts_stream(self, text, voice, language):
+        self.tts_calls.append(text)
+        async for _, result in self._pipeline_segments(text.split(), self.synthesize, 3):
+            yield result
+
+    async def generate_content(self, prompt, is_json=False):
+        raise NotImplementedError
+
+    async def generate_content_with_file(self, prompt, file_info, is_json=False):
+        raise NotImplementedError
+
+
+SEGMENTS = [f"s{i}" for i in range(12)]
+
+
+def test_results_in_order_with_bounded_concurrency():
+    """结果严格按片段顺序输出，在途片段数不超过并发上限"""
+    client = PipelineClient()
+    results = asyncio.run(client.run(SEGMENTS, concurrency=4))
+    assert results == [(i, f"audio:{s}") for i, s in enumerate(SEGMENTS)]
+    assert client.peak_in_flight == 4
+
+
+def test_failed_segment_retried_alone():
+    """失败的片段单独重试，其他片段不会重新合成"""
+    client = PipelineClient(failures={"s3": 2})
+    results = asyncio.run(client.run(SEGMENTS, concurrency=3))
+    assert [result for _, result in results] == [f"audio:{s}" for s in SEGMENTS]
+    assert client.calls.count("s3") == 3
+    assert all(client.calls.count(s) == 1 for s in SEGMENTS if s != "s3")
+
+
+def test_exhausted_retries_cancel_remaining():
+    """片段重试耗尽后抛出异常，并取消其余在途片段"""
+    client = PipelineClient(failures={"s1": 5}, max_retries=2)
+
+    async def run():
+        received = []
+        with pytest.raises(APIError):
+            async for index, _ in client._pipeline_segments(SEGMENTS, client.synthesize, 3):
+                received.append(index)
+        await asyncio.sleep(client.latency * 2)
+        return received
+
+    assert asyncio.run(run()) == [0]
+    assert client.in_flight == 0
+    assert len(client.calls) < len(SEGMENTS)
+
+
+def test_long_text_pipelined_as_a_whole():
+    """超过 max_output_tokens 的长文本一次交给客户端，流水线不在分块边界处排空"""
+    client = PipelineClient()
+    client.config.max_output_tokens = 20
+    service = TTSService(client)
+    text = " ".join(SEGMENTS)
+
+    async def run():
+        return [chunk async for chunk in service.generate_audio_stream(text)]
+
+    assert asyncio.run(run()) == [f"audio:{s}" for s in SEGMENTS]
+    assert client.tts_calls == [text]
+    assert client.peak_in_flight == 3
+
+
+def measure(concurrency, latency=0.02, segments=SEGMENTS):
+    """返回合成全部片段的耗时（秒）"""
+    client = PipelineClient(latency=latency)
+    start = time.perf_counter()
+    asyncio.run(client.run(segments, concurrency))
+    return time.perf_counter() - start
+
+
+def test_pipeline_faster_than_sequential():
+    """流水线合成的总耗时明显小于逐个合成"""
+    sequential = measure(1)
+    pipelined = measure(4)
+    # 理论加速约 4 倍，这里留出充足的抖动余量
+    assert pipelined < sequential / 2, f"sequential={sequential:.3f}s pipelined={pipelined:.3f}s"
+
+
+def main():
+    """输出不同并发度下合成 60 个片段（每片段约 200ms）的耗时"""
+    segments = [f"s{i}" for i in range(60)]
+    baseline = measure(1, latency=0.2, segments=segments)
+    print(f"{'并发度':>6} {'总耗时(s)':>10} {'加速比':>8}")
+    print(f"{1:>6} {baseline:>10.2f} {1.0:>8.2f}")
+    for concurrency in (2, 3, 4, 8):
+        elapsed = measure(concurrency, latency=0.2, segments=segments)
+        print(f"{concurrency:>6} {elapsed:>10.2f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
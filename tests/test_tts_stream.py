@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+TTS 流式接口测试
+
+验证 /api/tts/stream 的 JSON SSE 事件、缓存命中时返回 cached 事件，
+Accept: audio/wav 时的二进制输出（缓存命中支持 Range），以及压缩缓存的
+媒体类型和时长。
+"""
+
+import base64
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.api.routes import tts_generate
+from reinvent_insight.infrastructure.audio.audio_utils import assemble_wav
+from reinvent_insight.services.audio_cache import AudioCache
+
+PCM_CHUNKS = [bytes([i]) * 4800 for i in range(1, 4)]
+
+
+class FakeTTSService:
+    """按固定片段返回音频的 TTS 服务"""
+
+    class config:
+        tts_default_voice = "Kai"
+        tts_default_language = "Chinese"
+
+    def __init__(self):
+        self.calls = 0
+
+    def calculate_hash(self, text, voice, language):
+        return hashlib.md5(f"{text}|{voice}|{language}".encode()).hexdigest()
+
+    async def generate_audio_stream(self, text, voice=None, language=None, skip_code_blocks=True):
+        self.calls += 1
+        for chunk in PCM_CHUNKS:
+            yield base64.b64encode(chunk).decode()
+
+
+def _client(tmp_path, monkeypatch):
+    service = FakeTTSService()
+    cache = AudioCache(tmp_path)
+    monkeypatch.setattr(tts_generate, "get_tts_service", lambda: service)
+    monkeypatch.setattr(tts_generate, "get_audio_cache", lambda: cache)
+    app = FastAPI()
+    app.include_router(tts_generate.router)
+    return TestClient(app), service, cache
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+REQUEST = {"article_hash": "doc", "text": "你好"}
+
+
+def test_sse_generation_then_cached(tmp_path, monkeypatch):
+    """首次生成发送 JSON 编码的 chunk/complete 事件，再次请求返回 cached 事件"""
+    client, service, cache = _client(tmp_path, monkeypatch)
+
+    events = _events(client.post("/api/tts/stream", json=REQUEST).text)
+    assert [name for name, _ in events] == ["chunk", "chunk", "chunk", "complete"]
+    assert events[0][1]["index"] == 1
+    assert base64.b64decode(events[0][1]["data"]) == PCM_CHUNKS[0]
+    audio_hash = events[-1][1]["audio_hash"]
+    assert cache.get(audio_hash).read_bytes() == assemble_wav(PCM_CHUNKS)
+    assert list(tmp_path.glob("*_stream_*")) == []
+
+    events = _events(client.post("/api/tts/stream", json=REQUEST).text)
+    assert events == [("cached", {
+        "audio_url": f"/api/tts/cache/{audio_hash}",
+        "audio_hash": audio_hash,
+        "duration": events[0][1]["duration"],
+    })]
+    assert service.calls == 1
+
+
+def test_binary_mode(tmp_path, monkeypatch):
+    """Accept: audio/wav 时未命中输出 WAV 流，命中时返回支持 Range 的文件"""
+    client, service, _ = _client(tmp_path, monkeypatch)
+    headers = {"Accept": "audio/wav"}
+
+    live = client.post("/api/tts/stream", json=REQUEST, headers=headers)
+    assert live.headers["content-type"] == "audio/wav"
+    assert live.content[:4] == b"RIFF" and live.content[44:] == b"".join(PCM_CHUNKS)
+
+    ranged = client.post("/api/tts/stream", json=REQUEST, headers={**headers, "Range": "bytes=44-99"})
+    assert ranged.status_code == 206
+    assert ranged.content == b"".join(PCM_CHUNKS)[:56]
+    assert ranged.headers["x-audio-hash"] == live.headers["x-audio-hash"]
+    assert service.calls == 1
+
+
+def test_compressed_cache_hit(tmp_path, monkeypatch):
+    """压缩缓存命中时按实际格式返回，时长取自元数据"""
+    client, service, cache = _client(tmp_path, monkeypatch)
+    audio_hash = service.calculate_hash(REQUEST["text"], "Kai", "Chinese")
+    mp3_path = tmp_path / f"{audio_hash}.mp3"
+    mp3_path.write_bytes(b"ID3" + b"\x00" * 100)
+    cache.register(audio_hash, mp3_path, "t", "Kai", "Chinese", duration=12.5)
+
+    events = _events(client.post("/api/tts/stream", json=REQUEST).text)
+    assert events == [("cached", {
+        "audio_url": f"/api/tts/cache/{audio_hash}", "audio_hash": audio_hash, "duration": 12.5
+    })]
+
+    response = client.post("/api/tts/stream", json=REQUEST, headers={"Accept": "audio/*"})
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.content == mp3_path.read_bytes()
+    assert service.calls == 0
+
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+可视化 HTML 分发测试
+
+验证 /api/article/{doc_hash}/visual 返回替换为本地路径的 HTML、按
+Accept-Encoding 返回 brotli/gzip 压缩版本、If-None-Match 命中时返回 304，
+以及文件更新后缓存失效。
+"""
+
+import gzip
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.api.routes import visual
+from reinvent_insight.core import config
+from reinvent_insight.core.utils.http_utils import choose_encoding, etag_matches
+from reinvent_insight.services.document import visual_html_cache
+from reinvent_insight.services.document.visual_html_cache import VisualHTMLCache
+
+VISUAL_HTML = (
+    '<html><head>'
+    '<script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>'
+    '<link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">'
+    '</head><body>' + '<p>可视化解读</p>' * 500 + '</body></html>'
+)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setitem(visual.hash_to_filename, "doc1", "article.md")
+    cache = VisualHTMLCache(max_entries=4)
+    monkeypatch.setattr(visual, "get_visual_html_cache", lambda: cache)
+    (tmp_path / "article_visual.html").write_text(VISUAL_HTML, encoding="utf-8")
+    app = FastAPI()
+    app.include_router(visual.router)
+    return TestClient(app), cache, tmp_path / "article_visual.html"
+
+
+def _get(client, **headers):
+    return client.get("/api/article/doc1/visual", headers=headers)
+
+
+def test_rewrites_and_compresses(client):
+    """CDN 链接替换为本地路径，按 Accept-Encoding 返回压缩版本"""
+    client, cache, _ = client
+    plain = _get(client, **{"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert "/js/vendor/chart.umd.min.js" in plain.text
+    assert "/css/vendor/fontawesome/all.min.css" in plain.text
+    assert "cdn.jsdelivr.net/npm/chart.js" not in plain.text
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    gzipped = _get(client, **{"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.text == plain.text
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+
+    entry = cache.peek(Path(config.OUTPUT_DIR) / "article_visual.html")
+    assert len(entry.bodies["gzip"]) < len(entry.bodies[None]) / 5
+    assert gzip.decompress(entry.bodies["gzip"]) == entry.bodies[None]
+    if visual_html_cache.brotli is not None:
+        br = _get(client, **{"Accept-Encoding": "gzip, br"})
+        assert br.headers["content-encoding"] == "br"
+        assert visual_html_cache.brotli.decompress(entry.bodies["br"]) == entry.bodies[None]
+
+    # 文件只处理一次
+    assert cache.misses == 1
+
+
+def test_not_modified_until_file_changes(client):
+    """If-None-Match 命中时返回 304，文件更新后返回新内容"""
+    client, _, path = client
+    first = _get(client, **{"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+
+    cached = _get(client, **{"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    path.write_text(VISUAL_HTML.replace("可视化解读", "新版本"), encoding="utf-8")
+    mtime = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+    updated = _get(client, **{"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert updated.status_code == 200
+    assert "新版本" in updated.text
+    assert updated.headers["etag"] != etag
+
+
+def test_missing_visual_returns_404(client):
+    client, _, path = client
+    path.unlink()
+    assert _get(client).status_code == 404
+
+
+def test_http_utils():
+    assert choose_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding(None, ["gzip"]) is None
+    assert etag_matches('W/"abc", "def"', ['"abc"'])
+    assert etag_matches("*", ['"x"'])
+    assert not etag_matches('"abc"', ['"abd"'])
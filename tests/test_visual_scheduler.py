@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+可视化解读调度器测试
+
+验证积压扫描只处理缺少 HTML 的文档、新文档优先于积压文档、并发数与积压
+清理模式的限制、失败重试次数持久化，以及文件删除后清理状态。
+生成任务由测试替换为写入 HTML 的假实现，不调用模型。
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reinvent_insight.core import config
+from reinvent_insight.infrastructure.file_system import watcher as fs_watcher
+from reinvent_insight.services.analysis import visual_watcher
+from reinvent_insight.services.analysis.visual_store import STATUS_DONE, STATUS_FAILED, VisualStateStore
+from reinvent_insight.services.analysis.visual_watcher import PRIORITY_NEW, VisualInterpretationWatcher
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "summaries"
+    docs_dir.mkdir()
+    monkeypatch.setattr(fs_watcher, "start_watching", lambda path, callback: None)
+    monkeypatch.setattr(visual_watcher.task_manager, "get_running_tasks_count", lambda: 0)
+    return docs_dir
+
+
+def write_doc(output_dir: Path, name: str, age: int = 0, with_html: bool = False) -> Path:
+    """写入深度解读（age 越大修改时间越早），可选同时写入可视化 HTML"""
+    md_file = output_dir / f"{name}.md"
+    md_file.write_text(f"# {name}\n", encoding="utf-8")
+    mtime = 1_700_000_000_000_000_000 - age * 1_000_000_000
+    os.utime(md_file, ns=(mtime, mtime))
+    if with_html:
+        (output_dir / f"{name}_visual.html").write_text("<html></html>", encoding="utf-8")
+    return md_file
+
+
+class FakeGeneration:
+    """记录调用顺序与并发数的假生成任务"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.order = []
+        self.active = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, md_file: Path, task_dir=None):
+        self.order.append(md_file.stem)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.release.wait()
+            await asyncio.sleep(0.02)
+        finally:
+            self.active -= 1
+        if self.fail:
+            return False, "模型调用失败"
+        md_file.with_name(f"{md_file.stem}_visual.html").write_text("<html>ok</html>", encoding="utf-8")
+        return True, None
+
+
+async def wait_until(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("等待超时")
+        await asyncio.sleep(0.01)
+
+
+def make_watcher(output_dir: Path, **kwargs) -> VisualInterpretationWatcher:
+    store = VisualStateStore(output_dir.parent / "visual_state.db")
+    return VisualInterpretationWatcher(output_dir, "test-model", store=store, **kwargs)
+
+
+def test_new_documents_jump_backlog(output_dir):
+    """积压按修改时间从新到旧处理，运行期间到达的新文档插队；已有 HTML 的文档不生成"""
+    write_doc(output_dir, "old", age=3)
+    write_doc(output_dir, "newer", age=1)
+    write_doc(output_dir, "middle", age=2)
+    write_doc(output_dir, "finished", age=0, with_html=True)
+
+    async def scenario():
+        watcher = make_watcher(output_dir, max_concurrent=1, backlog_drain=False)
+        fake = FakeGeneration()
+        fake.release.clear()
+        watcher._run_generation = fake
+        runner = asyncio.create_task(watcher.start_watching())
+
+        await wait_until(lambda: fake.order == ["newer"])
+        watcher.submit(write_doc(output_dir, "fresh"), PRIORITY_NEW)
+        fake.release.set()
+        await wait_until(lambda: watcher.completed == 4)
+
+        watcher.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        return watcher, fake
+
+    watcher, fake = asyncio.run(scenario())
+    assert fake.order == ["newer", "fresh", "middle", "old"]
+    assert watcher.store.get("finished.md").status == STATUS_DONE
+    assert watcher.store.count_by_status() == {STATUS_DONE: 5}
+    # 全部完成后重新扫描不再有积压
+    assert make_watcher(output_dir)._scan_backlog() == []
+
+
+@pytest.mark.parametrize("drain, expected_peak", [(False, 1), (True, 3)])
+def test_backlog_concurrency(output_dir, monkeypatch, drain, expected_peak):
+    """默认模式积压逐个生成；积压清理模式在模型未饱和时占满并发名额"""
+    for i in range(6):
+        write_doc(output_dir, f"doc{i}", age=i)
+    monkeypatch.setattr(VisualInterpretationWatcher, "_model_saturated", lambda self: False)
+
+    async def scenario():
+        watcher = make_watcher(output_dir, max_concurrent=3, backlog_drain=drain)
+        fake = FakeGeneration()
+        watcher._run_generation = fake
+        runner = asyncio.create_task(watcher.start_watching())
+        await wait_until(lambda: watcher.completed == 6)
+        watcher.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        return fake
+
+    assert asyncio.run(scenario()).peak == expected_peak
+
+
+def test_resubmitted_running_document_does_not_block_queue(output_dir):
+    """正在生成的文档被再次提交时暂存，结束后重新生成，期间其他文档照常处理"""
+    slow_file = write_doc(output_dir, "slow")
+
+    async def scenario():
+        watcher = make_watcher(output_dir, max_concurrent=2)
+        fake = FakeGeneration()
+        slow_release = asyncio.Event()
+        order = []
+
+        async def generation(md_file, task_dir=None):
+            order.append(md_file.stem)
+            first_slow_run = md_file.stem == "slow" and order.count("slow") == 1
+            if first_slow_run:
+                await slow_release.wait()
+            result = await fake(md_file, task_dir)
+            if first_slow_run:
+                # 模拟生成期间文档被更新：旧版本的 HTML 作废，需要重新生成
+                md_file.with_name("slow_visual.html").unlink()
+            return result
+
+        watcher._run_generation = generation
+        runner = asyncio.create_task(watcher.start_watching())
+        await wait_until(lambda: "slow.md" in watcher._running)
+
+        watcher.submit(slow_file, PRIORITY_NEW)
+        watcher.submit(write_doc(output_dir, "other"), PRIORITY_NEW)
+        await wait_until(lambda: watcher.completed == 1, timeout=1.0)
+        assert order == ["slow", "other"]
+
+        slow_release.set()
+        await wait_until(lambda: watcher.completed == 3)
+        watcher.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        return watcher, order
+
+    watcher, order = asyncio.run(scenario())
+    assert order == ["slow", "other", "slow"]
+    assert watcher.get_stats()["queued"] == 0
+
+
+def test_failures_are_retried_then_recorded(output_dir, monkeypatch):
+    """失败后按积压优先级重试，达到上限后记录失败，文件更新后重新入队"""
+    monkeypatch.setattr(config, "VISUAL_MAX_ATTEMPTS", 2)
+    md_file = write_doc(output_dir, "broken")
+
+    async def scenario():
+        watcher = make_watcher(output_dir, max_concurrent=1)
+        fake = FakeGeneration(fail=True)
+        watcher._run_generation = fake
+        runner = asyncio.create_task(watcher.start_watching())
+        await wait_until(lambda: watcher.failed == 2)
+        await asyncio.sleep(0.05)
+        watcher.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await runner
+        return watcher, fake
+
+    watcher, fake = asyncio.run(scenario())
+    assert fake.order == ["broken", "broken"]
+    record = watcher.store.get("broken.md")
+    assert (record.status, record.attempts, record.error) == (STATUS_FAILED, 2, "模型调用失败")
+
+    # 重启后同一版本不再自动重试；文件更新后重新入队
+    assert make_watcher(output_dir)._scan_backlog() == []
+    os.utime(md_file)
+    assert make_watcher(output_dir)._scan_backlog() == ["broken.md"]
+
+
+def test_deleted_document_is_dropped(output_dir):
+    md_file = write_doc(output_dir, "gone")
+
+    async def scenario():
+        watcher = make_watcher(output_dir)
+        watcher.store.mark_running("gone.md", md_file.stat())
+        watcher.submit(md_file)
+        md_file.unlink()
+        watcher._on_file_changed(md_file)
+        return watcher
+
+    watcher = asyncio.run(scenario())
+    assert watcher.get_stats()["queued"] == 0
+    assert watcher.store.get("gone.md") is None
@@ -271,7 +271,7 @@ export default {
                 // Trigger download
                 const link = document.createElement('a');
                 link.href = downloadUrl;
-                link.download = `audio_${this.articleHash}.wav`;
+                link.download = `audio_${this.articleHash}.${data.audio_format || 'wav'}`;
                 document.body.appendChild(link);
                 link.click();
                 document.body.removeChild(link);
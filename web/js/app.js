@@ -212,6 +212,7 @@ const app = createApp({
     const reconnectTimer = ref(null);
     const currentTaskId = ref(null);
     const currentEventSource = ref(null);
+    let lastSseEventId = 0; // 已收到的最后一个 SSE 事件ID，重连时从此处继续
 
     const MAX_RECONNECT_ATTEMPTS = 5;
     const BASE_RECONNECT_DELAY = 3000;
@@ -980,8 +981,19 @@ const app = createApp({
       // 构建 SSE URL，包含认证 token
       // EventSource 不支持自定义 Header，所以通过查询参数传递 token
       const token = localStorage.getItem('authToken');
-      const sseUrl = token
-        ? `/api/tasks/${taskId}/stream?token=${encodeURIComponent(token)}`
+      if (!isReconnect) {
+        lastSseEventId = 0;
+      }
+      const params = new URLSearchParams();
+      if (token) {
+        params.set('token', token);
+      }
+      if (lastSseEventId > 0) {
+        params.set('last_event_id', String(lastSseEventId));
+      }
+      const query = params.toString();
+      const sseUrl = query
+        ? `/api/tasks/${taskId}/stream?${query}`
         : `/api/tasks/${taskId}/stream`;
 
 
@@ -1009,6 +1021,9 @@ const app = createApp({
       eventSource.addEventListener('message', (event) => {
         try {
           const data = JSON.parse(event.data);
+          if (event.lastEventId) {
+            lastSseEventId = Number(event.lastEventId);
+          }
 
           if (data.type === 'result') {
             // 处理结果消息